@@ -5,12 +5,13 @@ from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_limiter.errors import RateLimitExceeded
-from flask_caching import Cache
 from flask_swagger_ui import get_swaggerui_blueprint
 import os
 from datetime import datetime, timedelta
 import uuid
 import json
+import re
+import time
 import logging
 import traceback
 
@@ -24,7 +25,25 @@ from utils.validators import (
 from utils.helpers import (
     serialize_firestore_doc, 
     serialize_firestore_timestamp,
-    get_user_id_from_token
+    to_json_value,
+    get_user_id_from_token,
+    fetch_page,
+    get_documents
+)
+from utils.stats import USER_STATS_COLLECTION, ensure_user_stats, stats_update, stats_summary
+from utils.response_cache import ResponseCache
+from utils.token_cache import TokenCache, LastLoginThrottle
+from utils.appointments import (
+    STATUS_PRIORITY, queue_query, serialize_appointment, status_count_calls, status_priority
+)
+from utils.doctor_patients import (
+    patients_collection, count_patients, update_appointment_status, rebuild_doctor_patients
+)
+from utils.firestore_reads import get_snapshots, run_parallel
+from utils.json_provider import FirestoreJSONProvider
+from utils.sharing import (
+    SHARED_COLLECTION, share_snapshot, public_analysis, share_etag, cache_max_age,
+    expiry_timestamp, find_legacy_share, migrate_share
 )
 
 # Configure logging
@@ -38,6 +57,8 @@ logger = logging.getLogger(__name__)
 CRED_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'firebase_credentials.json'))
 
 app = Flask(__name__)
+# Firestore değerlerini (timestamp, GeoPoint, referans) dönüştüren, orjson varsa onu kullanan JSON provider
+app.json = FirestoreJSONProvider(app)
 
 # CORS yapılandırması - Sadece belirli origin'lere izin ver
 # Environment variable'dan CORS origins al, yoksa varsayılanları kullan
@@ -49,6 +70,7 @@ else:
     # Varsayılan origins
     CORS_ORIGINS = [
         "http://localhost:3000",
+        "http://localhost:3001",  # landing-page (next dev -p 3001)
         "http://localhost:8080",
         "http://127.0.0.1:5500",
         "http://127.0.0.1:3000",
@@ -124,11 +146,17 @@ def handle_internal_error(e):
         "error_code": "INTERNAL_ERROR"
     }), 500
 
-# Caching - API response cache
-cache = Cache(app, config={
-    'CACHE_TYPE': 'simple',
-    'CACHE_DEFAULT_TIMEOUT': 300  # 5 dakika
-})
+# Caching - kullanıcı bazlı API response cache (uid + endpoint + query parametreleri)
+# Yazan endpoint'ler ilgili scope'u invalidate eder; RESPONSE_CACHE_* env değişkenleri
+response_cache = ResponseCache.from_env()
+
+# Doğrulanmış ID token cache'i (token exp'ine kadar, en fazla TOKEN_CACHE_MAX_AGE) ve
+# lastLogin yazımlarını kullanıcı başına LAST_LOGIN_WRITE_INTERVAL dakikada bire indiren throttle
+token_cache = TokenCache.from_env()
+last_login_throttle = LastLoginThrottle.from_env()
+
+# Public paylaşım yanıtlarının Cache-Control max-age üst sınırı (saniye); expiresAt'i asla aşmaz
+SHARE_CACHE_MAX_AGE = int(os.environ.get('SHARE_CACHE_MAX_AGE', '3600'))
 
 if not firebase_admin._apps:
     cred = credentials.Certificate(CRED_PATH)
@@ -166,7 +194,7 @@ def verify_token():
             return error, status
     """
     try:
-        uid = get_user_id_from_token(request)
+        uid = get_user_id_from_token(request, token_cache=token_cache)
         return uid, None, None
     except AuthenticationError as e:
         return None, jsonify({
@@ -182,6 +210,24 @@ def verify_token():
             "error_code": "AUTH_ERROR"
         }), 401
 
+def analysis_summary(analysis_data):
+    """Favori listesinde gösterilen analiz alanları (favori dokümanına kopyalanır)"""
+    return {
+        'diseaseType': analysis_data.get('diseaseType'),
+        'topPrediction': analysis_data.get('topPrediction', ''),
+        'imageUrl': analysis_data.get('imageUrl', ''),
+        'createdAt': analysis_data.get('createdAt')
+    }
+
+def appointments_cache_owner(specialty):
+    """Doktor randevu listesinin cache sahibi (uzmanlık alanı; alanı olmayan doktorlar tümünü görür)"""
+    return f"doctorType:{specialty or '*'}"
+
+def invalidate_appointments_cache(doctor_type):
+    """Randevu değişince o uzmanlık alanının ve tüm randevuları gören doktorların cache'ini düşür"""
+    response_cache.invalidate(appointments_cache_owner(doctor_type), 'doctor_appointments')
+    response_cache.invalidate(appointments_cache_owner(None), 'doctor_appointments')
+
 # ============================================================================
 # AUTH ENDPOINTS (Mevcut)
 # ============================================================================
@@ -209,6 +255,8 @@ def register():
             }
         })
         
+        response_cache.invalidate(user.uid, 'profile', 'stats')
+        
         return jsonify({"success": True, "uid": user.uid}), 200
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 400
@@ -219,11 +267,13 @@ def verify():
     data = request.get_json()
     id_token = data.get("idToken")
     try:
-        decoded = auth.verify_id_token(id_token)
+        decoded = token_cache.verify(id_token, auth.verify_id_token)
         
-        # Son giriş zamanını güncelle
-        user_ref = db.collection('users').document(decoded['uid'])
-        user_ref.update({'lastLogin': firestore.SERVER_TIMESTAMP})
+        # Son giriş zamanını güncelle (kullanıcı başına en fazla LAST_LOGIN_WRITE_INTERVAL dakikada bir)
+        if last_login_throttle.should_write(decoded['uid']):
+            user_ref = db.collection('users').document(decoded['uid'])
+            user_ref.update({'lastLogin': firestore.SERVER_TIMESTAMP})
+            response_cache.invalidate(decoded['uid'], 'profile')
         
         return jsonify({"success": True, "uid": decoded["uid"]}), 200
     except Exception as e:
@@ -244,6 +294,13 @@ def save_analysis():
         results (list): Analiz sonuçları listesi
         topPrediction (str): En yüksek tahmin
         imageUrl (str, opsiyonel): Görüntü URL'si
+        topConfidence (float, opsiyonel): En yüksek tahminin olasılığı
+        gradcamUrl (str, opsiyonel): Grad-CAM görüntüsü (URL veya data URL)
+        userEmail (str, opsiyonel): Kullanıcı e-postası
+    
+    Landing page analizleri de bu endpoint üzerinden kaydeder (firestore.rules
+    istemci tarafında analiz oluşturmayı reddeder), böylece userStats her
+    analizde artırılır.
     
     Returns:
         JSON: {
@@ -266,6 +323,9 @@ def save_analysis():
         results = validate_analysis_results(data.get("results", []))
         top_prediction = data.get("topPrediction", "")
         image_url = data.get("imageUrl", "")
+        top_confidence = data.get("topConfidence")
+        gradcam_url = data.get("gradcamUrl")
+        user_email = data.get("userEmail")
         
         # Validate top_prediction is a string
         if top_prediction and not isinstance(top_prediction, str):
@@ -275,6 +335,15 @@ def save_analysis():
         if image_url and not isinstance(image_url, str):
             raise ValidationError("imageUrl must be a string")
         
+        # Opsiyonel landing page alanları
+        if top_confidence is not None and (isinstance(top_confidence, bool)
+                                           or not isinstance(top_confidence, (int, float))):
+            raise ValidationError("topConfidence must be a number")
+        if gradcam_url is not None and not isinstance(gradcam_url, str):
+            raise ValidationError("gradcamUrl must be a string")
+        if user_email is not None and not isinstance(user_email, str):
+            raise ValidationError("userEmail must be a string")
+        
     except ValidationError as e:
         raise  # Re-raise to be handled by error handler
     except Exception as e:
@@ -292,14 +361,14 @@ def save_analysis():
             'topPrediction': top_prediction,
             'createdAt': firestore.SERVER_TIMESTAMP
         }
-        analysis_ref.set(analysis_data)
-        
-        # Kullanıcı istatistiklerini güncelle
-        try:
-            update_user_stats(uid, disease_type)
-        except Exception as e:
-            logger.warning(f"Failed to update user stats: {str(e)}")
-            # Don't fail the request if stats update fails
+        optional_fields = {'topConfidence': top_confidence, 'gradcamUrl': gradcam_url, 'userEmail': user_email}
+        analysis_data.update({key: value for key, value in optional_fields.items() if value is not None})
+        # Analiz ve istatistik artışı tek batch'te yazılır (ikisi birlikte uygulanır ya da hiçbiri)
+        batch = db.batch()
+        batch.set(analysis_ref, analysis_data)
+        update_user_stats(uid, disease_type, batch=batch)
+        batch.commit()
+        response_cache.invalidate(uid, 'analyses', 'stats')
         
         # Response için createdAt'i datetime olarak ekle (SERVER_TIMESTAMP JSON'a çevrilemez)
         response_data = {
@@ -310,6 +379,7 @@ def save_analysis():
             'topPrediction': top_prediction,
             'createdAt': serialize_firestore_timestamp(current_time)
         }
+        response_data.update({key: value for key, value in optional_fields.items() if value is not None})
         
         return jsonify({
             "success": True,
@@ -326,13 +396,18 @@ def save_analysis():
 @limiter.limit("30 per minute")  # Dakikada max 30 sorgu
 def get_analyses():
     """
-    Kullanıcının analiz geçmişini getir (Pagination destekli)
+    Kullanıcının analiz geçmişini getir (keyset pagination, en yeni önce)
+    
+    Sorgu createdAt'e göre Firestore'da sıralanır ve her sayfa için sadece
+    per_page + 1 doküman okunur (firestore.indexes.json'daki composite
+    index'ler gerekli).
     
     Query Parameters:
-        page (int): Sayfa numarası (varsayılan: 1)
         per_page (int): Sayfa başına kayıt sayısı (varsayılan: 20, max: 100)
         diseaseType (str): Hastalık türü filtresi (opsiyonel)
-        last_doc_id (str): Son doküman ID'si (cursor-based pagination için)
+        last_doc_id (str): Önceki yanıtın next_cursor değeri (sonraki sayfa için)
+        page (int): Sayfa numarası - sadece last_doc_id yoksa kullanılır
+            (offset ile atlanır, yeni istemciler cursor kullanmalı)
     
     Returns:
         JSON: {
@@ -342,7 +417,7 @@ def get_analyses():
             "page": int,
             "per_page": int,
             "has_more": bool,
-            "next_cursor": str (opsiyonel)
+            "next_cursor": str (has_more ise)
         }
     """
     uid, error_response, status_code = verify_token()
@@ -355,56 +430,41 @@ def get_analyses():
         # limit parametresi de destekleniyor (frontend uyumluluğu için)
         limit_param = request.args.get('limit') or request.args.get('per_page', '20')
         per_page = min(int(limit_param), 100)  # Max 100
+        page, per_page = validate_pagination_params(page, per_page)
         disease_type = request.args.get('diseaseType', None)
+        if disease_type:
+            disease_type = validate_disease_type(disease_type)
         last_doc_id = request.args.get('last_doc_id', None)
-        
-        # Query oluştur
-        # Firestore index gereksinimini önlemek için önce tüm analizleri al, sonra sırala
+    except ValidationError:
+        raise
+    except (TypeError, ValueError):
+        raise ValidationError("page and per_page must be integers")
+    
+    # Sadece ilk sayfa cache'lenir (dashboard yenilemeleri); cursor'lı sayfalar her zaman Firestore'dan
+    cacheable = not last_doc_id and page == 1
+    if cacheable:
+        cached, cache_generation = response_cache.lookup(uid, 'analyses', request.args)
+        if cached is not None:
+            return jsonify(cached), 200
+    
+    try:
         query = db.collection('analyses').where('userId', '==', uid)
-        
         if disease_type:
             query = query.where('diseaseType', '==', disease_type)
+        query = query.order_by('createdAt', direction=firestore.Query.DESCENDING)
         
-        # Tüm sonuçları al (limit olmadan)
-        all_docs = list(query.stream())
-        
-        # Memory'de sırala (Firestore index gereksinimini önler)
-        def get_timestamp(doc):
-            data = doc.to_dict()
-            created_at = data.get('createdAt')
-            if hasattr(created_at, 'timestamp'):
-                return created_at.timestamp()
-            elif isinstance(created_at, (int, float)):
-                return created_at
-            else:
-                return 0  # Varsayılan olarak en eski
-        
-        all_docs.sort(key=get_timestamp, reverse=True)
-        
-        # Pagination uygula
-        start_idx = (page - 1) * per_page
-        end_idx = start_idx + per_page + 1  # has_more kontrolü için +1
-        
-        docs = all_docs[start_idx:end_idx]
-        has_more = len(docs) > per_page
+        start_after = None
+        if last_doc_id:
+            # Cursor dokümanı bu kullanıcının olmalı (başkasının geçmişinde konum sızdırmasın)
+            start_after = db.collection('analyses').document(last_doc_id).get()
+            if not start_after.exists or start_after.to_dict().get('userId') != uid:
+                raise ValidationError("Invalid last_doc_id cursor")
+        elif page > 1:
+            query = query.offset((page - 1) * per_page)
         
-        if has_more:
-            docs = docs[:per_page]  # Son ekstra dokümanı çıkar
+        docs, has_more = fetch_page(query, per_page, start_after=start_after)
         
-        analyses = []
-        next_cursor = None
-        
-        for doc in docs:
-            data = doc.to_dict()
-            data['id'] = doc.id
-            # Timestamp'i düzelt
-            if 'createdAt' in data:
-                if hasattr(data['createdAt'], 'timestamp'):
-                    data['createdAt'] = data['createdAt'].timestamp()
-                elif isinstance(data['createdAt'], (int, float)):
-                    data['createdAt'] = data['createdAt']
-            analyses.append(data)
-            next_cursor = doc.id  # Son doküman ID'si
+        analyses = [serialize_firestore_doc(doc) for doc in docs]
         
         response = {
             "success": True,
@@ -415,11 +475,15 @@ def get_analyses():
             "has_more": has_more
         }
         
-        # Cursor-based pagination için next_cursor ekle
-        if has_more and next_cursor:
-            response["next_cursor"] = next_cursor
+        # Sonraki sayfa için cursor: bu sayfanın son dokümanı
+        if has_more and docs:
+            response["next_cursor"] = docs[-1].id
         
+        if cacheable:
+            response_cache.set(uid, 'analyses', response, request.args, generation=cache_generation)
         return jsonify(response), 200
+    except ValidationError:
+        raise
     except Exception as e:
         logger.error(f"Error getting analyses: {str(e)}\n{traceback.format_exc()}")
         return jsonify({"success": False, "error": str(e)}), 500
@@ -429,66 +493,37 @@ def get_analyses():
 # ============================================================================
 
 @app.route("/api/user/stats", methods=["GET"])
-@cache.cached(timeout=300)  # 5 dakika cache
 def get_user_stats():
     """Kullanıcı istatistiklerini getir"""
     uid, error_response, status_code = verify_token()
     if uid is None:
         return error_response, status_code
     
+    cached, cache_generation = response_cache.lookup(uid, 'stats')
+    if cached is not None:
+        return jsonify(cached), 200
+    
     try:
-        # Toplam analiz sayısı - Tüm analizleri say
-        all_analyses = db.collection('analyses').where('userId', '==', uid).stream()
-        total_analyses = len(list(all_analyses))
-        
-        # Hastalık türüne göre analiz sayıları
-        disease_counts = {}
-        disease_types = ['bone', 'skin', 'lung', 'eye']
-        for dt in disease_types:
-            analyses = db.collection('analyses').where('userId', '==', uid).where('diseaseType', '==', dt).stream()
-            disease_counts[dt] = len(list(analyses))
-        
-        # En çok analiz edilen hastalık türü
-        most_analyzed = max(disease_counts.items(), key=lambda x: x[1])[0] if disease_counts and max(disease_counts.values()) > 0 else None
-        
-        # Son analiz tarihi - Index gerektirmemek için tüm analizleri al, memory'de sırala
-        all_analyses_for_date = db.collection('analyses').where('userId', '==', uid).stream()
-        last_analysis_date = None
-        max_timestamp = 0
-        for doc in all_analyses_for_date:
-            data = doc.to_dict()
-            if 'createdAt' in data:
-                timestamp = 0
-                if hasattr(data['createdAt'], 'timestamp'):
-                    timestamp = data['createdAt'].timestamp()
-                elif isinstance(data['createdAt'], (int, float)):
-                    timestamp = data['createdAt']
-                if timestamp > max_timestamp:
-                    max_timestamp = timestamp
-                    last_analysis_date = timestamp
+        # İstatistikler save_analysis() tarafından güncellenen tek dokümandan okunur
+        # Doküman yoksa veya hiç yeniden hesaplanmamışsa (rebuilt işareti yok) bir kerelik backfill
+        stats = stats_summary(ensure_user_stats(db, uid))
         
         # Kullanıcı bilgileri
         user_ref = db.collection('users').document(uid)
         user_doc = user_ref.get()
         user_data = user_doc.to_dict() if user_doc.exists else {}
         
-        join_date = None
-        if user_data.get('createdAt'):
-            if hasattr(user_data.get('createdAt'), 'timestamp'):
-                join_date = user_data.get('createdAt').timestamp()
-            elif isinstance(user_data.get('createdAt'), (int, float)):
-                join_date = user_data.get('createdAt')
+        join_date = serialize_firestore_timestamp(user_data.get('createdAt')) if user_data.get('createdAt') else None
         
-        return jsonify({
+        response = {
             "success": True,
             "stats": {
-                "totalAnalyses": total_analyses,
-                "diseaseTypeCounts": disease_counts,
-                "mostAnalyzedDisease": most_analyzed,
-                "lastAnalysisDate": last_analysis_date,
+                **stats,
                 "joinDate": join_date
             }
-        }), 200
+        }
+        response_cache.set(uid, 'stats', response, generation=cache_generation)
+        return jsonify(response), 200
     except Exception as e:
         logger.error(f"Error getting user stats: {str(e)}\n{traceback.format_exc()}")
         return jsonify({"success": False, "error": str(e)}), 500
@@ -504,6 +539,10 @@ def get_profile():
     if uid is None:
         return error_response, status_code
     
+    cached, cache_generation = response_cache.lookup(uid, 'profile')
+    if cached is not None:
+        return jsonify(cached), 200
+    
     try:
         user_ref = db.collection('users').document(uid)
         user_doc = user_ref.get()
@@ -511,18 +550,15 @@ def get_profile():
         if not user_doc.exists:
             return jsonify({"success": False, "error": "Kullanıcı bulunamadı"}), 404
         
-        user_data = user_doc.to_dict()
+        # Timestamp'ler (createdAt, lastLogin) Unix saniyesine çevrilir
+        user_data = to_json_value(user_doc.to_dict())
         
-        # Timestamp'leri string'e çevir
-        if 'createdAt' in user_data and hasattr(user_data['createdAt'], 'timestamp'):
-            user_data['createdAt'] = user_data['createdAt'].timestamp()
-        if 'lastLogin' in user_data and hasattr(user_data['lastLogin'], 'timestamp'):
-            user_data['lastLogin'] = user_data['lastLogin'].timestamp()
-        
-        return jsonify({
+        response = {
             "success": True,
             "profile": user_data
-        }), 200
+        }
+        response_cache.set(uid, 'profile', response, generation=cache_generation)
+        return jsonify(response), 200
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
@@ -554,6 +590,7 @@ def update_profile():
         
         if update_data:
             user_ref.update(update_data)
+            response_cache.invalidate(uid, 'profile')
         
         return jsonify({
             "success": True,
@@ -587,6 +624,7 @@ def upload_profile_photo():
         # Firestore'da güncelle
         user_ref = db.collection('users').document(uid)
         user_ref.update({'photoURL': photo_url})
+        response_cache.invalidate(uid, 'profile')
         
         # Firebase Auth'da da güncelle
         auth.update_user(uid, photo_url=photo_url)
@@ -616,9 +654,12 @@ def add_favorite():
         return jsonify({"success": False, "error": "analysisId gerekli"}), 400
     
     try:
-        # Analiz var mı kontrol et
-        analysis_ref = db.collection('analyses').document(analysis_id)
-        analysis_doc = analysis_ref.get()
+        # Analiz ve mevcut favori kontrolü birbirinden bağımsız: eşzamanlı okunur
+        existing_query = db.collection('favorites').where('userId', '==', uid).where('analysisId', '==', analysis_id).limit(1)
+        analysis_doc, existing = run_parallel(
+            db.collection('analyses').document(analysis_id).get,
+            lambda: list(existing_query.stream())
+        )
         
         if not analysis_doc.exists:
             return jsonify({"success": False, "error": "Analiz bulunamadı"}), 404
@@ -628,17 +669,18 @@ def add_favorite():
             return jsonify({"success": False, "error": "Bu analiz size ait değil"}), 403
         
         # Zaten favorilerde mi kontrol et
-        existing = db.collection('favorites').where('userId', '==', uid).where('analysisId', '==', analysis_id).limit(1).stream()
-        if list(existing):
+        if existing:
             return jsonify({"success": False, "error": "Bu analiz zaten favorilerde"}), 400
         
-        # Favorilere ekle
+        # Favorilere ekle (liste görünümü için analiz özeti favoriye kopyalanır, join gerekmez)
         favorite_ref = db.collection('favorites').document()
         favorite_ref.set({
             'userId': uid,
             'analysisId': analysis_id,
+            'analysisSummary': analysis_summary(analysis_data),
             'createdAt': firestore.SERVER_TIMESTAMP
         })
+        response_cache.invalidate(uid, 'favorites')
         
         return jsonify({
             "success": True,
@@ -649,71 +691,97 @@ def add_favorite():
 
 @app.route("/api/user/favorites", methods=["GET"])
 def get_favorites():
-    """Kullanıcının favorilerini getir"""
+    """
+    Kullanıcının favorilerini getir (en yeni önce, cursor pagination)
+    
+    Liste, favori dokümanlarındaki analysisSummary'den oluşur. Özeti olmayan
+    eski favoriler ve full=true isteklerinde analizler tek tek değil, get_all
+    ile toplu okunur.
+    
+    Query Parameters:
+        per_page (int): Sayfa başına kayıt sayısı (varsayılan: 20, max: 100)
+        last_doc_id (str): Önceki yanıtın next_cursor değeri
+        analysisId (str): Sadece bu analizin favorisini getir (opsiyonel)
+        full (bool): Özet yerine tam analiz dokümanlarını döndür
+    
+    Returns:
+        JSON: {"success": bool, "count": int, "favorites": list,
+               "has_more": bool, "next_cursor": str (has_more ise)}
+    """
     uid, error_response, status_code = verify_token()
     if uid is None:
         return error_response, status_code
     
     try:
-        # Index gerektirmemek için order_by kullanmadan tüm favorileri al, memory'de sırala
-        favorites_query = db.collection('favorites').where('userId', '==', uid)
-        all_fav_docs = list(favorites_query.stream())
-        
-        # Memory'de sırala (en yeni önce)
-        def get_fav_timestamp(fav_doc):
-            fav_data = fav_doc.to_dict()
-            created_at = fav_data.get('createdAt')
-            if hasattr(created_at, 'timestamp'):
-                return created_at.timestamp()
-            elif isinstance(created_at, (int, float)):
-                return created_at
-            else:
-                return 0
+        limit_param = request.args.get('limit') or request.args.get('per_page', '20')
+        _, per_page = validate_pagination_params(1, min(int(limit_param), 100))
+    except ValidationError:
+        raise
+    except (TypeError, ValueError):
+        raise ValidationError("per_page must be an integer")
+    last_doc_id = request.args.get('last_doc_id', None)
+    analysis_id = request.args.get('analysisId', None)
+    full = request.args.get('full', 'false').lower() in ('1', 'true', 'yes')
+    
+    cached, cache_generation = response_cache.lookup(uid, 'favorites', request.args)
+    if cached is not None:
+        return jsonify(cached), 200
+    
+    try:
+        query = db.collection('favorites').where('userId', '==', uid)
+        if analysis_id:
+            # Bir analizin en fazla bir favorisi olur, sıralama gerekmez
+            query = query.where('analysisId', '==', analysis_id)
+        else:
+            query = query.order_by('createdAt', direction=firestore.Query.DESCENDING)
+        
+        start_after = None
+        if last_doc_id and not analysis_id:
+            start_after = db.collection('favorites').document(last_doc_id).get()
+            if not start_after.exists or start_after.to_dict().get('userId') != uid:
+                raise ValidationError("Invalid last_doc_id cursor")
+        
+        page_docs, has_more = fetch_page(query, per_page, start_after=start_after)
+        fav_items = [(doc, doc.to_dict()) for doc in page_docs]
+        fav_items = [(doc, data) for doc, data in fav_items if data.get('analysisId')]
         
-        all_fav_docs.sort(key=get_fav_timestamp, reverse=True)
+        # Özeti olmayan (eski) favoriler veya full=true için analizleri toplu oku
+        to_fetch = [data['analysisId'] for _, data in fav_items if full or not data.get('analysisSummary')]
+        analyses = get_documents(db, [db.collection('analyses').document(aid) for aid in to_fetch])
         
         favorites = []
-        for fav_doc in all_fav_docs:
-            fav_data = fav_doc.to_dict()
-            analysis_id = fav_data.get('analysisId')
+        for fav_doc, fav_data in fav_items:
+            favorite_analysis_id = fav_data['analysisId']
             
-            if not analysis_id:
-                continue
+            if favorite_analysis_id in analyses:
+                analysis_data = analyses[favorite_analysis_id].to_dict()
+            elif fav_data.get('analysisSummary') and not full:
+                analysis_data = dict(fav_data['analysisSummary'])
+            else:
+                continue  # Analiz silinmiş
             
-            # Analiz bilgilerini getir
-            analysis_ref = db.collection('analyses').document(analysis_id)
-            analysis_doc = analysis_ref.get()
+            analysis_data = to_json_value(analysis_data)
+            analysis_data['id'] = favorite_analysis_id
             
-            if analysis_doc.exists:
-                analysis_data = analysis_doc.to_dict()
-                analysis_data['id'] = analysis_id
-                
-                # Timestamp'i düzelt
-                if 'createdAt' in analysis_data:
-                    if hasattr(analysis_data['createdAt'], 'timestamp'):
-                        analysis_data['createdAt'] = analysis_data['createdAt'].timestamp()
-                    elif isinstance(analysis_data['createdAt'], (int, float)):
-                        analysis_data['createdAt'] = analysis_data['createdAt']
-                
-                # FavoritedAt timestamp'ini düzelt
-                favorited_at = None
-                if fav_data.get('createdAt'):
-                    if hasattr(fav_data.get('createdAt'), 'timestamp'):
-                        favorited_at = fav_data.get('createdAt').timestamp()
-                    elif isinstance(fav_data.get('createdAt'), (int, float)):
-                        favorited_at = fav_data.get('createdAt')
-                
-                favorites.append({
-                    'favoriteId': fav_doc.id,
-                    'analysis': analysis_data,
-                    'favoritedAt': favorited_at
-                })
+            favorites.append({
+                'favoriteId': fav_doc.id,
+                'analysis': analysis_data,
+                'favoritedAt': serialize_firestore_timestamp(fav_data.get('createdAt'))
+            })
         
-        return jsonify({
+        response = {
             "success": True,
             "count": len(favorites),
-            "favorites": favorites
-        }), 200
+            "favorites": favorites,
+            "has_more": has_more
+        }
+        if has_more and page_docs:
+            response["next_cursor"] = page_docs[-1].id
+        
+        response_cache.set(uid, 'favorites', response, request.args, generation=cache_generation)
+        return jsonify(response), 200
+    except ValidationError:
+        raise
     except Exception as e:
         logger.error(f"Error getting favorites: {str(e)}\n{traceback.format_exc()}")
         return jsonify({"success": False, "error": str(e)}), 500
@@ -737,6 +805,7 @@ def remove_favorite(favorite_id):
             return jsonify({"success": False, "error": "Bu favori size ait değil"}), 403
         
         favorite_ref.delete()
+        response_cache.invalidate(uid, 'favorites')
         
         return jsonify({
             "success": True,
@@ -779,12 +848,13 @@ def share_analysis():
         share_token = str(uuid.uuid4())
         expires_at = datetime.utcnow() + timedelta(days=expires_in_days)
         
-        # Paylaşım dokümanı oluştur
-        share_ref = db.collection('shared').document()
+        # Paylaşım dokümanı: ID = token (public görüntüleme tek okuma), analizin snapshot'ı gömülü
+        share_ref = db.collection(SHARED_COLLECTION).document(share_token)
         share_ref.set({
             'userId': uid,
             'analysisId': analysis_id,
             'shareToken': share_token,
+            'analysis': share_snapshot(analysis_data),
             'expiresAt': expires_at,
             'createdAt': firestore.SERVER_TIMESTAMP
         })
@@ -802,46 +872,54 @@ def share_analysis():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+def shared_analysis_response(payload, etag, expires_at):
+    """Public paylaşım yanıtı: ETag + expiresAt'i aşmayan Cache-Control, If-None-Match ise 304"""
+    max_age = cache_max_age(expires_at, SHARE_CACHE_MAX_AGE)
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = jsonify(payload)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f"public, max-age={max_age}"
+    return response
+
 @app.route("/api/share/<share_token>", methods=["GET"])
 def get_shared_analysis(share_token):
     """Paylaşım linkinden analiz bilgilerini getir (Public)"""
+    # Paylaşımlar oluşturulduktan sonra değişmez: süresi dolana kadar process içinde cache'lenir.
+    # lookup() store'a yazmaz; sadece doğrulanmış (var olan, süresi dolmamış) paylaşımlar set() edilir,
+    # böylece rastgele token'lar cache'i dolduramaz.
+    cached, cache_generation = response_cache.lookup(f"share:{share_token}", 'shared')
+    if cached is not None and cache_max_age(cached['expiresAt'], SHARE_CACHE_MAX_AGE) > 0:
+        return shared_analysis_response(cached['payload'], cached['etag'], cached['expiresAt'])
+    
     try:
-        # Paylaşım dokümanını bul
-        share_query = db.collection('shared').where('shareToken', '==', share_token).limit(1).stream()
-        share_doc = None
-        for doc in share_query:
-            share_doc = doc
-            break
-        
-        if not share_doc:
-            return jsonify({"success": False, "error": "Paylaşım linki bulunamadı"}), 404
-        
-        share_data = share_doc.to_dict()
+        # Paylaşım dokümanı (ID = token); eski rastgele ID'li dokümanlar sorgu ile bulunup taşınır
+        share_doc = db.collection(SHARED_COLLECTION).document(share_token).get()
+        if share_doc.exists:
+            share_data = share_doc.to_dict()
+        else:
+            legacy_doc = find_legacy_share(db, share_token)
+            if legacy_doc is None:
+                return jsonify({"success": False, "error": "Paylaşım linki bulunamadı"}), 404
+            share_data = migrate_share(db, legacy_doc)
+            if share_data is None:
+                return jsonify({"success": False, "error": "Analiz bulunamadı"}), 404
         
         # Süresi dolmuş mu kontrol et
-        expires_at = share_data.get('expiresAt')
-        if expires_at and expires_at < datetime.utcnow():
+        expires_at = expiry_timestamp(share_data.get('expiresAt'))
+        if expires_at is not None and expires_at <= time.time():
             return jsonify({"success": False, "error": "Paylaşım linkinin süresi dolmuş"}), 410
         
-        # Analiz bilgilerini getir
-        analysis_id = share_data.get('analysisId')
-        analysis_ref = db.collection('analyses').document(analysis_id)
-        analysis_doc = analysis_ref.get()
-        
-        if not analysis_doc.exists:
-            return jsonify({"success": False, "error": "Analiz bulunamadı"}), 404
-        
-        analysis_data = analysis_doc.to_dict()
-        if 'createdAt' in analysis_data and hasattr(analysis_data['createdAt'], 'timestamp'):
-            analysis_data['createdAt'] = analysis_data['createdAt'].timestamp()
-        
-        # Hassas bilgileri kaldır (userId gibi)
-        analysis_data.pop('userId', None)
-        
-        return jsonify({
+        # Gömülü snapshot (hassas alanlar paylaşım oluşturulurken çıkarıldı)
+        payload = {
             "success": True,
-            "analysis": analysis_data
-        }), 200
+            "analysis": public_analysis(share_data.get('analysis', {}))
+        }
+        etag = share_etag(payload)
+        response_cache.set(f"share:{share_token}", 'shared',
+                           {'payload': payload, 'etag': etag, 'expiresAt': expires_at}, generation=cache_generation)
+        return shared_analysis_response(payload, etag, expires_at)
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
@@ -966,21 +1044,8 @@ def get_doctor_profile():
                 "message": "Doktor kaydı bulunamadı"
             }), 404
         
-        doctor_data = doctor_doc.to_dict()
-        doctor_data['id'] = uid
-        
-        # Timestamp'leri serialize et
-        if 'createdAt' in doctor_data:
-            if hasattr(doctor_data['createdAt'], 'timestamp'):
-                doctor_data['createdAt'] = doctor_data['createdAt'].timestamp()
-            elif isinstance(doctor_data['createdAt'], datetime):
-                doctor_data['createdAt'] = doctor_data['createdAt'].timestamp()
-        
-        if 'updatedAt' in doctor_data:
-            if hasattr(doctor_data['updatedAt'], 'timestamp'):
-                doctor_data['updatedAt'] = doctor_data['updatedAt'].timestamp()
-            elif isinstance(doctor_data['updatedAt'], datetime):
-                doctor_data['updatedAt'] = doctor_data['updatedAt'].timestamp()
+        # id = uid, timestamp'ler Unix saniyesi
+        doctor_data = serialize_firestore_doc(doctor_doc)
         
         return jsonify({
             "success": True,
@@ -993,15 +1058,44 @@ def get_doctor_profile():
 @app.route("/api/doctors/appointments", methods=["GET"])
 @limiter.limit("30 per minute")
 def get_doctor_appointments():
-    """Doktorun randevularını getir"""
+    """
+    Doktorun randevu kuyruğunu getir
+    
+    Sıralama: pending > approved > completed > rejected, sonra tarih ve saat
+    (en yakın önce). Filtre, sıralama ve sayfalama Firestore'da yapılır
+    (statusPriority alanı + firestore.indexes.json'daki composite index'ler).
+    
+    Query Parameters:
+        status (str): Sadece bu durumdaki randevular (opsiyonel)
+        per_page (int): Sayfa başına kayıt sayısı (varsayılan: 50, max: 100)
+        last_doc_id (str): Önceki yanıtın next_cursor değeri
+        include_counts (bool): Durum başına toplam sayıları da döndür (count aggregation)
+    
+    Returns:
+        JSON: {"success": bool, "appointments": list, "has_more": bool,
+               "next_cursor": str (has_more ise), "counts": dict (include_counts ise)}
+    """
     uid, error_response, status_code = verify_token()
     if uid is None:
         return error_response, status_code
     
     try:
-        # Önce doktor kaydını kontrol et
-        doctor_ref = db.collection('doctors').document(uid)
-        doctor_doc = doctor_ref.get()
+        limit_param = request.args.get('limit') or request.args.get('per_page', '50')
+        _, per_page = validate_pagination_params(1, min(int(limit_param), 100))
+    except ValidationError:
+        raise
+    except (TypeError, ValueError):
+        raise ValidationError("per_page must be an integer")
+    status_filter = request.args.get('status', None)
+    last_doc_id = request.args.get('last_doc_id', None)
+    
+    try:
+        # Doktor kaydı ve cursor dokümanı tek round-trip'te okunur
+        doctor_doc, start_after = get_snapshots(
+            db,
+            db.collection('doctors').document(uid),
+            db.collection('appointments').document(last_doc_id) if last_doc_id else None
+        )
         
         if not doctor_doc.exists:
             return jsonify({
@@ -1009,68 +1103,45 @@ def get_doctor_appointments():
                 "error": "Doktor kaydı bulunamadı"
             }), 404
         
-        doctor_data = doctor_doc.to_dict()
-        specialty = doctor_data.get('specialty')
-        
-        # Doktorun uzmanlık alanına göre randevuları getir
-        status_filter = request.args.get('status', None)
+        specialty = doctor_doc.to_dict().get('specialty')
         
-        query = db.collection('appointments')
+        # Randevular uzmanlık alanındaki tüm doktorlarla paylaşılır, cache de uzmanlık alanı bazlı
+        cache_owner = appointments_cache_owner(specialty)
+        cached, cache_generation = response_cache.lookup(cache_owner, 'doctor_appointments', request.args)
+        if cached is not None:
+            return jsonify(cached), 200
         
-        # Eğer doktorun uzmanlık alanı varsa, ona göre filtrele
-        if specialty:
-            query = query.where('doctorType', '==', specialty)
+        query = queue_query(db, specialty=specialty, status=status_filter)
         
-        # Tüm randevuları al (status filtresi memory'de yapılacak)
-        all_appointments = list(query.stream())
+        if start_after is not None:
+            if not start_after.exists or (specialty and start_after.to_dict().get('doctorType') != specialty):
+                raise ValidationError("Invalid last_doc_id cursor")
         
-        # Status filtresi uygula
-        if status_filter:
-            all_appointments = [apt for apt in all_appointments if apt.to_dict().get('status') == status_filter]
-        
-        # Memory'de tarih ve saate göre sırala (en yakın önce)
-        def get_appointment_sort_key(apt_doc):
-            apt_data = apt_doc.to_dict()
-            date_str = apt_data.get('date', '9999-99-99')  # Geçmiş tarihler en sona
-            time_str = apt_data.get('time', '99:99')
-            status = apt_data.get('status', 'pending')
-            # Öncelik: pending > approved > completed > rejected
-            priority = {'pending': 0, 'approved': 1, 'completed': 2, 'rejected': 3}.get(status, 4)
-            return f"{priority}_{date_str} {time_str}"
-        
-        all_appointments.sort(key=get_appointment_sort_key)
-        
-        appointments = []
-        for doc in all_appointments:
-            data = doc.to_dict()
-            data['id'] = doc.id
-            
-            # Timestamp'leri serialize et
-            if 'createdAt' in data:
-                if hasattr(data['createdAt'], 'timestamp'):
-                    data['createdAt'] = data['createdAt'].timestamp()
-                elif isinstance(data['createdAt'], datetime):
-                    data['createdAt'] = data['createdAt'].timestamp()
-            
-            if 'updatedAt' in data:
-                if hasattr(data['updatedAt'], 'timestamp'):
-                    data['updatedAt'] = data['updatedAt'].timestamp()
-                elif isinstance(data['updatedAt'], datetime):
-                    data['updatedAt'] = data['updatedAt'].timestamp()
-            
-            # approvedAt timestamp'ini serialize et
-            if 'approvedAt' in data:
-                if hasattr(data['approvedAt'], 'timestamp'):
-                    data['approvedAt'] = data['approvedAt'].timestamp()
-                elif isinstance(data['approvedAt'], datetime):
-                    data['approvedAt'] = data['approvedAt'].timestamp()
-            
-            appointments.append(data)
+        # Sayfa sorgusu ve (istenirse) durum başına count() sorguları birbirinden bağımsız: hepsi
+        # tek run_parallel() çağrısında eşzamanlı çalışır (iç içe run_parallel havuzu kilitleyebilir)
+        calls = [lambda: fetch_page(query, per_page, start_after=start_after)]
+        include_counts = request.args.get('include_counts', 'false').lower() in ('1', 'true', 'yes')
+        if include_counts:
+            calls.extend(status_count_calls(db, specialty=specialty))
+        results = run_parallel(*calls)
+        docs, has_more = results[0]
+        appointments = [serialize_appointment(doc) for doc in docs]
         
-        return jsonify({
+        response = {
             "success": True,
-            "appointments": appointments
-        }), 200
+            "appointments": appointments,
+            "has_more": has_more
+        }
+        if has_more and docs:
+            response["next_cursor"] = docs[-1].id
+        if include_counts:
+            response["counts"] = dict(zip(STATUS_PRIORITY, results[1:]))
+        
+        response_cache.set(cache_owner, 'doctor_appointments', response, request.args,
+                           generation=cache_generation)
+        return jsonify(response), 200
+    except ValidationError:
+        raise
     except Exception as e:
         logger.error(f"Error getting doctor appointments: {str(e)}\n{traceback.format_exc()}")
         return jsonify({"success": False, "error": str(e)}), 500
@@ -1084,9 +1155,9 @@ def approve_reject_appointment(appointment_id):
         return error_response, status_code
     
     try:
-        # Önce doktor kaydını kontrol et
-        doctor_ref = db.collection('doctors').document(uid)
-        doctor_doc = doctor_ref.get()
+        # Doktor kaydı ve randevu tek round-trip'te (BatchGetDocuments) okunur
+        appointment_ref = db.collection('appointments').document(appointment_id)
+        doctor_doc, appointment_doc = get_snapshots(db, db.collection('doctors').document(uid), appointment_ref)
         
         if not doctor_doc.exists:
             return jsonify({
@@ -1101,10 +1172,6 @@ def approve_reject_appointment(appointment_id):
                 "error": "Doktor hesabınız henüz onaylanmamış"
             }), 403
         
-        # Randevuyu getir
-        appointment_ref = db.collection('appointments').document(appointment_id)
-        appointment_doc = appointment_ref.get()
-        
         if not appointment_doc.exists:
             return jsonify({
                 "success": False,
@@ -1135,12 +1202,23 @@ def approve_reject_appointment(appointment_id):
         if note:
             update_data['doctorNote'] = note
         
-        appointment_ref.update(update_data)
+        # Görüşme odası yoksa istemcinin ürettiği oda adı kaydedilir
+        jitsi_room = data.get('jitsiRoom')
+        if action == 'approve' and jitsi_room and not appointment_doc.to_dict().get('jitsiRoom'):
+            if not isinstance(jitsi_room, str) or not re.fullmatch(r'[A-Za-z0-9-]{3,100}', jitsi_room):
+                raise ValidationError("jitsiRoom must be 3-100 letters, digits or dashes")
+            update_data['jitsiRoom'] = jitsi_room
+        
+        # Randevu ve doktorun hasta index'i tek transaction'da güncellenir
+        update_appointment_status(db.transaction(), db, appointment_ref, uid, update_data)
+        invalidate_appointments_cache(appointment_doc.to_dict().get('doctorType'))
         
         return jsonify({
             "success": True,
             "message": f"Randevu {'onaylandı' if action == 'approve' else 'reddedildi'}"
         }), 200
+    except ValidationError:
+        raise
     except Exception as e:
         logger.error(f"Error approving/rejecting appointment: {str(e)}\n{traceback.format_exc()}")
         return jsonify({"success": False, "error": str(e)}), 500
@@ -1154,9 +1232,9 @@ def complete_appointment(appointment_id):
         return error_response, status_code
     
     try:
-        # Önce doktor kaydını kontrol et
-        doctor_ref = db.collection('doctors').document(uid)
-        doctor_doc = doctor_ref.get()
+        # Doktor kaydı ve randevu tek round-trip'te (BatchGetDocuments) okunur
+        appointment_ref = db.collection('appointments').document(appointment_id)
+        doctor_doc, appointment_doc = get_snapshots(db, db.collection('doctors').document(uid), appointment_ref)
         
         if not doctor_doc.exists:
             return jsonify({
@@ -1171,10 +1249,6 @@ def complete_appointment(appointment_id):
                 "error": "Doktor hesabınız henüz onaylanmamış"
             }), 403
         
-        # Randevuyu getir
-        appointment_ref = db.collection('appointments').document(appointment_id)
-        appointment_doc = appointment_ref.get()
-        
         if not appointment_doc.exists:
             return jsonify({
                 "success": False,
@@ -1196,13 +1270,16 @@ def complete_appointment(appointment_id):
         # Randevuyu tamamlandı olarak işaretle
         update_data = {
             'status': 'completed',
-            'updatedAt': firestore.SERVER_TIMESTAMP
+            'updatedAt': firestore.SERVER_TIMESTAMP,
+            'doctorId': uid  # Muayeneyi yapan doktor; onaylayan farklıysa onun hasta index'inden düşülür
         }
         
         if note:
             update_data['completionNote'] = note
         
-        appointment_ref.update(update_data)
+        # Randevu ve doktorun hasta index'i tek transaction'da güncellenir
+        update_appointment_status(db.transaction(), db, appointment_ref, uid, update_data)
+        invalidate_appointments_cache(appointment_data.get('doctorType'))
         
         return jsonify({
             "success": True,
@@ -1215,15 +1292,41 @@ def complete_appointment(appointment_id):
 @app.route("/api/doctors/patients", methods=["GET"])
 @limiter.limit("30 per minute")
 def get_doctor_patients():
-    """Doktorun hastalarını getir"""
+    """
+    Doktorun hastalarını getir (son randevuya göre, cursor pagination)
+    
+    Hastalar doctors/{uid}/patients index'inden okunur (randevu onay/tamamlama
+    sırasında güncellenir); profil bilgileri tek get_all ile toplu alınır.
+    
+    Query Parameters:
+        per_page (int): Sayfa başına hasta sayısı (varsayılan: 20, max: 100)
+        last_doc_id (str): Önceki yanıtın next_cursor değeri
+        include_count (bool): Toplam hasta sayısını da döndür (count aggregation)
+    
+    Returns:
+        JSON: {"success": bool, "patients": list, "has_more": bool,
+               "next_cursor": str (has_more ise), "total": int (include_count ise)}
+    """
     uid, error_response, status_code = verify_token()
     if uid is None:
         return error_response, status_code
     
     try:
-        # Önce doktor kaydını kontrol et
+        limit_param = request.args.get('limit') or request.args.get('per_page', '20')
+        _, per_page = validate_pagination_params(1, min(int(limit_param), 100))
+    except ValidationError:
+        raise
+    except (TypeError, ValueError):
+        raise ValidationError("per_page must be an integer")
+    last_doc_id = request.args.get('last_doc_id', None)
+    
+    try:
+        # Doktor kaydı ve cursor dokümanı tek round-trip'te okunur
         doctor_ref = db.collection('doctors').document(uid)
-        doctor_doc = doctor_ref.get()
+        patients_ref = patients_collection(db, uid)
+        doctor_doc, start_after = get_snapshots(
+            db, doctor_ref, patients_ref.document(last_doc_id) if last_doc_id else None
+        )
         
         if not doctor_doc.exists:
             return jsonify({
@@ -1231,63 +1334,55 @@ def get_doctor_patients():
                 "error": "Doktor kaydı bulunamadı"
             }), 404
         
-        doctor_data = doctor_doc.to_dict()
-        specialty = doctor_data.get('specialty')
-        
-        # Doktorun randevularını getir
-        query = db.collection('appointments')
-        if specialty:
-            specialty_mapping = {
-                'dermatolog': 'dermatolog',
-                'ortopedist': 'ortopedist',
-                'gogus-hast': 'gogus-hast',
-                'goz-hast': 'goz-hast',
-                'genel-cerrahi': 'genel-cerrahi',
-                'ic-hastaliklari': 'ic-hastaliklari',
-                'noroloji': 'noroloji',
-                'kardiyoloji': 'kardiyoloji'
-            }
-            mapped_specialty = specialty_mapping.get(specialty, specialty)
-            all_appointments = [apt for apt in query.stream() if apt.to_dict().get('doctorType') == mapped_specialty]
-        else:
-            all_appointments = list(query.stream())
+        # Index'ten önce onaylanmış randevular için bir kerelik backfill
+        if not doctor_doc.to_dict().get('patientIndexBuiltAt'):
+            rebuild_doctor_patients(db, doctor_id=uid)
+            doctor_ref.update({'patientIndexBuiltAt': firestore.SERVER_TIMESTAMP})
         
-        # Unique hasta ID'lerini bul
-        patient_ids = set()
-        for apt_doc in all_appointments:
-            apt_data = apt_doc.to_dict()
-            patient_id = apt_data.get('userId')
-            if patient_id:
-                patient_ids.add(patient_id)
+        query = patients_ref.order_by('lastAppointment', direction=firestore.Query.DESCENDING)
+        
+        if start_after is not None and not start_after.exists:
+            raise ValidationError("Invalid last_doc_id cursor")
+        
+        # Sayfa ve (istenirse) toplam hasta sayısı tek run_parallel() çağrısında okunur
+        calls = [lambda: fetch_page(query, per_page, start_after=start_after)]
+        include_count = request.args.get('include_count', 'false').lower() in ('1', 'true', 'yes')
+        if include_count:
+            calls.append(lambda: count_patients(db, uid))
+        results = run_parallel(*calls)
+        entry_docs, has_more = results[0]
+        
+        # Hasta profillerini toplu getir
+        users = get_documents(db, [db.collection('users').document(doc.id) for doc in entry_docs])
         
-        # Hasta bilgilerini getir
         patients = []
-        for patient_id in patient_ids:
-            try:
-                # Firestore'dan kullanıcı bilgilerini al
-                user_ref = db.collection('users').document(patient_id)
-                user_doc = user_ref.get()
-                
-                if user_doc.exists:
-                    user_data = user_doc.to_dict()
-                    # Bu hastanın randevularını say
-                    patient_appointments = [apt for apt in all_appointments if apt.to_dict().get('userId') == patient_id]
-                    
-                    patients.append({
-                        'userId': patient_id,
-                        'email': user_data.get('email', ''),
-                        'displayName': user_data.get('displayName', 'Bilinmeyen'),
-                        'totalAppointments': len(patient_appointments),
-                        'lastAppointment': max([apt.to_dict().get('date', '') for apt in patient_appointments], default='')
-                    })
-            except Exception as e:
-                logger.warning(f"Error getting patient info for {patient_id}: {str(e)}")
+        for entry_doc in entry_docs:
+            entry = entry_doc.to_dict()
+            user_doc = users.get(entry_doc.id)
+            if user_doc is None or not entry.get('totalAppointments'):
                 continue
+            user_data = user_doc.to_dict()
+            patients.append({
+                'userId': entry_doc.id,
+                'email': user_data.get('email', ''),
+                'displayName': user_data.get('displayName', 'Bilinmeyen'),
+                'totalAppointments': entry.get('totalAppointments', 0),
+                'completedAppointments': entry.get('completedAppointments', 0),
+                'lastAppointment': entry.get('lastAppointment', '')
+            })
         
-        return jsonify({
+        response = {
             "success": True,
-            "patients": patients
-        }), 200
+            "patients": patients,
+            "has_more": has_more
+        }
+        if has_more and entry_docs:
+            response["next_cursor"] = entry_docs[-1].id
+        if include_count:
+            response["total"] = results[1]
+        return jsonify(response), 200
+    except ValidationError:
+        raise
     except Exception as e:
         logger.error(f"Error getting doctor patients: {str(e)}\n{traceback.format_exc()}")
         return jsonify({"success": False, "error": str(e)}), 500
@@ -1342,11 +1437,13 @@ def create_appointment():
             'reason': reason,
             'doctorType': doctor_type,
             'status': status,
+            'statusPriority': status_priority(status),
             'jitsiRoom': jitsi_room,
             'createdAt': firestore.SERVER_TIMESTAMP,
             'updatedAt': firestore.SERVER_TIMESTAMP
         }
         appointment_ref.set(appointment_data)
+        invalidate_appointments_cache(doctor_type)
         
         return jsonify({
             "success": True,
@@ -1382,36 +1479,9 @@ def get_appointments():
         if status_filter:
             query = query.where('status', '==', status_filter)
         
-        appointments = []
-        for doc in query.stream():
-            data = doc.to_dict()
-            data['id'] = doc.id
-            # Timestamp'i serialize et
-            if 'createdAt' in data:
-                if hasattr(data['createdAt'], 'timestamp'):
-                    data['createdAt'] = data['createdAt'].timestamp()
-                elif isinstance(data['createdAt'], datetime):
-                    data['createdAt'] = data['createdAt'].timestamp()
-                else:
-                    data['createdAt'] = None
-            if 'updatedAt' in data:
-                if hasattr(data['updatedAt'], 'timestamp'):
-                    data['updatedAt'] = data['updatedAt'].timestamp()
-                elif isinstance(data['updatedAt'], datetime):
-                    data['updatedAt'] = data['updatedAt'].timestamp()
-                else:
-                    data['updatedAt'] = None
-            
-            # approvedAt timestamp'ini serialize et
-            if 'approvedAt' in data:
-                if hasattr(data['approvedAt'], 'timestamp'):
-                    data['approvedAt'] = data['approvedAt'].timestamp()
-                elif isinstance(data['approvedAt'], datetime):
-                    data['approvedAt'] = data['approvedAt'].timestamp()
-                else:
-                    data['approvedAt'] = None
-            
-            appointments.append(data)
+        # Cache'lenmeyen liste: ham Firestore değerleri döner, timestamp'leri
+        # (createdAt, updatedAt, approvedAt) JSON provider encode sırasında Unix saniyesine çevirir
+        appointments = [{**doc.to_dict(), 'id': doc.id} for doc in query.stream()]
         
         # Frontend'de sıralama yap (Firestore index gereksinimini önlemek için)
         appointments.sort(key=lambda x: (
@@ -1448,8 +1518,12 @@ def join_appointment(appointment_id):
         return error_response, status_code
     
     try:
-        appointment_ref = db.collection('appointments').document(appointment_id)
-        appointment_doc = appointment_ref.get()
+        # Randevu ve (doktorsa) doktor kaydı tek round-trip'te okunur; doktor dokümanının ID'si uid
+        appointment_doc, doctor_doc = get_snapshots(
+            db,
+            db.collection('appointments').document(appointment_id),
+            db.collection('doctors').document(uid)
+        )
         
         if not appointment_doc.exists:
             return jsonify({"success": False, "error": "Randevu bulunamadı"}), 404
@@ -1458,16 +1532,7 @@ def join_appointment(appointment_id):
         
         # Kullanıcı kontrolü: Randevu sahibi (hasta) veya doktor olmalı
         is_patient = appointment_data.get('userId') == uid
-        is_doctor = False
-        
-        # Doktor kontrolü
-        if not is_patient:
-            doctor_ref = db.collection('doctors').where('userId', '==', uid).limit(1).stream()
-            doctor_docs = list(doctor_ref)
-            if doctor_docs:
-                doctor_data = doctor_docs[0].to_dict()
-                if doctor_data.get('status') == 'approved':
-                    is_doctor = True
+        is_doctor = not is_patient and doctor_doc.exists and doctor_doc.to_dict().get('status') == 'approved'
         
         if not is_patient and not is_doctor:
             return jsonify({"success": False, "error": "Bu randevuya erişim yetkiniz yok"}), 403
@@ -1542,33 +1607,30 @@ def submit_feedback():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
-def update_user_stats(uid, disease_type):
+def update_user_stats(uid, disease_type, delta=1, batch=None):
     """
-    Kullanıcı istatistiklerini güncelle (opsiyonel - cache için).
+    Kullanıcının userStats dokümanını atomik artışlarla güncelle.
     
-    Bu fonksiyon şu an için placeholder. İleride kullanıcı istatistiklerini
-    cache'lemek veya hızlı erişim için kullanılabilir.
+    Toplam sayı, hastalık türü sayısı ve son analiz zamanı tutulur; böylece
+    GET /api/user/stats analyses koleksiyonunu taramaz. Doküman yoksa veya
+    sadece artışlardan oluşmuşsa (aggregate'ten önce analiz kaydetmiş
+    kullanıcı), artıştan önce analyses koleksiyonundan yeniden hesaplanır;
+    aksi halde ilk kayıt totalAnalyses=1 yazardı. Tutarsızlık olursa
+    rebuild_user_stats.py ile de yeniden hesaplanabilir.
     
     Args:
         uid (str): Firebase kullanıcı ID'si
         disease_type (str): Hastalık türü (bone, skin, lung, eye)
-    
-    Returns:
-        None: Hata durumunda sessizce devam eder
+        delta (int): Analiz kaydında +1, analiz silinirken -1
+        batch: Opsiyonel Firestore WriteBatch (analiz yazımıyla birlikte commit edilir)
     """
-    try:
-        user_ref = db.collection('users').document(uid)
-        user_doc = user_ref.get()
-        
-        if user_doc.exists:
-            # İstatistikleri güncelle (opsiyonel)
-            # Burada daha detaylı istatistikler saklanabilir
-            # Örnek: Her hastalık türü için toplam analiz sayısı
-            pass
-    except Exception as e:
-        # Hata durumunda sessizce devam et (analiz kaydı başarısız olmasın)
-        print(f"[WARNING] User stats update failed: {e}")
-        pass
+    ensure_user_stats(db, uid)
+    ref = db.collection(USER_STATS_COLLECTION).document(uid)
+    update = stats_update(disease_type, delta)
+    if batch is not None:
+        batch.set(ref, update, merge=True)
+    else:
+        ref.set(update, merge=True)
 
 # ============================================================================
 # SWAGGER API DOCUMENTATION
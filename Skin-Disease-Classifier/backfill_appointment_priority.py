@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+APPOINTMENT statusPriority BACKFILL
+Doktor randevu kuyrugu Firestore'da statusPriority, date, time ile siralanir;
+bu alan eklenmeden once yazilmis randevulara (veya durumu alan guncellenmeden
+degistirilmis randevulara) statusPriority yazar. Alan olmayan randevular
+GET /api/doctors/appointments kuyrugunda gorunmez.
+
+Kullanim:
+  python backfill_appointment_priority.py
+  python backfill_appointment_priority.py --dry-run
+"""
+
+import argparse
+import os
+import sys
+
+import firebase_admin
+from firebase_admin import credentials, firestore
+
+from utils.appointments import backfill_status_priority
+
+# Windows console UTF-8 support
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8')
+    except:
+        pass
+
+CRED_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'firebase_credentials.json'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Randevulara statusPriority alanini yaz")
+    parser.add_argument('--dry-run', action='store_true', help="say ama yazma")
+    parser.add_argument('--credentials', default=CRED_PATH, help="Firebase service account JSON")
+    args = parser.parse_args()
+
+    if not firebase_admin._apps:
+        firebase_admin.initialize_app(credentials.Certificate(args.credentials))
+
+    updated = backfill_status_priority(firestore.client(), dry_run=args.dry_run)
+    print(f"[{'DRY-RUN' if args.dry_run else 'OK'}] {updated} randevu guncellendi")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DOCTOR APPOINTMENT QUEUE BENCHMARK (Firestore emulator)
+Eski get_doctor_appointments() yolu (uzmanlik alanindaki tum randevulari oku,
+status'u bellekte filtrele, to_dict() cagiran string anahtarla sirala) ile
+utils/appointments.queue_query() + fetch_page() yolunu karsilastirir:
+istek basina sure ve okunan dokuman sayisi.
+
+Sadece Firestore emulator'unde calisir (uretim veritabanina veri yazmamak icin):
+  firebase emulators:start --only firestore
+  export FIRESTORE_EMULATOR_HOST=localhost:8080
+
+Kullanim:
+  python benchmark_appointments.py                       # 100k randevu seed + olcum
+  python benchmark_appointments.py --skip-seed --runs 10
+  python benchmark_appointments.py --count 20000 --per-page 50
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+from google.cloud import firestore
+
+from utils.appointments import STATUS_PRIORITY, queue_query, serialize_appointment, status_priority
+from utils.helpers import fetch_page
+
+# Windows console UTF-8 support
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8')
+    except:
+        pass
+
+SPECIALTIES = ['dermatolog', 'ortopedist', 'gogus-hast', 'goz-hast',
+               'genel-cerrahi', 'ic-hastaliklari', 'noroloji', 'kardiyoloji']
+STATUS_WEIGHTS = {'pending': 0.2, 'approved': 0.3, 'completed': 0.4, 'rejected': 0.1}
+SEED_BATCH_SIZE = 500
+
+
+# ============================================================================
+# ESKI IMPLEMENTASYON (auth_api.get_doctor_appointments, degistirilmeden once)
+# ============================================================================
+
+def legacy_queue(db, specialty, status_filter):
+    query = db.collection('appointments')
+    if specialty:
+        query = query.where('doctorType', '==', specialty)
+    all_appointments = list(query.stream())
+    if status_filter:
+        all_appointments = [apt for apt in all_appointments if apt.to_dict().get('status') == status_filter]
+
+    def get_appointment_sort_key(apt_doc):
+        apt_data = apt_doc.to_dict()
+        date_str = apt_data.get('date', '9999-99-99')
+        time_str = apt_data.get('time', '99:99')
+        priority = {'pending': 0, 'approved': 1, 'completed': 2, 'rejected': 3}.get(apt_data.get('status', 'pending'), 4)
+        return f"{priority}_{date_str} {time_str}"
+
+    all_appointments.sort(key=get_appointment_sort_key)
+    appointments = []
+    for doc in all_appointments:
+        data = doc.to_dict()
+        data['id'] = doc.id
+        for field in ('createdAt', 'updatedAt', 'approvedAt'):
+            if field in data and hasattr(data[field], 'timestamp'):
+                data[field] = data[field].timestamp()
+        appointments.append(data)
+    return appointments, len(all_appointments)
+
+
+def indexed_queue(db, specialty, status_filter, per_page):
+    docs, has_more = fetch_page(queue_query(db, specialty=specialty, status=status_filter), per_page)
+    return [serialize_appointment(doc) for doc in docs], len(docs) + int(has_more)
+
+
+# ============================================================================
+# SEED + OLCUM
+# ============================================================================
+
+def seed(db, count, rng):
+    statuses = list(STATUS_WEIGHTS)
+    weights = list(STATUS_WEIGHTS.values())
+    batch = db.batch()
+    start = time.perf_counter()
+    for i in range(count):
+        status = rng.choices(statuses, weights)[0]
+        batch.set(db.collection('appointments').document(), {
+            'userId': f"patient-{rng.randrange(count // 10 or 1)}",
+            'doctorType': rng.choice(SPECIALTIES),
+            'date': f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            'time': f"{rng.randint(8, 17):02d}:{rng.choice(('00', '30'))}",
+            'reason': 'benchmark',
+            'status': status,
+            'statusPriority': status_priority(status),
+            'createdAt': firestore.SERVER_TIMESTAMP,
+        })
+        if (i + 1) % SEED_BATCH_SIZE == 0:
+            batch.commit()
+            batch = db.batch()
+            print(f"\r  seed {i + 1}/{count}", end='', flush=True)
+    batch.commit()
+    print(f"\r  seed {count}/{count} ({time.perf_counter() - start:.1f} s)")
+
+
+def measure(fn, runs):
+    timings = []
+    reads = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        _, reads = fn()
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return statistics.median(timings), reads
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Doktor randevu kuyrugu benchmark'i (Firestore emulator)")
+    parser.add_argument('--count', type=int, default=100_000, help="seed edilecek randevu sayisi")
+    parser.add_argument('--skip-seed', action='store_true', help="emulator'deki mevcut veriyi kullan")
+    parser.add_argument('--project', default='medianalytica-benchmark')
+    parser.add_argument('--per-page', type=int, default=50)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    if not os.environ.get('FIRESTORE_EMULATOR_HOST'):
+        print("[HATA] FIRESTORE_EMULATOR_HOST ayarli degil - bu benchmark sadece emulator'de calisir")
+        sys.exit(1)
+
+    db = firestore.Client(project=args.project)
+    rng = random.Random(0)
+    if not args.skip_seed:
+        print(f"[1] {args.count} randevu seed ediliyor ({os.environ['FIRESTORE_EMULATOR_HOST']})")
+        seed(db, args.count, rng)
+
+    specialty = SPECIALTIES[0]
+    print(f"\n[2] Olcum: doctorType={specialty}, per_page={args.per_page}, runs={args.runs}")
+    print(f"{'status':<12} {'yontem':<10} {'ms (medyan)':>12} {'okunan dok.':>12}")
+    print("-" * 50)
+    for status_filter in (None, *STATUS_PRIORITY):
+        label = status_filter or 'hepsi'
+        rows = [
+            ('eski', measure(lambda: legacy_queue(db, specialty, status_filter), args.runs)),
+            ('indexli', measure(lambda: indexed_queue(db, specialty, status_filter, args.per_page), args.runs)),
+        ]
+        for name, (ms, reads) in rows:
+            print(f"{label:<12} {name:<10} {ms:>12.1f} {reads:>12}")
+
+
+if __name__ == '__main__':
+    main()
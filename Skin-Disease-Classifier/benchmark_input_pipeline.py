@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+INPUT PIPELINE BENCHMARK
+Egitim scriptlerindeki eski ImageDataGenerator.flow_from_directory +
+preprocessing_function yolu ile training/data.py'deki tf.data pipeline'ini
+karsilastirir: saniyede goruntu (augmentation dahil, model yok) ve
+augmentation'siz ciktinin esitligi (ayni dosya sirasi, max mutlak fark).
+
+--data verilmezse gecici bir klasore sentetik PNG'ler yazilir.
+
+Kullanim:
+  python benchmark_input_pipeline.py
+  python benchmark_input_pipeline.py --data datasets/bone/Bone_4Class_Final/train --pipeline densenet_clahe
+  python benchmark_input_pipeline.py --images 512 --img-size 300 --pipeline efficientnet --batches 30
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+import tensorflow as tf
+from tensorflow.keras.preprocessing.image import ImageDataGenerator
+
+from inference.preprocessing import CLAHE_AVAILABLE, IMAGENET_MEAN, IMAGENET_STD, apply_clahe
+from training import Augmentation, ImageFolderData
+
+# Windows console UTF-8 support
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8')
+    except:
+        pass
+
+# Bone scriptinin augmentation'i (en agir olan)
+AUGMENTATION = dict(
+    rotation_range=22,
+    width_shift_range=0.2,
+    height_shift_range=0.2,
+    shear_range=0.11,
+    zoom_range=0.22,
+    fill_mode='constant',
+    cval=0.0,
+    brightness_range=[0.85, 1.15],
+)
+
+
+# ============================================================================
+# ESKI YOL (train_*_macro_f1.py, degistirilmeden once)
+# ============================================================================
+
+def legacy_preprocessing_function(pipeline):
+    def densenet_clahe(img):
+        if img.max() <= 1.0:
+            img = img * 255.0
+        img_uint8 = np.clip(img, 0, 255).astype(np.uint8)
+        if np.allclose(img_uint8[:, :, 0], img_uint8[:, :, 1]) and np.allclose(img_uint8[:, :, 1], img_uint8[:, :, 2]):
+            if CLAHE_AVAILABLE:
+                gray = apply_clahe(img_uint8[:, :, 0])
+                img_uint8 = np.repeat(gray[:, :, np.newaxis], 3, axis=-1)
+        return ((img_uint8.astype(np.float32) / 255.0) - IMAGENET_MEAN) / IMAGENET_STD
+
+    if pipeline == 'densenet_clahe':
+        return densenet_clahe
+    if pipeline == 'rescale':
+        return lambda img: img / 255.0
+    return lambda img: img
+
+
+def legacy_iterator(directory, class_names, img_size, batch_size, pipeline, augment):
+    datagen = ImageDataGenerator(
+        preprocessing_function=legacy_preprocessing_function(pipeline),
+        **(AUGMENTATION if augment else {})
+    )
+    return datagen.flow_from_directory(
+        directory,
+        target_size=img_size,
+        batch_size=batch_size,
+        class_mode='categorical',
+        classes=class_names,
+        shuffle=augment,
+        seed=42
+    )
+
+
+# ============================================================================
+# OLCUM
+# ============================================================================
+
+def write_synthetic(directory, count, img_size, class_names):
+    rng = np.random.default_rng(0)
+    for i in range(count):
+        class_dir = os.path.join(directory, class_names[i % len(class_names)])
+        os.makedirs(class_dir, exist_ok=True)
+        if i % 2:
+            pixels = np.repeat(rng.integers(0, 256, (*img_size, 1), dtype=np.uint8), 3, axis=-1)
+        else:
+            pixels = rng.integers(0, 256, (*img_size, 3), dtype=np.uint8)
+        Image.fromarray(pixels).save(os.path.join(class_dir, f"img{i:05d}.png"))
+
+
+def images_per_sec(batches, count):
+    iterator = iter(batches)
+    next(iterator)  # isinma (thread pool, graph tracing)
+    seen = 0
+    start = time.perf_counter()
+    for _ in range(count):
+        try:
+            images, _ = next(iterator)
+        except StopIteration:
+            break
+        seen += len(images)
+    return seen / (time.perf_counter() - start)
+
+
+def parity(directory, class_names, img_size, batch_size, pipeline):
+    legacy = legacy_iterator(directory, class_names, img_size, batch_size, pipeline, augment=False)
+    data = ImageFolderData(directory, class_names, img_size, batch_size, pipeline)
+    assert legacy.filenames and [os.path.join(directory, f) for f in legacy.filenames] == data.filepaths, \
+        "dosya sirasi farkli"
+    worst = 0.0
+    for index, (images, labels) in enumerate(data.dataset):
+        legacy_images, legacy_labels = legacy[index]
+        np.testing.assert_array_equal(labels.numpy(), legacy_labels)
+        worst = max(worst, float(np.max(np.abs(images.numpy() - legacy_images))))
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Input pipeline benchmark (ImageDataGenerator vs tf.data)")
+    parser.add_argument('--data', help="Sinif alt klasorlu split klasoru (verilmezse sentetik)")
+    parser.add_argument('--classes', nargs='+', help="Sinif adlari (varsayilan: alt klasorler)")
+    parser.add_argument('--images', type=int, default=256, help="Sentetik goruntu sayisi")
+    parser.add_argument('--img-size', type=int, default=384)
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--batches', type=int, default=20, help="Olculen batch sayisi")
+    parser.add_argument('--pipeline', default='densenet_clahe', choices=['densenet_clahe', 'efficientnet', 'rescale'])
+    args = parser.parse_args()
+
+    img_size = (args.img_size, args.img_size)
+    temp_dir = None
+    directory = args.data
+    if directory is None:
+        temp_dir = directory = tempfile.mkdtemp(prefix='input_pipeline_bench_')
+        write_synthetic(directory, args.images, img_size, args.classes or ['a', 'b', 'c', 'd'])
+    class_names = args.classes or sorted(
+        name for name in os.listdir(directory) if os.path.isdir(os.path.join(directory, name)))
+
+    try:
+        print(f"Veri: {directory} ({len(class_names)} sinif), pipeline={args.pipeline}, "
+              f"batch={args.batch_size}, CLAHE: {'var' if CLAHE_AVAILABLE else 'yok'}, CPU: {os.cpu_count()}")
+        print(f"{'yontem':<34} {'goruntu/sn':>12}")
+        print("-" * 48)
+        rows = [
+            ('ImageDataGenerator (augment)',
+             legacy_iterator(directory, class_names, img_size, args.batch_size, args.pipeline, augment=True)),
+            ('tf.data (augment)',
+             ImageFolderData(directory, class_names, img_size, args.batch_size, args.pipeline,
+                             augmentation=Augmentation(**AUGMENTATION), shuffle=True, seed=42).dataset.repeat()),
+            ('ImageDataGenerator (val)',
+             legacy_iterator(directory, class_names, img_size, args.batch_size, args.pipeline, augment=False)),
+            ('tf.data (val)',
+             ImageFolderData(directory, class_names, img_size, args.batch_size, args.pipeline).dataset.repeat()),
+        ]
+        for label, batches in rows:
+            print(f"{label:<34} {images_per_sec(batches, args.batches):>12.1f}")
+
+        worst = parity(directory, class_names, img_size, args.batch_size, args.pipeline)
+        print(f"\nAugmentation'siz esitlik: max |fark| = {worst:.2e} (ayni dosya sirasi ve etiketler)")
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
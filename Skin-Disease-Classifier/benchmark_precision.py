@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PRECISION / XLA COMPARISON
+Egitim scriptlerinin --precision {fp32,mixed_bfloat16,mixed_float16} ve --xla
+secenekleri icin karsilastirma kosusu: her ayar ayri bir process'te (dtype
+policy global, XLA cache'i paylasilmasin) ayni model ve veriyle egitilir,
+adim suresi (median ms/step), goruntu/sn ve son validation macro F1 yazilir.
+
+Model scriptlerdeki gibi: ImageNet backbone (weights=None) + GAP + Dropout +
+float32 softmax. Veri: --cache ile compile_dataset.py cache'i (train/val),
+verilmezse sinifa gore ortalamasi kayan sentetik goruntuler.
+
+Kullanim:
+  python benchmark_precision.py
+  python benchmark_precision.py --model efficientnetb3 --img-size 300 --precisions fp32 mixed_bfloat16
+  python benchmark_precision.py --cache datasets/cache/bone --epochs 3 --steps 50
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from inference.metrics import macro_f1
+from training.precision import PRECISIONS
+
+# Windows console UTF-8 support
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8')
+    except:
+        pass
+
+MODELS = ('densenet121', 'efficientnetb3')
+
+
+# ============================================================================
+# WORKER (tek ayar, ayri process)
+# ============================================================================
+
+def synthetic_dataset(num_classes, img_size, batch_size, count, seed):
+    import tensorflow as tf
+
+    rng = np.random.default_rng(seed)
+    labels = rng.integers(0, num_classes, count).astype(np.int32)
+    # Sinif basina farkli ortalama: ogrenilebilir, ama ilk epoch'ta kolay degil
+    means = np.linspace(-0.5, 0.5, num_classes, dtype=np.float32)
+
+    def make(index, label):
+        noise = tf.random.stateless_normal((*img_size, 3), seed=tf.stack([seed, index]))
+        return noise + tf.gather(means, label), tf.one_hot(label, num_classes)
+
+    dataset = tf.data.Dataset.from_tensor_slices((np.arange(count, dtype=np.int32), labels))
+    return (dataset.map(make, num_parallel_calls=tf.data.AUTOTUNE)
+            .batch(batch_size).cache().prefetch(tf.data.AUTOTUNE)), labels
+
+
+def build_model(name, img_size, num_classes, xla):
+    from tensorflow import keras
+    from tensorflow.keras import layers
+
+    backbone = {
+        'densenet121': keras.applications.DenseNet121,
+        'efficientnetb3': keras.applications.EfficientNetB3,
+    }[name](weights=None, include_top=False, input_shape=(*img_size, 3))
+    model = keras.Sequential([
+        backbone,
+        layers.GlobalAveragePooling2D(),
+        layers.Dropout(0.3),
+        layers.Dense(num_classes, activation='softmax', dtype='float32'),  # scriptlerdeki gibi
+    ])
+    model.compile(optimizer=keras.optimizers.Adam(1e-4), loss='categorical_crossentropy',
+                  metrics=['accuracy'], jit_compile=xla)
+    return model
+
+
+def run_worker(args):
+    from tensorflow import keras
+    from training import RecordData
+    from training.precision import set_precision
+
+    set_precision(args.precision, verbose=0)
+    img_size = (args.img_size, args.img_size)
+
+    if args.cache:
+        train = RecordData(os.path.join(args.cache, 'train'), args.batch_size, shuffle=True, seed=0)
+        val = RecordData(os.path.join(args.cache, 'val'), args.batch_size)
+        img_size, num_classes = train.img_size, train.num_classes
+        train_ds, val_ds, val_labels = train.dataset.repeat(), val.dataset, val.classes
+    else:
+        num_classes = args.classes
+        train_ds, _ = synthetic_dataset(num_classes, img_size, args.batch_size, args.batch_size * args.steps, 0)
+        train_ds = train_ds.repeat()
+        val_ds, val_labels = synthetic_dataset(num_classes, img_size, args.batch_size, args.val_images, 1)
+
+    model = build_model(args.model, img_size, num_classes, args.xla)
+
+    class StepTimes(keras.callbacks.Callback):
+        def __init__(self):
+            super().__init__()
+            self.times = []
+
+        def on_train_batch_begin(self, batch, logs=None):
+            self._start = time.perf_counter()
+
+        def on_train_batch_end(self, batch, logs=None):
+            self.times.append(time.perf_counter() - self._start)
+
+    step_times = StepTimes()
+    model.fit(train_ds, epochs=args.epochs, steps_per_epoch=args.steps, callbacks=[step_times], verbose=0)
+
+    probs = model.predict(val_ds, verbose=0)
+    # Ilk epoch'u (tracing / XLA derleme) olcume katma
+    timed = step_times.times[args.steps:] or step_times.times[1:]
+    step_ms = statistics.median(timed) * 1000.0
+    print(json.dumps({
+        'step_ms': step_ms,
+        'images_per_sec': args.batch_size / (step_ms / 1000.0),
+        'macro_f1': macro_f1(np.asarray(val_labels), probs.argmax(axis=1), num_classes),
+    }))
+
+
+# ============================================================================
+# KARSILASTIRMA
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Precision / XLA karsilastirma kosusu")
+    parser.add_argument('--model', choices=MODELS, default='densenet121')
+    parser.add_argument('--img-size', type=int, default=224)
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--epochs', type=int, default=2, help="Ilk epoch isinma sayilir")
+    parser.add_argument('--steps', type=int, default=30, help="Epoch basina adim")
+    parser.add_argument('--classes', type=int, default=4, help="Sentetik veri sinif sayisi")
+    parser.add_argument('--val-images', type=int, default=256, help="Sentetik validation goruntu sayisi")
+    parser.add_argument('--cache', help="compile_dataset.py cache'i (<cache>/train, <cache>/val)")
+    parser.add_argument('--precisions', nargs='+', choices=PRECISIONS, default=list(PRECISIONS))
+    parser.add_argument('--xla-modes', nargs='+', choices=['off', 'on'], default=['off', 'on'])
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--precision', default='fp32', help=argparse.SUPPRESS)
+    parser.add_argument('--xla', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    common = ['--model', args.model, '--img-size', str(args.img_size), '--batch-size', str(args.batch_size),
+              '--epochs', str(args.epochs), '--steps', str(args.steps), '--classes', str(args.classes),
+              '--val-images', str(args.val_images)] + (['--cache', args.cache] if args.cache else [])
+
+    print(f"Model: {args.model}, {'cache: ' + args.cache if args.cache else 'sentetik veri'}, "
+          f"batch={args.batch_size}, {args.epochs} epoch x {args.steps} adim")
+    print(f"{'precision':<16} {'xla':<5} {'ms/step':>9} {'goruntu/sn':>11} {'macro F1':>9}")
+    print("-" * 54)
+    baseline = None
+    for precision in args.precisions:
+        for xla in args.xla_modes:
+            cmd = [sys.executable, os.path.abspath(__file__), '--worker', '--precision', precision] + common
+            if xla == 'on':
+                cmd.append('--xla')
+            proc = subprocess.run(cmd, capture_output=True, text=True)
+            if proc.returncode != 0:
+                print(f"{precision:<16} {xla:<5} HATA: {proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else proc.returncode}")
+                continue
+            result = json.loads(proc.stdout.strip().splitlines()[-1])
+            baseline = baseline or result['step_ms']
+            print(f"{precision:<16} {xla:<5} {result['step_ms']:>9.1f} {result['images_per_sec']:>11.1f} "
+                  f"{result['macro_f1']:>9.4f}  (x{baseline / result['step_ms']:.2f})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PREPROCESSING MICRO-BENCHMARK
+Servislerdeki eski preprocess_image() kopyalari ile inference/preprocessing.py
+pipeline'larini karsilastirir: goruntu basina us ve NumPy'nin ayirdigi ek bellek
+(tracemalloc peak, goruntu basina).
+
+Eski kodun keras preprocess_input cagrilari ayni formulle NumPy'de yazildi
+(EfficientNet: degismez, DenseNet: 'torch' modu), TensorFlow gerekmez.
+
+Kullanim:
+  python benchmark_preprocessing.py
+  python benchmark_preprocessing.py --runs 500 --batch-size 8
+  python benchmark_preprocessing.py --upload-scale 2   # resize dahil
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from PIL import Image
+
+from inference.preprocessing import CLAHE_AVAILABLE, IMAGENET_MEAN, IMAGENET_STD, Preprocessor
+
+if CLAHE_AVAILABLE:
+    import cv2
+
+# Windows console UTF-8 support
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8')
+    except:
+        pass
+
+CASES = [
+    # (servis, pipeline, img_size, gri goruntu)
+    ('skin', 'efficientnet', (300, 300), False),
+    ('bone', 'densenet_clahe', (384, 384), False),
+    ('bone (gri)', 'densenet_clahe', (384, 384), True),
+    ('eye', 'rescale', (224, 224), False),
+]
+
+
+# ============================================================================
+# ESKI IMPLEMENTASYON (skin/bone/eye_disease_api.py, degistirilmeden once)
+# ============================================================================
+
+def legacy_densenet_preprocess(x):
+    x = x / 255.0
+    x = x - IMAGENET_MEAN
+    return x / IMAGENET_STD
+
+
+def legacy_preprocess(image, pipeline, img_size):
+    image = image.resize(img_size)
+    img_array = np.array(image)
+    if pipeline == 'rescale':
+        return np.expand_dims(img_array / 255.0, axis=0)
+
+    if pipeline == 'densenet_clahe':
+        if np.allclose(img_array[:, :, 0], img_array[:, :, 1]) and np.allclose(img_array[:, :, 1], img_array[:, :, 2]):
+            if CLAHE_AVAILABLE:
+                img_2d = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+                img_array = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8)).apply(img_2d)
+                img_array = np.expand_dims(img_array, axis=-1)
+            if img_array.shape[2] == 1:
+                img_array = np.repeat(img_array, 3, axis=-1)
+        return np.expand_dims(legacy_densenet_preprocess(img_array.astype(np.float32)), axis=0)
+
+    if len(img_array.shape) == 2:
+        img_array = np.stack([img_array] * 3, axis=-1)
+    return np.expand_dims(img_array.astype(np.float32), axis=0)
+
+
+# ============================================================================
+# OLCUM
+# ============================================================================
+
+def sample_image(img_size, grayscale, rng, scale):
+    # scale > 1: upload modelden buyuk, PIL resize da olcume dahil
+    width, height = int(img_size[0] * scale), int(img_size[1] * scale)
+    if grayscale:
+        return Image.fromarray(rng.integers(0, 256, (height, width), dtype=np.uint8)).convert('RGB')
+    return Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8))
+
+
+def time_us(fn, runs):
+    fn()
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs * 1e6
+
+
+def peak_kb(fn):
+    fn()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Preprocessing micro-benchmark (eski vs paylasilan pipeline)")
+    parser.add_argument('--runs', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=8, help="batch() olcumu icin goruntu sayisi")
+    parser.add_argument('--upload-scale', type=float, default=1.0,
+                        help="upload boyutu / model boyutu (1.0 = sadece NumPy isi olculur)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"CLAHE: {'var' if CLAHE_AVAILABLE else 'yok (OpenCV kurulu degil)'}, runs={args.runs}, "
+          f"upload scale={args.upload_scale}")
+    print(f"{'servis':<12} {'yontem':<22} {'us/goruntu':>11} {'ek bellek KB/goruntu':>22}")
+    print("-" * 70)
+
+    for name, pipeline, img_size, grayscale in CASES:
+        image = sample_image(img_size, grayscale, rng, args.upload_scale)
+        images = [image] * args.batch_size
+        preprocessor = Preprocessor(pipeline, img_size)
+        buffer = preprocessor.new_batch(args.batch_size)
+
+        legacy = lambda: legacy_preprocess(image, pipeline, img_size)
+        legacy_batch = lambda: np.concatenate([legacy_preprocess(im, pipeline, img_size) for im in images])
+        shared = lambda: preprocessor(image)
+        shared_slot = lambda: preprocessor(image, out=buffer[0])
+        shared_batch = lambda: preprocessor.batch(images, out=buffer)
+
+        # Sonuclar ayni olmali (float32 yuvarlama farki disinda)
+        np.testing.assert_allclose(shared(), legacy(), rtol=1e-4, atol=1e-4)
+
+        rows = [
+            ('eski', time_us(legacy, args.runs), peak_kb(legacy)),
+            ('yeni (1, H, W, 3)', time_us(shared, args.runs), peak_kb(shared)),
+            ('yeni batch slot', time_us(shared_slot, args.runs), peak_kb(shared_slot)),
+            (f'eski batch x{args.batch_size}', time_us(legacy_batch, max(1, args.runs // args.batch_size)) / args.batch_size,
+             peak_kb(legacy_batch) / args.batch_size),
+            (f'yeni batch x{args.batch_size}', time_us(shared_batch, max(1, args.runs // args.batch_size)) / args.batch_size,
+             peak_kb(shared_batch) / args.batch_size),
+        ]
+        for label, us, kb in rows:
+            print(f"{name:<12} {label:<22} {us:>11.1f} {kb:>22.1f}")
+        print()
+
+
+if __name__ == '__main__':
+    main()
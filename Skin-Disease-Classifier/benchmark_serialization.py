@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON SERIALIZATION MICRO-BENCHMARK
+Randevu/analiz listesi yanitlarinin serialize maliyeti: eski yol (handler icinde
+elle yazilmis createdAt/updatedAt/approvedAt donusumu + Flask'in varsayilan json
+encoder'i) ile yeni yol (helpers.serialize_firestore_doc + FirestoreJSONProvider,
+orjson kuruluysa orjson) karsilastirilir. Firestore gerekmez, dokumanlar sentetik.
+
+Kullanim:
+  python benchmark_serialization.py
+  python benchmark_serialization.py --docs 2000 --runs 50
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from google.api_core.datetime_helpers import DatetimeWithNanoseconds
+
+from utils.helpers import serialize_firestore_doc
+from utils.json_provider import ORJSON_AVAILABLE, FirestoreJSONProvider
+
+# Windows console UTF-8 support
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8')
+    except:
+        pass
+
+
+class Snapshot:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self.exists = True
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+def sample_docs(count):
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    docs = []
+    for i in range(count):
+        ts = DatetimeWithNanoseconds.fromtimestamp((base + timedelta(minutes=i)).timestamp(), tz=timezone.utc)
+        docs.append(Snapshot(f"apt{i:06d}", {
+            'userId': f"patient-{i % 500}",
+            'doctorType': 'dermatolog',
+            'date': '2025-03-14',
+            'time': '10:30',
+            'reason': 'Ciltte kızarıklık ve kaşıntı şikayeti',
+            'status': 'approved',
+            'jitsiRoom': f"medianalytica-{i:012x}",
+            'results': [{'class': 'nv', 'confidence': 0.91}, {'class': 'mel', 'confidence': 0.06}],
+            'createdAt': ts,
+            'updatedAt': ts,
+            'approvedAt': ts,
+        }))
+    return docs
+
+
+# ============================================================================
+# ESKI IMPLEMENTASYON (auth_api.get_appointments, degistirilmeden once)
+# ============================================================================
+
+def legacy_serialize(docs):
+    appointments = []
+    for doc in docs:
+        data = doc.to_dict()
+        data['id'] = doc.id
+        for field in ('createdAt', 'updatedAt', 'approvedAt'):
+            if field in data:
+                if hasattr(data[field], 'timestamp'):
+                    data[field] = data[field].timestamp()
+                elif isinstance(data[field], datetime):
+                    data[field] = data[field].timestamp()
+                else:
+                    data[field] = None
+        appointments.append(data)
+    return appointments
+
+
+def time_ms(fn, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON serialization micro-benchmark (eski vs FirestoreJSONProvider)")
+    parser.add_argument('--docs', type=int, default=1000, help="yanittaki dokuman sayisi")
+    parser.add_argument('--runs', type=int, default=30)
+    args = parser.parse_args()
+
+    docs = sample_docs(args.docs)
+    legacy_app, new_app = Flask('legacy'), Flask('new')
+    legacy_app.json = DefaultJSONProvider(legacy_app)
+    new_app.json = FirestoreJSONProvider(new_app)
+
+    def legacy():
+        with legacy_app.app_context():
+            return legacy_app.json.response({'success': True, 'appointments': legacy_serialize(docs)}).get_data()
+
+    def new():
+        with new_app.app_context():
+            return new_app.json.response({'success': True, 'appointments': [serialize_firestore_doc(d) for d in docs]}).get_data()
+
+    def new_direct():
+        # Dönüştürülmemiş Firestore değerleri doğrudan encoder'a verilir
+        with new_app.app_context():
+            return new_app.json.response({'success': True, 'appointments': [d.to_dict() for d in docs]}).get_data()
+
+    print(f"orjson: {'var' if ORJSON_AVAILABLE else 'yok (json modulu)'}, docs={args.docs}, runs={args.runs}")
+    print(f"{'yontem':<28} {'ms (medyan)':>12} {'KB':>8}")
+    print("-" * 50)
+    for label, fn in (('eski', legacy), ('yeni (serialize + provider)', new), ('yeni (sadece provider)', new_direct)):
+        print(f"{label:<28} {time_ms(fn, args.runs):>12.2f} {len(fn()) / 1024:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
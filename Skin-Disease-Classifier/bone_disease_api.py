@@ -21,8 +21,13 @@ try:
 except ImportError:
     print("[UYARI] OpenCV (cv2) bulunamadi. CLAHE devre disi. Yüklemek için: pip install opencv-python")
     CLAHE_AVAILABLE = False
-from tensorflow.keras.applications.densenet import preprocess_input as densenet_preprocess
 import base64
+from inference.prediction_cache import PredictionCache, model_version
+from inference.tflite_backend import inference_backend, load_tflite_backend
+from inference.onnx_backend import load_onnx_backend
+from inference.preprocessing import PreprocessPool, Preprocessor
+from inference.manifest import load_manifest, manifest_path, output_key, select_output, serving_model_path
+from inference.warmup import Warmup, warmup_batch_sizes, warmup_gradcam_enabled
 
 # Windows console UTF-8 support
 if sys.platform == 'win32':
@@ -42,7 +47,10 @@ import os
 MODEL_PATH_SAVEDMODEL = 'models/bone_disease_model_4class_densenet121_macro_f1_savedmodel'
 MODEL_PATH_KERAS = 'models/bone_disease_model_4class_densenet121_macro_f1.keras'
 # Önce SavedModel'i dene, yoksa .keras'ı dene
-MODEL_PATH = MODEL_PATH_SAVEDMODEL if os.path.exists(MODEL_PATH_SAVEDMODEL) else MODEL_PATH_KERAS
+# export_model.py manifest'i varsa model yolu ve çıktı anahtarı oradan okunur
+MODEL_MANIFEST = load_manifest(manifest_path('models', 'bone'))
+MODEL_PATH = serving_model_path(MODEL_MANIFEST) or (MODEL_PATH_SAVEDMODEL if os.path.exists(MODEL_PATH_SAVEDMODEL) else MODEL_PATH_KERAS)
+OUTPUT_KEY = output_key(MODEL_MANIFEST)
 CLASS_NAMES = [
     'Normal',
     'Fracture',
@@ -65,6 +73,10 @@ CLASS_DESCRIPTIONS = {
 }
 
 IMG_SIZE = (384, 384)  # Eğitimde kullanılan boyut (train_bone_4class_macro_f1.py ile aynı)
+# Gri goruntulerde CLAHE + DenseNet121 ImageNet normalizasyonu (egitimle AYNI)
+preprocessor = Preprocessor('densenet_clahe', IMG_SIZE)
+# PREPROCESS_WORKERS > 0: CLAHE + resize bir worker pool'da calisir
+preprocess_pool = PreprocessPool.from_env()
 
 # ============================================================================
 # ÖZEL KATMAN VE METRİK SINIFLARI - Model yüklenirken gerekli
@@ -240,95 +252,46 @@ except Exception as e:
         print(f"[HATA DETAY] {error_msg[:500]}...")
     sys.exit(1)
 
-def apply_clahe_grayscale(img):
-    """Apply CLAHE (Contrast Limited Adaptive Histogram Equalization) to grayscale image"""
-    if not CLAHE_AVAILABLE:
-        return img
-    
-    # Ensure uint8
-    if img.max() <= 1.0:
-        img_uint8 = (img * 255.0).astype(np.uint8)
-    elif img.dtype != np.uint8:
-        img_uint8 = np.clip(img, 0, 255).astype(np.uint8)
-    else:
-        img_uint8 = img
-    
-    # Extract single channel for grayscale
-    if len(img_uint8.shape) == 3 and img_uint8.shape[2] == 1:
-        img_2d = img_uint8[:, :, 0]
-    elif len(img_uint8.shape) == 2:
-        img_2d = img_uint8
-    else:
-        # If RGB, convert to grayscale first
-        img_2d = cv2.cvtColor(img_uint8, cv2.COLOR_RGB2GRAY)
-    
-    # Create CLAHE object
-    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-    
-    # Apply CLAHE
-    img_clahe = clahe.apply(img_2d)
-    
-    # Reshape back to (H, W, 1) if needed (preserve original shape)
-    if len(img_uint8.shape) == 3:
-        img_clahe = np.expand_dims(img_clahe, axis=-1)
-    
-    return img_clahe
+# Opsiyonel TFLite / ONNX Runtime backend (INFERENCE_BACKEND=tflite|onnx) - Grad-CAM icin TF model yuklu kalir
+runtime_model = load_tflite_backend(MODEL_PATH) or load_onnx_backend(MODEL_PATH)
 
+# Prediction cache (aynı görüntü tekrar yüklendiğinde model çalıştırılmaz)
+MODEL_VERSION = model_version(runtime_model.path if runtime_model else MODEL_PATH)
+prediction_cache = PredictionCache.from_env()
+print(f"[BILGI] Prediction cache: {prediction_cache.max_entries} kayit, TTL {prediction_cache.ttl_seconds:.0f}s, disk: {prediction_cache.disk_dir or 'yok'}")
 
 def preprocess_image(image):
     """
     Preprocess image for model input - Eğitim scriptindeki ile AYNI
-    
-    Process:
-    1. Resize to (384, 384)
-    2. Convert PIL Image to numpy array
-    3. Apply CLAHE if grayscale (matches training)
-    4. Convert grayscale to RGB if needed
-    5. Apply official DenseNet121 ImageNet preprocessing
+    (resize to (384, 384), CLAHE if grayscale, DenseNet121 ImageNet
+    preprocessing); see inference/preprocessing.py
+
+    Returns:
+        np.ndarray: (1, 384, 384, 3) float32
     """
-    # Resize to training size
-    image = image.resize(IMG_SIZE)
-    
-    # Convert PIL Image to numpy array (values in [0, 255], uint8)
-    img_array = np.array(image)
-    
-    # Detect if image is grayscale
-    is_grayscale = False
-    if len(img_array.shape) == 2:
-        is_grayscale = True
-    elif len(img_array.shape) == 3:
-        if img_array.shape[2] == 1:
-            is_grayscale = True
-        elif img_array.shape[2] == 3:
-            # Check if it's actually grayscale (all channels same)
-            if np.allclose(img_array[:,:,0], img_array[:,:,1]) and np.allclose(img_array[:,:,1], img_array[:,:,2]):
-                is_grayscale = True
-    
-    # Apply CLAHE if grayscale and available (matches training)
-    if is_grayscale and CLAHE_AVAILABLE:
-        img_array = apply_clahe_grayscale(img_array)
-        # Ensure still uint8 after CLAHE
-        if img_array.dtype != np.uint8:
-            img_array = np.clip(img_array, 0, 255).astype(np.uint8)
-    
-    # Convert grayscale to RGB if needed (model expects RGB input)
-    if len(img_array.shape) == 2:
-        # (H, W) -> (H, W, 3)
-        img_array = np.stack([img_array] * 3, axis=-1)
-    elif len(img_array.shape) == 3 and img_array.shape[2] == 1:
-        # (H, W, 1) -> (H, W, 3)
-        img_array = np.repeat(img_array, 3, axis=-1)
-    # If already RGB (H, W, 3), keep as is
-    
-    # Apply official DenseNet121 ImageNet preprocessing
-    # This handles: scaling to [0,1] and ImageNet mean/std normalization
-    # Matches exactly what the pretrained DenseNet121 expects
-    img_preprocessed = densenet_preprocess(img_array.astype(np.float32))
-    
-    # Add batch dimension
-    img_preprocessed = np.expand_dims(img_preprocessed, axis=0)
-    
-    return img_preprocessed
+    return preprocess_pool.run(preprocessor, image)
+
+def predict_probabilities(processed_image):
+    """Run a preprocessed batch through the model, returns (N, num_classes) numpy array"""
+    if runtime_model is not None:
+        return runtime_model.predict(processed_image)
+    
+    # SavedModel veya Keras model prediction
+    if hasattr(model, 'predict'):
+        # Keras model
+        return model.predict(processed_image, verbose=0)
+    
+    # SavedModel - callable veya signature function
+    input_tensor = tf.constant(processed_image, dtype=tf.float32)
+    predictions_tensor = model(input_tensor)
+    
+    # TensorFlow tensor'ı numpy array'e çevir
+    if isinstance(predictions_tensor, dict):
+        # Signature function dict döner - anahtar manifest'ten (eski export'larda tek çıktı)
+        return select_output(predictions_tensor, OUTPUT_KEY).numpy()
+    elif hasattr(predictions_tensor, 'numpy'):
+        return predictions_tensor.numpy()
+    return np.array(predictions_tensor)
 
 # ============================================================================
 # GRAD-CAM FUNCTIONS
@@ -536,6 +499,28 @@ def overlay_heatmap(img, heatmap, alpha=0.4):
     
     return superimposed
 
+# ============================================================================
+# WARM-UP - ilk gerçek istekler tracing/allocation maliyetini ödemesin
+# ============================================================================
+
+def build_warmup_steps():
+    """Her batch size için dummy tahmin (+ Grad-CAM) adımları"""
+    # Gri tonlamalı örnek: CLAHE yolu da ısınsın
+    gray = np.random.randint(0, 255, (IMG_SIZE[1], IMG_SIZE[0]), dtype=np.uint8)
+    sample = Image.fromarray(gray).convert('RGB')
+    processed = preprocess_image(sample)
+    
+    steps = []
+    for batch_size in warmup_batch_sizes():
+        batch = np.repeat(processed, batch_size, axis=0)
+        steps.append((f"predict_bs{batch_size}", lambda b=batch: predict_probabilities(b), True))
+    if warmup_gradcam_enabled() and model_type != 'savedmodel':
+        steps.append(("gradcam", lambda: compute_gradcam(model, processed, model_type=model_type), False))
+    return steps
+
+warmup = Warmup('bone')
+warmup.start(build_warmup_steps())
+
 @app.route('/')
 def status():
     """API status endpoint"""
@@ -550,10 +535,28 @@ def status():
         "endpoints": {
             "GET /": "API durumu",
             "POST /predict": "Goruntu tahmini (multipart/form-data, field: 'image')",
-            "GET /classes": "Tum siniflari listele"
+            "GET /classes": "Tum siniflari listele",
+            "GET /metrics": "Prediction cache istatistikleri",
+            "GET /ready": "Warm-up tamamlandi mi (load balancer icin)"
         }
     })
 
+@app.route('/ready')
+def ready():
+    """Readiness - warm-up bitene kadar 503 döner"""
+    return jsonify(warmup.status()), 200 if warmup.ready else 503
+
+@app.route('/metrics')
+def metrics():
+    """Inference metrics"""
+    return jsonify({
+        "model_version": MODEL_VERSION,
+        "backend": inference_backend() if runtime_model else "tensorflow",
+        "runtime_model": runtime_model.path if runtime_model else None,
+        "prediction_cache": prediction_cache.stats(),
+        "preprocess_pool": preprocess_pool.stats()
+    })
+
 @app.route('/classes')
 def list_classes():
     """List all disease classes with descriptions"""
@@ -585,37 +588,23 @@ def predict():
     file_content = file.read()
     file_stream = io.BytesIO(file_content)
     
+    # Aynı görüntü daha önce analiz edildiyse cache'ten dön
+    cache_key = PredictionCache.make_key(file_content, 'bone', MODEL_VERSION)
+    cached = prediction_cache.get(cache_key)
+    
     try:
-        # Read and preprocess image
-        file_stream.seek(0)
-        image = Image.open(file_stream).convert('RGB')
-        processed_image = preprocess_image(image)
-        
-        # Predict
-        # SavedModel veya Keras model prediction
-        if hasattr(model, 'predict'):
-            # Keras model
-            predictions = model.predict(processed_image, verbose=0)
+        processed_image = None
+        if cached is not None:
+            predictions = cached.probabilities[np.newaxis, :]
         else:
-            # SavedModel - callable veya signature function
-            # Input için TensorFlow tensor oluştur
-            input_tensor = tf.constant(processed_image, dtype=tf.float32)
+            # Read and preprocess image
+            file_stream.seek(0)
+            image = Image.open(file_stream)  # gri modlar (L) CLAHE icin oldugu gibi kalir
+            processed_image = preprocess_image(image)
             
-            # Signature function ise dict döner
-            if callable(model):
-                predictions_tensor = model(input_tensor)
-            else:
-                predictions_tensor = model(input_tensor)
-            
-            # TensorFlow tensor'ı numpy array'e çevir
-            if isinstance(predictions_tensor, dict):
-                # Signature function dict döner, genelde 'output_0' veya ilk değer
-                output_key = list(predictions_tensor.keys())[0]
-                predictions = predictions_tensor[output_key].numpy()
-            elif hasattr(predictions_tensor, 'numpy'):
-                predictions = predictions_tensor.numpy()
-            else:
-                predictions = np.array(predictions_tensor)
+            # Predict
+            predictions = predict_probabilities(processed_image)
+            prediction_cache.put(cache_key, predictions[0])
         
         # Get top prediction
         top_idx = np.argmax(predictions[0])
@@ -659,12 +648,17 @@ def predict():
         }
         
         # Grad-CAM isteğe bağlı
-        if request.form.get('with_gradcam', 'false').lower() == 'true':
+        with_gradcam = request.form.get('with_gradcam', 'false').lower() == 'true'
+        if with_gradcam and cached is not None and cached.gradcam is not None:
+            result["gradcam"] = f"data:image/png;base64,{base64.b64encode(cached.gradcam).decode('utf-8')}"
+        elif with_gradcam:
             try:
                 # Original image'ı sakla (preprocessing öncesi)
                 file_stream.seek(0)
                 original_image = Image.open(file_stream).convert('RGB')
                 original_array = np.array(original_image)
+                if processed_image is None:
+                    processed_image = preprocess_image(original_image)
                 
                 # Grad-CAM hesapla
                 print(f"[GRAD-CAM] Grad-CAM hesaplanıyor... Model tipi: {model_type}")
@@ -689,6 +683,7 @@ def predict():
                 buffer = io.BytesIO()
                 gradcam_pil.save(buffer, format='PNG')
                 gradcam_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
+                prediction_cache.put(cache_key, predictions[0], gradcam=buffer.getvalue())
                 
                 result["gradcam"] = f"data:image/png;base64,{gradcam_base64}"
             except NotImplementedError as e:
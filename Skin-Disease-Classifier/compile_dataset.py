@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+COMPILE DATASET (TFRecord CACHE)
+Egitim split'lerini bir kez decode + resize (+ bone/lung icin CLAHE) edip
+uint8 piksel, etiket ve kaynak dosya SHA-256'si ile sharded TFRecord olarak
+yazar (training/records.py). Egitim scriptleri DATASET_CACHE ile bu cache'i
+okur; her epoch JPEG/PNG decode ve CLAHE tekrar hesaplanmaz.
+
+Manifest'i ayni parametreler ve ayni dosyalarla (hash) yazilmis split'ler
+atlanir; --force ile yeniden yazilir.
+
+Kullanim:
+  python compile_dataset.py bone
+  python compile_dataset.py lung skin --shards 16
+  python compile_dataset.py bone --splits val test --force
+  python compile_dataset.py eye
+
+  DATASET_CACHE=datasets/cache/bone python train_bone_4class_macro_f1.py
+  python train.py bone --cache datasets/cache/bone
+"""
+
+import argparse
+import os
+import sys
+
+from training import CONFIGS, compile_split
+from training.configs.sources import SPLITS
+
+# Windows console UTF-8 support
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8')
+    except:
+        pass
+
+CACHE_ROOT = os.path.join('datasets', 'cache')
+
+# Same classes, image size, pipeline and file order as the engine's configs
+# (training/configs), which also match the train_*_macro_f1.py scripts
+DATASETS = CONFIGS
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Egitim split'lerini onislenmis TFRecord cache'ine derle")
+    parser.add_argument('datasets', nargs='+', choices=sorted(DATASETS))
+    parser.add_argument('--splits', nargs='+', default=list(SPLITS), choices=SPLITS)
+    parser.add_argument('--output', default=CACHE_ROOT, help="Cache koku (<output>/<dataset>/<split>)")
+    parser.add_argument('--shards', type=int, default=8, help="Split basina TFRecord dosyasi")
+    parser.add_argument('--force', action='store_true', help="Guncel olsa da yeniden yaz")
+    args = parser.parse_args()
+
+    print(f"{'dataset':<8} {'split':<6} {'goruntu':>8} {'shard':>6} {'MB':>9}  durum")
+    print("-" * 50)
+    for name in args.datasets:
+        config = DATASETS[name]
+        for split in args.splits:
+            filepaths, labels = config['files'](split, config['class_names'])
+            if not filepaths:
+                print(f"{name:<8} {split:<6} {0:>8} {'-':>6} {'-':>9}  kaynak yok, atlandi")
+                continue
+            cache_dir = os.path.join(args.output, name, split)
+            manifest, written = compile_split(
+                filepaths, labels, config['class_names'], cache_dir, config['img_size'], config['pipeline'],
+                color_mode=config.get('color_mode', 'rgb'), shards=args.shards, force=args.force, verbose=0
+            )
+            size_mb = sum(os.path.getsize(os.path.join(cache_dir, shard)) for shard in manifest['shards']) / 1e6
+            print(f"{name:<8} {split:<6} {manifest['count']:>8} {len(manifest['shards']):>6} {size_mb:>9.1f}  "
+                  f"{'yazildi' if written else 'guncel'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Convert models to ONNX (ONNX Runtime backend) + numerical parity check
+
+Her model icin models/<model>.onnx uretir (SavedModel varsa ondan, yoksa
+.keras dosyasindan), ONNX Runtime ile ornek test goruntulerinde TensorFlow
+ciktisiyla karsilastirir ve sonucu models/onnx_parity_report.json dosyasina
+yazar. Servisler (INFERENCE_BACKEND=onnx) reddedilen modelleri yuklemez.
+
+Gerekli: pip install tf2onnx onnxruntime
+
+Kullanim:
+  python convert_models_to_onnx.py                    # tum modeller
+  python convert_models_to_onnx.py --disease skin bone --opset 15
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+import numpy as np
+import tensorflow as tf
+from PIL import Image
+
+from export_tflite_models import (
+    EXPORTS, file_size_mb, find_model_path, list_images, load_images, load_reference_model,
+    predict_in_batches, single_image_latency_ms, update_report
+)
+from inference.metrics import parity_report
+from inference.onnx_backend import PARITY_REPORT_NAME, OnnxModel, onnx_model_path
+from inference.preprocessing import Preprocessor
+
+# Windows console UTF-8 support
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8')
+    except:
+        pass
+
+
+def convert(model_path, keras_model, config, output_path, opset):
+    """SavedModel -> tf2onnx CLI, .keras -> tf2onnx.convert.from_keras (batch boyutu dinamik)"""
+    if keras_model is None:
+        subprocess.run([sys.executable, '-m', 'tf2onnx.convert', '--saved-model', model_path,
+                        '--output', output_path, '--opset', str(opset)], check=True)
+        return
+
+    import tf2onnx
+    spec = (tf.TensorSpec((None, config['img_size'][1], config['img_size'][0], 3), tf.float32, name='input'),)
+    tf2onnx.convert.from_keras(keras_model, input_signature=spec, opset=opset, output_path=output_path)
+
+
+def sample_inputs(config, per_class):
+    """Test klasorunden ornekler; veri yoksa rastgele goruntuler (sadece sayisal parity)"""
+    samples = list_images(config['eval_dirs'], config, per_class=per_class)
+    if samples:
+        images = load_images([path for path, _ in samples], config)
+        return images, np.array([label for _, label in samples], dtype=np.int64)
+
+    print(f"[UYARI] Test verisi bulunamadi: {', '.join(config['eval_dirs'])} - rastgele goruntuler kullaniliyor")
+    rng = np.random.default_rng(42)
+    width, height = config['img_size']
+    preprocessor = Preprocessor(config['preprocess'], config['img_size'])
+    images = preprocessor.batch([
+        Image.fromarray(rng.integers(0, 255, (height, width, 3), dtype=np.uint8)) for _ in range(8)
+    ])
+    return images, None
+
+
+def convert_disease(disease, config, args):
+    """Bir hastalik modeli icin ONNX export + parity; rapor girdisini dondurur"""
+    print("\n" + "=" * 70)
+    print(f"{disease.upper()} MODEL")
+    print("=" * 70)
+
+    model_path = find_model_path(config)
+    if model_path is None:
+        print(f"[HATA] Model bulunamadi: {', '.join(config['model_paths'])}")
+        return {}
+
+    print(f"[YUKLENIYOR] TensorFlow model: {model_path}")
+    keras_model, reference_predict = load_reference_model(model_path)
+
+    output_path = onnx_model_path(model_path)
+    print(f"[DONUSTURULUYOR] -> {output_path} (opset {args.opset})")
+    convert(model_path, keras_model, config, output_path, args.opset)
+    print(f"[OK] {file_size_mb(output_path):.2f} MB")
+
+    images, y_true = sample_inputs(config, args.samples_per_class)
+    reference_probs = predict_in_batches(reference_predict, images)
+
+    onnx_model = OnnxModel(output_path)
+    candidate_probs = predict_in_batches(onnx_model.predict, images)
+
+    max_abs_diff = float(np.abs(reference_probs - candidate_probs).max())
+    top1_agreement = float((reference_probs.argmax(axis=1) == candidate_probs.argmax(axis=1)).mean())
+    entry = {
+        'disease': disease,
+        'source_model': model_path,
+        'samples': int(len(images)),
+        'max_abs_prob_diff': round(max_abs_diff, 7),
+        'top1_agreement': round(top1_agreement, 4),
+        'tolerance': args.atol,
+        'opset': args.opset,
+        'size_mb': {'reference': file_size_mb(model_path), 'candidate': file_size_mb(output_path)},
+        'latency_ms_bs1': {'reference': single_image_latency_ms(reference_predict, images[0]),
+                           'candidate': single_image_latency_ms(onnx_model.predict, images[0])},
+        'accepted': bool(max_abs_diff <= args.atol and top1_agreement == 1.0)
+    }
+    if y_true is not None:
+        # ONNX fp32 oldugu icin F1 birebir ayni olmali; yine de kayda gecsin
+        entry['f1'] = parity_report(y_true, reference_probs, candidate_probs, config['classes'])
+
+    print(f"  Max |fark|: {max_abs_diff:.2e} (tolerans {args.atol:.0e}), top-1 uyum {top1_agreement:.2%}")
+    print(f"  Latency (bs=1): {entry['latency_ms_bs1']['reference']} ms -> {entry['latency_ms_bs1']['candidate']} ms")
+    print(f"  [{'KABUL' if entry['accepted'] else 'RED'}]")
+    return {os.path.basename(output_path): entry}
+
+
+def add_arguments(parser):
+    """ONNX export/parity secenekleri (export_model.py de kullanir)"""
+    parser.add_argument('--opset', type=int, default=13)
+    parser.add_argument('--samples-per-class', type=int, default=10,
+                        help="parity icin sinif basina test goruntusu")
+    parser.add_argument('--atol', type=float, default=1e-4,
+                        help="olasiliklarda kabul edilen en buyuk mutlak fark")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ONNX export + numerical parity check")
+    parser.add_argument('--disease', nargs='+', choices=sorted(EXPORTS), default=sorted(EXPORTS))
+    add_arguments(parser)
+    parser.add_argument('--report', default=os.path.join('models', PARITY_REPORT_NAME))
+    args = parser.parse_args()
+
+    entries = {}
+    for disease in args.disease:
+        entries.update(convert_disease(disease, EXPORTS[disease], args))
+    update_report(args.report, entries)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MODEL EXPORT PIPELINE
+Egitilmis .keras modelinden servis artifact'larini ve manifest'i uretir.
+DOCKER_*.py, convert_skin_model_to_savedmodel.py ve convert_keras_to_tfjs.py
+scriptlerinin yerine gecer.
+
+Uretilenler (models/ altinda, <model> = .keras dosyasinin adi):
+  <model>_savedmodel/      sabit serving_default imzasi:
+                           image (None, H, W, 3) float32 -> {'probabilities': (None, num_classes)}
+  <model>_xla_savedmodel/  ayni imza, XLA ile derlenmis (--xla)
+  <model>_fp16.tflite, <model>_int8.tflite + parity raporu (--tflite)
+  <model>.onnx + parity raporu (--onnx)
+  <model>_tfjs/            TensorFlow.js (--tfjs)
+  <disease>_manifest.json  artifact yollari + SHA-256, input spec, batch size basina latency
+
+Servisler manifest'i okuyarak model yolunu ve cikti anahtarini bulur.
+
+Kullanim:
+  python export_model.py --disease bone
+  python export_model.py --disease skin --xla --tflite --tfjs
+  python export_model.py --disease lung --keras models/lung_3class_densenet121_macro_f1.keras --batch-sizes 1,4,8,16
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+import tensorflow as tf
+from tensorflow import keras
+
+import convert_models_to_onnx
+import export_tflite_models
+from export_tflite_models import EXPORTS, file_size_mb
+from inference.custom_objects import CUSTOM_OBJECTS
+from inference.manifest import (
+    INPUT_NAME, MANIFEST_VERSION, OUTPUT_KEY, artifact_sha256, manifest_path
+)
+from inference.onnx_backend import PARITY_REPORT_NAME as ONNX_PARITY_REPORT_NAME, onnx_model_path
+from inference.tflite_backend import PARITY_REPORT_NAME as TFLITE_PARITY_REPORT_NAME, tflite_model_path
+from inference.warmup import parse_batch_sizes
+
+# Windows console UTF-8 support
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8')
+    except:
+        pass
+
+
+def keras_source_path(config):
+    """EXPORTS icindeki .keras dosyasi"""
+    for path in config['model_paths']:
+        if path.endswith(('.keras', '.h5')):
+            return path
+    return None
+
+
+def input_spec(model, config):
+    """Modelin input shape'i; bilinmeyen boyutlar icin config'teki img_size"""
+    shape = list(model.input_shape) if getattr(model, 'input_shape', None) else [None, None, None, 3]
+    width, height = config['img_size']
+    return [None, shape[1] or height, shape[2] or width, shape[3] or 3]
+
+
+def save_serving_model(model, spec, path, jit_compile=False):
+    """
+    SavedModel'i acik bir serving_default imzasiyla kaydet.
+
+    Imza batch boyutunda polimorfik (None), diger boyutlar sabit; cikti her zaman
+    {'probabilities': ...} oldugu icin servisler ilk anahtari tahmin etmek zorunda kalmaz.
+    """
+    module = tf.Module()
+    module.model = model
+
+    @tf.function(input_signature=[tf.TensorSpec(spec, tf.float32, name=INPUT_NAME)], jit_compile=jit_compile)
+    def serve(image):
+        return {OUTPUT_KEY: model(image, training=False)}
+
+    module.serve = serve
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    tf.saved_model.save(module, path, signatures={'serving_default': serve})
+
+
+def verify_serving_model(model, path, spec):
+    """Kaydedilen imzayi Keras modeliyle karsilastir, en buyuk mutlak farki dondur"""
+    signature = tf.saved_model.load(path).signatures['serving_default']
+    sample = np.random.default_rng(0).random((2, *spec[1:]), dtype=np.float32)
+    expected = model(sample, training=False).numpy()
+    actual = signature(**{INPUT_NAME: tf.constant(sample)})[OUTPUT_KEY].numpy()
+    return float(np.abs(expected - actual).max())
+
+
+def measure_latency(path, spec, batch_sizes, runs):
+    """SavedModel imzasi icin batch size basina medyan latency (ms)"""
+    signature = tf.saved_model.load(path).signatures['serving_default']
+    latencies = {}
+    for batch_size in batch_sizes:
+        batch = tf.constant(np.random.default_rng(0).random((batch_size, *spec[1:]), dtype=np.float32))
+        signature(**{INPUT_NAME: batch})  # tracing / warm-up
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            signature(**{INPUT_NAME: batch})[OUTPUT_KEY].numpy()
+            timings.append((time.perf_counter() - start) * 1000.0)
+        latencies[str(batch_size)] = {
+            'median_ms': round(float(np.median(timings)), 2),
+            'per_image_ms': round(float(np.median(timings)) / batch_size, 2)
+        }
+        print(f"    bs={batch_size:<3} {latencies[str(batch_size)]['median_ms']:>9.2f} ms "
+              f"({latencies[str(batch_size)]['per_image_ms']:.2f} ms/goruntu)")
+    return latencies
+
+
+def export_tfjs(model, path):
+    try:
+        from tensorflowjs.converters import save_keras_model
+    except ImportError:
+        print("[UYARI] tensorflowjs paketi bulunamadi, TF.js atlaniyor (pip install tensorflowjs)")
+        return False
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    save_keras_model(model, path)
+    return True
+
+
+def artifact_entry(path, models_dir, **extra):
+    return {
+        'path': os.path.relpath(path, models_dir),
+        'sha256': artifact_sha256(path),
+        'size_mb': file_size_mb(path),
+        **extra
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Egitilmis .keras modelinden servis artifact'lari + manifest")
+    parser.add_argument('--disease', required=True, choices=sorted(EXPORTS))
+    parser.add_argument('--keras', help="kaynak .keras dosyasi (varsayilan: servisin kullandigi model)")
+    parser.add_argument('--models-dir', default='models')
+    parser.add_argument('--xla', action='store_true', help="XLA ile derlenmis SavedModel de uret")
+    parser.add_argument('--tflite', nargs='*', choices=export_tflite_models.PRECISIONS, default=None,
+                        help="TFLite export (varsayilan: fp16 ve int8)")
+    parser.add_argument('--onnx', action='store_true', help="ONNX export")
+    parser.add_argument('--tfjs', action='store_true', help="TensorFlow.js export")
+    parser.add_argument('--batch-sizes', default='1,4,8', help="latency olcumu icin batch size'lar")
+    parser.add_argument('--latency-runs', type=int, default=20)
+    export_tflite_models.add_arguments(parser)
+    convert_models_to_onnx.add_arguments(parser)
+    args = parser.parse_args()
+
+    config = EXPORTS[args.disease]
+    source_path = args.keras or keras_source_path(config)
+    if not source_path or not os.path.exists(source_path):
+        print(f"[HATA] Kaynak model bulunamadi: {source_path}")
+        sys.exit(1)
+
+    base = os.path.join(args.models_dir, os.path.splitext(os.path.basename(source_path))[0])
+    savedmodel_path = f"{base}_savedmodel"
+    batch_sizes = parse_batch_sizes(args.batch_sizes)
+
+    print("=" * 70)
+    print(f"MODEL EXPORT: {args.disease} ({source_path})")
+    print("=" * 70)
+
+    print("\n[1] Keras model yukleniyor...")
+    model = keras.models.load_model(source_path, custom_objects=CUSTOM_OBJECTS, compile=False)
+    spec = input_spec(model, config)
+    print(f"[OK] Input: {spec}, output: {model.output_shape}")
+
+    artifacts = {'keras': artifact_entry(source_path, args.models_dir)}
+    latency = {}
+
+    print(f"\n[2] SavedModel: {savedmodel_path}")
+    save_serving_model(model, spec, savedmodel_path)
+    max_diff = verify_serving_model(model, savedmodel_path, spec)
+    print(f"[OK] Imza dogrulandi (Keras ile max |fark| {max_diff:.2e})")
+    artifacts['savedmodel'] = artifact_entry(savedmodel_path, args.models_dir, signature='serving_default')
+    latency['savedmodel'] = measure_latency(savedmodel_path, spec, batch_sizes, args.latency_runs)
+
+    if args.xla:
+        xla_path = f"{base}_xla_savedmodel"
+        print(f"\n[3] XLA SavedModel: {xla_path}")
+        save_serving_model(model, spec, xla_path, jit_compile=True)
+        artifacts['savedmodel_xla'] = artifact_entry(xla_path, args.models_dir, signature='serving_default')
+        latency['savedmodel_xla'] = measure_latency(xla_path, spec, batch_sizes, args.latency_runs)
+
+    # TFLite / ONNX asamalari yeni SavedModel'den calisir
+    stage_config = {**config, 'model_paths': [savedmodel_path]}
+
+    if args.tflite is not None:
+        args.precision = args.tflite or list(export_tflite_models.PRECISIONS)
+        print(f"\n[4] TFLite: {', '.join(args.precision)}")
+        entries = export_tflite_models.export_disease(args.disease, stage_config, args)
+        export_tflite_models.update_report(os.path.join(args.models_dir, TFLITE_PARITY_REPORT_NAME), entries)
+        for precision in args.precision:
+            path = tflite_model_path(savedmodel_path, precision)
+            if os.path.exists(path):
+                verdict = entries.get(os.path.basename(path), {}).get('accepted')
+                artifacts[f'tflite_{precision}'] = artifact_entry(path, args.models_dir, parity_accepted=verdict)
+
+    if args.onnx:
+        print("\n[5] ONNX")
+        entries = convert_models_to_onnx.convert_disease(args.disease, stage_config, args)
+        export_tflite_models.update_report(os.path.join(args.models_dir, ONNX_PARITY_REPORT_NAME), entries)
+        path = onnx_model_path(savedmodel_path)
+        if os.path.exists(path):
+            verdict = entries.get(os.path.basename(path), {}).get('accepted')
+            artifacts['onnx'] = artifact_entry(path, args.models_dir, parity_accepted=verdict)
+
+    if args.tfjs:
+        tfjs_path = f"{base}_tfjs"
+        print(f"\n[6] TF.js: {tfjs_path}")
+        if export_tfjs(model, tfjs_path):
+            artifacts['tfjs'] = artifact_entry(tfjs_path, args.models_dir)
+
+    manifest = {
+        'manifest_version': MANIFEST_VERSION,
+        'disease': args.disease,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'tensorflow_version': tf.__version__,
+        'signature': {
+            'name': 'serving_default',
+            'input': {'name': INPUT_NAME, 'shape': spec, 'dtype': 'float32'},
+            'output_key': OUTPUT_KEY,
+        },
+        'preprocess': config['preprocess'],
+        'classes': config['classes'],
+        'artifacts': artifacts,
+        'latency_ms': latency,
+    }
+    path = manifest_path(args.models_dir, args.disease)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    print("\n" + "=" * 70)
+    print(f"MANIFEST: {path}")
+    print("=" * 70)
+    for name, entry in artifacts.items():
+        print(f"  {name:<16} {entry['path']:<60} {entry['size_mb']:>8.2f} MB  {entry['sha256'][:12]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TFLite export with post-training quantization + accuracy-parity report
+
+Her model icin iki TFLite dosyasi uretir:
+  models/<model>_fp16.tflite  - float16 agirliklar
+  models/<model>_int8.tflite  - full-int8 (egitim klasorlerinden kalibrasyon)
+
+Sonra test klasorunde fp32 model ile karsilastirir (sinif bazinda macro F1)
+ve sonucu models/tflite_parity_report.json dosyasina yazar. Servisler
+(INFERENCE_BACKEND=tflite) reddedilen modelleri yuklemez.
+
+Kullanim:
+  python export_tflite_models.py                       # tum modeller, fp16 + int8
+  python export_tflite_models.py --disease bone --precision int8
+  python export_tflite_models.py --calibration-samples 300 --max-f1-drop 0.005
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import tensorflow as tf
+from tensorflow import keras
+from PIL import Image
+
+from inference.custom_objects import CUSTOM_OBJECTS
+from inference.manifest import OUTPUT_KEY, select_output
+from inference.metrics import parity_report
+from inference.preprocessing import CLAHE_AVAILABLE, Preprocessor
+from inference.tflite_backend import PARITY_REPORT_NAME, PRECISIONS, TFLiteModel, tflite_model_path
+
+if not CLAHE_AVAILABLE:
+    print("[UYARI] OpenCV (cv2) bulunamadi. CLAHE devre disi. Yüklemek için: pip install opencv-python")
+
+# Windows console UTF-8 support
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8')
+    except:
+        pass
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+LUNG_SEG_DIR = 'datasets/Lung Segmentation Data/Lung Segmentation Data'
+INFECTION_SEG_DIR = 'datasets/Infection Segmentation Data/Infection Segmentation Data'
+
+# Servislerdeki model yollari ve egitim scriptlerindeki veri klasorleri
+EXPORTS = {
+    'skin': {
+        'model_paths': ['models/skin_disease_model_5class_efficientnetb3_macro_f1_savedmodel',
+                        'models/skin_disease_model_5class_efficientnetb3_macro_f1.keras'],
+        'img_size': (300, 300),
+        'classes': ['akiec', 'bcc', 'bkl', 'mel', 'nv'],
+        'preprocess': 'efficientnet',
+        'calibration_dirs': ['datasets/HAM10000/base_dir/train_dir'],
+        'eval_dirs': ['datasets/HAM10000/base_dir/test_dir'],
+        'image_subdir': None
+    },
+    'bone': {
+        'model_paths': ['models/bone_disease_model_4class_densenet121_macro_f1_savedmodel',
+                        'models/bone_disease_model_4class_densenet121_macro_f1.keras'],
+        'img_size': (384, 384),
+        'classes': ['Normal', 'Fracture', 'Benign_Tumor', 'Malignant_Tumor'],
+        'preprocess': 'densenet_clahe',
+        'calibration_dirs': ['datasets/bone/Bone_4Class_Final/train'],
+        'eval_dirs': ['datasets/bone/Bone_4Class_Final/test'],
+        'image_subdir': None
+    },
+    'lung': {
+        'model_paths': ['models/lung_3class_densenet121_macro_f1_savedmodel',
+                        'models/lung_3class_densenet121_macro_f1.keras'],
+        'img_size': (384, 384),
+        'classes': ['COVID-19', 'Non-COVID', 'Normal'],
+        'preprocess': 'densenet_clahe',
+        'calibration_dirs': [os.path.join(LUNG_SEG_DIR, 'Train'), os.path.join(INFECTION_SEG_DIR, 'Train')],
+        'eval_dirs': [os.path.join(LUNG_SEG_DIR, 'Test'), os.path.join(INFECTION_SEG_DIR, 'Test')],
+        'image_subdir': 'images'  # class klasorlerinde maskeler de var
+    },
+    'eye': {
+        'model_paths': ['models/eye_disease_model.keras'],
+        'img_size': (224, 224),
+        'classes': ['Diabetic_Retinopathy', 'Disc_Edema', 'Glaucoma', 'Macular_Scar', 'Myopia',
+                    'Normal', 'Pterygium', 'Retinal_Detachment', 'Retinitis_Pigmentosa'],
+        'preprocess': 'rescale',
+        'calibration_dirs': ['datasets/Eye_Mendeley/train'],
+        'eval_dirs': ['datasets/Eye_Mendeley/test'],
+        'image_subdir': None
+    }
+}
+
+# ============================================================================
+# PREPROCESSING (servislerle AYNI)
+# ============================================================================
+
+def load_images(paths, config):
+    """Goruntu dosyalari -> (N, H, W, 3) float32 model input (inference/preprocessing.py)"""
+    preprocessor = Preprocessor(config['preprocess'], config['img_size'])
+    batch = preprocessor.new_batch(len(paths))
+    for i, path in enumerate(paths):
+        with Image.open(path) as image:
+            preprocessor(image, out=batch[i])
+    return batch
+
+
+def list_images(split_dirs, config, per_class=None, seed=42):
+    """
+    (path, label) ciftleri; per_class verilirse her siniftan en fazla per_class ornek.
+    """
+    rng = random.Random(seed)
+    samples = []
+    for label, class_name in enumerate(config['classes']):
+        paths = []
+        for split_dir in split_dirs:
+            class_dir = os.path.join(split_dir, class_name)
+            if config['image_subdir']:
+                class_dir = os.path.join(class_dir, config['image_subdir'])
+            if not os.path.isdir(class_dir):
+                continue
+            paths.extend(os.path.join(class_dir, name) for name in sorted(os.listdir(class_dir))
+                         if name.lower().endswith(IMAGE_EXTENSIONS))
+        if per_class and len(paths) > per_class:
+            paths = rng.sample(paths, per_class)
+        samples.extend((path, label) for path in paths)
+    return samples
+
+# ============================================================================
+# MODEL LOADING / CONVERSION
+# ============================================================================
+
+def find_model_path(config):
+    for path in config['model_paths']:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def load_reference_model(model_path):
+    """fp32 model -> (N, H, W, 3) float32 alip (N, num_classes) donduren fonksiyon"""
+    if os.path.isdir(model_path):
+        saved_model = tf.saved_model.load(model_path)
+        signature = saved_model.signatures['serving_default']
+
+        def predict(batch):
+            outputs = signature(tf.constant(batch, dtype=tf.float32))
+            return select_output(outputs, OUTPUT_KEY).numpy()
+        return None, predict
+
+    model = keras.models.load_model(model_path, custom_objects=CUSTOM_OBJECTS, compile=False)
+    return model, lambda batch: model.predict(batch, verbose=0)
+
+
+def convert(model_path, keras_model, precision, calibration):
+    """
+    fp16: agirliklar float16, hesaplama float32
+    int8: agirliklar + aktivasyonlar int8, input/output int8 (kalibrasyon gerekli)
+    """
+    if keras_model is None:
+        converter = tf.lite.TFLiteConverter.from_saved_model(model_path)
+    else:
+        converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+    if precision == 'fp16':
+        converter.target_spec.supported_types = [tf.float16]
+    else:
+        def representative_dataset():
+            for sample in calibration:
+                yield [sample[np.newaxis].astype(np.float32)]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+
+    return converter.convert()
+
+
+def predict_in_batches(predict_fn, images, batch_size=16):
+    outputs = [predict_fn(images[i:i + batch_size]) for i in range(0, len(images), batch_size)]
+    return np.concatenate(outputs, axis=0)
+
+
+def single_image_latency_ms(predict_fn, sample, runs=10):
+    predict_fn(sample[np.newaxis])  # warm-up
+    start = time.perf_counter()
+    for _ in range(runs):
+        predict_fn(sample[np.newaxis])
+    return round((time.perf_counter() - start) * 1000.0 / runs, 2)
+
+
+def file_size_mb(path):
+    if os.path.isdir(path):
+        total = sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+    else:
+        total = os.path.getsize(path)
+    return round(total / (1024 * 1024), 2)
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def export_disease(disease, config, args):
+    """Bir hastalik modeli icin export + parity; rapor girdilerini dondurur"""
+    print("\n" + "=" * 70)
+    print(f"{disease.upper()} MODEL")
+    print("=" * 70)
+
+    model_path = find_model_path(config)
+    if model_path is None:
+        print(f"[HATA] Model bulunamadi: {', '.join(config['model_paths'])}")
+        return {}
+
+    print(f"[YUKLENIYOR] fp32 model: {model_path}")
+    keras_model, reference_predict = load_reference_model(model_path)
+
+    calibration_samples = list_images(config['calibration_dirs'], config,
+                                      per_class=max(1, args.calibration_samples // len(config['classes'])))
+    calibration = load_images([path for path, _ in calibration_samples], config)
+    if not len(calibration):
+        # Veri yoksa rastgele kalibrasyon anlamsiz olur; int8 atlanir
+        print(f"[UYARI] Kalibrasyon verisi bulunamadi: {', '.join(config['calibration_dirs'])}")
+    else:
+        print(f"[BILGI] Kalibrasyon: {len(calibration)} goruntu")
+
+    eval_samples = list_images(config['eval_dirs'], config, per_class=args.eval_samples_per_class or None)
+    eval_images = load_images([path for path, _ in eval_samples], config) if eval_samples else None
+    y_true = np.array([label for _, label in eval_samples], dtype=np.int64)
+    if eval_images is None:
+        print(f"[UYARI] Test verisi bulunamadi: {', '.join(config['eval_dirs'])} - parity atlaniyor")
+    else:
+        print(f"[BILGI] Parity: {len(eval_samples)} test goruntusu")
+        reference_probs = predict_in_batches(reference_predict, eval_images)
+        reference_latency = single_image_latency_ms(reference_predict, eval_images[0])
+
+    entries = {}
+    for precision in args.precision:
+        if precision == 'int8' and not len(calibration):
+            continue
+        output_path = tflite_model_path(model_path, precision)
+        print(f"\n[DONUSTURULUYOR] {precision} -> {output_path}")
+        with open(output_path, 'wb') as f:
+            f.write(convert(model_path, keras_model, precision, calibration))
+        print(f"[OK] {file_size_mb(output_path):.2f} MB (fp32: {file_size_mb(model_path):.2f} MB)")
+
+        if eval_images is None:
+            continue
+
+        tflite_model = TFLiteModel(output_path, args.threads)
+        candidate_probs = predict_in_batches(tflite_model.predict, eval_images)
+        report = parity_report(y_true, reference_probs, candidate_probs, config['classes'],
+                               max_f1_drop=args.max_f1_drop, max_class_f1_drop=args.max_class_f1_drop)
+        report.update({
+            'disease': disease,
+            'precision': precision,
+            'source_model': model_path,
+            'size_mb': {'reference': file_size_mb(model_path), 'candidate': file_size_mb(output_path)},
+            'latency_ms_bs1': {'reference': reference_latency,
+                               'candidate': single_image_latency_ms(tflite_model.predict, eval_images[0])},
+            'threads': tflite_model.num_threads
+        })
+        entries[os.path.basename(output_path)] = report
+        print_report(report)
+
+    return entries
+
+
+def print_report(report):
+    verdict = "KABUL" if report['accepted'] else "RED"
+    macro = report['macro_f1']
+    print(f"  Macro F1: fp32 {macro['reference']:.4f} -> {report['precision']} {macro['candidate']:.4f} "
+          f"(dusus {macro['drop']:+.4f})  top-1 uyum {report['top1_agreement']:.2%}")
+    for name, scores in report['per_class_f1'].items():
+        print(f"    {name:<22} {scores['reference']:.4f} -> {scores['candidate']:.4f} ({scores['drop']:+.4f})")
+    print(f"  Latency (bs=1): {report['latency_ms_bs1']['reference']} ms -> {report['latency_ms_bs1']['candidate']} ms")
+    print(f"  [{verdict}]")
+
+
+def update_report(report_path, entries):
+    """Parity girdilerini mevcut rapora ekle (diger modellerin sonuclari korunur)"""
+    report = {'models': {}}
+    if os.path.exists(report_path):
+        with open(report_path, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+    report['models'].update(entries)
+    report['generated_at'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+    report['tensorflow_version'] = tf.__version__
+    os.makedirs(os.path.dirname(report_path) or '.', exist_ok=True)
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print("\n" + "=" * 70)
+    print(f"PARITY RAPORU: {report_path}")
+    print("=" * 70)
+    for name, entry in sorted(report['models'].items()):
+        print(f"  {name:<60} {'KABUL' if entry['accepted'] else 'RED'}")
+
+
+def add_arguments(parser):
+    """TFLite export/parity secenekleri (export_model.py de kullanir)"""
+    parser.add_argument('--calibration-samples', type=int, default=200,
+                        help="int8 kalibrasyonu icin toplam goruntu (siniflara esit dagitilir)")
+    parser.add_argument('--eval-samples-per-class', type=int, default=0,
+                        help="parity icin sinif basina en fazla goruntu (0 = hepsi)")
+    parser.add_argument('--max-f1-drop', type=float, default=0.01)
+    parser.add_argument('--max-class-f1-drop', type=float, default=0.03)
+    parser.add_argument('--threads', type=int, default=None, help="TFLite interpreter thread sayisi")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TFLite fp16/int8 export + accuracy-parity report")
+    parser.add_argument('--disease', nargs='+', choices=sorted(EXPORTS), default=sorted(EXPORTS))
+    parser.add_argument('--precision', nargs='+', choices=PRECISIONS, default=list(PRECISIONS))
+    add_arguments(parser)
+    parser.add_argument('--report', default=os.path.join('models', PARITY_REPORT_NAME))
+    args = parser.parse_args()
+
+    entries = {}
+    for disease in args.disease:
+        entries.update(export_disease(disease, EXPORTS[disease], args))
+    update_report(args.report, entries)
+
+
+if __name__ == '__main__':
+    main()
@@ -13,6 +13,12 @@ from tensorflow import keras
 from PIL import Image
 import numpy as np
 import io
+from inference.prediction_cache import PredictionCache, model_version
+from inference.tflite_backend import inference_backend, load_tflite_backend
+from inference.onnx_backend import load_onnx_backend
+from inference.preprocessing import Preprocessor
+from inference.manifest import artifact_path, load_manifest, manifest_path
+from inference.warmup import Warmup, warmup_batch_sizes
 
 # Windows console UTF-8 support
 if sys.platform == 'win32':
@@ -24,7 +30,9 @@ if sys.platform == 'win32':
 app = Flask(__name__)
 
 # Model configuration
-MODEL_PATH = 'models/eye_disease_model.keras'
+# Source .keras from the export_model.py manifest if there is one
+MODEL_MANIFEST = load_manifest(manifest_path('models', 'eye'))
+MODEL_PATH = artifact_path(MODEL_MANIFEST, 'keras') or 'models/eye_disease_model.keras'
 CLASS_NAMES = [
     'Diabetic_Retinopathy',
     'Disc_Edema',
@@ -50,6 +58,8 @@ CLASS_DESCRIPTIONS = {
 }
 
 IMG_SIZE = (224, 224)
+# Model was trained on x / 255 inputs
+preprocessor = Preprocessor('rescale', IMG_SIZE)
 
 print("\n" + "="*70)
 print("MENDELEY EYE DISEASE DETECTION API")
@@ -97,18 +107,40 @@ except Exception as e:
     print(f"[INFO] Train the model first using: python train_mendeley_eye.py")
     sys.exit(1)
 
+# Optional TFLite / ONNX Runtime backend (INFERENCE_BACKEND=tflite|onnx)
+runtime_model = load_tflite_backend(MODEL_PATH) or load_onnx_backend(MODEL_PATH)
+
+# Prediction cache - repeated uploads of the same image skip the model
+MODEL_VERSION = model_version(runtime_model.path if runtime_model else MODEL_PATH)
+prediction_cache = PredictionCache.from_env()
+
 def preprocess_image(image):
-    """Preprocess image for model input"""
-    # Resize
-    image = image.resize(IMG_SIZE)
-    
-    # Convert to array and normalize
-    img_array = np.array(image) / 255.0
-    
-    # Add batch dimension
-    img_array = np.expand_dims(img_array, axis=0)
+    """Preprocess image for model input, returns (1, 224, 224, 3) float32"""
+    return preprocessor(image)
+
+def predict_probabilities(processed_image):
+    """Run a preprocessed batch through the model, returns (N, num_classes) numpy array"""
+    if runtime_model is not None:
+        return runtime_model.predict(processed_image)
+    return model.predict(processed_image, verbose=0)
+
+# ============================================================================
+# WARM-UP - the first real requests should not pay for tracing/allocation
+# ============================================================================
+
+def build_warmup_steps():
+    """One dummy prediction per warm-up batch size"""
+    sample = Image.fromarray(np.random.randint(0, 255, (IMG_SIZE[1], IMG_SIZE[0], 3), dtype=np.uint8))
+    processed = preprocess_image(sample)
     
-    return img_array
+    steps = []
+    for batch_size in warmup_batch_sizes():
+        batch = np.repeat(processed, batch_size, axis=0)
+        steps.append((f"predict_bs{batch_size}", lambda b=batch: predict_probabilities(b), True))
+    return steps
+
+warmup = Warmup('eye')
+warmup.start(build_warmup_steps())
 
 @app.route('/')
 def status():
@@ -126,10 +158,27 @@ def status():
             "GET /": "API status",
             "POST /predict": "Image prediction (multipart/form-data, field: 'image')",
             "GET /classes": "List all disease classes",
+            "GET /metrics": "Prediction cache statistics",
+            "GET /ready": "Readiness (200 once warm-up has finished)",
             "GET /web": "Web interface"
         }
     })
 
+@app.route('/ready')
+def ready():
+    """Readiness probe - 503 until warm-up has finished"""
+    return jsonify(warmup.status()), 200 if warmup.ready else 503
+
+@app.route('/metrics')
+def metrics():
+    """Inference metrics"""
+    return jsonify({
+        "model_version": MODEL_VERSION,
+        "backend": inference_backend() if runtime_model else "tensorflow",
+        "runtime_model": runtime_model.path if runtime_model else None,
+        "prediction_cache": prediction_cache.stats()
+    })
+
 @app.route('/classes')
 def list_classes():
     """List all disease classes with descriptions"""
@@ -157,12 +206,20 @@ def predict():
         return jsonify({"error": "No selected image"}), 400
     
     try:
-        # Read and preprocess image
-        image = Image.open(io.BytesIO(file.read())).convert('RGB')
-        processed_image = preprocess_image(image)
+        file_content = file.read()
+        cache_key = PredictionCache.make_key(file_content, 'eye', MODEL_VERSION)
+        cached = prediction_cache.get(cache_key)
         
-        # Predict
-        predictions = model.predict(processed_image, verbose=0)
+        if cached is not None:
+            predictions = cached.probabilities[np.newaxis, :]
+        else:
+            # Read and preprocess image
+            image = Image.open(io.BytesIO(file_content)).convert('RGB')
+            processed_image = preprocess_image(image)
+            
+            # Predict
+            predictions = predict_probabilities(processed_image)
+            prediction_cache.put(cache_key, predictions[0])
         
         # Get top prediction
         top_idx = np.argmax(predictions[0])
@@ -0,0 +1,42 @@
+"""
+Shared inference utilities for the disease detection APIs.
+"""
+
+from .prediction_cache import PredictionCache, CacheEntry, model_version
+from .warmup import Warmup, parse_batch_sizes, warmup_batch_sizes, warmup_gradcam_enabled
+from .tflite_backend import TFLiteModel, load_tflite_backend, open_tflite_model, tflite_model_path
+from .onnx_backend import OnnxModel, load_onnx_backend, open_onnx_model, onnx_model_path
+from .preprocessing import Preprocessor, PreprocessPool, clahe_operator, is_grayscale
+from .manifest import load_manifest, manifest_path, artifact_path, serving_model_path, output_key, select_output
+from .metrics import per_class_f1, macro_f1, parity_report
+
+__all__ = [
+    'PredictionCache',
+    'CacheEntry',
+    'model_version',
+    'Warmup',
+    'parse_batch_sizes',
+    'warmup_batch_sizes',
+    'warmup_gradcam_enabled',
+    'TFLiteModel',
+    'load_tflite_backend',
+    'open_tflite_model',
+    'tflite_model_path',
+    'OnnxModel',
+    'load_onnx_backend',
+    'open_onnx_model',
+    'onnx_model_path',
+    'Preprocessor',
+    'PreprocessPool',
+    'clahe_operator',
+    'is_grayscale',
+    'load_manifest',
+    'manifest_path',
+    'artifact_path',
+    'serving_model_path',
+    'output_key',
+    'select_output',
+    'per_class_f1',
+    'macro_f1',
+    'parity_report',
+]
@@ -0,0 +1,116 @@
+"""
+Export manifests.
+
+export_model.py writes models/<disease>_manifest.json next to the artifacts
+it produces. The manifest records the SavedModel signature (input spec and
+output key), every artifact with its SHA-256, and the measured latency per
+batch size. The services read it to find the model and its output key
+instead of guessing paths and taking the first key of the output dict.
+"""
+
+import hashlib
+import json
+import os
+
+MANIFEST_VERSION = 1
+INPUT_NAME = 'image'
+OUTPUT_KEY = 'probabilities'
+
+
+def manifest_path(models_dir, disease_type):
+    """models/<disease>_manifest.json"""
+    return os.path.join(models_dir, f"{disease_type}_manifest.json")
+
+
+def artifact_sha256(path):
+    """
+    SHA-256 of a file, or of every file in a directory (relative path + contents,
+    in sorted order) so SavedModel / TF.js directories get a stable hash.
+    """
+    digest = hashlib.sha256()
+    if os.path.isdir(path):
+        files = sorted(
+            os.path.relpath(os.path.join(dirpath, name), path)
+            for dirpath, _, names in os.walk(path) for name in names
+        )
+        for relpath in files:
+            digest.update(relpath.replace(os.sep, '/').encode())
+            _update_from_file(digest, os.path.join(path, relpath))
+    else:
+        _update_from_file(digest, path)
+    return digest.hexdigest()
+
+
+def _update_from_file(digest, path):
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+
+
+def load_manifest(path):
+    """
+    Read a manifest.
+
+    Returns:
+        dict, or None if the file is missing, unreadable or from another
+        manifest version
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('manifest_version') != MANIFEST_VERSION:
+        print(f"[UYARI] {path}: desteklenmeyen manifest versiyonu {manifest.get('manifest_version')}")
+        return None
+    manifest['_dir'] = os.path.dirname(path)
+    return manifest
+
+
+def artifact_path(manifest, name):
+    """
+    Path of an artifact ('savedmodel', 'savedmodel_xla', 'tflite_int8', ...).
+
+    Returns:
+        str, or None if the manifest has no such artifact or it is missing on disk
+    """
+    if not manifest:
+        return None
+    entry = manifest.get('artifacts', {}).get(name)
+    if not entry:
+        return None
+    path = os.path.join(manifest.get('_dir', ''), entry['path'])
+    return path if os.path.exists(path) else None
+
+
+def serving_model_path(manifest, xla=None):
+    """
+    SavedModel the services should load: the XLA-compiled variant when
+    SERVING_XLA=true (or xla=True) and it was exported, else the plain one.
+    """
+    if xla is None:
+        xla = os.environ.get('SERVING_XLA', 'false').lower() == 'true'
+    if xla:
+        path = artifact_path(manifest, 'savedmodel_xla')
+        if path:
+            return path
+    return artifact_path(manifest, 'savedmodel')
+
+
+def output_key(manifest):
+    """Output dict key of the serving_default signature, or None without a manifest."""
+    if not manifest:
+        return None
+    return manifest.get('signature', {}).get('output_key')
+
+
+def select_output(outputs, key=None):
+    """
+    Pick the probabilities tensor from a signature's output dict.
+
+    Uses the manifest key when known; models exported before manifests
+    existed have a single, arbitrarily named output.
+    """
+    if key is not None and key in outputs:
+        return outputs[key]
+    return outputs[list(outputs.keys())[0]]
@@ -0,0 +1,99 @@
+"""
+Classification metrics for comparing model variants.
+
+Used by the export scripts to check that an optimized model (quantized TFLite,
+ONNX, ...) still matches the fp32 model before it is put into service, and by
+the trainers' validation macro-F1 callback (training/callbacks.py).
+"""
+
+import numpy as np
+
+
+def confusion_matrix(y_true, y_pred, num_classes):
+    """(num_classes, num_classes) confusion matrix, rows are true labels."""
+    y_true = np.asarray(y_true, dtype=np.int64)
+    y_pred = np.asarray(y_pred, dtype=np.int64)
+    counts = np.bincount(y_true * num_classes + y_pred, minlength=num_classes * num_classes)
+    return counts.reshape(num_classes, num_classes)
+
+
+def classification_scores(cm):
+    """
+    Per-class precision, recall, F1 and support from a confusion matrix
+    (sklearn's definitions with zero_division=0).
+
+    Returns:
+        dict: 'precision', 'recall', 'f1' (float64 arrays) and 'support' (int array)
+    """
+    cm = np.asarray(cm)
+    num_classes = cm.shape[0]
+    tp = np.diag(cm).astype(np.float64)
+    predicted = cm.sum(axis=0)
+    support = cm.sum(axis=1)
+    denominator = predicted + support
+    return {
+        'precision': np.divide(tp, predicted, out=np.zeros(num_classes), where=predicted > 0),
+        'recall': np.divide(tp, support, out=np.zeros(num_classes), where=support > 0),
+        'f1': np.divide(2 * tp, denominator, out=np.zeros(num_classes), where=denominator > 0),
+        'support': support,
+    }
+
+
+def per_class_f1(y_true, y_pred, num_classes):
+    """F1 score per class (0.0 for classes that never occur and are never predicted)."""
+    return classification_scores(confusion_matrix(y_true, y_pred, num_classes))['f1']
+
+
+def macro_f1(y_true, y_pred, num_classes):
+    """Unweighted mean of the per-class F1 scores (same as sklearn's average='macro')."""
+    return float(per_class_f1(y_true, y_pred, num_classes).mean())
+
+
+def parity_report(y_true, reference_probs, candidate_probs, class_names,
+                  max_f1_drop=0.01, max_class_f1_drop=0.03):
+    """
+    Compare a candidate model's predictions against the reference (fp32) model.
+
+    Args:
+        y_true: Integer labels, shape (N,)
+        reference_probs: Reference probabilities, shape (N, num_classes)
+        candidate_probs: Candidate probabilities, shape (N, num_classes)
+        class_names: Class names in label order
+        max_f1_drop: Largest accepted macro F1 drop
+        max_class_f1_drop: Largest accepted F1 drop for any single class
+
+    Returns:
+        dict: Macro and per-class F1 for both models, top-1 agreement,
+        largest probability difference and the accept/reject verdict
+    """
+    num_classes = len(class_names)
+    reference_probs = np.asarray(reference_probs, dtype=np.float32)
+    candidate_probs = np.asarray(candidate_probs, dtype=np.float32)
+    reference_pred = reference_probs.argmax(axis=1)
+    candidate_pred = candidate_probs.argmax(axis=1)
+
+    reference_f1 = per_class_f1(y_true, reference_pred, num_classes)
+    candidate_f1 = per_class_f1(y_true, candidate_pred, num_classes)
+    class_drops = reference_f1 - candidate_f1
+    f1_drop = float(reference_f1.mean() - candidate_f1.mean())
+
+    return {
+        'samples': int(len(reference_pred)),
+        'macro_f1': {
+            'reference': round(float(reference_f1.mean()), 4),
+            'candidate': round(float(candidate_f1.mean()), 4),
+            'drop': round(f1_drop, 4)
+        },
+        'per_class_f1': {
+            name: {
+                'reference': round(float(reference_f1[i]), 4),
+                'candidate': round(float(candidate_f1[i]), 4),
+                'drop': round(float(class_drops[i]), 4)
+            }
+            for i, name in enumerate(class_names)
+        },
+        'top1_agreement': round(float((reference_pred == candidate_pred).mean()), 4) if len(reference_pred) else 0.0,
+        'max_abs_prob_diff': round(float(np.abs(reference_probs - candidate_probs).max()), 4) if len(reference_pred) else 0.0,
+        'thresholds': {'max_f1_drop': max_f1_drop, 'max_class_f1_drop': max_class_f1_drop},
+        'accepted': bool(f1_drop <= max_f1_drop and class_drops.max(initial=0.0) <= max_class_f1_drop)
+    }
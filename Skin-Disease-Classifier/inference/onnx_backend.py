@@ -0,0 +1,166 @@
+"""
+ONNX Runtime inference backend for CPU serving.
+
+convert_models_to_onnx.py writes an ONNX export next to each model
+(e.g. models/<name>.onnx) and records a numerical-parity check against the
+TensorFlow model. When INFERENCE_BACKEND=onnx the services run predictions
+through an ONNX Runtime CPU session with full graph optimizations; the
+TensorFlow model stays loaded for Grad-CAM.
+"""
+
+import json
+import os
+
+import numpy as np
+
+PARITY_REPORT_NAME = 'onnx_parity_report.json'
+
+_OPTIMIZATION_LEVELS = {
+    'disabled': 'ORT_DISABLE_ALL',
+    'basic': 'ORT_ENABLE_BASIC',
+    'extended': 'ORT_ENABLE_EXTENDED',
+    'all': 'ORT_ENABLE_ALL',
+}
+
+
+def onnx_model_path(model_path):
+    """
+    Path of the ONNX export for a model.
+
+    'models/x_savedmodel', 'models/x_xla_savedmodel' and 'models/x.keras' all map
+    to 'models/x.onnx'.
+    """
+    base = model_path.rstrip('/\\')
+    for suffix in ('_xla_savedmodel', '_savedmodel'):
+        if base.endswith(suffix):
+            base = base[:-len(suffix)]
+            break
+    else:
+        base = os.path.splitext(base)[0]
+    return f"{base}.onnx"
+
+
+def session_settings():
+    """
+    ONNX Runtime settings from the environment:
+    ORT_INTRA_OP_THREADS (default 0 = ONNX Runtime picks, usually one per core),
+    ORT_INTER_OP_THREADS (default 1, the graphs are sequential),
+    ORT_GRAPH_OPTIMIZATION (disabled/basic/extended/all, default all).
+    """
+    level = os.environ.get('ORT_GRAPH_OPTIMIZATION', 'all').strip().lower()
+    if level not in _OPTIMIZATION_LEVELS:
+        raise ValueError(f"ORT_GRAPH_OPTIMIZATION must be one of {sorted(_OPTIMIZATION_LEVELS)}, got {level!r}")
+    return {
+        'intra_op_threads': int(os.environ.get('ORT_INTRA_OP_THREADS', '0')),
+        'inter_op_threads': int(os.environ.get('ORT_INTER_OP_THREADS', '1')),
+        'graph_optimization': level,
+    }
+
+
+def parity_verdict(onnx_path, report_path=None):
+    """
+    Whether the parity report accepted this ONNX file.
+
+    Returns:
+        bool, or None if there is no report entry for it
+    """
+    report_path = report_path or os.path.join(os.path.dirname(onnx_path), PARITY_REPORT_NAME)
+    try:
+        with open(report_path, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+    except (OSError, ValueError):
+        return None
+    entry = report.get('models', {}).get(os.path.basename(onnx_path))
+    return None if entry is None else bool(entry.get('accepted'))
+
+
+class OnnxModel:
+    """
+    ONNX Runtime session on the CPU execution provider.
+
+    Sessions are safe to call from several threads; each call gets its own
+    IO binding so the input array is handed to ONNX Runtime without a copy.
+
+    Args:
+        path: .onnx file
+        settings: Overrides for session_settings()
+    """
+
+    def __init__(self, path, **settings):
+        import onnxruntime as ort
+
+        self.path = path
+        self.settings = {**session_settings(), **settings}
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = getattr(
+            ort.GraphOptimizationLevel, _OPTIMIZATION_LEVELS[self.settings['graph_optimization']]
+        )
+        options.intra_op_num_threads = self.settings['intra_op_threads']
+        options.inter_op_num_threads = self.settings['inter_op_threads']
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+
+        self._session = ort.InferenceSession(path, sess_options=options, providers=['CPUExecutionProvider'])
+        self._input_name = self._session.get_inputs()[0].name
+        self._output_name = self._session.get_outputs()[0].name
+
+    @property
+    def input_shape(self):
+        return tuple(self._session.get_inputs()[0].shape)
+
+    def predict(self, images):
+        """
+        Args:
+            images: Preprocessed batch of shape (N, H, W, C)
+
+        Returns:
+            np.ndarray: (N, num_classes) float32 probabilities
+        """
+        images = np.ascontiguousarray(images, dtype=np.float32)
+        binding = self._session.io_binding()
+        binding.bind_cpu_input(self._input_name, images)
+        binding.bind_output(self._output_name)
+        self._session.run_with_iobinding(binding)
+        return binding.copy_outputs_to_cpu()[0]
+
+
+def open_onnx_model(path, **settings):
+    """
+    Load an ONNX file unless it is missing or the parity report rejected it.
+
+    Returns:
+        OnnxModel or None (callers fall back to TensorFlow)
+    """
+    if not os.path.exists(path):
+        print(f"[UYARI] ONNX model bulunamadi: {path} - TensorFlow backend kullaniliyor")
+        return None
+
+    verdict = parity_verdict(path)
+    if verdict is False:
+        print(f"[UYARI] {os.path.basename(path)} parity kontrolunde reddedilmis - TensorFlow backend kullaniliyor")
+        return None
+    if verdict is None:
+        print(f"[UYARI] {os.path.basename(path)} icin parity raporu yok, dogrulanmamis model kullaniliyor")
+
+    try:
+        model = OnnxModel(path, **settings)
+    except Exception as e:
+        print(f"[UYARI] ONNX model yuklenemedi: {str(e)[:200]} - TensorFlow backend kullaniliyor")
+        return None
+    print(f"[BILGI] ONNX Runtime backend: {path} "
+          f"(intra {model.settings['intra_op_threads']}, inter {model.settings['inter_op_threads']} thread, "
+          f"optimizasyon {model.settings['graph_optimization']})")
+    return model
+
+
+def load_onnx_backend(model_path, **settings):
+    """
+    Load the ONNX export of a model if INFERENCE_BACKEND=onnx.
+
+    Returns:
+        OnnxModel, or None when the backend is not selected or the export
+        cannot be used
+    """
+    if os.environ.get('INFERENCE_BACKEND', 'tensorflow').strip().lower() != 'onnx':
+        return None
+    return open_onnx_model(onnx_model_path(model_path), **settings)
@@ -0,0 +1,315 @@
+"""
+Content-addressed prediction cache.
+
+Predictions are keyed on a hash of the raw upload bytes plus the disease type
+and model version, so re-uploading the same image skips decoding,
+preprocessing and the forward pass. Entries live in an in-process LRU with a
+TTL and can optionally be written to a directory that survives restarts.
+The directory is capped at disk_max_bytes: a write that crosses the cap (or
+the first write after a TTL has passed since the last sweep) removes expired
+entries, then the oldest ones, until the directory is back under
+DISK_SWEEP_TARGET of the cap.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# A sweep frees space down to this fraction of disk_max_bytes, so it does not run on every write
+DISK_SWEEP_TARGET = 0.8
+
+
+class CacheEntry:
+    """Cached probability vector and optional Grad-CAM PNG bytes."""
+
+    __slots__ = ('probabilities', 'gradcam', 'created_at')
+
+    def __init__(self, probabilities, gradcam=None, created_at=None):
+        self.probabilities = probabilities
+        self.gradcam = gradcam
+        self.created_at = created_at if created_at is not None else time.time()
+
+
+def model_version(path):
+    """
+    Short version string for a model on disk.
+
+    SavedModel directories hash every file (relative path + contents, in
+    sorted order): retraining the same architecture only rewrites
+    variables/, so saved_model.pb or fingerprint.pb alone would keep the
+    old version. Single-file models (.keras/.h5/.tflite/.onnx) use size and
+    modification time.
+
+    Args:
+        path: Model file or SavedModel directory
+
+    Returns:
+        str: 12 character hex digest, or 'unknown' if the path does not exist
+    """
+    if not path or not os.path.exists(path):
+        return 'unknown'
+
+    digest = hashlib.sha256()
+    if os.path.isdir(path):
+        files = sorted(
+            os.path.relpath(os.path.join(dirpath, name), path)
+            for dirpath, _, names in os.walk(path) for name in names
+        )
+        for relpath in files:
+            digest.update(relpath.replace(os.sep, '/').encode())
+            with open(os.path.join(path, relpath), 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(chunk)
+    else:
+        stat = os.stat(path)
+        digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()[:12]
+
+
+class PredictionCache:
+    """
+    LRU + TTL prediction cache with an optional on-disk tier.
+
+    Args:
+        max_entries: Maximum number of in-memory entries (0 disables the cache)
+        ttl_seconds: Entry lifetime in seconds (applies to both tiers)
+        disk_dir: Directory for the persistent tier, or None for memory only
+        disk_max_bytes: Size cap of the disk tier (0: no cap, expired entries
+            are still swept)
+    """
+
+    def __init__(self, max_entries=1024, ttl_seconds=3600, disk_dir=None, disk_max_bytes=512 * 1024 * 1024):
+        self.max_entries = max(0, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = max(0, int(disk_max_bytes))
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._sweep_lock = threading.Lock()
+        self._disk_bytes = 0
+        self._last_sweep = 0.0
+        self._counters = {
+            'hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'disk_writes': 0,
+            'disk_removals': 0,
+        }
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._sweep_disk(time.time())
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build a cache from environment variables:
+        PREDICTION_CACHE_SIZE (default 1024, 0 disables),
+        PREDICTION_CACHE_TTL (seconds, default 3600),
+        PREDICTION_CACHE_DIR (optional on-disk tier),
+        PREDICTION_CACHE_DISK_MB (disk tier cap, default 512, 0: no cap).
+        """
+        return cls(
+            max_entries=int(os.environ.get('PREDICTION_CACHE_SIZE', '1024')),
+            ttl_seconds=float(os.environ.get('PREDICTION_CACHE_TTL', '3600')),
+            disk_dir=os.environ.get('PREDICTION_CACHE_DIR') or None,
+            disk_max_bytes=int(float(os.environ.get('PREDICTION_CACHE_DISK_MB', '512')) * 1024 * 1024)
+        )
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    @staticmethod
+    def make_key(image_bytes, disease_type, version):
+        """Cache key for an upload: sha256(bytes) + disease type + model version."""
+        image_hash = hashlib.sha256(image_bytes).hexdigest()
+        return f"{disease_type}-{version}-{image_hash}"
+
+    def get(self, key):
+        """
+        Look up an entry.
+
+        Returns:
+            CacheEntry or None
+        """
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry.created_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self._counters['hits'] += 1
+                    return entry
+                del self._entries[key]
+                self._counters['expirations'] += 1
+
+        entry = self._read_disk(key, now)
+        with self._lock:
+            if entry is None:
+                self._counters['misses'] += 1
+                return None
+            self._counters['disk_hits'] += 1
+            self._insert(key, entry)
+        return entry
+
+    def put(self, key, probabilities, gradcam=None):
+        """
+        Store a probability vector (and optionally Grad-CAM PNG bytes).
+
+        If the key already has a Grad-CAM and none is given, it is kept.
+        """
+        if not self.enabled:
+            return
+
+        probabilities = np.asarray(probabilities, dtype=np.float32).reshape(-1)
+        with self._lock:
+            existing = self._entries.get(key)
+            if gradcam is None and existing is not None:
+                gradcam = existing.gradcam
+            entry = CacheEntry(probabilities, gradcam)
+            self._insert(key, entry)
+        self._write_disk(key, entry)
+
+    def stats(self):
+        """Hit/miss/eviction counters and current size."""
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['disk_hits'] + self._counters['misses']
+            hit_rate = (self._counters['hits'] + self._counters['disk_hits']) / lookups if lookups else 0.0
+            return {
+                'enabled': self.enabled,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'disk_dir': self.disk_dir,
+                'disk_bytes': self._disk_bytes,
+                'disk_max_bytes': self.disk_max_bytes,
+                'hit_rate': round(hit_rate, 4),
+                **self._counters
+            }
+
+    def clear(self):
+        """Drop all in-memory entries (the disk tier is left untouched)."""
+        with self._lock:
+            self._entries.clear()
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _insert(self, key, entry):
+        # Caller holds the lock
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters['evictions'] += 1
+
+    def _disk_paths(self, key):
+        return (os.path.join(self.disk_dir, f"{key}.npy"),
+                os.path.join(self.disk_dir, f"{key}.png"))
+
+    def _read_disk(self, key, now):
+        if not self.disk_dir:
+            return None
+
+        probs_path, png_path = self._disk_paths(key)
+        try:
+            created_at = os.path.getmtime(probs_path)
+            if now - created_at > self.ttl_seconds:
+                os.remove(probs_path)
+                if os.path.exists(png_path):
+                    os.remove(png_path)
+                with self._lock:
+                    self._counters['expirations'] += 1
+                return None
+            probabilities = np.load(probs_path)
+            gradcam = None
+            if os.path.exists(png_path):
+                with open(png_path, 'rb') as f:
+                    gradcam = f.read()
+            return CacheEntry(probabilities, gradcam, created_at)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key, entry):
+        if not self.disk_dir:
+            return
+
+        probs_path, png_path = self._disk_paths(key)
+        try:
+            # Write to a temp file first so readers never see a partial entry
+            tmp_path = f"{probs_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, entry.probabilities)
+            written = os.path.getsize(tmp_path)
+            os.replace(tmp_path, probs_path)
+            if entry.gradcam is not None:
+                tmp_path = f"{png_path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(entry.gradcam)
+                written += len(entry.gradcam)
+                os.replace(tmp_path, png_path)
+        except OSError:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._counters['disk_writes'] += 1
+            self._disk_bytes += written
+            over_cap = self.disk_max_bytes and self._disk_bytes > self.disk_max_bytes
+            sweep_due = now - self._last_sweep > self.ttl_seconds
+        if over_cap or sweep_due:
+            self._sweep_disk(now)
+
+    def _sweep_disk(self, now):
+        """Remove expired entries, then the oldest, until under DISK_SWEEP_TARGET of the cap."""
+        # One sweep at a time; writers that find a sweep running skip it
+        if not self._sweep_lock.acquire(blocking=False):
+            return
+        try:
+            # key -> [created_at, bytes, paths]; files are <key>.npy, <key>.png and their .tmp files
+            entries = {}
+            for name in os.listdir(self.disk_dir):
+                path = os.path.join(self.disk_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                item = entries.setdefault(name.split('.', 1)[0], [stat.st_mtime, 0, []])
+                item[0] = min(item[0], stat.st_mtime)
+                item[1] += stat.st_size
+                item[2].append(path)
+
+            total = sum(item[1] for item in entries.values())
+            target = self.disk_max_bytes * DISK_SWEEP_TARGET if self.disk_max_bytes else float('inf')
+            removed = 0
+            for created_at, size, paths in sorted(entries.values(), key=lambda item: item[0]):
+                # Oldest first: once an entry is live and the total fits, every later one is too
+                if now - created_at <= self.ttl_seconds and total <= target:
+                    break
+                for path in paths:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                total -= size
+                removed += 1
+
+            with self._lock:
+                self._disk_bytes = total
+                self._last_sweep = now
+                self._counters['disk_removals'] += removed
+        except OSError:
+            pass
+        finally:
+            self._sweep_lock.release()
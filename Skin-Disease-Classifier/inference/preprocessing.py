@@ -0,0 +1,262 @@
+"""
+Shared image preprocessing for the inference services.
+
+Each service used to carry its own preprocess_image() that made several
+full-image copies per request (np.array, np.stack for grayscale, astype,
+expand_dims, preprocess_input). A Preprocessor decodes the PIL image once
+into uint8 and writes the normalized float32 result straight into a slot of
+a preallocated batch. Pipelines (must match the training scripts):
+
+  efficientnet    - float32 in [0, 255]; EfficientNetB3 normalizes inside the model
+  densenet_clahe  - CLAHE on grayscale X-rays, then ImageNet mean/std ('torch' mode)
+  rescale         - x / 255 (eye model)
+
+Grayscale images are recognized from the decoded image mode ('L'/'LA') when
+the caller did not convert to RGB; otherwise a strided sample rejects colour
+images before the full channel comparison runs.
+
+CLAHE operators are created once per thread. PreprocessPool optionally runs
+decode + resize + CLAHE on a thread or process pool (PREPROCESS_WORKERS).
+"""
+
+import io
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+try:
+    import cv2
+    CLAHE_AVAILABLE = True
+except ImportError:
+    CLAHE_AVAILABLE = False
+
+PIPELINES = ('efficientnet', 'densenet_clahe', 'rescale')
+GRAYSCALE_MODES = ('L', 'LA')
+SAMPLE_STRIDE = 16
+
+# keras.applications.densenet.preprocess_input ('torch' mode)
+IMAGENET_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+IMAGENET_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
+
+def is_grayscale(pixels, stride=SAMPLE_STRIDE):
+    """
+    Whether a uint8 (H, W) / (H, W, 1) / (H, W, 3) array is grayscale.
+
+    Colour images almost always differ somewhere in a strided sample, so the
+    full-size channel comparison only runs for (near-)grayscale images.
+    """
+    if pixels.ndim == 2 or pixels.shape[2] == 1:
+        return True
+    sample = pixels[::stride, ::stride]
+    if not (np.array_equal(sample[..., 0], sample[..., 1]) and np.array_equal(sample[..., 1], sample[..., 2])):
+        return False
+    return np.array_equal(pixels[..., 0], pixels[..., 1]) and np.array_equal(pixels[..., 1], pixels[..., 2])
+
+
+_thread_state = threading.local()
+
+
+def clahe_operator():
+    """
+    CLAHE operator with the training parameters (clipLimit=2.0, 8x8 tiles).
+
+    Creating one per image showed up in profiles; cv2 CLAHE objects keep
+    internal state, so each thread gets its own instead of sharing one.
+    """
+    clahe = getattr(_thread_state, 'clahe', None)
+    if clahe is None:
+        clahe = _thread_state.clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+    return clahe
+
+
+def apply_clahe(gray):
+    """CLAHE on a uint8 (H, W) image, same parameters as training"""
+    return clahe_operator().apply(np.ascontiguousarray(gray))
+
+
+class Preprocessor:
+    """
+    Per-model preprocessing pipeline.
+
+    Args:
+        pipeline: One of PIPELINES
+        img_size: (width, height) the model was trained on
+        clahe: Apply CLAHE to grayscale images (densenet_clahe only,
+            default: when OpenCV is available)
+    """
+
+    def __init__(self, pipeline, img_size, clahe=None):
+        if pipeline not in PIPELINES:
+            raise ValueError(f"pipeline must be one of {PIPELINES}, got {pipeline!r}")
+        self.pipeline = pipeline
+        self.img_size = tuple(img_size)
+        self.clahe = pipeline == 'densenet_clahe' and (CLAHE_AVAILABLE if clahe is None else clahe)
+
+        # out = pixels * scale - offset, applied in place on the float32 slot.
+        # Per-channel constants are tiled to a full image row so the in-place
+        # ops run over long contiguous rows instead of a length-3 inner loop.
+        width = self.img_size[0]
+        if pipeline == 'densenet_clahe':
+            self._scale = np.tile(1.0 / (255.0 * IMAGENET_STD), width)
+            self._offset = np.tile(IMAGENET_MEAN / IMAGENET_STD, width)
+        elif pipeline == 'rescale':
+            self._scale = np.float32(1.0 / 255.0)
+            self._offset = None
+        else:
+            self._scale = None
+            self._offset = None
+
+    @property
+    def shape(self):
+        """Shape of one preprocessed image, (H, W, 3)"""
+        width, height = self.img_size
+        return (height, width, 3)
+
+    def new_batch(self, batch_size):
+        """Uninitialized float32 (batch_size, H, W, 3) buffer"""
+        return np.empty((batch_size, *self.shape), dtype=np.float32)
+
+    def decode(self, image):
+        """
+        PIL image -> resized uint8 array, (H, W) for grayscale modes and
+        (H, W, 3) otherwise.
+        """
+        if image.mode in GRAYSCALE_MODES:
+            if image.mode != 'L':
+                image = image.convert('L')
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+        if image.size != self.img_size:
+            image = image.resize(self.img_size)
+        return np.asarray(image)
+
+    def write(self, pixels, out):
+        """
+        Normalize a resized uint8 array into `out`, a C-contiguous float32
+        (H, W, 3) slot (e.g. a row of new_batch()).
+
+        Grayscale input is copied into the three channels instead of being stacked.
+        """
+        if not out.flags.c_contiguous:
+            raise ValueError("out must be a C-contiguous (H, W, 3) float32 array")
+        if self.clahe and is_grayscale(pixels):
+            pixels = apply_clahe(pixels if pixels.ndim == 2 else pixels[..., 0])
+        if pixels.ndim == 3 and pixels.shape[2] == 1:
+            pixels = pixels[..., 0]
+
+        if pixels.ndim == 2:
+            for channel in range(3):
+                np.copyto(out[..., channel], pixels, casting='unsafe')
+        else:
+            np.copyto(out, pixels, casting='unsafe')
+
+        rows = out.reshape(out.shape[0], -1)  # view, out is contiguous
+        if self._scale is not None:
+            rows *= self._scale
+        if self._offset is not None:
+            rows -= self._offset
+        return out
+
+    def __call__(self, image, out=None):
+        """
+        Preprocess one PIL image.
+
+        Args:
+            image: PIL image in any mode
+            out: Optional (H, W, 3) slot of a batch from new_batch()
+
+        Returns:
+            np.ndarray: (1, H, W, 3) float32, or `out` when given
+        """
+        if out is not None:
+            return self.write(self.decode(image), out)
+        batch = self.new_batch(1)
+        self.write(self.decode(image), batch[0])
+        return batch
+
+    def batch(self, images, out=None):
+        """
+        Preprocess several PIL images into one (N, H, W, 3) float32 batch.
+
+        Args:
+            images: Sequence of PIL images
+            out: Optional buffer from new_batch() with at least len(images) rows
+        """
+        if out is None:
+            out = self.new_batch(len(images))
+        for i, image in enumerate(images):
+            self.write(self.decode(image), out[i])
+        return out[:len(images)]
+
+
+def _preprocess(preprocessor, image):
+    """Pool task: decode upload bytes if needed, then preprocess"""
+    if isinstance(image, (bytes, bytearray)):
+        image = Image.open(io.BytesIO(image))
+    return preprocessor(image)
+
+
+class PreprocessPool:
+    """
+    Optional worker pool for preprocessing.
+
+    With workers > 0, decode + resize + CLAHE run on the pool while the
+    calling thread only waits for the result, so X-ray preprocessing of new
+    requests overlaps with model execution and the number of images being
+    preprocessed at once is bounded. OpenCV and PIL release the GIL, so a
+    thread pool is usually enough; kind='process' also parallelizes the
+    NumPy/Python parts at the cost of pickling the input and result.
+
+    Args:
+        workers: Pool size, 0 runs inline in the calling thread
+        kind: 'thread' or 'process'
+    """
+
+    KINDS = ('thread', 'process')
+
+    def __init__(self, workers=0, kind='thread'):
+        if kind not in self.KINDS:
+            raise ValueError(f"kind must be one of {self.KINDS}, got {kind!r}")
+        self.workers = max(0, int(workers))
+        self.kind = kind
+        self._executor = None
+        if self.workers:
+            if kind == 'process':
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='preprocess')
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build a pool from environment variables:
+        PREPROCESS_WORKERS (default 0 = inline),
+        PREPROCESS_POOL (thread/process, default thread).
+        """
+        return cls(
+            workers=int(os.environ.get('PREPROCESS_WORKERS', '0')),
+            kind=os.environ.get('PREPROCESS_POOL', 'thread').strip().lower()
+        )
+
+    def run(self, preprocessor, image, timeout=None):
+        """
+        Preprocess one image (PIL image or encoded upload bytes).
+
+        Returns:
+            np.ndarray: (1, H, W, 3) float32
+        """
+        if self._executor is None:
+            return _preprocess(preprocessor, image)
+        return self._executor.submit(_preprocess, preprocessor, image).result(timeout=timeout)
+
+    def stats(self):
+        return {"workers": self.workers, "kind": self.kind if self.workers else "inline"}
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
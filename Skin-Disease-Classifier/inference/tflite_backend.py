@@ -0,0 +1,197 @@
+"""
+TFLite inference backend for CPU serving.
+
+export_tflite_models.py writes float16 and full-int8 TFLite versions of the
+trained models next to the originals (e.g. models/<name>_int8.tflite) together
+with an accuracy-parity report. When INFERENCE_BACKEND=tflite the services
+run predictions through the TFLite interpreter instead of TensorFlow; the
+TensorFlow model stays loaded for Grad-CAM.
+"""
+
+import json
+import os
+import threading
+
+import numpy as np
+
+PRECISIONS = ('fp16', 'int8')
+PARITY_REPORT_NAME = 'tflite_parity_report.json'
+
+
+def inference_backend():
+    """Backend selected by INFERENCE_BACKEND ('tensorflow', 'tflite' or 'onnx', default 'tensorflow')."""
+    return os.environ.get('INFERENCE_BACKEND', 'tensorflow').strip().lower()
+
+
+def tflite_precision():
+    """Quantized variant selected by TFLITE_PRECISION ('fp16' or 'int8', default 'int8')."""
+    precision = os.environ.get('TFLITE_PRECISION', 'int8').strip().lower()
+    if precision not in PRECISIONS:
+        raise ValueError(f"TFLITE_PRECISION must be one of {PRECISIONS}, got {precision!r}")
+    return precision
+
+
+def tflite_threads():
+    """Interpreter thread count from TFLITE_THREADS (default: all CPUs)."""
+    value = os.environ.get('TFLITE_THREADS')
+    return int(value) if value else (os.cpu_count() or 1)
+
+
+def tflite_model_path(model_path, precision):
+    """
+    Path of the TFLite export for a model.
+
+    'models/x_savedmodel', 'models/x_xla_savedmodel' and 'models/x.keras' all map
+    to 'models/x_<precision>.tflite'.
+    """
+    base = model_path.rstrip('/\\')
+    for suffix in ('_xla_savedmodel', '_savedmodel'):
+        if base.endswith(suffix):
+            base = base[:-len(suffix)]
+            break
+    else:
+        base = os.path.splitext(base)[0]
+    return f"{base}_{precision}.tflite"
+
+
+def quantize_input(images, details):
+    """
+    Convert a float32 batch to the interpreter's input dtype.
+
+    Float inputs are passed through; integer inputs are quantized with the
+    tensor's (scale, zero_point).
+    """
+    dtype = details['dtype']
+    if np.issubdtype(dtype, np.floating):
+        return np.asarray(images, dtype=dtype)
+    scale, zero_point = details['quantization']
+    info = np.iinfo(dtype)
+    quantized = np.round(np.asarray(images, dtype=np.float32) / scale + zero_point)
+    return np.clip(quantized, info.min, info.max).astype(dtype)
+
+
+def dequantize_output(values, details):
+    """Convert an interpreter output back to float32 probabilities."""
+    if np.issubdtype(details['dtype'], np.floating):
+        return np.asarray(values, dtype=np.float32)
+    scale, zero_point = details['quantization']
+    return (values.astype(np.float32) - zero_point) * scale
+
+
+def parity_verdict(tflite_path, report_path=None):
+    """
+    Whether the parity report accepted this TFLite file.
+
+    Returns:
+        bool, or None if there is no report entry for it
+    """
+    report_path = report_path or os.path.join(os.path.dirname(tflite_path), PARITY_REPORT_NAME)
+    try:
+        with open(report_path, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+    except (OSError, ValueError):
+        return None
+    entry = report.get('models', {}).get(os.path.basename(tflite_path))
+    return None if entry is None else bool(entry.get('accepted'))
+
+
+def _interpreter_class():
+    # tflite_runtime is much lighter than TensorFlow, prefer it when installed
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+class TFLiteModel:
+    """
+    Thread-safe wrapper around a TFLite interpreter.
+
+    The interpreter is not re-entrant, so calls are serialized with a lock.
+    The input tensor is resized on demand when the batch size changes.
+
+    Args:
+        path: .tflite file
+        num_threads: Interpreter threads (default: TFLITE_THREADS)
+    """
+
+    def __init__(self, path, num_threads=None):
+        self.path = path
+        self.num_threads = num_threads or tflite_threads()
+        self._lock = threading.Lock()
+        self._interpreter = _interpreter_class()(model_path=path, num_threads=self.num_threads)
+        self._interpreter.allocate_tensors()
+        self._refresh_details()
+
+    def _refresh_details(self):
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+
+    @property
+    def input_shape(self):
+        return tuple(int(d) for d in self._input['shape'])
+
+    @property
+    def input_dtype(self):
+        return np.dtype(self._input['dtype']).name
+
+    def predict(self, images):
+        """
+        Args:
+            images: Preprocessed float32 batch of shape (N, H, W, C)
+
+        Returns:
+            np.ndarray: (N, num_classes) float32 probabilities
+        """
+        images = np.asarray(images, dtype=np.float32)
+        with self._lock:
+            if self._input['shape'][0] != len(images):
+                self._interpreter.resize_tensor_input(self._input['index'], list(images.shape))
+                self._interpreter.allocate_tensors()
+                self._refresh_details()
+            self._interpreter.set_tensor(self._input['index'], quantize_input(images, self._input))
+            self._interpreter.invoke()
+            output = self._interpreter.get_tensor(self._output['index'])
+        return dequantize_output(output, self._output)
+
+
+def open_tflite_model(path, num_threads=None):
+    """
+    Load a TFLite file unless it is missing or the parity report rejected it.
+
+    Returns:
+        TFLiteModel or None (callers fall back to TensorFlow)
+    """
+    if not os.path.exists(path):
+        print(f"[UYARI] TFLite model bulunamadi: {path} - TensorFlow backend kullaniliyor")
+        return None
+
+    verdict = parity_verdict(path)
+    if verdict is False:
+        print(f"[UYARI] {os.path.basename(path)} parity raporunda reddedilmis - TensorFlow backend kullaniliyor")
+        return None
+    if verdict is None:
+        print(f"[UYARI] {os.path.basename(path)} icin parity raporu yok, dogrulanmamis model kullaniliyor")
+
+    try:
+        model = TFLiteModel(path, num_threads)
+    except Exception as e:
+        print(f"[UYARI] TFLite model yuklenemedi: {str(e)[:200]} - TensorFlow backend kullaniliyor")
+        return None
+    print(f"[BILGI] TFLite backend: {path} ({model.input_dtype} input, {model.num_threads} thread)")
+    return model
+
+
+def load_tflite_backend(model_path, precision=None, num_threads=None):
+    """
+    Load the TFLite export of a model if INFERENCE_BACKEND asks for it.
+
+    Returns:
+        TFLiteModel, or None when the backend is not selected or the export
+        cannot be used
+    """
+    if inference_backend() != 'tflite':
+        return None
+    return open_tflite_model(tflite_model_path(model_path, precision or tflite_precision()), num_threads)
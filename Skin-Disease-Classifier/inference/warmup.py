@@ -0,0 +1,130 @@
+"""
+Model warm-up and readiness tracking.
+
+The first calls into a freshly loaded model pay for graph tracing and memory
+allocation. A Warmup runs representative dummy inputs through the model in a
+background thread, and the service's /ready endpoint reports 200 only once
+every required step has succeeded.
+"""
+
+import os
+import threading
+import time
+import traceback
+
+
+def parse_batch_sizes(value, default=(1,)):
+    """
+    Parse a comma-separated list of batch sizes ("1,4,8").
+
+    Args:
+        value: String from the environment, or None
+        default: Batch sizes to use when value is empty
+
+    Returns:
+        list: Sorted, de-duplicated positive batch sizes
+    """
+    if not value:
+        return sorted(set(default))
+    sizes = set()
+    for part in value.split(','):
+        part = part.strip()
+        if part and int(part) > 0:
+            sizes.add(int(part))
+    return sorted(sizes) or sorted(set(default))
+
+
+def warmup_batch_sizes(default=(1,)):
+    """Batch sizes from WARMUP_BATCH_SIZES."""
+    return parse_batch_sizes(os.environ.get('WARMUP_BATCH_SIZES'), default)
+
+
+def warmup_gradcam_enabled():
+    """Whether WARMUP_GRADCAM asks for the Grad-CAM path to be warmed up (default: true)."""
+    return os.environ.get('WARMUP_GRADCAM', 'true').lower() == 'true'
+
+
+class Warmup:
+    """
+    Runs warm-up steps and tracks readiness.
+
+    Each step is a (label, callable, required) tuple. The service is ready once
+    all steps have run and none of the required ones failed; optional steps
+    (e.g. Grad-CAM) are reported but do not block readiness.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._status = {
+            'state': 'pending',
+            'started_at': None,
+            'finished_at': None,
+            'duration_s': None,
+            'steps': {},
+            'errors': {}
+        }
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def start(self, steps, background=True):
+        """
+        Run the warm-up steps.
+
+        Args:
+            steps: List of (label, callable, required) tuples
+            background: Run in a daemon thread (True) or block the caller
+        """
+        if background:
+            thread = threading.Thread(target=self.run, args=(steps,), name=f"warmup-{self.name}", daemon=True)
+            thread.start()
+            return thread
+        self.run(steps)
+        return None
+
+    def run(self, steps):
+        started = time.perf_counter()
+        with self._lock:
+            self._status['state'] = 'running'
+            self._status['started_at'] = time.time()
+
+        required_failed = False
+        for label, fn, required in steps:
+            step_start = time.perf_counter()
+            try:
+                fn()
+                with self._lock:
+                    self._status['steps'][label] = round(time.perf_counter() - step_start, 3)
+            except Exception as e:
+                print(f"[WARMUP] {self.name}: {label} failed: {str(e)[:200]}")
+                traceback.print_exc()
+                with self._lock:
+                    self._status['errors'][label] = str(e)[:500]
+                required_failed = required_failed or required
+
+        with self._lock:
+            self._status['finished_at'] = time.time()
+            self._status['duration_s'] = round(time.perf_counter() - started, 3)
+            self._status['state'] = 'failed' if required_failed else 'ready'
+
+        if required_failed:
+            print(f"[WARMUP] {self.name}: failed after {self._status['duration_s']}s, service stays not-ready")
+        else:
+            print(f"[WARMUP] {self.name}: ready in {self._status['duration_s']}s")
+            self._ready.set()
+
+    def fail(self, reason):
+        """Mark the service as permanently not ready (e.g. model failed to load)."""
+        with self._lock:
+            self._status['state'] = 'failed'
+            self._status['errors']['load'] = reason
+
+    def status(self):
+        with self._lock:
+            return {
+                'ready': self.ready,
+                **{k: (dict(v) if isinstance(v, dict) else v) for k, v in self._status.items()}
+            }
@@ -15,8 +15,13 @@ from PIL import Image
 import io
 import tensorflow as tf
 from tensorflow import keras
-from tensorflow.keras.applications.densenet import preprocess_input as densenet_preprocess
 import base64
+from inference.prediction_cache import PredictionCache, model_version
+from inference.tflite_backend import inference_backend, load_tflite_backend
+from inference.onnx_backend import load_onnx_backend
+from inference.preprocessing import PreprocessPool, Preprocessor
+from inference.manifest import artifact_path, load_manifest, manifest_path
+from inference.warmup import Warmup, warmup_batch_sizes, warmup_gradcam_enabled
 
 # OpenCV for CLAHE (optional but recommended for X-ray images)
 try:
@@ -29,7 +34,7 @@ except ImportError:
 # UTF-8 encoding
 if sys.platform == 'win32':
     try:
-    sys.stdout.reconfigure(encoding='utf-8')
+        sys.stdout.reconfigure(encoding='utf-8')
     except:
         pass
 
@@ -41,8 +46,13 @@ CORS(app)  # Frontend'den istek kabul etmek için
 MODEL_PATH_SAVEDMODEL = 'models/lung_3class_densenet121_macro_f1_savedmodel'
 MODEL_PATH_KERAS = 'models/lung_3class_densenet121_macro_f1.keras'
 MODEL_PATH_OLD = 'models/lung_disease_model.keras'
-# Öncelik sırası: SavedModel > .keras > old model
-if os.path.exists(MODEL_PATH_SAVEDMODEL):
+# Grad-CAM için Keras model gerekli: manifest varsa export edilen kaynak .keras dosyası
+# (export_model.py'nin SavedModel'i Keras ile yüklenemez)
+MODEL_MANIFEST = load_manifest(manifest_path('models', 'lung'))
+# Öncelik sırası: manifest > SavedModel > .keras > old model
+if artifact_path(MODEL_MANIFEST, 'keras'):
+    MODEL_PATH = artifact_path(MODEL_MANIFEST, 'keras')
+elif os.path.exists(MODEL_PATH_SAVEDMODEL):
     MODEL_PATH = MODEL_PATH_SAVEDMODEL
 elif os.path.exists(MODEL_PATH_KERAS):
     MODEL_PATH = MODEL_PATH_KERAS
@@ -50,6 +60,10 @@ else:
     MODEL_PATH = MODEL_PATH_OLD
 
 IMG_SIZE = (384, 384)  # Must match training size (medical imaging optimized)
+# CLAHE on grayscale X-rays + DenseNet121 ImageNet preprocessing (same as training)
+preprocessor = Preprocessor('densenet_clahe', IMG_SIZE)
+# PREPROCESS_WORKERS > 0 runs CLAHE + resize on a worker pool
+preprocess_pool = PreprocessPool.from_env()
 CLASS_NAMES = ['COVID-19', 'Non-COVID', 'Normal']
 
 CLASS_NAMES_TR = {
@@ -164,98 +178,27 @@ except Exception as e:
     print(f"HATA: Model yuklenemedi: {e}")
     model = None
 
+# Opsiyonel TFLite / ONNX Runtime backend (INFERENCE_BACKEND=tflite|onnx) - Grad-CAM icin TF model yuklu kalir
+runtime_model = (load_tflite_backend(MODEL_PATH) or load_onnx_backend(MODEL_PATH)) if model is not None else None
+
+# Prediction cache (aynı görüntü tekrar yüklendiğinde model çalıştırılmaz)
+MODEL_VERSION = model_version(runtime_model.path if runtime_model else MODEL_PATH)
+prediction_cache = PredictionCache.from_env()
+
 # ============================================================================
 # YARDIMCI FONKSIYONLAR
 # ============================================================================
 
-def apply_clahe_grayscale(img):
-    """
-    Apply CLAHE (Contrast Limited Adaptive Histogram Equalization) to grayscale images.
-    CLAHE improves contrast in X-Ray images by enhancing local contrast.
-    Must match training preprocessing exactly.
-    """
-    if not CLAHE_AVAILABLE:
-        return img
-    
-    # Convert to uint8 if needed
-    if img.dtype != np.uint8:
-        img_uint8 = np.clip(img, 0, 255).astype(np.uint8)
-    else:
-        img_uint8 = img
-    
-    # Extract single channel for grayscale
-    if len(img_uint8.shape) == 3 and img_uint8.shape[2] == 1:
-        img_2d = img_uint8[:, :, 0]
-    elif len(img_uint8.shape) == 2:
-        img_2d = img_uint8
-    else:
-        # If RGB, convert to grayscale first
-        img_2d = cv2.cvtColor(img_uint8, cv2.COLOR_RGB2GRAY)
-    
-    # Create CLAHE object (same parameters as training)
-    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-    
-    # Apply CLAHE
-    img_clahe = clahe.apply(img_2d)
-    
-    # Reshape back to (H, W, 1) if needed
-    if len(img.shape) == 3:
-        img_clahe = np.expand_dims(img_clahe, axis=-1)
-    
-    return img_clahe
-
 def preprocess_image(image):
     """
     Goruntu on isleme - DenseNet121 için
     Must match training preprocessing: CLAHE + DenseNet ImageNet preprocessing
+    (see inference/preprocessing.py)
+
+    Returns:
+        np.ndarray: (1, 384, 384, 3) float32
     """
-    # Boyutlandir
-    image = image.resize(IMG_SIZE)
-    
-    # Array'e cevir
-    img = np.array(image)
-    
-    # Ensure input is in [0, 255] range and uint8 format
-    if img.max() <= 1.0:
-        img = (img * 255.0).astype(np.uint8)
-    elif img.dtype != np.uint8:
-        img = np.clip(img, 0, 255).astype(np.uint8)
-    
-    # Detect if image is grayscale
-    is_grayscale = False
-    if len(img.shape) == 2:
-        is_grayscale = True
-    elif len(img.shape) == 3:
-        if img.shape[2] == 1:
-            is_grayscale = True
-        elif img.shape[2] == 3:
-            # Check if it's actually grayscale (all channels same)
-            if np.allclose(img[:,:,0], img[:,:,1]) and np.allclose(img[:,:,1], img[:,:,2]):
-                is_grayscale = True
-    
-    # Apply CLAHE if grayscale and available (X-ray images benefit from this)
-    if is_grayscale and CLAHE_AVAILABLE:
-        img = apply_clahe_grayscale(img)
-        if img.dtype != np.uint8:
-            img = np.clip(img, 0, 255).astype(np.uint8)
-    
-    # Convert grayscale to RGB if needed
-    if len(img.shape) == 2:
-        img = np.stack([img] * 3, axis=-1)
-    elif len(img.shape) == 3 and img.shape[2] == 1:
-        img = np.repeat(img, 3, axis=-1)
-    
-    # Ensure RGB (not RGBA)
-    if len(img.shape) == 3 and img.shape[2] == 4:
-        img = img[:, :, :3]
-    
-    # Batch dimension ekle
-    img_array = np.expand_dims(img, axis=0).astype(np.float32)
-    
-    # Apply official DenseNet121 ImageNet preprocessing
-    img_array = densenet_preprocess(img_array)
-    
-    return img_array
+    return preprocess_pool.run(preprocessor, image)
 
 def generate_gradcam(model, img_array, class_index, layer_name='conv5_block16_concat'):
     """Grad-CAM görselleştirmesi oluştur"""
@@ -301,7 +244,7 @@ def generate_gradcam(model, img_array, class_index, layer_name='conv5_block16_co
         return None
 
 def create_gradcam_overlay(original_image, heatmap):
-    """Grad-CAM overlay görüntüsü oluştur"""
+    """Grad-CAM overlay görüntüsü oluştur (PNG bytes döner)"""
     try:
         import cv2
         
@@ -319,18 +262,50 @@ def create_gradcam_overlay(original_image, heatmap):
         
         overlay = cv2.addWeighted(original_array, 0.6, heatmap_colored, 0.4, 0)
         
-        # Base64'e çevir
+        # PNG olarak kodla
         overlay_image = Image.fromarray(overlay)
         buffer = io.BytesIO()
         overlay_image.save(buffer, format='PNG')
-        buffer.seek(0)
         
-        return f"data:image/png;base64,{base64.b64encode(buffer.getvalue()).decode()}"
+        return buffer.getvalue()
     except Exception as e:
         print(f"Overlay hatasi: {e}")
         return None
 
-def predict_lung_disease(image, with_gradcam=False):
+def format_prediction(probabilities):
+    """Olasilik vektorunden API cevabini olustur"""
+    results = []
+    for i, class_name in enumerate(CLASS_NAMES):
+        confidence = float(probabilities[i])
+        results.append({
+            "class": class_name,
+            "class_tr": CLASS_NAMES_TR.get(class_name, class_name),
+            "confidence": confidence,
+            "percentage": f"{confidence * 100:.2f}%",
+            "description": CLASS_DESCRIPTIONS.get(class_name, '')
+        })
+    
+    # Confidence'a gore sirala
+    results.sort(key=lambda x: x['confidence'], reverse=True)
+    
+    return {
+        "success": True,
+        "prediction": results[0]["class"],
+        "prediction_tr": results[0]["class_tr"],
+        "confidence": results[0]["confidence"],
+        "confidence_percentage": results[0]["percentage"],
+        "description": results[0]["description"],
+        "top_3": results[:3],
+        "all_predictions": results
+    }
+
+def predict_probabilities(processed_image):
+    """Run a preprocessed batch through the model, returns (N, num_classes) numpy array"""
+    if runtime_model is not None:
+        return runtime_model.predict(processed_image)
+    return model.predict(processed_image, verbose=0)
+
+def predict_lung_disease(image, with_gradcam=False, cache_key=None):
     """Akciger hastaligi tahmini"""
     if model is None:
         return {"error": "Model yuklu degil"}
@@ -340,48 +315,58 @@ def predict_lung_disease(image, with_gradcam=False):
         processed_image = preprocess_image(image)
         
         # Tahmin
-        predictions = model.predict(processed_image, verbose=0)
+        predictions = predict_probabilities(processed_image)
+        if cache_key:
+            prediction_cache.put(cache_key, predictions[0])
         
         # Sonuclari hazirla
-        results = []
-        for i, class_name in enumerate(CLASS_NAMES):
-            confidence = float(predictions[0][i])
-            results.append({
-                "class": class_name,
-                "class_tr": CLASS_NAMES_TR.get(class_name, class_name),
-                "confidence": confidence,
-                "percentage": f"{confidence * 100:.2f}%",
-                "description": CLASS_DESCRIPTIONS.get(class_name, '')
-            })
-        
-        # Confidence'a gore sirala
-        results.sort(key=lambda x: x['confidence'], reverse=True)
-        
-        response = {
-            "success": True,
-            "prediction": results[0]["class"],
-            "prediction_tr": results[0]["class_tr"],
-            "confidence": results[0]["confidence"],
-            "confidence_percentage": results[0]["percentage"],
-            "description": results[0]["description"],
-            "top_3": results[:3],
-            "all_predictions": results
-        }
+        response = format_prediction(predictions[0])
         
         # Grad-CAM ekle
         if with_gradcam:
-            top_class_index = CLASS_NAMES.index(results[0]["class"])
+            top_class_index = CLASS_NAMES.index(response["prediction"])
             heatmap = generate_gradcam(model, processed_image, top_class_index)
             if heatmap is not None:
-                gradcam_image = create_gradcam_overlay(image, heatmap)
-                if gradcam_image:
-                    response["gradcam"] = gradcam_image
+                gradcam_png = create_gradcam_overlay(image, heatmap)
+                if gradcam_png:
+                    if cache_key:
+                        prediction_cache.put(cache_key, predictions[0], gradcam=gradcam_png)
+                    response["gradcam"] = f"data:image/png;base64,{base64.b64encode(gradcam_png).decode()}"
         
         return response
     
     except Exception as e:
         return {"error": str(e)}
 
+# ============================================================================
+# WARM-UP - ilk gerçek istekler tracing/allocation maliyetini ödemesin
+# ============================================================================
+
+def build_warmup_steps():
+    """Her batch size için dummy tahmin (+ Grad-CAM) adımları"""
+    # Gri tonlamalı örnek: CLAHE yolu da ısınsın
+    gray = np.random.randint(0, 255, (IMG_SIZE[1], IMG_SIZE[0]), dtype=np.uint8)
+    sample = Image.fromarray(gray).convert('RGB')
+    processed = preprocess_image(sample)
+    
+    steps = []
+    for batch_size in warmup_batch_sizes():
+        batch = np.repeat(processed, batch_size, axis=0)
+        steps.append((f"predict_bs{batch_size}", lambda b=batch: predict_probabilities(b), True))
+    if warmup_gradcam_enabled():
+        # generate_gradcam hata durumunda None döner
+        def gradcam_step():
+            if generate_gradcam(model, processed, 0) is None:
+                raise RuntimeError("Grad-CAM hesaplanamadi")
+        steps.append(("gradcam", gradcam_step, False))
+    return steps
+
+warmup = Warmup('lung')
+if model is not None:
+    warmup.start(build_warmup_steps())
+else:
+    warmup.fail("Model yuklu degil")
+
 # ============================================================================
 # API ENDPOINTS
 # ============================================================================
@@ -402,6 +387,8 @@ def home():
             "GET /": "API durumu",
             "POST /predict": "Goruntu tahmini (multipart/form-data, field: 'image', optional: 'with_gradcam')",
             "GET /health": "Saglik kontrolu",
+            "GET /ready": "Warm-up tamamlandi mi (load balancer icin)",
+            "GET /metrics": "Prediction cache istatistikleri",
             "GET /web": "Web arayuzu"
         }
     })
@@ -415,6 +402,22 @@ def health():
         "model_path": MODEL_PATH
     })
 
+@app.route('/ready')
+def ready():
+    """Readiness - warm-up bitene kadar 503 döner"""
+    return jsonify(warmup.status()), 200 if warmup.ready else 503
+
+@app.route('/metrics')
+def metrics():
+    """Inference metrics"""
+    return jsonify({
+        "model_version": MODEL_VERSION,
+        "backend": inference_backend() if runtime_model else "tensorflow",
+        "runtime_model": runtime_model.path if runtime_model else None,
+        "prediction_cache": prediction_cache.stats(),
+        "preprocess_pool": preprocess_pool.stats()
+    })
+
 @app.route('/predict', methods=['POST'])
 def predict():
     """Tahmin endpoint'i"""
@@ -430,15 +433,26 @@ def predict():
     with_gradcam = request.form.get('with_gradcam', 'false').lower() == 'true'
     
     try:
+        file_content = file.read()
+        
+        # Aynı görüntü daha önce analiz edildiyse cache'ten dön
+        cache_key = PredictionCache.make_key(file_content, 'lung', MODEL_VERSION)
+        cached = prediction_cache.get(cache_key)
+        if cached is not None and (not with_gradcam or cached.gradcam is not None):
+            result = format_prediction(cached.probabilities)
+            if with_gradcam:
+                result["gradcam"] = f"data:image/png;base64,{base64.b64encode(cached.gradcam).decode()}"
+            return jsonify(result)
+        
         # Goruntu yukle
-        image = Image.open(io.BytesIO(file.read()))
+        image = Image.open(io.BytesIO(file_content))
         
         # RGB'ye çevir
         if image.mode != 'RGB':
             image = image.convert('RGB')
         
         # Tahmin yap
-        result = predict_lung_disease(image, with_gradcam=with_gradcam)
+        result = predict_lung_disease(image, with_gradcam=with_gradcam, cache_key=cache_key)
         
         if "error" in result:
             return jsonify(result), 500
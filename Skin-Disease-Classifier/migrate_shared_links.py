@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SHARED LINK MIGRATION
+Eski paylasim dokumanlarini (rastgele ID, shareToken sorgusu ile bulunan,
+analiz snapshot'i olmayan) shared/{shareToken} duzenine tasir ve analizin
+snapshot'ini gomer. Boylece public link acmak tek dokuman okumasidir.
+
+GET /api/share/<token> tasinmamis bir linki ilk acilista kendisi de tasir;
+bu script hepsini tek seferde yapar. Analizi silinmis paylasimlar atlanir.
+
+Kullanim:
+  python migrate_shared_links.py            # tasi
+  python migrate_shared_links.py --dry-run  # yazmadan say
+"""
+
+import argparse
+import os
+import sys
+
+import firebase_admin
+from firebase_admin import credentials, firestore
+
+from utils.sharing import migrate_shared_links
+
+# Windows console UTF-8 support
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8')
+    except:
+        pass
+
+CRED_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'firebase_credentials.json'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paylasim dokumanlarini shared/{shareToken} duzenine tasi")
+    parser.add_argument('--dry-run', action='store_true', help="say ama yazma")
+    parser.add_argument('--credentials', default=CRED_PATH, help="Firebase service account JSON")
+    args = parser.parse_args()
+
+    if not firebase_admin._apps:
+        firebase_admin.initialize_app(credentials.Certificate(args.credentials))
+    db = firestore.client()
+
+    result = migrate_shared_links(db, dry_run=args.dry_run)
+    print(f"[{'DRY-RUN' if args.dry_run else 'OK'}] tasinan: {result['migrated']}, atlanan: {result['skipped']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DOCTOR PATIENT INDEX BACKFILL / REPAIR
+doctors/{uid}/patients index'ini appointments koleksiyonundan yeniden hesaplar.
+
+Ne zaman calistirilir:
+  - Index eklenmeden once onaylanmis randevular icin (GET /api/doctors/patients
+    bunu doktor basina ilk istekte kendisi de yapar)
+  - Randevular frontend'den dogrudan Firestore'da onaylandiginda/tamamlandiginda
+
+Kullanim:
+  python rebuild_doctor_patients.py                  # tum doktorlar
+  python rebuild_doctor_patients.py --doctor <uid>   # tek doktor
+  python rebuild_doctor_patients.py --dry-run        # yazmadan goster
+"""
+
+import argparse
+import os
+import sys
+
+import firebase_admin
+from firebase_admin import credentials, firestore
+
+from utils.doctor_patients import rebuild_doctor_patients
+
+# Windows console UTF-8 support
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8')
+    except:
+        pass
+
+CRED_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'firebase_credentials.json'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Doktor -> hasta index'ini appointments koleksiyonundan yeniden hesapla")
+    parser.add_argument('--doctor', help="sadece bu doktor")
+    parser.add_argument('--dry-run', action='store_true', help="hesapla ama yazma")
+    parser.add_argument('--credentials', default=CRED_PATH, help="Firebase service account JSON")
+    args = parser.parse_args()
+
+    if not firebase_admin._apps:
+        firebase_admin.initialize_app(credentials.Certificate(args.credentials))
+    db = firestore.client()
+
+    results = rebuild_doctor_patients(db, doctor_id=args.doctor, dry_run=args.dry_run)
+
+    print(f"{'doktor':<30} {'hasta':>6} {'randevu':>8}")
+    print("-" * 50)
+    for uid, entries in sorted(results.items()):
+        total = sum(entry['totalAppointments'] for entry in entries.values())
+        print(f"{uid:<30} {len(entries):>6} {total:>8}")
+    print(f"\n[{'DRY-RUN' if args.dry_run else 'OK'}] {len(results)} doktor")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+USER STATS BACKFILL / REPAIR
+userStats dokumanlarini analyses koleksiyonundan yeniden hesaplar.
+
+Ne zaman calistirilir:
+  - userStats aggregate'i eklenmeden once analiz kaydetmis kullanicilar icin (opsiyonel:
+    auth_api "rebuilt" isareti olmayan dokumanlari ilk okuma/kayitta kendisi doldurur)
+  - Analizler Firestore'dan dogrudan silindiginde/duzenlendiginde (sayilar kaydiysa)
+
+Kullanim:
+  python rebuild_user_stats.py                 # tum kullanicilar
+  python rebuild_user_stats.py --uid <uid>     # tek kullanici
+  python rebuild_user_stats.py --dry-run       # yazmadan goster
+"""
+
+import argparse
+import os
+import sys
+
+import firebase_admin
+from firebase_admin import credentials, firestore
+
+from utils.stats import rebuild_user_stats
+
+# Windows console UTF-8 support
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8')
+    except:
+        pass
+
+CRED_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'firebase_credentials.json'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="userStats dokumanlarini analyses koleksiyonundan yeniden hesapla")
+    parser.add_argument('--uid', help="sadece bu kullanici")
+    parser.add_argument('--dry-run', action='store_true', help="hesapla ama yazma")
+    parser.add_argument('--credentials', default=CRED_PATH, help="Firebase service account JSON")
+    args = parser.parse_args()
+
+    if not firebase_admin._apps:
+        firebase_admin.initialize_app(credentials.Certificate(args.credentials))
+    db = firestore.client()
+
+    results = rebuild_user_stats(db, uid=args.uid, dry_run=args.dry_run)
+
+    print(f"{'uid':<30} {'toplam':>7}  hastalik turleri")
+    print("-" * 70)
+    for uid, stats in sorted(results.items()):
+        counts = ', '.join(f"{dt}={n}" for dt, n in sorted(stats['diseaseTypeCounts'].items()))
+        print(f"{uid:<30} {stats['totalAnalyses']:>7}  {counts}")
+    print(f"\n[{'DRY-RUN' if args.dry_run else 'OK'}] {len(results)} kullanici")
+
+
+if __name__ == '__main__':
+    main()
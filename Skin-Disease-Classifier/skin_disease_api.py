@@ -15,8 +15,13 @@ from tensorflow import keras
 from PIL import Image
 import numpy as np
 import io
-from tensorflow.keras.applications.efficientnet import preprocess_input as efficientnet_preprocess
 import base64
+from inference.prediction_cache import PredictionCache, model_version
+from inference.tflite_backend import inference_backend, load_tflite_backend
+from inference.onnx_backend import load_onnx_backend
+from inference.preprocessing import Preprocessor
+from inference.manifest import load_manifest, manifest_path, output_key, select_output, serving_model_path
+from inference.warmup import Warmup, warmup_batch_sizes, warmup_gradcam_enabled
 
 # Windows console UTF-8 support
 if sys.platform == 'win32':
@@ -33,7 +38,10 @@ CORS(app)  # Frontend'den istek kabul etmek için
 MODEL_PATH_SAVEDMODEL = 'models/skin_disease_model_5class_efficientnetb3_macro_f1_savedmodel'
 MODEL_PATH_KERAS = 'models/skin_disease_model_5class_efficientnetb3_macro_f1.keras'
 # Önce SavedModel'i dene, yoksa .keras'ı dene (bone_disease_api.py ile aynı strateji)
-MODEL_PATH = MODEL_PATH_SAVEDMODEL if os.path.exists(MODEL_PATH_SAVEDMODEL) else MODEL_PATH_KERAS
+# export_model.py manifest'i varsa model yolu ve çıktı anahtarı oradan okunur
+MODEL_MANIFEST = load_manifest(manifest_path('models', 'skin'))
+MODEL_PATH = serving_model_path(MODEL_MANIFEST) or (MODEL_PATH_SAVEDMODEL if os.path.exists(MODEL_PATH_SAVEDMODEL) else MODEL_PATH_KERAS)
+OUTPUT_KEY = output_key(MODEL_MANIFEST)
 
 CLASS_NAMES = [
     'akiec',   # Actinic Keratoses
@@ -60,6 +68,8 @@ CLASS_DESCRIPTIONS = {
 }
 
 IMG_SIZE = (300, 300)  # EfficientNetB3 input size
+# EfficientNetB3 normalizasyonu model icinde yapar: girdi float32 [0, 255]
+preprocessor = Preprocessor('efficientnet', IMG_SIZE)
 
 # ============================================================================
 # CUSTOM METRIC CLASS - Model yüklenirken gerekli
@@ -226,10 +236,8 @@ try:
     # Test prediction
     try:
         # Use EfficientNet preprocessing for test
-        test_img = np.random.randint(0, 255, (IMG_SIZE[0], IMG_SIZE[1], 3), dtype=np.uint8)
-        test_img_float = test_img.astype(np.float32)
-        test_input = efficientnet_preprocess(test_img_float)
-        test_input = np.expand_dims(test_input, axis=0)
+        test_img = np.random.randint(0, 255, (IMG_SIZE[1], IMG_SIZE[0], 3), dtype=np.uint8)
+        test_input = preprocessor(Image.fromarray(test_img))
         
         test_output = model.predict(test_input, verbose=0)
         print(f"[TEST] Model tahmin yapabiliyor: output shape {test_output.shape}")
@@ -276,44 +284,45 @@ except Exception as e:
     
     sys.exit(1)
 
+# Opsiyonel TFLite / ONNX Runtime backend (INFERENCE_BACKEND=tflite|onnx) - Grad-CAM icin TF model yuklu kalir
+runtime_model = load_tflite_backend(MODEL_PATH) or load_onnx_backend(MODEL_PATH)
+
+# Prediction cache (aynı görüntü tekrar yüklendiğinde model çalıştırılmaz)
+MODEL_VERSION = model_version(runtime_model.path if runtime_model else MODEL_PATH)
+prediction_cache = PredictionCache.from_env()
+print(f"[BILGI] Prediction cache: {prediction_cache.max_entries} kayit, TTL {prediction_cache.ttl_seconds:.0f}s, disk: {prediction_cache.disk_dir or 'yok'}")
+
 def preprocess_image_efficientnet(image):
     """
     Preprocess image for EfficientNetB3 input - Eğitim scriptindeki ile AYNI
-    
-    Process:
-    1. Resize to (300, 300)
-    2. Convert PIL Image to numpy array
-    3. Apply EfficientNet preprocessing (ImageNet normalization)
+    (resize to (300, 300), RGB, float32 [0, 255]); see inference/preprocessing.py
+
+    Returns:
+        np.ndarray: (1, 300, 300, 3) float32
     """
-    # Resize to training size
-    image = image.resize(IMG_SIZE)
-    
-    # Convert PIL Image to numpy array (values in [0, 255], uint8)
-    img_array = np.array(image)
-    
-    # Ensure RGB format
-    if len(img_array.shape) == 2:
-        # Grayscale to RGB
-        img_array = np.stack([img_array] * 3, axis=-1)
-    elif len(img_array.shape) == 3 and img_array.shape[2] == 4:
-        # RGBA to RGB
-        img_array = img_array[:, :, :3]
-    elif len(img_array.shape) == 3 and img_array.shape[2] == 1:
-        # Single channel to RGB
-        img_array = np.repeat(img_array, 3, axis=-1)
-    
-    # Ensure float32 in [0, 255] range
-    if img_array.dtype != np.float32:
-        img_array = img_array.astype(np.float32)
-    
-    # EfficientNet preprocessing (handles ImageNet normalization internally)
-    # This applies: scale to [0,1] then ImageNet mean/std normalization
-    img_preprocessed = efficientnet_preprocess(img_array)
-    
-    # Add batch dimension
-    img_preprocessed = np.expand_dims(img_preprocessed, axis=0)
-    
-    return img_preprocessed
+    return preprocessor(image)
+
+def predict_probabilities(processed_image):
+    """Run a preprocessed batch through the model, returns (N, num_classes) numpy array"""
+    if runtime_model is not None:
+        return runtime_model.predict(processed_image)
+    
+    # SavedModel veya Keras model prediction (bone_disease_api.py ile aynı)
+    if model_type == 'savedmodel':
+        # SavedModel - callable veya signature function
+        input_tensor = tf.constant(processed_image, dtype=tf.float32)
+        predictions_tensor = model(input_tensor)
+        
+        # TensorFlow tensor'ı numpy array'e çevir
+        if isinstance(predictions_tensor, dict):
+            # Signature function dict döner - anahtar manifest'ten (eski export'larda tek çıktı)
+            return select_output(predictions_tensor, OUTPUT_KEY).numpy()
+        elif hasattr(predictions_tensor, 'numpy'):
+            return predictions_tensor.numpy()
+        return np.array(predictions_tensor)
+    
+    # Keras model
+    return model.predict(processed_image, verbose=0)
 
 # ============================================================================
 # GRAD-CAM FUNCTIONS (Optional - for visualization)
@@ -471,6 +480,26 @@ def overlay_heatmap(img, heatmap, alpha=0.4):
     
     return superimposed
 
+# ============================================================================
+# WARM-UP - ilk gerçek istekler tracing/allocation maliyetini ödemesin
+# ============================================================================
+
+def build_warmup_steps():
+    """Her batch size için dummy tahmin (+ Grad-CAM) adımları"""
+    sample = Image.fromarray(np.random.randint(0, 255, (IMG_SIZE[1], IMG_SIZE[0], 3), dtype=np.uint8))
+    processed = preprocess_image_efficientnet(sample)
+    
+    steps = []
+    for batch_size in warmup_batch_sizes():
+        batch = np.repeat(processed, batch_size, axis=0)
+        steps.append((f"predict_bs{batch_size}", lambda b=batch: predict_probabilities(b), True))
+    if warmup_gradcam_enabled() and model_type != 'savedmodel':
+        steps.append(("gradcam", lambda: compute_gradcam(model, processed), False))
+    return steps
+
+warmup = Warmup('skin')
+warmup.start(build_warmup_steps())
+
 @app.route('/')
 def status():
     """API status endpoint"""
@@ -485,10 +514,27 @@ def status():
         "endpoints": {
             "GET /": "API durumu",
             "POST /predict": "Goruntu tahmini (multipart/form-data, field: 'image')",
-            "GET /classes": "Tum siniflari listele"
+            "GET /classes": "Tum siniflari listele",
+            "GET /metrics": "Prediction cache istatistikleri",
+            "GET /ready": "Warm-up tamamlandi mi (load balancer icin)"
         }
     })
 
+@app.route('/ready')
+def ready():
+    """Readiness - warm-up bitene kadar 503 döner"""
+    return jsonify(warmup.status()), 200 if warmup.ready else 503
+
+@app.route('/metrics')
+def metrics():
+    """Inference metrics"""
+    return jsonify({
+        "model_version": MODEL_VERSION,
+        "backend": inference_backend() if runtime_model else "tensorflow",
+        "runtime_model": runtime_model.path if runtime_model else None,
+        "prediction_cache": prediction_cache.stats()
+    })
+
 @app.route('/classes')
 def list_classes():
     """List all disease classes with descriptions"""
@@ -520,35 +566,23 @@ def predict():
     file_content = file.read()
     file_stream = io.BytesIO(file_content)
     
+    # Aynı görüntü daha önce analiz edildiyse cache'ten dön
+    cache_key = PredictionCache.make_key(file_content, 'skin', MODEL_VERSION)
+    cached = prediction_cache.get(cache_key)
+    
     try:
-        # Read and preprocess image
-        file_stream.seek(0)
-        image = Image.open(file_stream).convert('RGB')
-        processed_image = preprocess_image_efficientnet(image)
-        
-        # Predict
-        # SavedModel veya Keras model prediction (bone_disease_api.py ile aynı)
-        if model_type == 'savedmodel':
-            # SavedModel - callable veya signature function
-            input_tensor = tf.constant(processed_image, dtype=tf.float32)
-            
-            if callable(model):
-                predictions_tensor = model(input_tensor)
-            else:
-                predictions_tensor = model(input_tensor)
-            
-            # TensorFlow tensor'ı numpy array'e çevir
-            if isinstance(predictions_tensor, dict):
-                # Signature function dict döner, genelde 'output_0' veya ilk değer
-                output_key = list(predictions_tensor.keys())[0]
-                predictions = predictions_tensor[output_key].numpy()
-            elif hasattr(predictions_tensor, 'numpy'):
-                predictions = predictions_tensor.numpy()
-            else:
-                predictions = np.array(predictions_tensor)
+        processed_image = None
+        if cached is not None:
+            predictions = cached.probabilities[np.newaxis, :]
         else:
-            # Keras model
-            predictions = model.predict(processed_image, verbose=0)
+            # Read and preprocess image
+            file_stream.seek(0)
+            image = Image.open(file_stream).convert('RGB')
+            processed_image = preprocess_image_efficientnet(image)
+            
+            # Predict
+            predictions = predict_probabilities(processed_image)
+            prediction_cache.put(cache_key, predictions[0])
         
         # Get top prediction
         top_idx = np.argmax(predictions[0])
@@ -592,12 +626,17 @@ def predict():
         }
         
         # Grad-CAM isteğe bağlı
-        if request.form.get('with_gradcam', 'false').lower() == 'true':
+        with_gradcam = request.form.get('with_gradcam', 'false').lower() == 'true'
+        if with_gradcam and cached is not None and cached.gradcam is not None:
+            result["gradcam"] = f"data:image/png;base64,{base64.b64encode(cached.gradcam).decode('utf-8')}"
+        elif with_gradcam:
             try:
                 # Original image'ı sakla
                 file_stream.seek(0)
                 original_image = Image.open(file_stream).convert('RGB')
                 original_array = np.array(original_image)
+                if processed_image is None:
+                    processed_image = preprocess_image_efficientnet(original_image)
                 
                 # Grad-CAM hesapla (sadece Keras model için)
                 if model_type == 'savedmodel':
@@ -617,6 +656,7 @@ def predict():
                 buffer = io.BytesIO()
                 gradcam_pil.save(buffer, format='PNG')
                 gradcam_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
+                prediction_cache.put(cache_key, predictions[0], gradcam=buffer.getvalue())
                 
                 result["gradcam"] = f"data:image/png;base64,{gradcam_base64}"
             except Exception as e:
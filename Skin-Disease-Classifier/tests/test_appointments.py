@@ -0,0 +1,90 @@
+"""
+Unit tests for the doctor appointment queue queries.
+"""
+
+from datetime import datetime
+from utils.appointments import queue_query, serialize_appointment, status_priority
+
+
+class RecordingQuery:
+    """Records where/order_by calls of a query chain."""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def where(self, field, op, value):
+        self.calls.append(('where', field, value))
+        return self
+    
+    def order_by(self, field, **kwargs):
+        self.calls.append(('order_by', field))
+        return self
+
+
+class RecordingDB:
+    def __init__(self):
+        self.query = RecordingQuery()
+    
+    def collection(self, name):
+        assert name == 'appointments'
+        return self.query
+
+
+class FakeSnapshot:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self.exists = True
+        self._data = data
+    
+    def to_dict(self):
+        return dict(self._data)
+
+
+class TestStatusPriority:
+    """Tests for status_priority function."""
+    
+    def test_queue_order(self):
+        """Test pending > approved > completed > rejected > unknown."""
+        order = [status_priority(s) for s in ('pending', 'approved', 'completed', 'rejected', 'other')]
+        assert order == sorted(order)
+        assert len(set(order)) == 5
+
+
+class TestQueueQuery:
+    """Tests for queue_query function."""
+    
+    def test_all_statuses(self):
+        """Test that the full queue is ordered by priority, date and time in Firestore."""
+        db = RecordingDB()
+        queue_query(db, specialty='dermatolog')
+        assert db.query.calls == [
+            ('where', 'doctorType', 'dermatolog'),
+            ('order_by', 'statusPriority'),
+            ('order_by', 'date'),
+            ('order_by', 'time'),
+        ]
+    
+    def test_status_filter(self):
+        """Test that a status filter replaces the priority ordering."""
+        db = RecordingDB()
+        queue_query(db, status='pending')
+        assert db.query.calls == [
+            ('where', 'status', 'pending'),
+            ('order_by', 'date'),
+            ('order_by', 'time'),
+        ]
+
+
+class TestSerializeAppointment:
+    """Tests for serialize_appointment function."""
+    
+    def test_serialize(self):
+        """Test id, timestamp conversion and that the internal sort field is dropped."""
+        data = serialize_appointment(FakeSnapshot('apt-1', {
+            'status': 'pending',
+            'statusPriority': 0,
+            'createdAt': datetime(2024, 1, 1)
+        }))
+        assert data['id'] == 'apt-1'
+        assert isinstance(data['createdAt'], float)
+        assert 'statusPriority' not in data
@@ -0,0 +1,147 @@
+"""
+Unit tests for the doctor -> patient index.
+"""
+
+from utils.doctor_patients import apply_status_change, compute_patient_index, count_patients
+
+
+class CountResult:
+    def __init__(self, value):
+        self.value = value
+
+
+class FakeQuery:
+    """Collection path + filters; count() counts the entries matching a '>' filter."""
+    
+    def __init__(self, entries, path, filters=()):
+        self.entries, self.path, self.filters = entries, path, filters
+    
+    def document(self, name):
+        return FakeQuery(self.entries, self.path + (name,))
+    
+    def collection(self, name):
+        return FakeQuery(self.entries, self.path + (name,))
+    
+    def where(self, field, op, value):
+        assert op == '>'
+        return FakeQuery(self.entries, self.path, self.filters + ((field, value),))
+    
+    def count(self):
+        return self
+    
+    def get(self):
+        entries = self.entries.get(self.path, [])
+        matching = [e for e in entries if all(e.get(field, 0) > value for field, value in self.filters)]
+        return [[CountResult(len(matching))]]
+
+
+class FakeDB:
+    def __init__(self, entries):
+        self.entries = entries
+    
+    def collection(self, name):
+        return FakeQuery(self.entries, (name,))
+
+
+def appointment(status, doctor_id=None, date='2024-05-01', user_id='patient-1'):
+    return {'userId': user_id, 'status': status, 'doctorId': doctor_id, 'date': date}
+
+
+class TestApplyStatusChange:
+    """Tests for apply_status_change function."""
+    
+    def test_approve_adds_patient(self):
+        """Test that approving a pending appointment indexes the patient."""
+        entry = apply_status_change({}, appointment('pending'), 'approved', 'doc-1')
+        assert entry == {
+            'userId': 'patient-1',
+            'totalAppointments': 1,
+            'completedAppointments': 0,
+            'lastAppointment': '2024-05-01'
+        }
+    
+    def test_complete_counts_once(self):
+        """Test that completing an approved appointment does not count it twice."""
+        current = {'userId': 'patient-1', 'totalAppointments': 1, 'completedAppointments': 0,
+                   'lastAppointment': '2024-05-01'}
+        entry = apply_status_change(current, appointment('approved', 'doc-1'), 'completed', 'doc-1')
+        assert entry['totalAppointments'] == 1
+        assert entry['completedAppointments'] == 1
+    
+    def test_keeps_latest_date(self):
+        """Test that an older appointment does not move lastAppointment back."""
+        current = {'totalAppointments': 1, 'completedAppointments': 0, 'lastAppointment': '2024-06-01'}
+        entry = apply_status_change(current, appointment('pending', date='2024-01-01'), 'approved', 'doc-1')
+        assert entry['totalAppointments'] == 2
+        assert entry['lastAppointment'] == '2024-06-01'
+    
+    def test_reject_pending_is_noop(self):
+        """Test that rejecting a pending appointment leaves the index alone."""
+        assert apply_status_change({}, appointment('pending'), 'rejected', 'doc-1') is None
+    
+    def test_reject_approved_decrements(self):
+        """Test that rejecting an appointment this doctor approved removes it from the count."""
+        current = {'totalAppointments': 2, 'completedAppointments': 0, 'lastAppointment': '2024-05-01'}
+        entry = apply_status_change(current, appointment('approved', 'doc-1'), 'rejected', 'doc-1')
+        assert entry['totalAppointments'] == 1
+    
+    def test_other_doctor_reject_decrements_previous(self):
+        """Test that rejecting another doctor's approved appointment decrements that doctor."""
+        current = {'totalAppointments': 1, 'completedAppointments': 0, 'lastAppointment': '2024-05-01'}
+        approved = appointment('approved', 'doc-1')
+        entry = apply_status_change(current, approved, 'rejected', 'doc-1', owner_id='doc-1')
+        assert entry['totalAppointments'] == 0
+        assert apply_status_change({}, approved, 'rejected', 'doc-1', owner_id='doc-2') is None
+    
+    def test_other_doctor_complete_moves_patient(self):
+        """Test that completing another doctor's appointment moves it to the completing doctor."""
+        current = {'totalAppointments': 1, 'completedAppointments': 0, 'lastAppointment': '2024-05-01'}
+        approved = appointment('approved', 'doc-1')
+        previous = apply_status_change(current, approved, 'completed', 'doc-2', owner_id='doc-1')
+        assert previous['totalAppointments'] == 0
+        assert previous['completedAppointments'] == 0
+        entry = apply_status_change({}, approved, 'completed', 'doc-2')
+        assert entry['totalAppointments'] == 1
+        assert entry['completedAppointments'] == 1
+    
+    def test_matches_rebuild(self):
+        """Test that incremental updates agree with compute_patient_index."""
+        approved = appointment('approved', 'doc-1')
+        completed = dict(approved, status='completed', doctorId='doc-2')
+        entries = {'doc-1': compute_patient_index([approved])['patient-1']}
+        for owner_id in ('doc-1', 'doc-2'):
+            entry = apply_status_change(entries.get(owner_id, {}), approved, 'completed', 'doc-2', owner_id)
+            entries[owner_id] = entry
+        assert entries['doc-1']['totalAppointments'] == 0
+        assert entries['doc-2'] == compute_patient_index([completed])['patient-1']
+
+
+class TestComputePatientIndex:
+    """Tests for compute_patient_index function."""
+    
+    def test_counts_per_patient(self):
+        """Test totals, completed counts and last date; pending/rejected are ignored."""
+        entries = compute_patient_index([
+            appointment('approved', 'doc-1', '2024-01-01'),
+            appointment('completed', 'doc-1', '2024-03-01'),
+            appointment('rejected', 'doc-1', '2024-04-01'),
+            appointment('approved', 'doc-1', '2024-02-01', user_id='patient-2'),
+            appointment('pending', 'doc-1', '2024-02-01', user_id='patient-3'),
+        ])
+        assert set(entries) == {'patient-1', 'patient-2'}
+        assert entries['patient-1']['totalAppointments'] == 2
+        assert entries['patient-1']['completedAppointments'] == 1
+        assert entries['patient-1']['lastAppointment'] == '2024-03-01'
+        assert entries['patient-2']['totalAppointments'] == 1
+
+
+class TestCountPatients:
+    """Tests for count_patients function."""
+    
+    def test_skips_zeroed_entries(self):
+        """Test that entries whose appointments were all rejected are not counted."""
+        db = FakeDB({('doctors', 'doc-1', 'patients'): [
+            {'totalAppointments': 2}, {'totalAppointments': 0}, {'totalAppointments': 1}
+        ]})
+        assert count_patients(db, 'doc-1') == 2
+        assert count_patients(db, 'doc-2') == 0
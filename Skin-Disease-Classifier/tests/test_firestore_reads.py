@@ -0,0 +1,167 @@
+"""
+Unit tests for the concurrent Firestore read helpers.
+"""
+
+import threading
+import time
+import pytest
+from utils import firestore_reads
+from utils.appointments import STATUS_PRIORITY, status_count_calls
+from utils.firestore_reads import get_snapshots, run_parallel
+
+
+class FakeRef:
+    def __init__(self, path):
+        self.path = path
+
+
+class FakeSnapshot:
+    def __init__(self, ref, exists=True):
+        self.reference = ref
+        self.exists = exists
+
+
+class FakeDB:
+    """get_all returns snapshots in reverse order, like Firestore's arbitrary order."""
+    
+    def __init__(self, existing):
+        self.existing = set(existing)
+        self.calls = []
+    
+    def get_all(self, refs):
+        self.calls.append([ref.path for ref in refs])
+        return [FakeSnapshot(ref, ref.path in self.existing) for ref in reversed(refs)]
+
+
+class TestGetSnapshots:
+    """Tests for get_snapshots function."""
+    
+    def test_single_round_trip_in_argument_order(self):
+        """Test that all refs are fetched with one get_all and returned in order."""
+        db = FakeDB({'doctors/d1', 'appointments/a1'})
+        doctor, appointment = get_snapshots(db, FakeRef('doctors/d1'), FakeRef('appointments/a1'))
+        assert len(db.calls) == 1
+        assert doctor.reference.path == 'doctors/d1'
+        assert appointment.reference.path == 'appointments/a1'
+    
+    def test_missing_and_none_refs(self):
+        """Test that missing documents are non-existing snapshots and None refs give None."""
+        db = FakeDB({'doctors/d1'})
+        doctor, cursor, missing = get_snapshots(db, FakeRef('doctors/d1'), None, FakeRef('appointments/x'))
+        assert doctor.exists
+        assert cursor is None
+        assert not missing.exists
+        assert db.calls == [['doctors/d1', 'appointments/x']]
+    
+    def test_duplicates_fetched_once(self):
+        """Test that a reference passed twice is read once."""
+        db = FakeDB({'users/u1'})
+        first, second = get_snapshots(db, FakeRef('users/u1'), FakeRef('users/u1'))
+        assert db.calls == [['users/u1']]
+        assert first is second
+    
+    def test_no_refs(self):
+        """Test that no request is made without references."""
+        db = FakeDB(set())
+        assert get_snapshots(db, None) == (None,)
+        assert db.calls == []
+
+
+class TestRunParallel:
+    """Tests for run_parallel function."""
+    
+    def test_results_in_order(self):
+        """Test that results follow argument order."""
+        assert run_parallel(lambda: 1, lambda: 2, lambda: 3) == [1, 2, 3]
+        assert run_parallel(lambda: 'only') == ['only']
+    
+    def test_calls_overlap(self):
+        """Test that calls run concurrently (both must be in flight to finish)."""
+        barrier = threading.Barrier(2, timeout=5)
+        assert run_parallel(barrier.wait, barrier.wait) is not None
+    
+    def test_exception_propagates(self):
+        """Test that a failing call raises in the caller."""
+        def fail():
+            raise RuntimeError("boom")
+        with pytest.raises(RuntimeError):
+            run_parallel(lambda: 1, fail)
+
+
+class CountResult:
+    def __init__(self, value):
+        self.value = value
+
+
+class CountQuery:
+    """appointments query whose count() returns the number of where() filters + status length."""
+    
+    def __init__(self, filters=()):
+        self.filters = filters
+    
+    def where(self, field, op, value):
+        return CountQuery(self.filters + (value,))
+    
+    def count(self):
+        return self
+    
+    def get(self):
+        time.sleep(0.01)  # round-trip
+        return [[CountResult(len(self.filters[-1]))]]
+
+
+class CountDB:
+    def collection(self, name):
+        return CountQuery()
+
+
+@pytest.fixture
+def small_pool(monkeypatch):
+    """A fresh two-thread read pool, shut down afterwards."""
+    monkeypatch.setenv('FIRESTORE_READ_THREADS', '2')
+    monkeypatch.setattr(firestore_reads, '_executor', None)
+    yield
+    if firestore_reads._executor is not None:
+        firestore_reads._executor.shutdown(wait=False)
+
+
+def run_with_timeout(target, count, timeout=5):
+    """Start count threads running target; return how many are still running after timeout."""
+    threads = [threading.Thread(target=target, daemon=True) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    deadline = time.time() + timeout
+    for thread in threads:
+        thread.join(timeout=max(0, deadline - time.time()))
+    return sum(thread.is_alive() for thread in threads)
+
+
+class TestRunParallelConcurrency:
+    """Tests that run_parallel cannot exhaust its own bounded pool."""
+    
+    def test_nested_call_with_every_worker_busy(self, small_pool):
+        """Test that run_parallel called from pool workers runs inline instead of waiting on the pool."""
+        barrier = threading.Barrier(2, timeout=5)
+        results = []
+        
+        def outer():
+            barrier.wait()  # both workers are now outer calls
+            return sum(run_parallel(lambda: 1, lambda: 2))
+        
+        assert run_with_timeout(lambda: results.append(run_parallel(outer, outer)), 1) == 0
+        assert results == [[3, 3]]
+    
+    def test_concurrent_appointment_requests_with_counts(self, small_pool):
+        """Test many concurrent page + status count reads (get_doctor_appointments with include_counts)."""
+        db = CountDB()
+        results = []
+        lock = threading.Lock()
+        
+        def request():
+            page, *counts = run_parallel(lambda: 'page', *status_count_calls(db, specialty='skin'))
+            with lock:
+                results.append((page, dict(zip(STATUS_PRIORITY, counts))))
+        
+        assert run_with_timeout(request, 16) == 0
+        assert len(results) == 16
+        assert results[0] == ('page', {status: len(status) for status in STATUS_PRIORITY})
@@ -3,10 +3,15 @@ Unit tests for helper utilities.
 """
 
 import pytest
-from datetime import datetime
+from datetime import datetime, timezone
+from google.cloud.firestore_v1 import GeoPoint
 from utils.helpers import (
     serialize_firestore_timestamp,
-    sanitize_string
+    serialize_firestore_doc,
+    to_json_value,
+    sanitize_string,
+    fetch_page,
+    get_documents
 )
 
 
@@ -44,6 +49,36 @@ class TestSerializeFirestoreTimestamp:
         assert result == 1234567890.0
 
 
+class TestToJsonValue:
+    """Tests for to_json_value function."""
+    
+    def test_nested_timestamps(self):
+        """Test that timestamps are converted at any depth."""
+        dt = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        value = {'a': {'b': [{'c': dt}]}, 'd': (dt,)}
+        assert to_json_value(value) == {'a': {'b': [{'c': dt.timestamp()}]}, 'd': [dt.timestamp()]}
+    
+    def test_firestore_types(self):
+        """Test GeoPoint, bytes and plain values."""
+        assert to_json_value(GeoPoint(41.0, 29.0)) == {'latitude': 41.0, 'longitude': 29.0}
+        assert to_json_value(b'\x00\x01') == 'AAE='
+        assert to_json_value('text') == 'text'
+        assert to_json_value(None) is None
+    
+    def test_serialize_doc(self):
+        """Test that serialize_firestore_doc adds the id and converts nested values."""
+        class Snapshot:
+            id = 'doc1'
+            exists = True
+            
+            def to_dict(self):
+                return {'summary': {'createdAt': datetime(2024, 1, 1, tzinfo=timezone.utc)}}
+        
+        data = serialize_firestore_doc(Snapshot())
+        assert data['id'] == 'doc1'
+        assert isinstance(data['summary']['createdAt'], float)
+
+
 class TestSanitizeString:
     """Tests for sanitize_string function."""
     
@@ -93,3 +128,101 @@ class TestSanitizeString:
         with pytest.raises(ValueError):
             sanitize_string([])
 
+
+class FakeQuery:
+    """Minimal stand-in for a Firestore query (records limit / start_after)."""
+    
+    def __init__(self, docs):
+        self.docs = docs
+        self.limit_value = None
+        self.cursor = None
+    
+    def start_after(self, snapshot):
+        self.cursor = snapshot
+        self.docs = self.docs[self.docs.index(snapshot) + 1:]
+        return self
+    
+    def limit(self, count):
+        self.limit_value = count
+        return self
+    
+    def stream(self):
+        return iter(self.docs[:self.limit_value])
+
+
+class TestFetchPage:
+    """Tests for fetch_page function."""
+    
+    def test_reads_one_extra_document(self):
+        """Test that only per_page + 1 documents are requested."""
+        query = FakeQuery(list(range(50)))
+        docs, has_more = fetch_page(query, 10)
+        assert query.limit_value == 11
+        assert docs == list(range(10))
+        assert has_more is True
+    
+    def test_last_page(self):
+        """Test that has_more is False when the query is exhausted."""
+        docs, has_more = fetch_page(FakeQuery(list(range(10))), 10)
+        assert docs == list(range(10))
+        assert has_more is False
+    
+    def test_start_after(self):
+        """Test that the page continues after the cursor document."""
+        query = FakeQuery(list(range(25)))
+        docs, has_more = fetch_page(query, 10, start_after=19)
+        assert query.cursor == 19
+        assert docs == list(range(20, 25))
+        assert has_more is False
+
+
+class FakeSnapshot:
+    """Document snapshot stand-in."""
+    
+    def __init__(self, doc_id, exists=True):
+        self.id = doc_id
+        self.exists = exists
+
+
+class FakeRef:
+    """Document reference stand-in."""
+    
+    def __init__(self, doc_id):
+        self.id = doc_id
+        self.path = f"analyses/{doc_id}"
+
+
+class FakeDB:
+    """Records get_all calls; documents listed in missing do not exist."""
+    
+    def __init__(self, missing=()):
+        self.missing = set(missing)
+        self.calls = []
+    
+    def get_all(self, refs):
+        self.calls.append([ref.id for ref in refs])
+        return [FakeSnapshot(ref.id, ref.id not in self.missing) for ref in refs]
+
+
+class TestGetDocuments:
+    """Tests for get_documents function."""
+    
+    def test_chunked_batches(self):
+        """Test that references are fetched in get_all chunks, not one by one."""
+        db = FakeDB()
+        docs = get_documents(db, [FakeRef(str(i)) for i in range(5)], chunk_size=2)
+        assert db.calls == [['0', '1'], ['2', '3'], ['4']]
+        assert sorted(docs) == ['0', '1', '2', '3', '4']
+    
+    def test_duplicates_and_missing(self):
+        """Test that duplicates are fetched once and missing documents are dropped."""
+        db = FakeDB(missing={'b'})
+        docs = get_documents(db, [FakeRef('a'), FakeRef('b'), FakeRef('a')])
+        assert db.calls == [['a', 'b']]
+        assert list(docs) == ['a']
+    
+    def test_no_refs(self):
+        """Test that an empty list makes no requests."""
+        db = FakeDB()
+        assert get_documents(db, []) == {}
+        assert db.calls == []
@@ -0,0 +1,51 @@
+"""
+Unit tests for the Firestore-aware Flask JSON provider.
+"""
+
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+import pytest
+from flask import Flask, jsonify
+from google.cloud.firestore_v1 import GeoPoint
+from utils import json_provider
+from utils.json_provider import FirestoreJSONProvider
+
+
+@pytest.fixture(params=[True, False], ids=['orjson', 'stdlib'])
+def app(request, monkeypatch):
+    if request.param and not json_provider.ORJSON_AVAILABLE:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(json_provider, 'ORJSON_AVAILABLE', request.param)
+    app = Flask(__name__)
+    app.json = FirestoreJSONProvider(app)
+    return app
+
+
+class TestFirestoreJSONProvider:
+    """Tests for FirestoreJSONProvider."""
+    
+    def test_firestore_values(self, app):
+        """Test that timestamps, GeoPoints and nested lists are encoded."""
+        dt = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        with app.app_context():
+            response = jsonify({'items': [{'createdAt': dt, 'location': GeoPoint(1.5, 2.5)}], 'name': 'Çağrı'})
+        assert json.loads(response.get_data(as_text=True)) == {
+            'items': [{'createdAt': dt.timestamp(), 'location': {'latitude': 1.5, 'longitude': 2.5}}],
+            'name': 'Çağrı'
+        }
+    
+    def test_flask_defaults_kept(self, app):
+        """Test that types handled by Flask's default encoder still work."""
+        with app.app_context():
+            assert json.loads(app.json.dumps({'amount': Decimal('1.5')})) == {'amount': '1.5'}
+    
+    def test_sorted_keys(self, app):
+        """Test that sort_keys is honored like the default provider."""
+        with app.app_context():
+            assert app.json.dumps({'b': 1, 'a': 2}).replace(' ', '') == '{"a":2,"b":1}'
+    
+    def test_unknown_type_raises(self, app):
+        """Test that unsupported objects raise TypeError."""
+        with app.app_context(), pytest.raises(TypeError):
+            app.json.dumps({'x': object()})
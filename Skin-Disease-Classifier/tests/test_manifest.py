@@ -0,0 +1,78 @@
+"""
+Unit tests for export manifests.
+"""
+
+import json
+
+import pytest
+
+from inference.manifest import (
+    MANIFEST_VERSION, artifact_path, artifact_sha256, load_manifest, manifest_path,
+    output_key, select_output, serving_model_path
+)
+
+
+@pytest.fixture
+def models_dir(tmp_path):
+    """A models/ directory with a plain and an XLA SavedModel and a manifest."""
+    for name in ('m_savedmodel', 'm_xla_savedmodel'):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / 'saved_model.pb').write_bytes(name.encode())
+    manifest = {
+        'manifest_version': MANIFEST_VERSION,
+        'signature': {'output_key': 'probabilities'},
+        'artifacts': {
+            'savedmodel': {'path': 'm_savedmodel'},
+            'savedmodel_xla': {'path': 'm_xla_savedmodel'},
+            'tflite_int8': {'path': 'm_int8.tflite'},  # listed but not on disk
+        }
+    }
+    (tmp_path / 'skin_manifest.json').write_text(json.dumps(manifest))
+    return tmp_path
+
+
+class TestLoadManifest:
+    """Tests for load_manifest and artifact lookup."""
+
+    def test_missing_manifest(self, tmp_path):
+        """Test that a missing manifest is None and lookups fall through."""
+        manifest = load_manifest(manifest_path(str(tmp_path), 'skin'))
+        assert manifest is None
+        assert serving_model_path(manifest) is None
+        assert output_key(manifest) is None
+
+    def test_other_version_is_ignored(self, tmp_path):
+        """Test that manifests from another version are not used."""
+        (tmp_path / 'skin_manifest.json').write_text(json.dumps({'manifest_version': 999}))
+        assert load_manifest(manifest_path(str(tmp_path), 'skin')) is None
+
+    def test_artifact_paths_are_relative_to_manifest(self, models_dir):
+        """Test that artifact paths resolve next to the manifest."""
+        manifest = load_manifest(manifest_path(str(models_dir), 'skin'))
+        assert artifact_path(manifest, 'savedmodel') == str(models_dir / 'm_savedmodel')
+        assert artifact_path(manifest, 'tflite_int8') is None
+        assert artifact_path(manifest, 'onnx') is None
+        assert output_key(manifest) == 'probabilities'
+
+    def test_xla_selection(self, models_dir, monkeypatch):
+        """Test that SERVING_XLA picks the XLA SavedModel."""
+        manifest = load_manifest(manifest_path(str(models_dir), 'skin'))
+        monkeypatch.setenv('SERVING_XLA', 'true')
+        assert serving_model_path(manifest) == str(models_dir / 'm_xla_savedmodel')
+        assert serving_model_path(manifest, xla=False) == str(models_dir / 'm_savedmodel')
+
+
+class TestHelpers:
+    """Tests for artifact_sha256 and select_output."""
+
+    def test_directory_hash_follows_contents(self, models_dir):
+        """Test that a directory hash changes when a file changes."""
+        before = artifact_sha256(str(models_dir / 'm_savedmodel'))
+        (models_dir / 'm_savedmodel' / 'saved_model.pb').write_bytes(b'changed')
+        assert artifact_sha256(str(models_dir / 'm_savedmodel')) != before
+
+    def test_select_output(self):
+        """Test that the manifest key wins and single outputs still work."""
+        assert select_output({'a': 1, 'probabilities': 2}, 'probabilities') == 2
+        assert select_output({'output_0': 3}, 'probabilities') == 3
+        assert select_output({'output_0': 3}) == 3
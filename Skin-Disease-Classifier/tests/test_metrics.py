@@ -0,0 +1,60 @@
+"""
+Unit tests for the model-comparison metrics.
+"""
+
+import numpy as np
+import pytest
+
+from inference.metrics import confusion_matrix, macro_f1, parity_report, per_class_f1
+
+
+class TestF1:
+    """Tests for per_class_f1 and macro_f1."""
+
+    def test_confusion_matrix(self):
+        """Test that rows are true labels and columns are predictions."""
+        cm = confusion_matrix([0, 0, 1, 2], [0, 1, 1, 2], 3)
+        np.testing.assert_array_equal(cm, [[1, 1, 0], [0, 1, 0], [0, 0, 1]])
+
+    def test_matches_hand_computed_scores(self):
+        """Test per-class F1 against hand-computed values."""
+        f1 = per_class_f1([0, 0, 1, 2], [0, 1, 1, 2], 3)
+        np.testing.assert_allclose(f1, [2 / 3, 2 / 3, 1.0])
+        assert macro_f1([0, 0, 1, 2], [0, 1, 1, 2], 3) == pytest.approx(7 / 9)
+
+    def test_absent_class_scores_zero(self):
+        """Test that a class that never occurs and is never predicted scores 0."""
+        f1 = per_class_f1([0, 1], [0, 1], 3)
+        np.testing.assert_allclose(f1, [1.0, 1.0, 0.0])
+
+
+class TestParityReport:
+    """Tests for parity_report."""
+
+    def setup_method(self):
+        self.y_true = np.array([0, 1, 2, 0, 1, 2])
+        self.reference = np.eye(3)[self.y_true]
+
+    def test_identical_predictions_are_accepted(self):
+        """Test that a candidate matching the reference is accepted."""
+        report = parity_report(self.y_true, self.reference, self.reference, ['a', 'b', 'c'])
+        assert report['accepted'] is True
+        assert report['macro_f1']['drop'] == 0.0
+        assert report['top1_agreement'] == 1.0
+
+    def test_regression_is_rejected(self):
+        """Test that a macro F1 drop above the threshold is rejected."""
+        candidate = self.reference.copy()
+        candidate[0] = [0.0, 1.0, 0.0]  # one 'a' now predicted as 'b'
+        report = parity_report(self.y_true, self.reference, candidate, ['a', 'b', 'c'])
+        assert report['accepted'] is False
+        assert report['per_class_f1']['a']['drop'] > 0
+        assert report['per_class_f1']['c']['drop'] == 0.0
+
+    def test_thresholds_are_configurable(self):
+        """Test that a loose threshold accepts the same regression."""
+        candidate = self.reference.copy()
+        candidate[0] = [0.0, 1.0, 0.0]
+        report = parity_report(self.y_true, self.reference, candidate, ['a', 'b', 'c'],
+                               max_f1_drop=0.5, max_class_f1_drop=0.5)
+        assert report['accepted'] is True
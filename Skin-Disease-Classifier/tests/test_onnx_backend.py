@@ -0,0 +1,56 @@
+"""
+Unit tests for the ONNX Runtime backend helpers (no session needed).
+"""
+
+import json
+
+import pytest
+
+from inference.onnx_backend import load_onnx_backend, onnx_model_path, parity_verdict, session_settings
+
+
+class TestModelPath:
+    """Tests for onnx_model_path."""
+
+    @pytest.mark.parametrize('model_path', [
+        'models/bone_model_savedmodel',
+        'models/bone_model_savedmodel/',
+        'models/bone_model_xla_savedmodel',
+        'models/bone_model.keras',
+    ])
+    def test_maps_next_to_model(self, model_path):
+        """Test that SavedModel dirs and single files map to the same export."""
+        assert onnx_model_path(model_path) == 'models/bone_model.onnx'
+
+
+class TestSessionSettings:
+    """Tests for session_settings."""
+
+    def test_defaults(self, monkeypatch):
+        """Test the default thread and optimization settings."""
+        for name in ('ORT_INTRA_OP_THREADS', 'ORT_INTER_OP_THREADS', 'ORT_GRAPH_OPTIMIZATION'):
+            monkeypatch.delenv(name, raising=False)
+        assert session_settings() == {'intra_op_threads': 0, 'inter_op_threads': 1, 'graph_optimization': 'all'}
+
+    def test_invalid_optimization_level(self, monkeypatch):
+        """Test that an unknown optimization level is rejected."""
+        monkeypatch.setenv('ORT_GRAPH_OPTIMIZATION', 'turbo')
+        with pytest.raises(ValueError):
+            session_settings()
+
+
+class TestBackendSelection:
+    """Tests for the serving fallback."""
+
+    def test_backend_not_selected(self, monkeypatch):
+        """Test that nothing is loaded unless INFERENCE_BACKEND=onnx."""
+        monkeypatch.setenv('INFERENCE_BACKEND', 'tflite')
+        assert load_onnx_backend('models/m.keras') is None
+
+    def test_rejected_model_is_not_loaded(self, tmp_path, monkeypatch):
+        """Test that an export rejected by the parity check falls back to TensorFlow."""
+        (tmp_path / 'onnx_parity_report.json').write_text(json.dumps({'models': {'m.onnx': {'accepted': False}}}))
+        (tmp_path / 'm.onnx').write_bytes(b'')
+        monkeypatch.setenv('INFERENCE_BACKEND', 'onnx')
+        assert parity_verdict(str(tmp_path / 'm.onnx')) is False
+        assert load_onnx_backend(str(tmp_path / 'm_savedmodel')) is None
@@ -0,0 +1,179 @@
+"""
+Unit tests for the prediction cache.
+"""
+
+import os
+import time
+
+import numpy as np
+import pytest
+
+from inference.prediction_cache import PredictionCache, model_version
+
+
+class TestMakeKey:
+    """Tests for PredictionCache.make_key."""
+
+    def test_same_bytes_same_key(self):
+        """Test that identical uploads map to the same key."""
+        a = PredictionCache.make_key(b'image', 'skin', 'v1')
+        b = PredictionCache.make_key(b'image', 'skin', 'v1')
+        assert a == b
+
+    def test_key_depends_on_disease_and_version(self):
+        """Test that disease type and model version are part of the key."""
+        base = PredictionCache.make_key(b'image', 'skin', 'v1')
+        assert PredictionCache.make_key(b'image', 'bone', 'v1') != base
+        assert PredictionCache.make_key(b'image', 'skin', 'v2') != base
+        assert PredictionCache.make_key(b'other', 'skin', 'v1') != base
+
+
+class TestMemoryTier:
+    """Tests for the in-process LRU + TTL tier."""
+
+    def test_hit_and_miss_counters(self):
+        """Test that lookups update hit/miss counters."""
+        cache = PredictionCache(max_entries=4)
+        assert cache.get('k') is None
+        cache.put('k', [0.2, 0.8])
+        entry = cache.get('k')
+        assert entry is not None
+        np.testing.assert_allclose(entry.probabilities, [0.2, 0.8])
+        stats = cache.stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = PredictionCache(max_entries=2)
+        cache.put('a', [1.0])
+        cache.put('b', [1.0])
+        cache.get('a')  # 'b' is now least recently used
+        cache.put('c', [1.0])
+        assert cache.get('b') is None
+        assert cache.get('a') is not None
+        assert cache.stats()['evictions'] == 1
+
+    def test_ttl_expiry(self):
+        """Test that expired entries are dropped."""
+        cache = PredictionCache(max_entries=2, ttl_seconds=0.01)
+        cache.put('k', [1.0])
+        time.sleep(0.02)
+        assert cache.get('k') is None
+        assert cache.stats()['expirations'] == 1
+
+    def test_gradcam_is_kept_on_update(self):
+        """Test that re-putting probabilities keeps an existing Grad-CAM."""
+        cache = PredictionCache(max_entries=2)
+        cache.put('k', [1.0], gradcam=b'png')
+        cache.put('k', [1.0])
+        assert cache.get('k').gradcam == b'png'
+
+    def test_disabled_cache(self):
+        """Test that max_entries=0 disables the cache."""
+        cache = PredictionCache(max_entries=0)
+        cache.put('k', [1.0])
+        assert cache.get('k') is None
+        assert cache.stats()['enabled'] is False
+
+
+class TestDiskTier:
+    """Tests for the optional on-disk tier."""
+
+    def test_survives_new_instance(self, tmp_path):
+        """Test that entries written to disk are visible to a fresh cache."""
+        first = PredictionCache(max_entries=2, disk_dir=str(tmp_path))
+        first.put('k', [0.1, 0.9], gradcam=b'png')
+
+        second = PredictionCache(max_entries=2, disk_dir=str(tmp_path))
+        entry = second.get('k')
+        assert entry is not None
+        np.testing.assert_allclose(entry.probabilities, [0.1, 0.9])
+        assert entry.gradcam == b'png'
+        assert second.stats()['disk_hits'] == 1
+
+    def test_expired_disk_entry(self, tmp_path):
+        """Test that expired disk entries are removed."""
+        cache = PredictionCache(max_entries=2, ttl_seconds=60, disk_dir=str(tmp_path))
+        cache.put('k', [1.0])
+        old = time.time() - 120
+        os.utime(tmp_path / 'k.npy', (old, old))
+
+        fresh = PredictionCache(max_entries=2, ttl_seconds=60, disk_dir=str(tmp_path))
+        assert fresh.get('k') is None
+        assert not (tmp_path / 'k.npy').exists()
+
+    def test_size_cap_removes_oldest(self, tmp_path):
+        """Test that crossing disk_max_bytes sweeps the oldest entries first."""
+        gradcam = b'x' * 1000
+        cache = PredictionCache(max_entries=100, disk_dir=str(tmp_path), disk_max_bytes=5000)
+        for i in range(4):
+            cache.put(f'k{i}', [1.0], gradcam=gradcam)
+            old = time.time() - 100 + i
+            os.utime(tmp_path / f'k{i}.npy', (old, old))
+            os.utime(tmp_path / f'k{i}.png', (old, old))
+        cache.put('k4', [1.0], gradcam=gradcam)
+
+        remaining = sorted(path.name for path in tmp_path.iterdir())
+        assert 'k0.npy' not in remaining and 'k0.png' not in remaining
+        assert 'k4.npy' in remaining and 'k4.png' in remaining
+        stats = cache.stats()
+        assert stats['disk_removals'] >= 1
+        assert stats['disk_bytes'] == sum(path.stat().st_size for path in tmp_path.iterdir())
+        assert stats['disk_bytes'] <= 5000
+
+    def test_expired_entries_swept_on_write(self, tmp_path):
+        """Test that expired files are removed without their key being read again."""
+        cache = PredictionCache(max_entries=2, ttl_seconds=60, disk_dir=str(tmp_path))
+        cache.put('old', [1.0], gradcam=b'png')
+        old = time.time() - 120
+        for name in ('old.npy', 'old.png'):
+            os.utime(tmp_path / name, (old, old))
+        cache._last_sweep = old
+
+        cache.put('new', [1.0])
+        assert sorted(path.name for path in tmp_path.iterdir()) == ['new.npy']
+
+    def test_startup_sweep(self, tmp_path):
+        """Test that a new instance trims a directory left over the cap."""
+        first = PredictionCache(max_entries=10, disk_dir=str(tmp_path), disk_max_bytes=0)
+        for i in range(5):
+            first.put(f'k{i}', [1.0], gradcam=b'x' * 1000)
+        second = PredictionCache(max_entries=10, disk_dir=str(tmp_path), disk_max_bytes=2500)
+        assert second.stats()['disk_bytes'] <= 2000
+
+
+class TestModelVersion:
+    """Tests for model_version."""
+
+    def test_missing_path(self):
+        """Test that a missing model reports 'unknown'."""
+        assert model_version('does/not/exist') == 'unknown'
+
+    def test_savedmodel_fingerprint(self, tmp_path):
+        """Test that SavedModel versions follow fingerprint.pb contents."""
+        (tmp_path / 'fingerprint.pb').write_bytes(b'a')
+        first = model_version(str(tmp_path))
+        (tmp_path / 'fingerprint.pb').write_bytes(b'b')
+        assert model_version(str(tmp_path)) != first
+
+    def test_savedmodel_retrained_weights(self, tmp_path):
+        """Test that new weights with an unchanged graph change the version."""
+        (tmp_path / 'saved_model.pb').write_bytes(b'graph')
+        variables = tmp_path / 'variables'
+        variables.mkdir()
+        (variables / 'variables.index').write_bytes(b'index')
+        (variables / 'variables.data-00000-of-00001').write_bytes(b'old weights')
+        first = model_version(str(tmp_path))
+        assert model_version(str(tmp_path)) == first
+
+        (variables / 'variables.data-00000-of-00001').write_bytes(b'new weights')
+        assert model_version(str(tmp_path)) != first
+
+    @pytest.mark.parametrize('suffix', ['.keras', '.h5'])
+    def test_single_file_model(self, tmp_path, suffix):
+        """Test that single-file models get a stable version."""
+        path = tmp_path / f'model{suffix}'
+        path.write_bytes(b'weights')
+        assert model_version(str(path)) == model_version(str(path))
+        assert len(model_version(str(path))) == 12
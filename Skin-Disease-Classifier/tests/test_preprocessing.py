@@ -0,0 +1,180 @@
+"""
+Unit tests for the shared preprocessing pipelines.
+
+The expected values are computed the way the services did before
+(np.stack for grayscale, keras preprocess_input formulas).
+"""
+
+import io
+import threading
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from inference.preprocessing import (
+    CLAHE_AVAILABLE, IMAGENET_MEAN, IMAGENET_STD, PreprocessPool, Preprocessor, apply_clahe,
+    clahe_operator, is_grayscale
+)
+
+SIZE = (40, 32)  # (width, height)
+
+
+def reference(pixels, pipeline):
+    """Old per-service implementation on a resized uint8 (H, W, 3) array"""
+    x = pixels.astype(np.float32)
+    if pipeline == 'densenet_clahe':
+        return ((x / 255.0) - IMAGENET_MEAN) / IMAGENET_STD
+    if pipeline == 'rescale':
+        return x / 255.0
+    return x
+
+
+@pytest.fixture
+def rgb_image():
+    rng = np.random.default_rng(0)
+    return Image.fromarray(rng.integers(0, 256, (SIZE[1], SIZE[0], 3), dtype=np.uint8))
+
+
+@pytest.fixture
+def gray_pixels():
+    return np.random.default_rng(1).integers(0, 256, (SIZE[1], SIZE[0]), dtype=np.uint8)
+
+
+class TestIsGrayscale:
+    """Tests for is_grayscale."""
+
+    def test_single_channel(self, gray_pixels):
+        """Test that 2D and (H, W, 1) arrays are grayscale."""
+        assert is_grayscale(gray_pixels)
+        assert is_grayscale(gray_pixels[..., np.newaxis])
+
+    def test_equal_channels(self, gray_pixels):
+        """Test that RGB arrays with equal channels are grayscale."""
+        assert is_grayscale(np.repeat(gray_pixels[..., np.newaxis], 3, axis=-1))
+
+    def test_difference_outside_sample(self, gray_pixels):
+        """Test that a difference the strided sample misses is still found."""
+        pixels = np.repeat(gray_pixels[..., np.newaxis], 3, axis=-1)
+        pixels[1, 1, 2] ^= 1
+        assert not is_grayscale(pixels, stride=16)
+
+    def test_colour(self, rgb_image):
+        """Test that colour images are rejected."""
+        assert not is_grayscale(np.asarray(rgb_image))
+
+
+class TestPreprocessor:
+    """Tests for Preprocessor."""
+
+    def test_unknown_pipeline(self):
+        """Test that unknown pipelines are rejected."""
+        with pytest.raises(ValueError):
+            Preprocessor('simple', SIZE)
+
+    @pytest.mark.parametrize('pipeline', ['efficientnet', 'densenet_clahe', 'rescale'])
+    def test_matches_reference(self, pipeline, rgb_image):
+        """Test that colour images match the old implementation."""
+        out = Preprocessor(pipeline, SIZE)(rgb_image)
+        assert out.shape == (1, SIZE[1], SIZE[0], 3)
+        assert out.dtype == np.float32
+        np.testing.assert_allclose(out[0], reference(np.asarray(rgb_image), pipeline), rtol=1e-5, atol=1e-5)
+
+    def test_resizes_and_drops_alpha(self, rgb_image):
+        """Test that other sizes and RGBA are handled like resize + convert('RGB')."""
+        image = rgb_image.resize((64, 64)).convert('RGBA')
+        expected = reference(np.asarray(image.convert('RGB').resize(SIZE)), 'rescale')
+        np.testing.assert_allclose(Preprocessor('rescale', SIZE)(image)[0], expected, rtol=1e-6)
+
+    def test_grayscale_mode_matches_rgb(self, gray_pixels):
+        """Test that an 'L' image gives the same result as its RGB conversion."""
+        preprocessor = Preprocessor('densenet_clahe', SIZE)
+        gray = Image.fromarray(gray_pixels)
+        np.testing.assert_array_equal(preprocessor(gray), preprocessor(gray.convert('RGB')))
+
+    @pytest.mark.skipif(not CLAHE_AVAILABLE, reason="OpenCV not installed")
+    def test_clahe_on_grayscale_only(self, gray_pixels, rgb_image):
+        """Test that CLAHE is applied to grayscale X-rays and not to colour images."""
+        preprocessor = Preprocessor('densenet_clahe', SIZE)
+        enhanced = np.repeat(apply_clahe(gray_pixels)[..., np.newaxis], 3, axis=-1)
+        np.testing.assert_allclose(preprocessor(Image.fromarray(gray_pixels))[0],
+                                   reference(enhanced, 'densenet_clahe'), rtol=1e-5, atol=1e-5)
+        np.testing.assert_allclose(preprocessor(rgb_image)[0],
+                                   reference(np.asarray(rgb_image), 'densenet_clahe'), rtol=1e-5, atol=1e-5)
+
+    def test_clahe_disabled(self, gray_pixels):
+        """Test that clahe=False only normalizes."""
+        out = Preprocessor('densenet_clahe', SIZE, clahe=False)(Image.fromarray(gray_pixels))
+        expected = reference(np.repeat(gray_pixels[..., np.newaxis], 3, axis=-1), 'densenet_clahe')
+        np.testing.assert_allclose(out[0], expected, rtol=1e-5, atol=1e-5)
+
+    def test_writes_into_batch_slot(self, rgb_image):
+        """Test that out= fills a slot of a preallocated batch in place."""
+        preprocessor = Preprocessor('efficientnet', SIZE)
+        batch = preprocessor.new_batch(3)
+        result = preprocessor(rgb_image, out=batch[1])
+        assert np.shares_memory(result, batch)
+        np.testing.assert_array_equal(batch[1], np.asarray(rgb_image))
+
+    def test_batch(self, rgb_image, gray_pixels):
+        """Test that batch() stacks images in order and reuses a larger buffer."""
+        preprocessor = Preprocessor('rescale', SIZE)
+        images = [rgb_image, Image.fromarray(gray_pixels)]
+        buffer = preprocessor.new_batch(4)
+        out = preprocessor.batch(images, out=buffer)
+        assert out.shape == (2, SIZE[1], SIZE[0], 3)
+        assert np.shares_memory(out, buffer)
+        for i, image in enumerate(images):
+            np.testing.assert_array_equal(out[i], preprocessor(image)[0])
+
+
+@pytest.mark.skipif(not CLAHE_AVAILABLE, reason="OpenCV not installed")
+class TestClaheOperator:
+    """Tests for clahe_operator."""
+
+    def test_reused_within_thread(self):
+        """Test that the operator is created once per thread."""
+        assert clahe_operator() is clahe_operator()
+
+    def test_separate_per_thread(self):
+        """Test that other threads get their own operator."""
+        other = []
+        thread = threading.Thread(target=lambda: other.append(clahe_operator()))
+        thread.start()
+        thread.join()
+        assert other[0] is not clahe_operator()
+
+
+class TestPreprocessPool:
+    """Tests for PreprocessPool."""
+
+    def test_from_env(self, monkeypatch):
+        """Test that PREPROCESS_WORKERS/PREPROCESS_POOL configure the pool."""
+        monkeypatch.setenv('PREPROCESS_WORKERS', '2')
+        pool = PreprocessPool.from_env()
+        try:
+            assert pool.stats() == {"workers": 2, "kind": "thread"}
+        finally:
+            pool.shutdown()
+        monkeypatch.delenv('PREPROCESS_WORKERS')
+        assert PreprocessPool.from_env().stats() == {"workers": 0, "kind": "inline"}
+
+    def test_unknown_kind(self):
+        """Test that unknown pool kinds are rejected."""
+        with pytest.raises(ValueError):
+            PreprocessPool(workers=1, kind='gpu')
+
+    @pytest.mark.parametrize('workers', [0, 2])
+    def test_matches_inline(self, workers, gray_pixels):
+        """Test that pooled results (from PIL images or upload bytes) match inline ones."""
+        preprocessor = Preprocessor('densenet_clahe', SIZE)
+        image = Image.fromarray(gray_pixels)
+        encoded = io.BytesIO()
+        image.save(encoded, format='PNG')
+
+        pool = PreprocessPool(workers=workers)
+        try:
+            np.testing.assert_array_equal(pool.run(preprocessor, image), preprocessor(image))
+            np.testing.assert_array_equal(pool.run(preprocessor, encoded.getvalue()), preprocessor(image))
+        finally:
+            pool.shutdown()
@@ -0,0 +1,147 @@
+"""
+Unit tests for the per-user response cache.
+"""
+
+import time
+from utils.response_cache import MemoryStore, ResponseCache
+
+
+class FailingStore:
+    """Store whose server is unreachable."""
+    
+    def get(self, key):
+        raise ConnectionError("down")
+    
+    def set(self, key, value, ttl_seconds=None):
+        raise ConnectionError("down")
+    
+    def delete(self, key):
+        raise ConnectionError("down")
+
+
+class TestMemoryStore:
+    """Tests for the in-process LRU store."""
+    
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        store = MemoryStore(max_entries=2)
+        store.set('a', 1)
+        store.set('b', 2)
+        store.get('a')
+        store.set('c', 3)
+        assert store.get('a') == 1
+        assert store.get('b') is None
+        assert store.evictions == 1
+    
+    def test_ttl(self):
+        """Test that expired entries are not returned."""
+        store = MemoryStore()
+        store.set('a', 1, ttl_seconds=0.01)
+        time.sleep(0.02)
+        assert store.get('a') is None
+    
+    def test_add_only_if_missing(self):
+        """Test that add() does not overwrite a live entry but replaces an expired one."""
+        store = MemoryStore()
+        assert store.add('a', 1)
+        assert not store.add('a', 2)
+        assert store.get('a') == 1
+        store.set('b', 1, ttl_seconds=0.01)
+        time.sleep(0.02)
+        assert store.add('b', 2)
+        assert store.get('b') == 2
+
+
+class TestResponseCache:
+    """Tests for ResponseCache keying and invalidation."""
+    
+    def test_keyed_by_owner_and_params(self):
+        """Test that users and query parameters never share entries."""
+        cache = ResponseCache(MemoryStore())
+        cache.set('uid-1', 'analyses', {'count': 1}, {'limit': '20'})
+        assert cache.get('uid-1', 'analyses', {'limit': '20'}) == {'count': 1}
+        assert cache.get('uid-2', 'analyses', {'limit': '20'}) is None
+        assert cache.get('uid-1', 'analyses', {'limit': '50'}) is None
+    
+    def test_invalidate(self):
+        """Test that invalidation drops every param variant of the scope only."""
+        cache = ResponseCache(MemoryStore())
+        cache.set('uid-1', 'analyses', {'page': 1})
+        cache.set('uid-1', 'analyses', {'page': 1}, {'diseaseType': 'skin'})
+        cache.set('uid-1', 'profile', {'name': 'x'})
+        cache.invalidate('uid-1', 'analyses')
+        assert cache.get('uid-1', 'analyses') is None
+        assert cache.get('uid-1', 'analyses', {'diseaseType': 'skin'}) is None
+        assert cache.get('uid-1', 'profile') == {'name': 'x'}
+        assert cache.stats()['invalidations'] == 1
+    
+    def test_evicted_generation_orphans_entries(self):
+        """Test that losing the generation token never serves old entries."""
+        store = MemoryStore()
+        cache = ResponseCache(store)
+        cache.set('uid-1', 'stats', {'total': 1})
+        store.delete(cache._generation_key('uid-1', 'stats'))
+        assert cache.get('uid-1', 'stats') is None
+    
+    def test_invalidation_during_read_is_not_cached(self):
+        """Test that a response read before an invalidation is not stored under the new generation."""
+        cache = ResponseCache(MemoryStore())
+        cache.set('uid-1', 'stats', {'total': 1})
+        cache.invalidate('uid-1', 'stats')
+        
+        value, generation = cache.lookup('uid-1', 'stats')
+        assert value is None
+        stale = {'total': 1}               # Firestore read ...
+        cache.invalidate('uid-1', 'stats')  # ... a write lands before set()
+        cache.set('uid-1', 'stats', stale, generation=generation)
+        assert cache.get('uid-1', 'stats') is None
+        
+        value, generation = cache.lookup('uid-1', 'stats')
+        cache.set('uid-1', 'stats', {'total': 2}, generation=generation)
+        assert cache.get('uid-1', 'stats') == {'total': 2}
+    
+    def test_invalidation_during_first_read_is_not_cached(self):
+        """Test the same race when the owner had no generation yet."""
+        cache = ResponseCache(MemoryStore())
+        value, generation = cache.lookup('uid-1', 'profile')
+        assert value is None and generation
+        cache.invalidate('uid-1', 'profile')
+        cache.set('uid-1', 'profile', {'name': 'old'}, generation=generation)
+        assert cache.get('uid-1', 'profile') is None
+    
+    def test_lookup_does_not_write(self):
+        """Test that misses for unknown owners (e.g. random share tokens) leave the store empty."""
+        store = MemoryStore()
+        cache = ResponseCache(store)
+        for i in range(100):
+            assert cache.lookup(f"share:random-{i}", 'shared')[0] is None
+        assert len(store) == 0
+        
+        value, generation = cache.lookup('share:valid', 'shared')
+        cache.set('share:valid', 'shared', {'payload': 1}, generation=generation)
+        assert cache.get('share:valid', 'shared') == {'payload': 1}
+        assert len(store) == 2
+    
+    def test_disabled(self):
+        """Test that a zero-size store disables caching."""
+        cache = ResponseCache(MemoryStore(max_entries=0))
+        cache.set('uid-1', 'stats', {'total': 1})
+        assert not cache.enabled
+        assert cache.get('uid-1', 'stats') is None
+    
+    def test_store_errors_are_misses(self):
+        """Test that store failures do not raise."""
+        cache = ResponseCache(FailingStore())
+        cache.set('uid-1', 'stats', {'total': 1})
+        cache.invalidate('uid-1', 'stats')
+        assert cache.get('uid-1', 'stats') is None
+        assert cache.stats()['errors'] == 3
+    
+    def test_from_env(self, monkeypatch):
+        """Test environment configuration of the memory backend."""
+        monkeypatch.setenv('RESPONSE_CACHE_SIZE', '16')
+        monkeypatch.setenv('RESPONSE_CACHE_TTL', '60')
+        cache = ResponseCache.from_env()
+        assert isinstance(cache.store, MemoryStore)
+        assert cache.store.max_entries == 16
+        assert cache.ttl_seconds == 60
@@ -0,0 +1,148 @@
+"""
+Unit tests for public analysis share links.
+"""
+
+from datetime import datetime, timedelta, timezone
+from utils.sharing import (
+    share_snapshot, public_analysis, share_etag, cache_max_age, expiry_timestamp, migrate_shared_links
+)
+
+
+class FakeSnapshot:
+    def __init__(self, doc_id, data, reference=None):
+        self.id = doc_id
+        self.exists = data is not None
+        self.reference = reference or doc_id
+        self._data = data
+    
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+
+class FakeBatch:
+    def __init__(self, log):
+        self.log = log
+    
+    def set(self, ref, data):
+        self.log.append(('set', ref, data))
+    
+    def delete(self, ref):
+        self.log.append(('delete', ref))
+    
+    def commit(self):
+        self.log.append(('commit',))
+
+
+class FakeCollection:
+    def __init__(self, name, docs):
+        self.name = name
+        self.docs = docs
+    
+    def stream(self):
+        return [FakeSnapshot(doc_id, data, f"{self.name}/{doc_id}") for doc_id, data in self.docs.items()]
+    
+    def document(self, doc_id):
+        return FakeDocument(self.name, doc_id, self.docs.get(doc_id))
+
+
+class FakeDocument:
+    def __init__(self, collection, doc_id, data):
+        self.path = f"{collection}/{doc_id}"
+        self.doc_id = doc_id
+        self.data = data
+    
+    def get(self):
+        return FakeSnapshot(self.doc_id, self.data, self.path)
+    
+    def __eq__(self, other):
+        return self.path == other
+
+
+class FakeDB:
+    def __init__(self, collections):
+        self.collections = collections
+        self.log = []
+    
+    def collection(self, name):
+        return FakeCollection(name, self.collections.setdefault(name, {}))
+    
+    def batch(self):
+        return FakeBatch(self.log)
+
+
+class TestSnapshot:
+    """Tests for share_snapshot and public_analysis."""
+    
+    def test_private_fields_removed(self):
+        """Test that the owner uid is not embedded in the share."""
+        snapshot = share_snapshot({'userId': 'u1', 'diseaseType': 'skin', 'topPrediction': 'nv'})
+        assert snapshot == {'diseaseType': 'skin', 'topPrediction': 'nv'}
+    
+    def test_created_at_serialized(self):
+        """Test that createdAt becomes a Unix timestamp."""
+        created = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        analysis = public_analysis({'createdAt': created, 'diseaseType': 'skin'})
+        assert analysis == {'createdAt': created.timestamp(), 'diseaseType': 'skin'}
+
+
+class TestExpiry:
+    """Tests for expiry_timestamp and cache_max_age."""
+    
+    def test_naive_datetime_is_utc(self):
+        """Test that naive (utcnow) and aware datetimes give the same timestamp."""
+        naive = datetime(2025, 6, 1, 12, 0)
+        assert expiry_timestamp(naive) == expiry_timestamp(naive.replace(tzinfo=timezone.utc))
+        assert expiry_timestamp(None) is None
+    
+    def test_max_age_capped(self):
+        """Test that max-age is the cap when expiry is far away."""
+        assert cache_max_age(10_000, 3600, now=0) == 3600
+        assert cache_max_age(None, 3600, now=0) == 3600
+    
+    def test_max_age_never_past_expiry(self):
+        """Test that max-age stops at expiresAt."""
+        assert cache_max_age(100, 3600, now=0) == 100
+        assert cache_max_age(100, 3600, now=200) == 0
+
+
+class TestEtag:
+    """Tests for share_etag."""
+    
+    def test_stable_and_content_dependent(self):
+        """Test that the ETag ignores key order but changes with the content."""
+        assert share_etag({'a': 1, 'b': 2}) == share_etag({'b': 2, 'a': 1})
+        assert share_etag({'a': 1}) != share_etag({'a': 2})
+        assert '"' not in share_etag({'a': 1})
+
+
+class TestMigration:
+    """Tests for migrate_shared_links."""
+    
+    def test_legacy_share_rekeyed(self):
+        """Test that a random-ID share moves to shared/{token} with a snapshot."""
+        expires = datetime.now(timezone.utc) + timedelta(days=1)
+        db = FakeDB({
+            'shared': {
+                'random-id': {'userId': 'u1', 'analysisId': 'a1', 'shareToken': 'tok', 'expiresAt': expires},
+                'tok2': {'shareToken': 'tok2', 'analysis': {}},
+            },
+            'analyses': {'a1': {'userId': 'u1', 'diseaseType': 'skin'}},
+        })
+        assert migrate_shared_links(db) == {'migrated': 1, 'skipped': 0}
+        op, ref, data = db.log[0]
+        assert op == 'set' and ref == 'shared/tok'
+        assert data['analysis'] == {'diseaseType': 'skin'}
+        assert db.log[1] == ('delete', 'shared/random-id')
+        assert db.log[-1] == ('commit',)
+    
+    def test_deleted_analysis_skipped(self):
+        """Test that shares of deleted analyses are left alone."""
+        db = FakeDB({'shared': {'random-id': {'analysisId': 'gone', 'shareToken': 'tok'}}})
+        assert migrate_shared_links(db) == {'migrated': 0, 'skipped': 1}
+        assert db.log == []
+    
+    def test_dry_run(self):
+        """Test that dry runs only count."""
+        db = FakeDB({'shared': {'random-id': {'analysisId': 'a1', 'shareToken': 'tok'}}})
+        assert migrate_shared_links(db, dry_run=True) == {'migrated': 1, 'skipped': 0}
+        assert db.log == []
@@ -0,0 +1,68 @@
+"""
+Unit tests for huggingface-space/vendor_inference.py: the Space's copies of
+the inference modules come from inference/ and must not drift.
+"""
+
+import ast
+import importlib.util
+import os
+
+import pytest
+
+SPACE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'huggingface-space')
+INFERENCE_DIR = os.path.join(os.path.dirname(__file__), '..', 'inference')
+
+spec = importlib.util.spec_from_file_location('vendor_inference', os.path.join(SPACE_DIR, 'vendor_inference.py'))
+vendor_inference = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(vendor_inference)
+
+
+def imported_modules(path):
+    """Top-level module names a file imports (absolute imports only)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            names.add(node.module.split('.')[0])
+    return names
+
+
+class TestVendoring:
+    """Tests for vendor / stale_modules"""
+
+    def test_vendor_copies_identical_files(self, tmp_path):
+        copied = vendor_inference.vendor(INFERENCE_DIR, str(tmp_path))
+        assert copied == list(vendor_inference.VENDORED_MODULES)
+        assert vendor_inference.stale_modules(INFERENCE_DIR, str(tmp_path)) == []
+        assert vendor_inference.vendor(INFERENCE_DIR, str(tmp_path)) == []
+
+    def test_stale_copy_is_detected(self, tmp_path):
+        vendor_inference.vendor(INFERENCE_DIR, str(tmp_path))
+        with open(tmp_path / 'warmup.py', 'a', encoding='utf-8') as f:
+            f.write('\n# local edit\n')
+        assert vendor_inference.stale_modules(INFERENCE_DIR, str(tmp_path)) == ['warmup.py']
+
+    @pytest.mark.parametrize('name', vendor_inference.VENDORED_MODULES)
+    def test_existing_space_copy_is_current(self, name):
+        """Copies already vendored into the Space checkout match inference/."""
+        path = os.path.join(SPACE_DIR, name)
+        if not os.path.exists(path):
+            pytest.skip(f"{name} not vendored in this checkout")
+        assert name not in vendor_inference.stale_modules()
+
+    @pytest.mark.parametrize('name', vendor_inference.VENDORED_MODULES)
+    def test_vendored_modules_have_no_relative_imports(self, name):
+        with open(os.path.join(INFERENCE_DIR, name), 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read())
+        assert not [node for node in ast.walk(tree) if isinstance(node, ast.ImportFrom) and node.level]
+
+    def test_space_imports_are_vendored(self):
+        """Every inference module the Space imports is in VENDORED_MODULES."""
+        inference_modules = {name[:-3] for name in os.listdir(INFERENCE_DIR) if name.endswith('.py')}
+        vendored = {name[:-3] for name in vendor_inference.VENDORED_MODULES}
+        for name in ('app.py', 'upload_models.py'):
+            missing = (imported_modules(os.path.join(SPACE_DIR, name)) & inference_modules) - vendored
+            assert not missing, f"{name} imports unvendored {missing}"
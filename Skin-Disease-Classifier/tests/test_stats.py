@@ -0,0 +1,190 @@
+"""
+Unit tests for the per-user statistics aggregate.
+"""
+
+from datetime import datetime
+from firebase_admin import firestore
+from utils.stats import (
+    USER_STATS_COLLECTION, compute_user_stats, ensure_user_stats, needs_rebuild, stats_summary, stats_update
+)
+
+
+def merge_fields(target, update):
+    """Apply set(..., merge=True) fields, resolving Increment like Firestore."""
+    for key, value in update.items():
+        if isinstance(value, dict):
+            merge_fields(target.setdefault(key, {}), value)
+        elif isinstance(value, firestore.Increment):
+            target[key] = target.get(key, 0) + value.value
+        else:
+            target[key] = value
+
+
+class FakeSnapshot:
+    def __init__(self, data):
+        self.exists = data is not None
+        self._data = data
+    
+    def to_dict(self):
+        return dict(self._data)
+
+
+class FakeDocument:
+    def __init__(self, docs, doc_id):
+        self.docs = docs
+        self.doc_id = doc_id
+    
+    def get(self):
+        return FakeSnapshot(self.docs.get(self.doc_id))
+    
+    def set(self, data, merge=False):
+        if merge:
+            merge_fields(self.docs.setdefault(self.doc_id, {}), data)
+        else:
+            self.docs[self.doc_id] = dict(data)
+
+
+class FakeQuery:
+    def __init__(self, docs, field=None, value=None):
+        self.docs = docs
+        self.field = field
+        self.value = value
+    
+    def where(self, field, op, value):
+        return FakeQuery(self.docs, field, value)
+    
+    def stream(self):
+        return [FakeSnapshot(data) for data in self.docs.values()
+                if self.field is None or data.get(self.field) == self.value]
+    
+    def document(self, doc_id):
+        return FakeDocument(self.docs, doc_id)
+
+
+class FakeBatch:
+    def __init__(self):
+        self.writes = []
+    
+    def set(self, ref, data, merge=False):
+        self.writes.append((ref, data, merge))
+    
+    def commit(self):
+        for ref, data, merge in self.writes:
+            ref.set(data, merge=merge)
+
+
+class FakeDB:
+    def __init__(self, collections):
+        self.collections = collections
+    
+    def collection(self, name):
+        return FakeQuery(self.collections.setdefault(name, {}))
+    
+    def batch(self):
+        return FakeBatch()
+
+
+class TestStatsUpdate:
+    """Tests for stats_update function."""
+    
+    def test_increment_on_save(self):
+        """Test that saving an analysis increments counts and sets the last date."""
+        update = stats_update('skin')
+        assert isinstance(update['totalAnalyses'], firestore.Increment)
+        assert set(update['diseaseTypeCounts']) == {'skin'}
+        assert 'lastAnalysisAt' in update
+    
+    def test_decrement_keeps_last_date(self):
+        """Test that removing an analysis does not touch lastAnalysisAt."""
+        update = stats_update('bone', delta=-1)
+        assert isinstance(update['diseaseTypeCounts']['bone'], firestore.Increment)
+        assert 'lastAnalysisAt' not in update
+
+
+class TestComputeUserStats:
+    """Tests for compute_user_stats function."""
+    
+    def test_counts_and_last_date(self):
+        """Test totals, per-disease counts and the latest createdAt."""
+        newest = datetime(2024, 3, 1)
+        stats = compute_user_stats([
+            {'diseaseType': 'skin', 'createdAt': datetime(2024, 1, 1)},
+            {'diseaseType': 'skin', 'createdAt': newest},
+            {'diseaseType': 'eye', 'createdAt': datetime(2024, 2, 1)},
+            {'diseaseType': 'bone'},
+        ])
+        assert stats['totalAnalyses'] == 4
+        assert stats['diseaseTypeCounts'] == {'skin': 2, 'eye': 1, 'bone': 1}
+        assert stats['lastAnalysisAt'] == newest
+    
+    def test_no_analyses(self):
+        """Test that a user without analyses gets an empty aggregate."""
+        assert compute_user_stats([]) == {
+            'totalAnalyses': 0,
+            'diseaseTypeCounts': {},
+            'lastAnalysisAt': None
+        }
+
+
+class TestStatsSummary:
+    """Tests for stats_summary function."""
+    
+    def test_summary(self):
+        """Test that the response fills missing disease types and picks the most analyzed."""
+        summary = stats_summary({
+            'totalAnalyses': 3,
+            'diseaseTypeCounts': {'lung': 2, 'skin': 1},
+            'lastAnalysisAt': datetime(2024, 1, 1)
+        })
+        assert summary['totalAnalyses'] == 3
+        assert summary['diseaseTypeCounts'] == {'bone': 0, 'eye': 0, 'lung': 2, 'skin': 1}
+        assert summary['mostAnalyzedDisease'] == 'lung'
+        assert isinstance(summary['lastAnalysisDate'], float)
+    
+    def test_missing_document(self):
+        """Test that a missing stats document reads as zero analyses."""
+        summary = stats_summary(None)
+        assert summary['totalAnalyses'] == 0
+        assert summary['mostAnalyzedDisease'] is None
+        assert summary['lastAnalysisDate'] is None
+
+
+class TestEnsureUserStats:
+    """Tests for ensure_user_stats / needs_rebuild (backfill before the first increment)."""
+    
+    def save_analysis(self, db, uid, analysis_id, disease_type):
+        """What save_analysis() does: backfill, then analysis + increment in one batch."""
+        ensure_user_stats(db, uid)
+        batch = db.batch()
+        batch.set(db.collection('analyses').document(analysis_id), {'userId': uid, 'diseaseType': disease_type})
+        batch.set(db.collection(USER_STATS_COLLECTION).document(uid), stats_update(disease_type), merge=True)
+        batch.commit()
+    
+    def test_needs_rebuild(self):
+        """Test that missing and increment-only documents need a rebuild."""
+        assert needs_rebuild(None)
+        assert needs_rebuild({'totalAnalyses': 1})
+        assert not needs_rebuild({'totalAnalyses': 1, 'rebuilt': True})
+    
+    def test_first_save_after_deploy(self):
+        """Test that a user with existing analyses keeps their history on the first save."""
+        analyses = {f'a{i}': {'userId': 'u1', 'diseaseType': 'skin'} for i in range(40)}
+        analyses['other'] = {'userId': 'u2', 'diseaseType': 'bone'}
+        db = FakeDB({'analyses': analyses})
+        
+        self.save_analysis(db, 'u1', 'new', 'lung')
+        stats = db.collections[USER_STATS_COLLECTION]['u1']
+        assert stats['totalAnalyses'] == 41
+        assert stats['diseaseTypeCounts'] == {'skin': 40, 'lung': 1}
+        
+        # Later saves only increment
+        self.save_analysis(db, 'u1', 'newer', 'lung')
+        assert db.collections[USER_STATS_COLLECTION]['u1']['totalAnalyses'] == 42
+        assert stats_summary(ensure_user_stats(db, 'u1'))['totalAnalyses'] == 42
+    
+    def test_increment_only_document_is_repaired(self):
+        """Test that a delta-only document written before the fix is rebuilt on read."""
+        analyses = {f'a{i}': {'userId': 'u1', 'diseaseType': 'eye'} for i in range(5)}
+        db = FakeDB({'analyses': analyses, USER_STATS_COLLECTION: {'u1': {'totalAnalyses': 1}}})
+        assert ensure_user_stats(db, 'u1')['totalAnalyses'] == 5
+        assert db.collections[USER_STATS_COLLECTION]['u1']['rebuilt'] is True
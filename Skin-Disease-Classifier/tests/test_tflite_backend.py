@@ -0,0 +1,83 @@
+"""
+Unit tests for the TFLite backend helpers (no interpreter needed).
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from inference.tflite_backend import (
+    dequantize_output, load_tflite_backend, parity_verdict, quantize_input, tflite_model_path
+)
+
+
+class TestModelPath:
+    """Tests for tflite_model_path."""
+
+    @pytest.mark.parametrize('model_path', [
+        'models/skin_model_savedmodel',
+        'models/skin_model_savedmodel/',
+        'models/skin_model_xla_savedmodel',
+        'models/skin_model.keras',
+    ])
+    def test_maps_next_to_model(self, model_path):
+        """Test that SavedModel dirs and single files map to the same export."""
+        assert tflite_model_path(model_path, 'int8') == 'models/skin_model_int8.tflite'
+
+
+class TestQuantization:
+    """Tests for quantize_input/dequantize_output."""
+
+    def test_float_passthrough(self):
+        """Test that float tensors are not quantized."""
+        details = {'dtype': np.float32, 'quantization': (0.0, 0)}
+        images = np.array([[1.5, -2.0]], dtype=np.float64)
+        out = quantize_input(images, details)
+        assert out.dtype == np.float32
+        np.testing.assert_allclose(out, images)
+
+    def test_int8_round_trip(self):
+        """Test that quantize + dequantize stays within half a step."""
+        details = {'dtype': np.int8, 'quantization': (0.05, -3)}
+        values = np.linspace(-6.0, 6.0, 25, dtype=np.float32)
+        quantized = quantize_input(values, details)
+        assert quantized.dtype == np.int8
+        restored = dequantize_output(quantized, details)
+        np.testing.assert_allclose(restored, values, atol=0.025 + 1e-6)
+
+    def test_int8_saturates(self):
+        """Test that out-of-range inputs clip to the dtype limits."""
+        details = {'dtype': np.int8, 'quantization': (0.01, 0)}
+        quantized = quantize_input(np.array([100.0, -100.0]), details)
+        np.testing.assert_array_equal(quantized, [127, -128])
+
+
+class TestParityVerdict:
+    """Tests for parity_verdict and the serving fallback."""
+
+    def write_report(self, tmp_path, accepted):
+        report = {'models': {'m_int8.tflite': {'accepted': accepted}}}
+        (tmp_path / 'tflite_parity_report.json').write_text(json.dumps(report))
+
+    def test_missing_report(self, tmp_path):
+        """Test that models without a report entry are unverified (None)."""
+        assert parity_verdict(str(tmp_path / 'm_int8.tflite')) is None
+
+    @pytest.mark.parametrize('accepted', [True, False])
+    def test_report_entry(self, tmp_path, accepted):
+        """Test that the report verdict is returned."""
+        self.write_report(tmp_path, accepted)
+        assert parity_verdict(str(tmp_path / 'm_int8.tflite')) is accepted
+
+    def test_rejected_model_is_not_loaded(self, tmp_path, monkeypatch):
+        """Test that a rejected export falls back to TensorFlow."""
+        self.write_report(tmp_path, False)
+        (tmp_path / 'm_int8.tflite').write_bytes(b'')
+        monkeypatch.setenv('INFERENCE_BACKEND', 'tflite')
+        assert load_tflite_backend(str(tmp_path / 'm.keras'), precision='int8') is None
+
+    def test_backend_not_selected(self, monkeypatch):
+        """Test that nothing is loaded unless INFERENCE_BACKEND=tflite."""
+        monkeypatch.delenv('INFERENCE_BACKEND', raising=False)
+        assert load_tflite_backend('models/m.keras') is None
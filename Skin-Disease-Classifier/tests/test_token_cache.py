@@ -0,0 +1,99 @@
+"""
+Unit tests for the verified-token cache and lastLogin throttle.
+"""
+
+import time
+import pytest
+from utils.token_cache import TokenCache, LastLoginThrottle
+
+
+class FakeVerifier:
+    """verify_id_token stand-in that counts calls."""
+    
+    def __init__(self, lifetime=3600, error=None):
+        self.lifetime = lifetime
+        self.error = error
+        self.calls = []
+    
+    def __call__(self, token, check_revoked=False):
+        self.calls.append((token, check_revoked))
+        if self.error:
+            raise self.error
+        return {'uid': f"uid-{token}", 'exp': time.time() + self.lifetime}
+
+
+class TestTokenCache:
+    """Tests for TokenCache."""
+    
+    def test_reuses_verification(self):
+        """Test that a token is verified once while it is valid."""
+        cache = TokenCache()
+        verifier = FakeVerifier()
+        assert cache.verify('a', verifier)['uid'] == 'uid-a'
+        assert cache.verify('a', verifier)['uid'] == 'uid-a'
+        assert len(verifier.calls) == 1
+        assert cache.stats()['hits'] == 1
+    
+    def test_expires_at_token_exp(self):
+        """Test that a token is not served from cache past its exp."""
+        cache = TokenCache()
+        verifier = FakeVerifier(lifetime=0.01)
+        cache.verify('a', verifier)
+        time.sleep(0.02)
+        cache.verify('a', verifier)
+        assert len(verifier.calls) == 2
+    
+    def test_max_age(self):
+        """Test that max_age forces re-verification (revocation policy)."""
+        cache = TokenCache(max_age_seconds=0.01, check_revoked=True)
+        verifier = FakeVerifier()
+        cache.verify('a', verifier)
+        time.sleep(0.02)
+        cache.verify('a', verifier)
+        assert verifier.calls == [('a', True), ('a', True)]
+    
+    def test_failures_not_cached(self):
+        """Test that failed verifications raise and are retried."""
+        cache = TokenCache()
+        verifier = FakeVerifier(error=ValueError("bad token"))
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                cache.verify('a', verifier)
+        assert len(verifier.calls) == 2
+    
+    def test_bounded(self):
+        """Test LRU eviction and forget_user."""
+        cache = TokenCache(max_entries=2)
+        verifier = FakeVerifier()
+        for token in ('a', 'b', 'c'):
+            cache.verify(token, verifier)
+        assert cache.stats()['size'] == 2
+        assert cache.stats()['evictions'] == 1
+        cache.forget_user('uid-c')
+        cache.verify('c', verifier)
+        assert len(verifier.calls) == 4
+    
+    def test_disabled(self):
+        """Test that a zero-size cache verifies every time."""
+        cache = TokenCache(max_entries=0)
+        verifier = FakeVerifier()
+        cache.verify('a', verifier)
+        cache.verify('a', verifier)
+        assert len(verifier.calls) == 2
+
+
+class TestLastLoginThrottle:
+    """Tests for LastLoginThrottle."""
+    
+    def test_once_per_interval(self):
+        """Test that writes are coalesced per user."""
+        throttle = LastLoginThrottle(interval_seconds=60)
+        assert throttle.should_write('u1') is True
+        assert throttle.should_write('u1') is False
+        assert throttle.should_write('u2') is True
+    
+    def test_zero_interval(self):
+        """Test that interval 0 writes on every call."""
+        throttle = LastLoginThrottle(interval_seconds=0)
+        assert throttle.should_write('u1') is True
+        assert throttle.should_write('u1') is True
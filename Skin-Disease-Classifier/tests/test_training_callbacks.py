@@ -0,0 +1,59 @@
+"""
+Unit tests for the validation macro-F1 callback helpers (no TensorFlow needed).
+"""
+
+import numpy as np
+import pytest
+
+from inference.metrics import classification_scores
+from training.callbacks import format_report, should_evaluate, validation_report
+
+
+class TestShouldEvaluate:
+    """Tests for should_evaluate"""
+
+    def test_every_epoch(self):
+        assert all(should_evaluate(epoch, 1) for epoch in range(5))
+
+    def test_every_n_epochs_and_last(self):
+        assert [epoch for epoch in range(7) if should_evaluate(epoch, 3, epochs=7)] == [2, 5, 6]
+
+    def test_invalid_every_falls_back_to_one(self):
+        assert should_evaluate(0, 0)
+
+
+class TestValidationReport:
+    """Tests for validation_report / classification_scores"""
+
+    def test_matches_sklearn(self):
+        sklearn_metrics = pytest.importorskip('sklearn.metrics')
+        rng = np.random.default_rng(0)
+        y_true = rng.integers(0, 4, 200)
+        probs = rng.random((200, 4))
+        y_pred = probs.argmax(axis=1)
+
+        report = validation_report(y_true, probs, 4)
+        precision, recall, f1, support = sklearn_metrics.precision_recall_fscore_support(
+            y_true, y_pred, labels=range(4), zero_division=0)
+        assert report['macro_f1'] == pytest.approx(
+            sklearn_metrics.f1_score(y_true, y_pred, average='macro', zero_division=0))
+        np.testing.assert_allclose(report['precision'], precision)
+        np.testing.assert_allclose(report['recall'], recall)
+        np.testing.assert_allclose(report['f1'], f1)
+        np.testing.assert_array_equal(report['support'], support)
+        np.testing.assert_array_equal(report['confusion_matrix'],
+                                      sklearn_metrics.confusion_matrix(y_true, y_pred, labels=range(4)))
+
+    def test_absent_class_scores_zero(self):
+        scores = classification_scores(np.array([[2, 0, 0], [1, 1, 0], [0, 0, 0]]))
+        assert scores['f1'][2] == 0.0
+        assert scores['precision'][2] == 0.0
+        assert scores['support'].tolist() == [2, 2, 0]
+
+
+def test_format_report():
+    report = validation_report(np.array([0, 1, 1]), np.array([[0.9, 0.1], [0.2, 0.8], [0.7, 0.3]]), 2)
+    text = format_report(report, ['Normal', 'Fracture'])
+    assert 'Fracture' in text
+    assert text.splitlines()[-2].split() == ['1', '0']
+    assert text.splitlines()[-1].split() == ['1', '1']
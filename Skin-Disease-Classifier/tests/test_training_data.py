@@ -0,0 +1,162 @@
+"""
+Unit tests for the training input pipeline helpers that do not need TensorFlow.
+
+The file order and labels must match flow_from_directory so that
+.classes lines up with the predictions of a non-shuffled pipeline.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pytest
+
+from training import Augmentation, ImageFolderData, RecordData, list_image_files, load_split
+from training.records import (
+    MANIFEST_NAME, cache_params, file_sha256, is_up_to_date, read_manifest, shard_names
+)
+
+CLASSES = ['Normal', 'Fracture']
+
+
+def touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb'):
+        pass
+
+
+@pytest.fixture
+def split_dir(tmp_path):
+    for name in ('b.png', 'a.JPG', 'notes.txt', 'c.jpeg'):
+        touch(str(tmp_path / 'Normal' / name))
+    touch(str(tmp_path / 'Normal' / 'sub' / 'd.png'))
+    touch(str(tmp_path / 'Fracture' / 'x.bmp'))
+    touch(str(tmp_path / 'Ignored' / 'y.png'))
+    return tmp_path
+
+
+class TestListImageFiles:
+    """Tests for list_image_files"""
+
+    def test_order_and_labels(self, split_dir):
+        filepaths, labels = list_image_files(str(split_dir), CLASSES)
+        names = [os.path.relpath(path, str(split_dir)).replace(os.sep, '/') for path in filepaths]
+        assert names == ['Normal/a.JPG', 'Normal/b.png', 'Normal/c.jpeg', 'Normal/sub/d.png', 'Fracture/x.bmp']
+        assert labels.dtype == np.int32
+        assert labels.tolist() == [0, 0, 0, 0, 1]
+
+    def test_class_order_defines_labels(self, split_dir):
+        _, labels = list_image_files(str(split_dir), list(reversed(CLASSES)))
+        assert labels.tolist() == [0, 1, 1, 1, 1]
+
+    def test_missing_class_directory(self, tmp_path):
+        filepaths, labels = list_image_files(str(tmp_path), CLASSES)
+        assert filepaths == []
+        assert labels.shape == (0,)
+
+
+class TestImageFolderData:
+    """Tests for the flow_from_directory-compatible attributes"""
+
+    def test_attributes(self, split_dir):
+        data = ImageFolderData(str(split_dir), CLASSES, img_size=(8, 8), batch_size=2, pipeline='densenet_clahe')
+        assert data.samples == 5
+        assert data.num_classes == 2
+        assert len(data) == 3
+        assert data.class_indices == {'Normal': 0, 'Fracture': 1}
+        assert data.classes.tolist() == [0, 0, 0, 0, 1]
+
+    def test_clahe_only_for_densenet(self, split_dir):
+        data = ImageFolderData(str(split_dir), CLASSES, img_size=(8, 8), batch_size=2,
+                               pipeline='efficientnet', clahe=True)
+        assert data.clahe is False
+
+    @pytest.mark.parametrize('kwargs', [{'pipeline': 'unknown'}, {'pipeline': 'rescale', 'color_mode': 'rgba'}])
+    def test_invalid_arguments(self, split_dir, kwargs):
+        with pytest.raises(ValueError):
+            ImageFolderData(str(split_dir), CLASSES, img_size=(8, 8), batch_size=2, **kwargs)
+
+
+class TestAugmentation:
+    """Tests for Augmentation parameter handling"""
+
+    def test_scalar_zoom_range(self):
+        assert Augmentation(zoom_range=0.2).zoom_range == pytest.approx((0.8, 1.2))
+
+    def test_has_affine(self):
+        assert not Augmentation(horizontal_flip=True, brightness_range=[0.9, 1.1]).has_affine
+        assert Augmentation(rotation_range=10).has_affine
+        assert Augmentation(zoom_range=[0.9, 1.0]).has_affine
+
+    def test_invalid_fill_mode(self):
+        with pytest.raises(ValueError):
+            Augmentation(fill_mode='mirror')
+
+
+def write_manifest(cache_dir, **overrides):
+    manifest = {
+        **cache_params(CLASSES, (8, 8), 'densenet_clahe', 'rgb', True),
+        'count': 3,
+        'shards': shard_names(2),
+        'files': ['a.png', 'b.png', 'c.png'],
+        'sha256': ['0' * 64] * 3,
+        'labels': [0, 0, 1],
+        **overrides,
+    }
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(os.path.join(cache_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    return manifest
+
+
+class TestRecordCache:
+    """Tests for the compiled TFRecord cache helpers"""
+
+    def test_file_sha256(self, tmp_path):
+        path = tmp_path / 'x.png'
+        path.write_bytes(b'abc' * 1000)
+        assert file_sha256(str(path), chunk_size=7) == hashlib.sha256(b'abc' * 1000).hexdigest()
+
+    def test_shard_names(self):
+        assert shard_names(2) == ['shard-00000-of-00002.tfrecord', 'shard-00001-of-00002.tfrecord']
+
+    def test_stored_channels(self):
+        assert cache_params(CLASSES, (8, 8), 'densenet_clahe', 'grayscale', True)['channels'] == 3
+        assert cache_params(CLASSES, (8, 8), 'rescale', 'grayscale', False)['channels'] == 1
+        assert cache_params(CLASSES, (8, 8), 'efficientnet', 'rgb', False)['channels'] == 3
+
+    def test_is_up_to_date(self, tmp_path):
+        manifest = write_manifest(str(tmp_path))
+        params = cache_params(CLASSES, (8, 8), 'densenet_clahe', 'rgb', True)
+        files, hashes = manifest['files'], manifest['sha256']
+        assert is_up_to_date(manifest, params, files, hashes, np.array([0, 0, 1]))
+        assert not is_up_to_date(None, params, files, hashes, [0, 0, 1])
+        assert not is_up_to_date(manifest, params, files, ['1' * 64] + hashes[1:], [0, 0, 1])
+        assert not is_up_to_date(manifest, params, files, hashes, [0, 1, 1])
+        assert not is_up_to_date(manifest, {**params, 'img_size': [16, 16]}, files, hashes, [0, 0, 1])
+
+    def test_read_manifest_missing(self, tmp_path):
+        assert read_manifest(str(tmp_path)) is None
+        with pytest.raises(FileNotFoundError):
+            RecordData(str(tmp_path), batch_size=2)
+
+    def test_record_data_attributes(self, tmp_path):
+        write_manifest(str(tmp_path))
+        data = RecordData(str(tmp_path), batch_size=2, shuffle=True)
+        assert data.samples == 3
+        assert len(data) == 2
+        assert data.classes.tolist() == [0, 0, 1]
+        assert data.clahe is False
+        assert data.shard_paths == [os.path.join(str(tmp_path), name) for name in shard_names(2)]
+
+    def test_load_split(self, split_dir, tmp_path):
+        assert isinstance(load_split('train', str(split_dir), CLASSES, (8, 8), 2, 'densenet_clahe'), ImageFolderData)
+
+        cache_root = tmp_path / 'cache'
+        write_manifest(str(cache_root / 'train'))
+        data = load_split('train', None, CLASSES, (8, 8), 2, 'densenet_clahe', cache_root=str(cache_root),
+                          shuffle=True, color_mode='rgb')
+        assert isinstance(data, RecordData)
+        with pytest.raises(ValueError):
+            load_split('train', None, CLASSES, (16, 16), 2, 'densenet_clahe', cache_root=str(cache_root))
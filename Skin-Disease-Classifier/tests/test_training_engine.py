@@ -0,0 +1,166 @@
+"""
+Unit tests for the training engine's TensorFlow-free parts: configs, class
+weights, strategy selection, dry-run comparison, synthetic data and the
+macro-F1 script wrappers.
+"""
+
+import ast
+import copy
+import os
+
+import numpy as np
+import pytest
+
+from training.callbacks import median_step_time
+from training.configs import CONFIGS, get_config, validate_config
+from training.configs import sources
+from training.configs.sources import folder_files
+from training.engine import class_weights, compare_to_baseline, strategy_name
+from training.synthetic import write_synthetic_dataset
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+
+class TestConfigs:
+    """Tests for get_config / validate_config"""
+
+    @pytest.mark.parametrize('name', sorted(CONFIGS))
+    def test_shipped_configs_are_valid(self, name):
+        config = get_config(name)
+        assert len(config['class_names']) >= 2
+        assert config['phases']
+
+    def test_unknown_name(self):
+        with pytest.raises(KeyError):
+            get_config('brain')
+
+    def test_missing_key(self):
+        config = copy.deepcopy(CONFIGS['bone'])
+        del config['backbone']
+        with pytest.raises(ValueError, match='backbone'):
+            validate_config(config)
+
+    def test_unknown_loss(self):
+        config = copy.deepcopy(CONFIGS['bone'])
+        config['loss'] = {'name': 'hinge'}
+        with pytest.raises(ValueError, match='loss'):
+            validate_config(config)
+
+    def test_class_weights_for_unknown_class(self):
+        config = copy.deepcopy(CONFIGS['bone'])
+        config['class_weights'] = {'Osteoporosis': (1.5, 2.0)}
+        with pytest.raises(ValueError, match='Osteoporosis'):
+            validate_config(config)
+
+    def test_duplicate_phase(self):
+        config = copy.deepcopy(CONFIGS['bone'])
+        config['phases'] = [config['phases'][0], dict(config['phases'][0])]
+        with pytest.raises(ValueError, match='Duplicate'):
+            validate_config(config)
+
+    def test_invalid_unfreeze(self):
+        config = copy.deepcopy(CONFIGS['bone'])
+        config['phases'][0] = dict(config['phases'][0], unfreeze=-1)
+        with pytest.raises(ValueError, match='unfreeze'):
+            validate_config(config)
+
+
+class TestClassWeights:
+    """Tests for class_weights"""
+
+    def test_balanced(self):
+        weights = class_weights([0, 0, 0, 1], ['a', 'b'])
+        assert weights == pytest.approx({0: 4 / 6, 1: 2.0})
+
+    def test_factor_and_cap(self):
+        labels = [0] * 6 + [1] * 3 + [2]
+        weights = class_weights(labels, ['a', 'b', 'c'], {'b': (1.5, 5.0), 'c': (2.0, 4.0)})
+        assert weights[1] == pytest.approx(10 / 9 * 1.5)
+        assert weights[2] == pytest.approx(4.0)
+
+    def test_missing_class(self):
+        assert class_weights([0, 0], ['a', 'b'])[1] == 1.0
+
+
+class TestStrategyName:
+    """Tests for strategy_name"""
+
+    def test_auto(self):
+        assert strategy_name('auto', 0) == 'default'
+        assert strategy_name('auto', 1) == 'default'
+        assert strategy_name('auto', 2) == 'mirrored'
+
+    def test_explicit(self):
+        assert strategy_name('mirrored', 1) == 'mirrored'
+
+    def test_unknown(self):
+        with pytest.raises(ValueError):
+            strategy_name('tpu', 0)
+
+
+class TestDryRunComparison:
+    """Tests for compare_to_baseline / median_step_time"""
+
+    def test_regression(self):
+        baseline = {'phases': {'head': {'step_ms': 100.0}, 'finetune': {'step_ms': 200.0}}}
+        result = {'phases': {'head': {'step_ms': 110.0}, 'finetune': {'step_ms': 260.0}}}
+        regressions = compare_to_baseline(result, baseline, tolerance=0.2)
+        assert len(regressions) == 1
+        assert regressions[0].startswith('finetune')
+
+    def test_new_phase_is_ignored(self):
+        assert compare_to_baseline({'phases': {'head': {'step_ms': 50.0}}}, {'phases': {}}) == []
+
+    def test_median_skips_first_epoch(self):
+        assert median_step_time([9.0, 1.0, 2.0, 3.0], [0, 2]) == pytest.approx(2.5)
+
+    def test_median_single_epoch_skips_first_step(self):
+        assert median_step_time([9.0, 1.0, 3.0], [0]) == pytest.approx(2.0)
+        assert median_step_time([], []) == 0.0
+
+
+class TestSources:
+    """Tests for the synthetic dataset and the file sources"""
+
+    def test_synthetic_dataset(self, tmp_path):
+        class_names = ['a', 'b', 'c']
+        dirs = write_synthetic_dataset(str(tmp_path), class_names, (16, 16), images=2)
+        filepaths, labels = folder_files(dirs)('train', class_names)
+        assert len(filepaths) == 8
+        assert sorted(np.bincount(labels).tolist()) == [2, 3, 3]
+        assert [os.path.basename(os.path.dirname(path)) for path in filepaths] == \
+            [class_names[label] for label in labels]
+        assert len(folder_files(dirs)('val', class_names)[0]) == 3
+
+    def test_lung_files_order(self, tmp_path, monkeypatch):
+        lung_dir, infection_dir = tmp_path / 'lung', tmp_path / 'infection'
+        for base, names in ((lung_dir, ['b.png', 'a.jpg', 'notes.txt']), (infection_dir, ['c.png'])):
+            image_dir = base / 'Train' / 'Normal' / 'images'
+            image_dir.mkdir(parents=True)
+            for name in names:
+                (image_dir / name).write_bytes(b'')
+        monkeypatch.setattr(sources, 'LUNG_SEG_DIR', str(lung_dir))
+        monkeypatch.setattr(sources, 'INFECTION_SEG_DIR', str(infection_dir))
+
+        filepaths, labels = sources.lung_files('train', ['COVID-19', 'Normal'])
+        assert [os.path.basename(path) for path in filepaths] == ['a.jpg', 'b.png', 'c.png']
+        assert labels.tolist() == [1, 1, 1]
+
+
+class TestScriptWrappers:
+    """The macro-F1 scripts run the engine with their config."""
+
+    @pytest.mark.parametrize('script, name', [
+        ('train_bone_4class_macro_f1.py', 'bone'),
+        ('train_lung_3class_densenet121_macro_f1.py', 'lung'),
+        ('train_skin_6class_efficientnetb3_macro_f1.py', 'skin'),
+    ])
+    def test_wrapper_runs_config(self, script, name):
+        with open(os.path.join(ROOT, script), 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read())
+        calls = [node for node in ast.walk(tree) if isinstance(node, ast.Call)
+                 and isinstance(node.func, ast.Attribute) and node.func.attr == 'main']
+        assert len(calls) == 1
+        assert calls[0].args[0].elts[0].value == name
+        assert name in CONFIGS
+        assert not [node for node in ast.walk(tree) if isinstance(node, (ast.FunctionDef, ast.ClassDef))]
@@ -0,0 +1,56 @@
+"""
+Unit tests for the trainers' --precision / --xla options (no TensorFlow needed).
+"""
+
+import pytest
+
+from training.precision import PRECISIONS, parse_training_args, precision_warning
+
+
+class TestParseTrainingArgs:
+    """Tests for parse_training_args"""
+
+    def test_defaults(self, monkeypatch):
+        monkeypatch.delenv('TRAIN_PRECISION', raising=False)
+        monkeypatch.delenv('TRAIN_XLA', raising=False)
+        args = parse_training_args(argv=[])
+        assert args.precision == 'fp32'
+        assert args.xla is False
+
+    @pytest.mark.parametrize('precision', PRECISIONS)
+    def test_flags(self, precision):
+        args = parse_training_args(argv=['--precision', precision, '--xla'])
+        assert args.precision == precision
+        assert args.xla is True
+
+    def test_environment_defaults(self, monkeypatch):
+        monkeypatch.setenv('TRAIN_PRECISION', 'mixed_bfloat16')
+        monkeypatch.setenv('TRAIN_XLA', '1')
+        args = parse_training_args(argv=[])
+        assert args.precision == 'mixed_bfloat16'
+        assert args.xla is True
+
+    def test_invalid_precision(self):
+        with pytest.raises(SystemExit):
+            parse_training_args(argv=['--precision', 'float16'])
+
+
+class TestPrecisionWarning:
+    """Tests for precision_warning"""
+
+    def test_fp32_never_warns(self):
+        assert precision_warning('fp32', [], set()) is None
+
+    def test_gpu_capabilities(self):
+        assert precision_warning('mixed_float16', [(7, 5)], set()) is None
+        assert precision_warning('mixed_float16', [(6, 1)], set()) is not None
+        assert precision_warning('mixed_bfloat16', [(8, 0)], set()) is None
+        assert precision_warning('mixed_bfloat16', [(7, 5)], set()) is not None
+        # The slowest GPU decides
+        assert precision_warning('mixed_bfloat16', [(8, 6), (7, 0)], set()) is not None
+
+    def test_cpu(self):
+        assert precision_warning('mixed_float16', [], {'avx512_bf16'}) is not None
+        assert precision_warning('mixed_bfloat16', [], {'avx2', 'avx512f'}) is not None
+        assert precision_warning('mixed_bfloat16', [], {'avx512_bf16'}) is None
+        assert precision_warning('mixed_bfloat16', [], {'amx_bf16'}) is None
@@ -0,0 +1,79 @@
+"""
+Unit tests for warm-up and readiness tracking.
+"""
+
+import pytest
+
+from inference.warmup import Warmup, parse_batch_sizes
+
+
+class TestParseBatchSizes:
+    """Tests for parse_batch_sizes function."""
+
+    def test_empty_uses_default(self):
+        """Test that an empty value falls back to the default."""
+        assert parse_batch_sizes(None) == [1]
+        assert parse_batch_sizes('', default=(1, 8)) == [1, 8]
+
+    def test_sorted_and_deduplicated(self):
+        """Test that sizes are sorted and duplicates removed."""
+        assert parse_batch_sizes('8, 1,4,8') == [1, 4, 8]
+
+    def test_invalid_value(self):
+        """Test that non-numeric values raise ValueError."""
+        with pytest.raises(ValueError):
+            parse_batch_sizes('one')
+
+
+class TestWarmup:
+    """Tests for the Warmup readiness state."""
+
+    def test_ready_after_steps(self):
+        """Test that the service is ready once all steps succeed."""
+        calls = []
+        warmup = Warmup('test')
+        assert not warmup.ready
+        warmup.start([
+            ('a', lambda: calls.append('a'), True),
+            ('b', lambda: calls.append('b'), True),
+        ], background=False)
+        assert warmup.ready
+        assert calls == ['a', 'b']
+        status = warmup.status()
+        assert status['state'] == 'ready'
+        assert set(status['steps']) == {'a', 'b'}
+
+    def test_required_failure_blocks_readiness(self):
+        """Test that a failing required step keeps the service not ready."""
+        def boom():
+            raise RuntimeError("boom")
+
+        warmup = Warmup('test')
+        warmup.start([('predict', boom, True)], background=False)
+        assert not warmup.ready
+        assert warmup.status()['state'] == 'failed'
+        assert 'predict' in warmup.status()['errors']
+
+    def test_optional_failure_does_not_block(self):
+        """Test that an optional step (e.g. Grad-CAM) may fail."""
+        def boom():
+            raise RuntimeError("boom")
+
+        warmup = Warmup('test')
+        warmup.start([('predict', lambda: None, True), ('gradcam', boom, False)], background=False)
+        assert warmup.ready
+        assert 'gradcam' in warmup.status()['errors']
+
+    def test_background_thread(self):
+        """Test that background warm-up eventually becomes ready."""
+        warmup = Warmup('test')
+        thread = warmup.start([('predict', lambda: None, True)])
+        thread.join(timeout=5)
+        assert warmup.ready
+
+    def test_fail(self):
+        """Test that fail() marks the service not ready."""
+        warmup = Warmup('test')
+        warmup.fail("model missing")
+        assert not warmup.ready
+        assert warmup.status()['errors']['load'] == "model missing"
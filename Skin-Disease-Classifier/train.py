@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TRAINING ENGINE
+training/configs altindaki hastalik config'lerinden biriyle egitim: veri
+(tf.data veya compile_dataset.py cache'i), class weight, model, faz plani
+ve callback'ler tek yerde (training/engine.py). --precision, --xla ve
+--strategy (birden fazla GPU'da MirroredStrategy) her hastalik icin ayni.
+
+--dry-run: ayni config, sinif basina birkac sentetik goruntu, rastgele
+backbone agirliklari ve faz basina birkac adim; faz basina median ms/step
+ve goruntu/sn yazilir (regresyon benchmark'i). --json sonucu kaydeder,
+--baseline onceki bir sonuca gore --tolerance'tan fazla yavaslayan faz
+varsa cikis kodu 1 olur.
+
+Kullanim:
+  python train.py bone
+  python train.py skin --precision mixed_bfloat16 --xla
+  python train.py lung --cache datasets/cache/lung --strategy mirrored
+  python train.py bone --dry-run --img-size 128 --steps 5
+  python train.py skin --dry-run --json dry_run_skin.json
+  python train.py skin --dry-run --baseline dry_run_skin.json --tolerance 0.2
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from training import CONFIGS, Trainer, dry_run, get_config, set_precision
+from training.engine import STRATEGIES, compare_to_baseline
+from training.precision import add_precision_arguments
+
+# Windows console UTF-8 support
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8')
+    except:
+        pass
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('config', choices=sorted(CONFIGS))
+    add_precision_arguments(parser)
+    parser.add_argument('--strategy', choices=STRATEGIES, default='auto',
+                        help="auto: birden fazla GPU varsa mirrored")
+    parser.add_argument('--cache', default=os.environ.get('DATASET_CACHE') or None,
+                        help="compile_dataset.py cache'i (<cache>/<split>), varsayilan: DATASET_CACHE")
+    parser.add_argument('--model-dir', default='models')
+    parser.add_argument('--macro-f1-every', type=int, default=int(os.environ.get('MACRO_F1_EVERY', '1')),
+                        help="Validation macro F1 her N epoch'ta bir")
+
+    dry = parser.add_argument_group('dry run')
+    dry.add_argument('--dry-run', action='store_true', help="Sentetik veriyle kisa kosu (benchmark)")
+    dry.add_argument('--steps', type=int, default=5, help="Epoch basina adim")
+    dry.add_argument('--epochs', type=int, default=2, help="Faz basina epoch (ilki isinma, olculmez)")
+    dry.add_argument('--images', type=int, default=8, help="val/test split basina goruntu (train: 4 kati)")
+    dry.add_argument('--img-size', type=int, help="Kare goruntu boyutu (varsayilan: config'teki)")
+    dry.add_argument('--batch-size', type=int, help="Tum fazlar icin batch size")
+    dry.add_argument('--compile-cache', action='store_true', help="Sentetik veriyi TFRecord cache'inden oku")
+    dry.add_argument('--json', help="Sonucu bu dosyaya yaz")
+    dry.add_argument('--baseline', help="Karsilastirilacak onceki --json sonucu")
+    dry.add_argument('--tolerance', type=float, default=0.2, help="Izin verilen yavaslama (0.2 = %%20)")
+    dry.add_argument('--verbose', action='store_true', help="Keras ilerleme ciktisi")
+    return parser.parse_args(argv)
+
+
+def print_summary(name, results):
+    print(f"\n{'faz':<10} {'epoch':>5} {'egitilen':>9} {'batch':>6} {'ms/step':>9} {'goruntu/sn':>11}")
+    print("-" * 55)
+    for phase, record in results['phases'].items():
+        print(f"{phase:<10} {record['epochs']:>5} {record['trainable_layers']:>9} {record['batch_size']:>6} "
+              f"{record['step_ms']:>9.1f} {record['images_per_sec']:>11.1f}")
+    print(f"\n{name}: test macro F1 {results['test']['macro_f1']:.4f}, "
+          f"accuracy {results['test']['accuracy']:.4f}")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    config = get_config(args.config)
+    set_precision(args.precision)
+    trainer_kwargs = {'xla': args.xla, 'strategy': args.strategy, 'macro_f1_every': args.macro_f1_every}
+
+    if not args.dry_run:
+        results = Trainer(config, cache_root=args.cache, model_dir=args.model_dir, **trainer_kwargs).train()
+        print_summary(args.config, results)
+        print(f"Model: {results['model']}")
+        return 0
+
+    img_size = (args.img_size, args.img_size) if args.img_size else None
+    results = dry_run(config, steps=args.steps, epochs=args.epochs, images=args.images, img_size=img_size,
+                      batch_size=args.batch_size, use_cache=args.compile_cache,
+                      verbose=1 if args.verbose else 0, **trainer_kwargs)
+    results.pop('model', None)  # removed with the temporary directory
+    results['settings'] = {'config': args.config, 'precision': args.precision, 'xla': args.xla,
+                           'steps': args.steps, 'epochs': args.epochs,
+                           'img_size': list(img_size or config['img_size'])}
+    print_summary(args.config, results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Sonuc: {args.json}")
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare_to_baseline(results, json.load(f), args.tolerance)
+        for message in regressions:
+            print(f"[REGRESYON] {message}")
+        if regressions:
+            return 1
+        print(f"Baseline'a gore yavaslama yok (tolerans %{args.tolerance * 100:.0f})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -16,6 +16,7 @@ from tensorflow.keras.callbacks import ModelCheckpoint, EarlyStopping, ReduceLRO
 import matplotlib.pyplot as plt
 from sklearn.metrics import classification_report, confusion_matrix
 import seaborn as sns
+from training import parse_training_args, set_precision
 
 # Windows console UTF-8 support
 if sys.platform == 'win32':
@@ -24,6 +25,10 @@ if sys.platform == 'win32':
     except:
         pass
 
+# Command line: --precision {fp32,mixed_bfloat16,mixed_float16} --xla (default: fp32, no XLA)
+args = parse_training_args(__doc__)
+set_precision(args.precision)
+
 print("\n" + "="*70)
 print("BONE DISEASE DETECTION - 4 CLASS IMPROVED TRAINING V2")
 print("Fixes: Early Unfreeze, No Class Weights in Phase 1, Higher LR, Data Verification")
@@ -87,6 +92,7 @@ def focal_loss(alpha=0.25, gamma=2.0):
     Focuses on hard examples and down-weights easy examples
     """
     def loss(y_true, y_pred):
+        y_true, y_pred = tf.cast(y_true, tf.float32), tf.cast(y_pred, tf.float32)  # float32 under mixed precision
         # Clip predictions to prevent log(0)
         y_pred = tf.clip_by_value(y_pred, 1e-7, 1.0 - 1e-7)
         
@@ -237,7 +243,7 @@ model = keras.Sequential([
     layers.Dense(256, activation='relu', kernel_regularizer=keras.regularizers.l2(0.0001)),
     layers.BatchNormalization(),
     layers.Dropout(0.3),
-    layers.Dense(NUM_CLASSES, activation='softmax')
+    layers.Dense(NUM_CLASSES, activation='softmax', dtype='float32')  # float32 output under mixed precision
 ])
 
 # Compile with FOCAL LOSS (much better for imbalance)
@@ -248,7 +254,8 @@ model.compile(
     metrics=[
         'accuracy',
         keras.metrics.TopKCategoricalAccuracy(k=2, name='top_2_accuracy')
-    ]
+    ],
+    jit_compile=args.xla
 )
 
 print("\n[MODEL] Model architecture:")
@@ -358,7 +365,8 @@ model.compile(
     metrics=[
         'accuracy',
         keras.metrics.TopKCategoricalAccuracy(k=2, name='top_2_accuracy')
-    ]
+    ],
+    jit_compile=args.xla
 )
 
 checkpoint_finetune = ModelCheckpoint(
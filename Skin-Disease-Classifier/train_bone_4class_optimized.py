@@ -17,6 +17,7 @@ import matplotlib.pyplot as plt
 from sklearn.metrics import classification_report, confusion_matrix
 import seaborn as sns
 from sklearn.utils.class_weight import compute_class_weight
+from training import parse_training_args, set_precision
 
 # Windows console UTF-8 support
 if sys.platform == 'win32':
@@ -25,6 +26,10 @@ if sys.platform == 'win32':
     except:
         pass
 
+# Command line: --precision {fp32,mixed_bfloat16,mixed_float16} --xla (default: fp32, no XLA)
+args = parse_training_args(__doc__)
+set_precision(args.precision)
+
 print("\n" + "="*70)
 print("BONE DISEASE DETECTION - 4 CLASS OPTIMIZED TRAINING")
 print("Optimized for X-ray images")
@@ -40,9 +45,7 @@ if len(physical_devices) > 0:
         tf.config.experimental.set_memory_growth(physical_devices[0], True)
         print("[GPU] Memory growth enabled")
         
-        # Mixed precision training (optional - %50 hız artışı)
-        # tf.keras.mixed_precision.set_global_policy('mixed_float16')
-        # print("[GPU] Mixed precision enabled")
+        # Mixed precision training: --precision mixed_float16 (see training/precision.py)
     except:
         pass
 else:
@@ -89,6 +92,7 @@ def categorical_crossentropy_smooth(smoothing=0.1):
     Categorical crossentropy with label smoothing
     """
     def loss(y_true, y_pred):
+        y_true, y_pred = tf.cast(y_true, tf.float32), tf.cast(y_pred, tf.float32)  # float32 under mixed precision
         y_pred = tf.clip_by_value(y_pred, 1e-7, 1.0 - 1e-7)
         num_classes = tf.cast(tf.shape(y_true)[1], tf.float32)
         y_true_smooth = y_true * (1.0 - smoothing) + smoothing / num_classes
@@ -194,7 +198,7 @@ model = keras.Sequential([
     layers.Dense(256, activation='relu', kernel_regularizer=keras.regularizers.l2(0.0001)),
     layers.BatchNormalization(),
     layers.Dropout(0.3),
-    layers.Dense(NUM_CLASSES, activation='softmax')
+    layers.Dense(NUM_CLASSES, activation='softmax', dtype='float32')  # float32 output under mixed precision
 ])
 
 # Compile with label smoothing loss
@@ -205,7 +209,8 @@ model.compile(
     metrics=[
         'accuracy',
         keras.metrics.TopKCategoricalAccuracy(k=2, name='top_2_accuracy')  # 4 sınıf için top-2 yeterli
-    ]
+    ],
+    jit_compile=args.xla
 )
 
 print("\n[MODEL] Model architecture:")
@@ -319,7 +324,8 @@ model.compile(
     metrics=[
         'accuracy',
         keras.metrics.TopKCategoricalAccuracy(k=2, name='top_2_accuracy')
-    ]
+    ],
+    jit_compile=args.xla
 )
 
 checkpoint_finetune = ModelCheckpoint(
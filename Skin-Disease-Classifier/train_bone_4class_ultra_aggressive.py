@@ -17,6 +17,7 @@ from tensorflow.keras.callbacks import ModelCheckpoint, EarlyStopping, ReduceLRO
 import matplotlib.pyplot as plt
 from sklearn.metrics import classification_report, confusion_matrix
 import seaborn as sns
+from training import parse_training_args, set_precision
 
 # Windows console UTF-8 support
 if sys.platform == 'win32':
@@ -25,6 +26,10 @@ if sys.platform == 'win32':
     except:
         pass
 
+# Command line: --precision {fp32,mixed_bfloat16,mixed_float16} --xla (default: fp32, no XLA)
+args = parse_training_args(__doc__)
+set_precision(args.precision)
+
 print("\n" + "="*70)
 print("BONE DISEASE DETECTION - ULTRA AGGRESSIVE TRAINING")
 print("For EXTREME Class Imbalance (Phase 1 Failed)")
@@ -91,6 +96,7 @@ def focal_loss(alpha=0.5, gamma=3.0):
     Higher gamma = more focus on hard examples
     """
     def loss(y_true, y_pred):
+        y_true, y_pred = tf.cast(y_true, tf.float32), tf.cast(y_pred, tf.float32)  # float32 under mixed precision
         y_pred = tf.clip_by_value(y_pred, 1e-7, 1.0 - 1e-7)
         cross_entropy = -y_true * tf.math.log(y_pred)
         p_t = tf.where(tf.equal(y_true, 1), y_pred, 1 - y_pred)
@@ -206,7 +212,7 @@ model = keras.Sequential([
     layers.Dense(256, activation='relu', kernel_regularizer=keras.regularizers.l2(0.0001)),
     layers.BatchNormalization(),
     layers.Dropout(0.3),
-    layers.Dense(NUM_CLASSES, activation='softmax')
+    layers.Dense(NUM_CLASSES, activation='softmax', dtype='float32')  # float32 output under mixed precision
 ])
 
 # Compile with ULTRA AGGRESSIVE focal loss
@@ -217,7 +223,8 @@ model.compile(
     metrics=[
         'accuracy',
         keras.metrics.TopKCategoricalAccuracy(k=2, name='top_2_accuracy')
-    ]
+    ],
+    jit_compile=args.xla
 )
 
 print("\n[MODEL] Model architecture:")
@@ -326,7 +333,8 @@ if len(unique_preds) >= 2:
         metrics=[
             'accuracy',
             keras.metrics.TopKCategoricalAccuracy(k=2, name='top_2_accuracy')
-        ]
+        ],
+        jit_compile=args.xla
     )
     
     checkpoint_finetune = ModelCheckpoint(
@@ -61,6 +61,12 @@ INITIAL_EPOCHS = 50
 FINE_TUNE_EPOCHS = 30
 LEARNING_RATE = 0.0001
 FINE_TUNE_LR = 0.00005
+# Colab hücresi (argparse yok): train_*.py'deki --precision / --xla karşılığı
+PRECISION = 'fp32'  # 'fp32' | 'mixed_float16' (T4 için hızlı) | 'mixed_bfloat16' (A100/TPU)
+XLA = False  # model.compile(jit_compile=True)
+if PRECISION != 'fp32':
+    keras.mixed_precision.set_global_policy(PRECISION)
+    print(f"⚡ Mixed precision: {PRECISION}")
 
 CLASS_NAMES = [
     'Diabetic_Retinopathy', 'Disc_Edema', 'Glaucoma',
@@ -142,13 +148,14 @@ model = keras.Sequential([
     layers.Dropout(0.3),
     layers.Dense(256, activation='relu', kernel_regularizer=keras.regularizers.l2(0.001)),
     layers.Dropout(0.2),
-    layers.Dense(NUM_CLASSES, activation='softmax')
+    layers.Dense(NUM_CLASSES, activation='softmax', dtype='float32')  # float32 output under mixed precision
 ])
 
 model.compile(
     optimizer=keras.optimizers.Adam(learning_rate=LEARNING_RATE),
     loss='categorical_crossentropy',
-    metrics=['accuracy', keras.metrics.TopKCategoricalAccuracy(k=3, name='top_3_accuracy')]
+    metrics=['accuracy', keras.metrics.TopKCategoricalAccuracy(k=3, name='top_3_accuracy')],
+    jit_compile=XLA
 )
 
 print(f"  Total params: {model.count_params():,}")
@@ -204,7 +211,8 @@ print(f"  Unfrozen: {len([l for l in base_model.layers if l.trainable])} layers"
 model.compile(
     optimizer=keras.optimizers.Adam(learning_rate=FINE_TUNE_LR),
     loss='categorical_crossentropy',
-    metrics=['accuracy', keras.metrics.TopKCategoricalAccuracy(k=3, name='top_3_accuracy')]
+    metrics=['accuracy', keras.metrics.TopKCategoricalAccuracy(k=3, name='top_3_accuracy')],
+    jit_compile=XLA
 )
 
 checkpoint_finetune = ModelCheckpoint(
@@ -19,11 +19,16 @@ from tensorflow.keras.applications import MobileNetV2
 from tensorflow.keras.callbacks import ModelCheckpoint, EarlyStopping, ReduceLROnPlateau
 import matplotlib.pyplot as plt
 from datetime import datetime
+from training import parse_training_args, set_precision
 
 # UTF-8 encoding
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
 
+# Command line: --precision {fp32,mixed_bfloat16,mixed_float16} --xla (default: fp32, no XLA)
+args = parse_training_args(__doc__)
+set_precision(args.precision)
+
 print("=" * 70)
 print(" AKCIGER HASTALIKLARI SINIFLANDIRMA - MODEL EGITIMI")
 print("=" * 70)
@@ -209,14 +214,15 @@ model = keras.Sequential([
     layers.Dropout(0.5),
     layers.Dense(256, activation='relu'),
     layers.Dropout(0.3),
-    layers.Dense(NUM_CLASSES, activation='softmax')
+    layers.Dense(NUM_CLASSES, activation='softmax', dtype='float32')  # float32 output under mixed precision
 ])
 
 # Model derleme
 model.compile(
     optimizer=keras.optimizers.Adam(learning_rate=LEARNING_RATE),
     loss='categorical_crossentropy',
-    metrics=['accuracy']
+    metrics=['accuracy'],
+    jit_compile=args.xla
 )
 
 print("\n✓ Model oluşturuldu!")
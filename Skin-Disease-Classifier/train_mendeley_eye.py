@@ -16,6 +16,7 @@ from tensorflow.keras.applications import EfficientNetB3
 from tensorflow.keras.callbacks import ModelCheckpoint, EarlyStopping, ReduceLROnPlateau
 import matplotlib.pyplot as plt
 from datetime import datetime
+from training import parse_training_args, set_precision
 
 # Windows console UTF-8 support
 if sys.platform == 'win32':
@@ -24,6 +25,10 @@ if sys.platform == 'win32':
     except:
         pass
 
+# Command line: --precision {fp32,mixed_bfloat16,mixed_float16} --xla (default: fp32, no XLA)
+args = parse_training_args(__doc__)
+set_precision(args.precision)
+
 print("\n" + "="*70)
 print("MENDELEY EYE DISEASE DETECTION - TRAINING")
 print("Model: EfficientNetB3 + Transfer Learning + Fine-tuning")
@@ -163,7 +168,7 @@ model = keras.Sequential([
     layers.Dropout(0.3),
     layers.Dense(256, activation='relu', kernel_regularizer=keras.regularizers.l2(0.001)),
     layers.Dropout(0.2),
-    layers.Dense(NUM_CLASSES, activation='softmax')
+    layers.Dense(NUM_CLASSES, activation='softmax', dtype='float32')  # float32 output under mixed precision
 ])
 
 # Compile model
@@ -173,7 +178,8 @@ model.compile(
     metrics=[
         'accuracy',
         keras.metrics.TopKCategoricalAccuracy(k=3, name='top_3_accuracy')
-    ]
+    ],
+    jit_compile=args.xla
 )
 
 print("\n[MODEL] Model architecture:")
@@ -256,7 +262,8 @@ model.compile(
     metrics=[
         'accuracy',
         keras.metrics.TopKCategoricalAccuracy(k=3, name='top_3_accuracy')
-    ]
+    ],
+    jit_compile=args.xla
 )
 
 checkpoint_finetune = ModelCheckpoint(
@@ -16,6 +16,7 @@ from tensorflow.keras.preprocessing.image import ImageDataGenerator
 from tensorflow.keras.applications import EfficientNetB3
 from tensorflow.keras.callbacks import ModelCheckpoint, EarlyStopping, ReduceLROnPlateau
 import matplotlib.pyplot as plt
+from training import parse_training_args, set_precision
 
 # Windows console UTF-8 support
 if sys.platform == 'win32':
@@ -24,6 +25,10 @@ if sys.platform == 'win32':
     except:
         pass
 
+# Command line: --precision {fp32,mixed_bfloat16,mixed_float16} --xla (default: fp32, no XLA)
+args = parse_training_args(__doc__)
+set_precision(args.precision)
+
 print("\n" + "="*70)
 print("MENDELEY EYE DISEASE DETECTION - 5 CLASS TRAINING")
 print("Model: EfficientNetB3 + Focal Loss + Enhanced Augmentation")
@@ -84,6 +89,7 @@ def focal_loss(gamma=2.0, alpha=0.25):
     and focusing on hard examples.
     """
     def focal_loss_fixed(y_true, y_pred):
+        y_true, y_pred = tf.cast(y_true, tf.float32), tf.cast(y_pred, tf.float32)  # float32 under mixed precision
         y_pred = tf.clip_by_value(y_pred, 1e-7, 1.0 - 1e-7)
         cross_entropy = -y_true * tf.math.log(y_pred)
         p_t = tf.reduce_sum(y_true * y_pred, axis=-1)
@@ -182,7 +188,7 @@ model = keras.Sequential([
     layers.Dense(512, activation='relu', kernel_regularizer=keras.regularizers.l2(0.001)),
     layers.BatchNormalization(),
     layers.Dropout(0.4),
-    layers.Dense(NUM_CLASSES, activation='softmax')
+    layers.Dense(NUM_CLASSES, activation='softmax', dtype='float32')  # float32 output under mixed precision
 ])
 
 # Compile with Focal Loss
@@ -193,7 +199,8 @@ model.compile(
     metrics=[
         'accuracy',
         keras.metrics.TopKCategoricalAccuracy(k=3, name='top_3_accuracy')
-    ]
+    ],
+    jit_compile=args.xla
 )
 
 print("\n[MODEL] Model architecture:")
@@ -279,7 +286,8 @@ model.compile(
     metrics=[
         'accuracy',
         keras.metrics.TopKCategoricalAccuracy(k=3, name='top_3_accuracy')
-    ]
+    ],
+    jit_compile=args.xla
 )
 
 checkpoint_finetune = ModelCheckpoint(
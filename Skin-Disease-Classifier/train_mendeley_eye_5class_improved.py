@@ -17,6 +17,7 @@ from tensorflow.keras.callbacks import ModelCheckpoint, EarlyStopping, ReduceLRO
 import matplotlib.pyplot as plt
 from sklearn.metrics import classification_report, confusion_matrix
 import seaborn as sns
+from training import parse_training_args, set_precision
 
 # Windows console UTF-8 support
 if sys.platform == 'win32':
@@ -25,6 +26,10 @@ if sys.platform == 'win32':
     except:
         pass
 
+# Command line: --precision {fp32,mixed_bfloat16,mixed_float16} --xla (default: fp32, no XLA)
+args = parse_training_args(__doc__)
+set_precision(args.precision)
+
 print("\n" + "="*70)
 print("MENDELEY EYE DISEASE DETECTION - IMPROVED 5 CLASS TRAINING")
 print("Fixes: Better Loss, Higher Patience, Label Smoothing, Better LR")
@@ -86,6 +91,7 @@ def categorical_crossentropy_smooth(smoothing=0.1):
     Better than focal loss when class imbalance is moderate
     """
     def loss(y_true, y_pred):
+        y_true, y_pred = tf.cast(y_true, tf.float32), tf.cast(y_pred, tf.float32)  # float32 under mixed precision
         y_pred = tf.clip_by_value(y_pred, 1e-7, 1.0 - 1e-7)
         # Apply label smoothing
         num_classes = tf.cast(tf.shape(y_true)[1], tf.float32)
@@ -183,7 +189,7 @@ model = keras.Sequential([
     layers.Dense(256, activation='relu', kernel_regularizer=keras.regularizers.l2(0.0001)),
     layers.BatchNormalization(),
     layers.Dropout(0.3),
-    layers.Dense(NUM_CLASSES, activation='softmax')
+    layers.Dense(NUM_CLASSES, activation='softmax', dtype='float32')  # float32 output under mixed precision
 ])
 
 # Compile with label smoothing loss
@@ -194,7 +200,8 @@ model.compile(
     metrics=[
         'accuracy',
         keras.metrics.TopKCategoricalAccuracy(k=3, name='top_3_accuracy')
-    ]
+    ],
+    jit_compile=args.xla
 )
 
 print("\n[MODEL] Model architecture:")
@@ -297,7 +304,8 @@ model.compile(
     metrics=[
         'accuracy',
         keras.metrics.TopKCategoricalAccuracy(k=3, name='top_3_accuracy')
-    ]
+    ],
+    jit_compile=args.xla
 )
 
 checkpoint_finetune = ModelCheckpoint(
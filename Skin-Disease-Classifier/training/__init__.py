@@ -0,0 +1,28 @@
+"""
+Shared training utilities for the train_*.py scripts and the training engine (train.py).
+"""
+
+from .callbacks import macro_f1_callback
+from .configs import CONFIGS, get_config
+from .data import Augmentation, ImageFolderData, images_per_second_callback, list_image_files
+from .engine import Trainer, dry_run
+from .precision import PRECISIONS, parse_training_args, set_precision
+from .records import RecordData, compile_split, load_split
+
+__all__ = [
+    'Augmentation',
+    'CONFIGS',
+    'ImageFolderData',
+    'PRECISIONS',
+    'RecordData',
+    'Trainer',
+    'compile_split',
+    'dry_run',
+    'get_config',
+    'images_per_second_callback',
+    'list_image_files',
+    'load_split',
+    'macro_f1_callback',
+    'parse_training_args',
+    'set_precision',
+]
@@ -0,0 +1,140 @@
+"""
+Validation macro-F1 callback for the macro-F1 trainers.
+
+The scripts' SklearnMacroF1Callback looped over the validation generator and
+called model.predict() once per batch: one small, unpipelined predict call
+(with its own setup) per batch, plus Python list concatenation, every epoch.
+macro_f1_callback() runs a single model.predict() over the whole validation
+dataset (batched, prefetched, in file order so it lines up with
+val_data.classes) and computes the confusion matrix and per-class
+precision/recall/F1 with NumPy (inference/metrics.py). It can run every N
+epochs; the last epoch is always evaluated.
+
+Logs 'val_sklearn_macro_f1' (same key as before, same value as
+sklearn.metrics.f1_score(average='macro', zero_division=0)) on the epochs it
+runs.
+
+step_time_callback() records per-step times for the engine's dry run
+(training/engine.py).
+"""
+
+import time
+
+import numpy as np
+
+from inference.metrics import classification_scores, confusion_matrix
+
+MACRO_F1_LOG_KEY = 'val_sklearn_macro_f1'
+
+
+def should_evaluate(epoch, every, epochs=None):
+    """True on every `every`-th epoch (1-based) and on the last epoch."""
+    every = max(1, int(every))
+    return (epoch + 1) % every == 0 or (epochs is not None and epoch + 1 >= epochs)
+
+
+def validation_report(y_true, probs, num_classes):
+    """
+    Confusion matrix and per-class scores for one validation pass.
+
+    Args:
+        y_true: Integer labels, shape (N,)
+        probs: Predicted probabilities, shape (N, num_classes)
+
+    Returns:
+        dict: 'macro_f1', 'confusion_matrix' and the classification_scores() arrays
+    """
+    y_pred = np.asarray(probs).argmax(axis=1)
+    cm = confusion_matrix(y_true, y_pred, num_classes)
+    scores = classification_scores(cm)
+    return {'macro_f1': float(scores['f1'].mean()), 'confusion_matrix': cm, **scores}
+
+
+def format_report(report, class_names):
+    """Per-class P/R/F1 table and confusion matrix as printable text."""
+    width = max(len(name) for name in class_names)
+    lines = [f"  {'class':<{width}} {'prec':>6} {'recall':>6} {'f1':>6} {'n':>6}"]
+    for i, name in enumerate(class_names):
+        lines.append(f"  {name:<{width}} {report['precision'][i]:>6.3f} {report['recall'][i]:>6.3f} "
+                     f"{report['f1'][i]:>6.3f} {report['support'][i]:>6d}")
+    lines.append("  confusion matrix (rows: true, columns: predicted):")
+    lines.extend(f"    {' '.join(f'{count:>5d}' for count in row)}" for row in report['confusion_matrix'])
+    return '\n'.join(lines)
+
+
+def macro_f1_callback(val_data, every=1, verbose=1):
+    """
+    Keras callback: full-validation macro F1 from one predict pass.
+
+    Args:
+        val_data: Non-shuffled ImageFolderData / RecordData
+        every: Evaluate every N epochs (the last epoch always)
+        verbose: 0 silent, 1 macro F1 line, 2 also per-class table and confusion matrix
+
+    The callback keeps .history (list of (epoch, report)) and .f1_scores.
+    """
+    from tensorflow import keras
+
+    if val_data.shuffle:
+        raise ValueError("val_data must not be shuffled (predictions are matched to val_data.classes)")
+
+    class MacroF1(keras.callbacks.Callback):
+        def __init__(self):
+            super().__init__()
+            self.history = []
+            self.f1_scores = []
+
+        def on_epoch_end(self, epoch, logs=None):
+            if not should_evaluate(epoch, every, self.params.get('epochs')):
+                return
+            start = time.perf_counter()
+            probs = self.model.predict(val_data.dataset, verbose=0)
+            report = validation_report(val_data.classes, probs, val_data.num_classes)
+            elapsed = time.perf_counter() - start
+
+            self.history.append((epoch, report))
+            self.f1_scores.append(report['macro_f1'])
+            if logs is not None:
+                logs[MACRO_F1_LOG_KEY] = report['macro_f1']
+            if verbose:
+                print(f"\n[Macro F1] Epoch {epoch + 1}: {report['macro_f1']:.4f} "
+                      f"({report['macro_f1'] * 100:.2f}%, {val_data.samples} images, {elapsed:.1f} s)")
+            if verbose > 1:
+                print(format_report(report, val_data.class_names))
+
+    return MacroF1()
+
+
+def step_time_callback():
+    """
+    Keras callback recording the wall time of every training step (.times,
+    seconds), for benchmarks; see median_step_time().
+    """
+    from tensorflow import keras
+
+    class StepTimes(keras.callbacks.Callback):
+        def __init__(self):
+            super().__init__()
+            self.times = []
+            self.epoch_starts = []
+
+        def on_epoch_begin(self, epoch, logs=None):
+            self.epoch_starts.append(len(self.times))
+
+        def on_train_batch_begin(self, batch, logs=None):
+            self._start = time.perf_counter()
+
+        def on_train_batch_end(self, batch, logs=None):
+            self.times.append(time.perf_counter() - self._start)
+
+    return StepTimes()
+
+
+def median_step_time(times, epoch_starts):
+    """
+    Median step time without the first epoch (tracing, XLA compilation,
+    pipeline warm-up); falls back to all steps but the first.
+    """
+    timed = list(times[epoch_starts[1]:]) if len(epoch_starts) > 1 else []
+    timed = timed or list(times[1:]) or list(times)
+    return float(np.median(timed)) if timed else 0.0
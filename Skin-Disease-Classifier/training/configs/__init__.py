@@ -0,0 +1,108 @@
+"""
+Per-disease training configs for the training engine (training/engine.py).
+
+One module per disease defines CONFIG, a dict with:
+
+    title           Printed name
+    class_names     Label order
+    files           (split, class_names) -> (filepaths, labels), see sources.py
+    img_size        (height, width)
+    pipeline        One of inference.preprocessing.PIPELINES
+    color_mode      'rgb' or 'grayscale'
+    batch_size      Default batch size (a phase may override it)
+    augmentation    training.Augmentation keyword arguments
+    backbone        One of BACKBONES (ImageNet weights, no top)
+    head            Layers between GlobalAveragePooling2D and the float32
+                    softmax: ('batchnorm',), ('dropout', rate),
+                    ('dense', units) or ('dense', units, l2)
+    loss            {'name': one of LOSSES, **keyword arguments}
+    class_weights   {class_name: (factor, cap)}: balanced weight x factor,
+                    at most cap; other classes keep the balanced weight
+    top_k           k of the top-k accuracy metric
+    output          Model file stem under models/
+    phases          Training phases, run in order, each starting from the
+                    previous phase's best checkpoint:
+        name                Checkpoint suffix
+        epochs              Maximum epochs
+        learning_rate       Adam learning rate
+        unfreeze            'all', or how many of the backbone's top layers
+                            train (0: frozen backbone)
+        freeze_batchnorm    Keep the backbone's BatchNormalization layers
+                            frozen (default False)
+        batch_size          Optional override
+        checkpoint_monitor  Metric the best checkpoint is chosen by
+        early_stopping      EarlyStopping keyword arguments
+        reduce_lr           ReduceLROnPlateau keyword arguments
+"""
+
+from . import bone, eye, lung, skin
+
+CONFIGS = {
+    'bone': bone.CONFIG,
+    'eye': eye.CONFIG,
+    'lung': lung.CONFIG,
+    'skin': skin.CONFIG,
+}
+
+BACKBONES = ('densenet121', 'efficientnetb2', 'efficientnetb3')
+LOSSES = ('categorical_crossentropy', 'focal_macro_f1', 'soft_macro_f1')
+HEAD_LAYERS = ('batchnorm', 'dropout', 'dense')
+REQUIRED_KEYS = ('title', 'class_names', 'files', 'img_size', 'pipeline', 'batch_size', 'backbone', 'head',
+                 'loss', 'output', 'phases')
+REQUIRED_PHASE_KEYS = ('name', 'epochs', 'learning_rate', 'unfreeze', 'checkpoint_monitor')
+
+
+def validate_config(config):
+    """
+    Check a config's structure.
+
+    Raises:
+        ValueError: Missing key or unknown backbone / loss / head layer / unfreeze value
+    """
+    from inference.preprocessing import PIPELINES
+
+    missing = [key for key in REQUIRED_KEYS if key not in config]
+    if missing:
+        raise ValueError(f"Config is missing {', '.join(missing)}")
+    if config['pipeline'] not in PIPELINES:
+        raise ValueError(f"pipeline must be one of {PIPELINES}, got {config['pipeline']!r}")
+    if config['backbone'] not in BACKBONES:
+        raise ValueError(f"backbone must be one of {BACKBONES}, got {config['backbone']!r}")
+    if config['loss'].get('name') not in LOSSES:
+        raise ValueError(f"loss name must be one of {LOSSES}, got {config['loss'].get('name')!r}")
+    for layer in config['head']:
+        if layer[0] not in HEAD_LAYERS:
+            raise ValueError(f"head layers must be one of {HEAD_LAYERS}, got {layer[0]!r}")
+    unknown = set(config.get('class_weights', {})) - set(config['class_names'])
+    if unknown:
+        raise ValueError(f"class_weights for unknown classes: {', '.join(sorted(unknown))}")
+    if not config['phases']:
+        raise ValueError("Config has no phases")
+
+    names = set()
+    for phase in config['phases']:
+        missing = [key for key in REQUIRED_PHASE_KEYS if key not in phase]
+        if missing:
+            raise ValueError(f"Phase {phase.get('name', '?')!r} is missing {', '.join(missing)}")
+        if phase['name'] in names:
+            raise ValueError(f"Duplicate phase name {phase['name']!r}")
+        names.add(phase['name'])
+        unfreeze = phase['unfreeze']
+        if unfreeze != 'all' and not (isinstance(unfreeze, int) and unfreeze >= 0):
+            raise ValueError(f"Phase {phase['name']!r}: unfreeze must be 'all' or a layer count, got {unfreeze!r}")
+    return config
+
+
+def get_config(name):
+    """
+    Validated config by disease name.
+
+    Raises:
+        KeyError: Unknown name
+    """
+    if name not in CONFIGS:
+        raise KeyError(f"Unknown config {name!r}; available: {', '.join(sorted(CONFIGS))}")
+    return validate_config(CONFIGS[name])
+
+
+__all__ = ['BACKBONES', 'CONFIGS', 'LOSSES', 'get_config', 'validate_config']
@@ -0,0 +1,63 @@
+"""
+Bone X-ray, 4 classes: DenseNet121 + CLAHE, categorical crossentropy with
+balanced class weights. train_bone_4class_macro_f1.py runs this config.
+"""
+
+from .sources import SPLITS, folder_files
+
+EARLY_STOPPING = {'monitor': 'val_macro_f1_metric', 'mode': 'max'}
+REDUCE_LR = {'monitor': 'val_macro_f1_metric', 'mode': 'max', 'factor': 0.3, 'patience': 15, 'min_lr': 1e-8,
+             'cooldown': 5}
+
+CONFIG = {
+    'title': 'Bone X-ray, 4 classes (DenseNet121)',
+    'class_names': ['Normal', 'Fracture', 'Benign_Tumor', 'Malignant_Tumor'],
+    'files': folder_files({split: f'datasets/bone/Bone_4Class_Final/{split}' for split in SPLITS}),
+    'img_size': (384, 384),
+    'pipeline': 'densenet_clahe',
+    'color_mode': 'rgb',
+    'batch_size': 16,
+    # X-ray: no flips (anatomical orientation), black fill
+    'augmentation': {
+        'rotation_range': 22,
+        'width_shift_range': 0.2,
+        'height_shift_range': 0.2,
+        'shear_range': 0.11,
+        'zoom_range': 0.22,
+        'channel_shift_range': 0.15,
+        'fill_mode': 'constant',
+        'cval': 0.0,
+        'brightness_range': [0.85, 1.15],
+    },
+    'backbone': 'densenet121',
+    'head': [
+        ('batchnorm',), ('dropout', 0.5),
+        ('dense', 256, 0.001), ('batchnorm',), ('dropout', 0.5),
+        ('dense', 128, 0.001), ('batchnorm',), ('dropout', 0.4),
+    ],
+    'loss': {'name': 'categorical_crossentropy'},
+    # Balanced weight x factor, capped
+    'class_weights': {'Fracture': (1.1, 2.0), 'Benign_Tumor': (1.3, 2.5), 'Malignant_Tumor': (1.2, 2.0)},
+    'top_k': 2,
+    'output': 'bone_disease_model_4class_densenet121_macro_f1',
+    'phases': [
+        {
+            'name': 'initial',
+            'epochs': 150,
+            'learning_rate': 1e-4,
+            'unfreeze': 150,
+            'checkpoint_monitor': 'val_macro_f1_metric',
+            'early_stopping': {**EARLY_STOPPING, 'patience': 25, 'min_delta': 0.003},
+            'reduce_lr': REDUCE_LR,
+        },
+        {
+            'name': 'finetuned',
+            'epochs': 80,
+            'learning_rate': 1e-5,
+            'unfreeze': 'all',
+            'checkpoint_monitor': 'val_macro_f1_metric',
+            'early_stopping': {**EARLY_STOPPING, 'patience': 20, 'min_delta': 0.002},
+            'reduce_lr': REDUCE_LR,
+        },
+    ],
+}
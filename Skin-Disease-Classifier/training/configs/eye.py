@@ -0,0 +1,60 @@
+"""
+Eye fundus (Mendeley), 5 classes: EfficientNetB3 on [0, 1] inputs with
+label smoothing and inverse-frequency class weights
+(train_mendeley_eye_5class_improved.py).
+"""
+
+from .sources import SPLITS, folder_files
+
+CONFIG = {
+    'title': 'Eye fundus, 5 classes (EfficientNetB3)',
+    'class_names': ['Diabetic_Retinopathy', 'Glaucoma', 'Macular_Scar', 'Myopia', 'Normal'],
+    'files': folder_files({split: f'datasets/Eye_Mendeley/{split}' for split in SPLITS}),
+    'img_size': (256, 256),
+    'pipeline': 'rescale',
+    'color_mode': 'rgb',
+    'batch_size': 32,
+    'augmentation': {
+        'rotation_range': 20,
+        'width_shift_range': 0.15,
+        'height_shift_range': 0.15,
+        'shear_range': 0.1,
+        'zoom_range': 0.2,
+        'horizontal_flip': True,
+        'fill_mode': 'reflect',
+        'brightness_range': [0.8, 1.2],
+        'channel_shift_range': 10,
+    },
+    'backbone': 'efficientnetb3',
+    'head': [
+        ('batchnorm',), ('dropout', 0.5),
+        ('dense', 512, 0.0001), ('batchnorm',), ('dropout', 0.4),
+        ('dense', 256, 0.0001), ('batchnorm',), ('dropout', 0.3),
+    ],
+    'loss': {'name': 'categorical_crossentropy', 'label_smoothing': 0.1},
+    'class_weights': {},
+    'top_k': 3,
+    'output': 'eye_disease_model_5class_improved',
+    'phases': [
+        {
+            'name': 'initial',
+            'epochs': 100,
+            'learning_rate': 5e-4,
+            'unfreeze': 0,
+            'checkpoint_monitor': 'val_accuracy',
+            'early_stopping': {'monitor': 'val_accuracy', 'mode': 'max', 'patience': 50, 'min_delta': 0.001},
+            'reduce_lr': {'monitor': 'val_loss', 'mode': 'min', 'factor': 0.5, 'patience': 10, 'min_lr': 1e-7,
+                          'cooldown': 5},
+        },
+        {
+            'name': 'finetuned',
+            'epochs': 50,
+            'learning_rate': 5e-5,
+            'unfreeze': 120,
+            'checkpoint_monitor': 'val_accuracy',
+            'early_stopping': {'monitor': 'val_accuracy', 'mode': 'max', 'patience': 30, 'min_delta': 0.001},
+            'reduce_lr': {'monitor': 'val_loss', 'mode': 'min', 'factor': 0.5, 'patience': 10, 'min_lr': 1e-7,
+                          'cooldown': 5},
+        },
+    ],
+}
@@ -0,0 +1,74 @@
+"""
+Lung X-ray, 3 classes: DenseNet121 + CLAHE on the combined Lung and
+Infection Segmentation datasets, gradual unfreezing with a smaller
+fine-tuning batch. train_lung_3class_densenet121_macro_f1.py runs this
+config.
+"""
+
+from .sources import lung_files
+
+EARLY_STOPPING = {'monitor': 'val_macro_f1_metric', 'mode': 'max', 'patience': 15}
+REDUCE_LR = {'monitor': 'val_macro_f1_metric', 'mode': 'max', 'factor': 0.3, 'patience': 15, 'min_lr': 1e-8,
+             'cooldown': 5}
+
+CONFIG = {
+    'title': 'Lung X-ray, 3 classes (DenseNet121)',
+    'class_names': ['COVID-19', 'Non-COVID', 'Normal'],
+    'files': lung_files,
+    'img_size': (384, 384),
+    'pipeline': 'densenet_clahe',
+    'color_mode': 'rgb',
+    'batch_size': 16,
+    'augmentation': {
+        'rotation_range': 22,
+        'width_shift_range': 0.2,
+        'height_shift_range': 0.2,
+        'horizontal_flip': True,
+        'zoom_range': 0.2,
+        'brightness_range': [0.8, 1.2],
+        'fill_mode': 'nearest',
+    },
+    'backbone': 'densenet121',
+    'head': [
+        ('batchnorm',), ('dropout', 0.5),
+        ('dense', 256, 0.001), ('batchnorm',), ('dropout', 0.5),
+        ('dense', 128, 0.001), ('batchnorm',), ('dropout', 0.4),
+    ],
+    'loss': {'name': 'categorical_crossentropy'},
+    'class_weights': {'COVID-19': (1.2, 2.0)},
+    'top_k': 2,
+    'output': 'lung_3class_densenet121_macro_f1',
+    'phases': [
+        {
+            'name': 'initial',
+            'epochs': 150,
+            'learning_rate': 1e-4,
+            'unfreeze': 150,
+            'checkpoint_monitor': 'val_macro_f1_metric',
+            'early_stopping': {**EARLY_STOPPING, 'min_delta': 0.003},
+            'reduce_lr': REDUCE_LR,
+        },
+        {
+            'name': 'phase2a',
+            'epochs': 40,
+            'learning_rate': 1e-5,
+            'batch_size': 4,  # backbone gradients need ~2-3x the memory
+            'unfreeze': 15,
+            'freeze_batchnorm': True,
+            'checkpoint_monitor': 'val_macro_f1_metric',
+            'early_stopping': {**EARLY_STOPPING, 'min_delta': 0.002},
+            'reduce_lr': REDUCE_LR,
+        },
+        {
+            'name': 'finetuned',
+            'epochs': 40,
+            'learning_rate': 5e-6,
+            'batch_size': 4,
+            'unfreeze': 'all',
+            'freeze_batchnorm': True,
+            'checkpoint_monitor': 'val_macro_f1_metric',
+            'early_stopping': {**EARLY_STOPPING, 'min_delta': 0.002},
+            'reduce_lr': REDUCE_LR,
+        },
+    ],
+}
@@ -0,0 +1,70 @@
+"""
+Skin lesions (HAM10000), 5 classes: EfficientNetB3, weighted crossentropy
+with label smoothing; checkpoints on macro F1, early stopping and LR
+schedule on the smoother val_loss. train_skin_6class_efficientnetb3_macro_f1.py
+runs this config.
+"""
+
+from .sources import SPLITS, folder_files
+
+CONFIG = {
+    'title': 'Skin lesions, 5 classes (EfficientNetB3)',
+    'class_names': ['akiec', 'bcc', 'bkl', 'mel', 'nv'],
+    'files': folder_files({split: f'datasets/HAM10000/base_dir/{split}_dir' for split in SPLITS}),
+    'img_size': (300, 300),
+    'pipeline': 'efficientnet',
+    'color_mode': 'rgb',
+    'batch_size': 16,
+    # Dermoscopy-safe: horizontal flip only, reflect fill
+    'augmentation': {
+        'rotation_range': 20,
+        'width_shift_range': 0.15,
+        'height_shift_range': 0.15,
+        'zoom_range': 0.15,
+        'shear_range': 0.1,
+        'horizontal_flip': True,
+        'brightness_range': [0.9, 1.1],
+        'fill_mode': 'reflect',
+    },
+    'backbone': 'efficientnetb3',
+    'head': [
+        ('batchnorm',),
+        ('dense', 256), ('batchnorm',), ('dropout', 0.3),
+        ('dense', 128), ('dropout', 0.2),
+    ],
+    'loss': {'name': 'categorical_crossentropy', 'label_smoothing': 0.01},
+    'class_weights': {},
+    'top_k': 2,
+    'output': 'skin_disease_model_5class_efficientnetb3_macro_f1',
+    'phases': [
+        {
+            'name': 'phase1',
+            'epochs': 100,
+            'learning_rate': 1e-4,
+            'unfreeze': 0,
+            'checkpoint_monitor': 'val_macro_f1_metric',
+            'early_stopping': {'monitor': 'val_loss', 'mode': 'min', 'patience': 15, 'min_delta': 0.001},
+            'reduce_lr': {'monitor': 'val_loss', 'mode': 'min', 'factor': 0.5, 'patience': 5, 'min_lr': 1e-7},
+        },
+        {
+            'name': 'phase2a',
+            'epochs': 10,
+            'learning_rate': 5e-5,
+            'unfreeze': 15,
+            'freeze_batchnorm': True,
+            'checkpoint_monitor': 'val_macro_f1_metric',
+            'early_stopping': {'monitor': 'val_loss', 'mode': 'min', 'patience': 10, 'min_delta': 0.001},
+            'reduce_lr': {'monitor': 'val_loss', 'mode': 'min', 'factor': 0.5, 'patience': 5, 'min_lr': 1e-7},
+        },
+        {
+            'name': 'finetuned',
+            'epochs': 40,
+            'learning_rate': 5e-5,
+            'unfreeze': 30,
+            'freeze_batchnorm': True,
+            'checkpoint_monitor': 'val_macro_f1_metric',
+            'early_stopping': {'monitor': 'val_loss', 'mode': 'min', 'patience': 20, 'min_delta': 0.002},
+            'reduce_lr': {'monitor': 'val_loss', 'mode': 'min', 'factor': 0.5, 'patience': 10, 'min_lr': 1e-6},
+        },
+    ],
+}
@@ -0,0 +1,44 @@
+"""
+Where each disease's images come from: callables (split, class_names) ->
+(filepaths, labels), split being 'train', 'val' or 'test'.
+
+Shared by the training engine (ImageFolderData(files=...)) and
+compile_dataset.py, so both see the same files in the same order.
+"""
+
+import os
+
+import numpy as np
+
+from ..data import list_image_files
+
+SPLITS = ('train', 'val', 'test')
+
+LUNG_SEG_DIR = 'datasets/Lung Segmentation Data/Lung Segmentation Data'
+INFECTION_SEG_DIR = 'datasets/Infection Segmentation Data/Infection Segmentation Data'
+LUNG_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+
+def folder_files(split_dirs):
+    """Class-per-subdirectory splits (flow_from_directory layout)."""
+    return lambda split, class_names: list_image_files(split_dirs[split], class_names)
+
+
+def lung_files(split, class_names):
+    """
+    Lung + Infection Segmentation images in the order of the lung trainer's
+    combine_datasets() directory (ds1_* then ds2_*, each sorted), without
+    copying them into a temporary directory.
+    """
+    filepaths, labels = [], []
+    split_name = split.capitalize()
+    for label, class_name in enumerate(class_names):
+        for base_dir in (LUNG_SEG_DIR, INFECTION_SEG_DIR):
+            image_dir = os.path.join(base_dir, split_name, class_name, 'images')
+            if not os.path.exists(image_dir):
+                continue
+            for name in sorted(os.listdir(image_dir)):
+                if name.lower().endswith(LUNG_EXTENSIONS):
+                    filepaths.append(os.path.join(image_dir, name))
+                    labels.append(label)
+    return filepaths, np.asarray(labels, dtype=np.int32)
@@ -0,0 +1,359 @@
+"""
+tf.data input pipeline for the training scripts.
+
+The macro-F1 trainers used ImageDataGenerator.flow_from_directory with a
+Python preprocessing_function, so decoding, augmentation and CLAHE ran
+single-threaded in Python while the model waited. ImageFolderData builds the
+same inputs as a tf.data pipeline:
+
+    file list -> shuffle -> parallel decode + resize -> augmentation
+      -> preprocessing (grayscale check, CLAHE, normalization) -> batch -> prefetch
+
+Every step runs in TensorFlow's thread pool (num_parallel_calls=AUTOTUNE);
+only CLAHE goes through tf.numpy_function, and OpenCV releases the GIL while
+it works.
+
+Reproduces flow_from_directory + the scripts' preprocessing functions:
+
+  - files: same listing and label order (classes in the given order,
+    files sorted, same extensions, subdirectories included)
+  - decode/resize: RGB (or grayscale) decode, nearest-neighbour resize
+    (load_img's default)
+  - augmentation: same parameter distributions and order as
+    ImageDataGenerator.random_transform / apply_transform (affine with
+    bilinear interpolation and fill mode, channel shift, flips, brightness
+    on the uint8 image)
+  - preprocessing: see PIPELINES in inference/preprocessing.py;
+    densenet_clahe casts to uint8, applies CLAHE (clipLimit=2.0, 8x8) to
+    grayscale images and ImageNet mean/std normalization; efficientnet passes
+    float32 [0, 255] through; rescale divides by 255
+
+Labels are one-hot float32 (class_mode='categorical').
+
+TensorFlow is imported lazily so the file listing can be used (and tested)
+without it.
+"""
+
+import math
+import os
+import time
+
+import numpy as np
+
+from inference.preprocessing import CLAHE_AVAILABLE, IMAGENET_MEAN, IMAGENET_STD, PIPELINES, apply_clahe
+
+# keras.preprocessing.image white-list formats
+IMAGE_EXTENSIONS = ('png', 'jpg', 'jpeg', 'bmp', 'ppm', 'tif', 'tiff')
+COLOR_MODES = ('rgb', 'grayscale')
+FILL_MODES = ('constant', 'nearest', 'reflect', 'wrap')
+
+
+def list_image_files(directory, class_names):
+    """
+    Image files and labels in flow_from_directory order.
+
+    Args:
+        directory: Split directory with one subdirectory per class
+        class_names: Class subdirectory names; the index is the label
+
+    Returns:
+        tuple: (list of file paths, np.ndarray of int32 labels)
+    """
+    filepaths = []
+    labels = []
+    for label, class_name in enumerate(class_names):
+        class_dir = os.path.join(directory, class_name)
+        for root, _, files in sorted(os.walk(class_dir, followlinks=False), key=lambda entry: entry[0]):
+            for name in sorted(files):
+                if name.lower().endswith(tuple('.' + ext for ext in IMAGE_EXTENSIONS)):
+                    filepaths.append(os.path.join(root, name))
+                    labels.append(label)
+    return filepaths, np.asarray(labels, dtype=np.int32)
+
+
+class Augmentation:
+    """
+    Random augmentation with ImageDataGenerator's parameters and semantics.
+
+    Shifts below 1 are fractions of the image size, above 1 pixels; rotation
+    and shear are in degrees; zoom_range z samples row and column zoom
+    independently from [1 - z, 1 + z]; brightness_range is a (low, high)
+    factor range applied to the uint8 image.
+    """
+
+    def __init__(self, rotation_range=0.0, width_shift_range=0.0, height_shift_range=0.0,
+                 shear_range=0.0, zoom_range=0.0, channel_shift_range=0.0,
+                 horizontal_flip=False, vertical_flip=False, brightness_range=None,
+                 fill_mode='nearest', cval=0.0):
+        if fill_mode not in FILL_MODES:
+            raise ValueError(f"fill_mode must be one of {FILL_MODES}, got {fill_mode!r}")
+        if np.isscalar(zoom_range):
+            zoom_range = (1.0 - zoom_range, 1.0 + zoom_range)
+        self.rotation_range = float(rotation_range)
+        self.width_shift_range = float(width_shift_range)
+        self.height_shift_range = float(height_shift_range)
+        self.shear_range = float(shear_range)
+        self.zoom_range = tuple(float(z) for z in zoom_range)
+        self.channel_shift_range = float(channel_shift_range)
+        self.horizontal_flip = bool(horizontal_flip)
+        self.vertical_flip = bool(vertical_flip)
+        self.brightness_range = tuple(brightness_range) if brightness_range is not None else None
+        self.fill_mode = fill_mode
+        self.cval = float(cval)
+
+    @property
+    def has_affine(self):
+        return bool(self.rotation_range or self.width_shift_range or self.height_shift_range
+                    or self.shear_range or self.zoom_range != (1.0, 1.0))
+
+    def __call__(self, image):
+        """Augment one float32 (H, W, C) image with values in [0, 255]."""
+        import tensorflow as tf
+
+        if self.has_affine:
+            image = self._affine(image)
+        if self.channel_shift_range:
+            intensity = tf.random.uniform([], -self.channel_shift_range, self.channel_shift_range)
+            image = tf.clip_by_value(image + intensity, tf.reduce_min(image), tf.reduce_max(image))
+        if self.horizontal_flip:
+            image = tf.cond(tf.random.uniform([]) < 0.5, lambda: tf.reverse(image, [1]), lambda: image)
+        if self.vertical_flip:
+            image = tf.cond(tf.random.uniform([]) < 0.5, lambda: tf.reverse(image, [0]), lambda: image)
+        if self.brightness_range is not None:
+            # PIL ImageEnhance.Brightness on the uint8 image: truncate, scale, truncate
+            factor = tf.random.uniform([], self.brightness_range[0], self.brightness_range[1])
+            image = tf.clip_by_value(tf.floor(tf.floor(image) * factor), 0.0, 255.0)
+        return image
+
+    def _uniform(self, limit):
+        import tensorflow as tf
+        return tf.random.uniform([], -limit, limit) if limit else tf.constant(0.0)
+
+    def _shift(self, limit, size):
+        shift = self._uniform(limit)
+        return shift * size if 0 < limit < 1 else shift
+
+    def _affine(self, image):
+        """
+        Rotation, shift, shear and zoom as in keras apply_affine_transform:
+        one matrix in (row, col) index space, centered on the image, mapping
+        output pixels to input pixels.
+        """
+        import tensorflow as tf
+
+        height = tf.cast(tf.shape(image)[0], tf.float32)
+        width = tf.cast(tf.shape(image)[1], tf.float32)
+        theta = self._uniform(self.rotation_range) * (math.pi / 180.0)
+        tx = self._shift(self.height_shift_range, height)
+        ty = self._shift(self.width_shift_range, width)
+        shear = self._uniform(self.shear_range) * (math.pi / 180.0)
+        zx = tf.random.uniform([], self.zoom_range[0], self.zoom_range[1])
+        zy = tf.random.uniform([], self.zoom_range[0], self.zoom_range[1])
+
+        one, zero = tf.constant(1.0), tf.constant(0.0)
+        rotation = tf.stack([[tf.cos(theta), -tf.sin(theta), zero],
+                             [tf.sin(theta), tf.cos(theta), zero],
+                             [zero, zero, one]])
+        shift = tf.stack([[one, zero, tx], [zero, one, ty], [zero, zero, one]])
+        shear_matrix = tf.stack([[one, -tf.sin(shear), zero], [zero, tf.cos(shear), zero], [zero, zero, one]])
+        zoom = tf.stack([[zx, zero, zero], [zero, zy, zero], [zero, zero, one]])
+        o_x, o_y = height / 2.0 - 0.5, width / 2.0 - 0.5
+        offset = tf.stack([[one, zero, o_x], [zero, one, o_y], [zero, zero, one]])
+        reset = tf.stack([[one, zero, -o_x], [zero, one, -o_y], [zero, zero, one]])
+        m = offset @ (rotation @ shift @ shear_matrix @ zoom) @ reset
+
+        # ImageProjectiveTransform uses (x=col, y=row): swap the row/col roles
+        transform = tf.stack([m[1, 1], m[1, 0], m[1, 2], m[0, 1], m[0, 0], m[0, 2], zero, zero])
+        return tf.raw_ops.ImageProjectiveTransformV3(
+            images=image[tf.newaxis],
+            transforms=transform[tf.newaxis],
+            output_shape=tf.shape(image)[:2],
+            fill_value=self.cval,
+            interpolation='BILINEAR',
+            fill_mode=self.fill_mode.upper()
+        )[0]
+
+
+class ImageFolderData:
+    """
+    A class-per-subdirectory image split as a batched tf.data pipeline.
+
+    Exposes the flow_from_directory attributes the scripts use (samples,
+    classes, class_indices, num_classes, filepaths, len() = steps per epoch);
+    pass .dataset to model.fit / evaluate / predict.
+
+    Args:
+        directory: Split directory
+        class_names: Class subdirectory names (label order)
+        img_size: (height, width)
+        batch_size: Batch size (the last batch may be smaller)
+        pipeline: One of inference.preprocessing.PIPELINES
+        augmentation: Augmentation for training, None for validation/test
+        shuffle: Reshuffle the file order every epoch
+        seed: Shuffle seed
+        color_mode: 'rgb' or 'grayscale'
+        clahe: CLAHE on grayscale images (densenet_clahe only, default: when OpenCV is available)
+        files: (filepaths, labels) to use instead of listing directory
+    """
+
+    def __init__(self, directory, class_names, img_size, batch_size, pipeline,
+                 augmentation=None, shuffle=False, seed=None, color_mode='rgb', clahe=None, files=None):
+        if pipeline not in PIPELINES:
+            raise ValueError(f"pipeline must be one of {PIPELINES}, got {pipeline!r}")
+        if color_mode not in COLOR_MODES:
+            raise ValueError(f"color_mode must be one of {COLOR_MODES}, got {color_mode!r}")
+        self.directory = directory
+        self.class_names = list(class_names)
+        self.img_size = tuple(img_size)
+        self.batch_size = int(batch_size)
+        self.pipeline = pipeline
+        self.augmentation = augmentation
+        self.shuffle = shuffle
+        self.seed = seed
+        self.color_mode = color_mode
+        self.clahe = pipeline == 'densenet_clahe' and (CLAHE_AVAILABLE if clahe is None else clahe)
+
+        if files is None:
+            files = list_image_files(directory, self.class_names)
+        self.filepaths = list(files[0])
+        self.classes = np.asarray(files[1], dtype=np.int32)
+        self.class_indices = {name: i for i, name in enumerate(self.class_names)}
+        self._dataset = None
+
+    @property
+    def samples(self):
+        return len(self.filepaths)
+
+    @property
+    def num_classes(self):
+        return len(self.class_names)
+
+    def __len__(self):
+        return math.ceil(self.samples / self.batch_size)
+
+    @property
+    def dataset(self):
+        """tf.data.Dataset of (images, one-hot labels) batches (built once)."""
+        if self._dataset is None:
+            self._dataset = self.build()
+        return self._dataset
+
+    def build(self):
+        import tensorflow as tf
+
+        autotune = tf.data.AUTOTUNE
+        # Validation/test keep file order so predictions line up with .classes
+        dataset = self.source().map(self._load, num_parallel_calls=autotune, deterministic=not self.shuffle)
+        return dataset.batch(self.batch_size).prefetch(autotune)
+
+    def source(self):
+        """Dataset of the elements read() takes, shuffled if requested: (path, label)."""
+        import tensorflow as tf
+
+        dataset = tf.data.Dataset.from_tensor_slices((self.filepaths, self.classes))
+        if self.shuffle:
+            dataset = dataset.shuffle(max(1, self.samples), seed=self.seed, reshuffle_each_iteration=True)
+        return dataset
+
+    def read(self, path, label):
+        """Element -> (float32 image in [0, 255], label)."""
+        return self.decode(path), label
+
+    def _load(self, *element):
+        import tensorflow as tf
+
+        image, label = self.read(*element)
+        if self.augmentation is not None:
+            image = self.augmentation(image)
+        image = self.preprocess(image)
+        return image, tf.one_hot(label, self.num_classes, dtype=tf.float32)
+
+    def decode(self, path):
+        """File -> resized float32 (H, W, C) image with values in [0, 255] (load_img + img_to_array)."""
+        import tensorflow as tf
+
+        channels = 3 if self.color_mode == 'rgb' else 1
+        data = tf.io.read_file(path)
+        # INTEGER_ACCURATE is libjpeg's default (ISLOW), which PIL uses
+        image = tf.cond(
+            tf.io.is_jpeg(data),
+            lambda: tf.io.decode_jpeg(data, channels=channels, dct_method='INTEGER_ACCURATE'),
+            lambda: tf.io.decode_image(data, channels=channels, dtype=tf.uint8, expand_animations=False)
+        )
+        image = tf.image.resize(image, self.img_size, method='nearest')
+        image.set_shape((*self.img_size, channels))
+        return tf.cast(image, tf.float32)
+
+    def preprocess(self, image):
+        """The scripts' preprocessing_function on a float32 (H, W, C) image."""
+        return self.normalize(self.enhance(image))
+
+    def enhance(self, image):
+        """
+        Pixel-level preprocessing before normalization. densenet_clahe: uint8
+        (H, W, 3) with CLAHE on grayscale images; other pipelines: unchanged.
+        """
+        import tensorflow as tf
+
+        if self.pipeline != 'densenet_clahe':
+            return image
+
+        # Back to uint8 (values <= 1 are taken as [0, 1] images)
+        image = tf.cond(tf.reduce_max(image) <= 1.0, lambda: image * 255.0, lambda: image)
+        image = tf.cast(tf.clip_by_value(image, 0.0, 255.0), tf.uint8)
+        if image.shape[-1] == 1:
+            image = tf.repeat(image, 3, axis=-1)
+            grayscale = tf.constant(True)
+        else:
+            grayscale = tf.reduce_all(tf.equal(image[..., 0], image[..., 1])) & \
+                tf.reduce_all(tf.equal(image[..., 1], image[..., 2]))
+        if self.clahe:
+            image = tf.cond(grayscale, lambda: self._clahe(image), lambda: image)
+        return image
+
+    def normalize(self, image):
+        """enhance() output -> model input."""
+        import tensorflow as tf
+
+        if self.pipeline == 'efficientnet':
+            return image
+        if self.pipeline == 'rescale':
+            return image * (1.0 / 255.0)
+        # keras.applications.densenet.preprocess_input ('torch' mode), same operation order
+        image = tf.cast(image, tf.float32) / 255.0
+        return (image - IMAGENET_MEAN) / IMAGENET_STD
+
+    def _clahe(self, image):
+        import tensorflow as tf
+
+        gray = tf.numpy_function(apply_clahe, [image[..., 0]], tf.uint8, stateful=False)
+        gray.set_shape(self.img_size)
+        return tf.repeat(gray[..., tf.newaxis], 3, axis=-1)
+
+
+def images_per_second_callback(samples_per_epoch, verbose=1):
+    """
+    Keras callback that logs training throughput (images/sec) per epoch,
+    measured up to the last training batch (validation excluded).
+
+    Args:
+        samples_per_epoch: Training images per epoch (ImageFolderData.samples)
+    """
+    from tensorflow import keras
+
+    class ImagesPerSecond(keras.callbacks.Callback):
+        def on_epoch_begin(self, epoch, logs=None):
+            self._start = self._last_batch = time.perf_counter()
+
+        def on_train_batch_end(self, batch, logs=None):
+            self._last_batch = time.perf_counter()
+
+        def on_epoch_end(self, epoch, logs=None):
+            elapsed = self._last_batch - self._start
+            rate = samples_per_epoch / elapsed if elapsed > 0 else 0.0
+            if logs is not None:
+                logs['images_per_sec'] = rate
+            if verbose:
+                print(f"\n[THROUGHPUT] Epoch {epoch + 1}: {rate:.1f} images/sec ({elapsed:.1f} s)")
+
+    return ImagesPerSecond()
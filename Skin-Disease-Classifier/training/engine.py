@@ -0,0 +1,361 @@
+"""
+Training engine: runs a per-disease config (training/configs) through the
+flow each train_*.py script implemented on its own:
+
+    splits (tf.data on the image files, or the compiled TFRecord cache)
+      -> balanced class weights (+ the config's per-class adjustments)
+      -> model built under the distribution strategy
+      -> per phase: trainable layers, compile (--precision policy, --xla),
+         fit with validation macro F1 / checkpoint / early stopping /
+         ReduceLROnPlateau, reload the best checkpoint
+      -> test report, final model and history JSON
+
+The input pipeline, cache, mixed precision, XLA and multi-GPU
+(MirroredStrategy; batch sizes are global) live here once, so every
+disease gets them.
+
+dry_run() trains the same config for a few steps per phase on synthetic
+images (training/synthetic.py) with random backbone weights and reports the
+median step time per phase; compare_to_baseline() turns two such results
+into a regression check.
+
+TensorFlow is imported lazily so configs, class weights and the baseline
+comparison can be used (and tested) without it.
+"""
+
+import gc
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from .callbacks import format_report, macro_f1_callback, median_step_time, step_time_callback, validation_report
+from .configs.sources import SPLITS, folder_files
+from .data import Augmentation, images_per_second_callback
+from .records import compile_split, load_split
+
+STRATEGIES = ('auto', 'default', 'mirrored')
+
+
+def strategy_name(requested, gpu_count):
+    """'auto' -> 'mirrored' with more than one GPU, else 'default'."""
+    if requested not in STRATEGIES:
+        raise ValueError(f"strategy must be one of {STRATEGIES}, got {requested!r}")
+    if requested == 'auto':
+        return 'mirrored' if gpu_count > 1 else 'default'
+    return requested
+
+
+def get_strategy(requested='auto', verbose=1):
+    """tf.distribute strategy (GPU memory growth enabled on every GPU)."""
+    import tensorflow as tf
+
+    gpus = tf.config.list_physical_devices('GPU')
+    for gpu in gpus:
+        try:
+            tf.config.experimental.set_memory_growth(gpu, True)
+        except (RuntimeError, ValueError):
+            pass  # already initialized
+    name = strategy_name(requested, len(gpus))
+    strategy = tf.distribute.MirroredStrategy() if name == 'mirrored' else tf.distribute.get_strategy()
+    if verbose:
+        print(f"[STRATEGY] {name}: {strategy.num_replicas_in_sync} replica(s), {len(gpus)} GPU(s)")
+    return strategy
+
+
+def class_weights(labels, class_names, adjustments=None):
+    """
+    sklearn's 'balanced' weights (n / (k * count)), then for the classes in
+    adjustments {name: (factor, cap)}: min(weight * factor, cap). Classes
+    without samples get 1.0.
+
+    Returns:
+        dict: label -> weight (model.fit class_weight)
+    """
+    counts = np.bincount(np.asarray(labels, dtype=np.int64), minlength=len(class_names))
+    weights = {}
+    for index, name in enumerate(class_names):
+        weight = counts.sum() / (len(class_names) * counts[index]) if counts[index] else 1.0
+        if name in (adjustments or {}):
+            factor, cap = adjustments[name]
+            weight = min(weight * factor, cap)
+        weights[index] = float(weight)
+    return weights
+
+
+def monitor_mode(monitor):
+    """'min' for losses, 'max' for scores."""
+    return 'min' if monitor.endswith('loss') else 'max'
+
+
+def compare_to_baseline(result, baseline, tolerance=0.2):
+    """
+    Phases whose median step time grew by more than `tolerance` (0.2 = 20%).
+
+    Args:
+        result, baseline: dry_run() / Trainer.train() results
+
+    Returns:
+        list of messages, empty if nothing regressed
+    """
+    regressions = []
+    for name, phase in result['phases'].items():
+        reference = baseline.get('phases', {}).get(name)
+        if not reference or not reference.get('step_ms') or not phase.get('step_ms'):
+            continue
+        change = phase['step_ms'] / reference['step_ms'] - 1.0
+        if change > tolerance:
+            regressions.append(f"{name}: {phase['step_ms']:.1f} ms/step vs {reference['step_ms']:.1f} "
+                               f"(+{change * 100:.0f}%)")
+    return regressions
+
+
+class Trainer:
+    """
+    Runs one training config.
+
+    Call training.set_precision() before creating the Trainer: the dtype
+    policy must be in place when the model is built.
+
+    Args:
+        config: Training config (training/configs)
+        xla: jit_compile the train/evaluate/predict steps
+        strategy: One of STRATEGIES
+        cache_root: compile_dataset.py cache of this config (<cache_root>/<split>), None for the image files
+        model_dir: Checkpoints, final model and history
+        macro_f1_every: Full-validation macro F1 every N epochs
+        weights: Backbone weights ('imagenet', or None for random initialization)
+        verbose: 0 silent, 1 progress
+    """
+
+    def __init__(self, config, xla=False, strategy='auto', cache_root=None, model_dir='models',
+                 macro_f1_every=1, weights='imagenet', verbose=1):
+        self.config = config
+        self.xla = xla
+        self.cache_root = cache_root
+        self.model_dir = model_dir
+        self.macro_f1_every = macro_f1_every
+        self.weights = weights
+        self.verbose = verbose
+        self.strategy = get_strategy(strategy, verbose)
+        self.num_classes = len(config['class_names'])
+        self._splits = {}
+        self._class_weight = None
+
+    def split(self, name, batch_size):
+        """
+        ImageFolderData / RecordData for a split (built once per batch size).
+
+        Raises:
+            FileNotFoundError: The split has no images
+        """
+        key = (name, batch_size)
+        if key not in self._splits:
+            config = self.config
+            train = name == 'train'
+            augmentation = Augmentation(**config['augmentation']) if train and config.get('augmentation') else None
+            # The cache records its own file list
+            files = {} if self.cache_root else {'files': config['files'](name, config['class_names'])}
+            data = load_split(
+                name,
+                None,
+                config['class_names'],
+                img_size=config['img_size'],
+                batch_size=batch_size,
+                pipeline=config['pipeline'],
+                augmentation=augmentation,
+                shuffle=train,
+                seed=42 if train else None,
+                color_mode=config.get('color_mode', 'rgb'),
+                cache_root=self.cache_root,
+                **files
+            )
+            if not data.samples:
+                raise FileNotFoundError(f"No {name} images for {config['title']}; check the config's files")
+            self._splits[key] = data
+        return self._splits[key]
+
+    @property
+    def class_weight(self):
+        if self._class_weight is None:
+            train = self.split('train', self.config['batch_size'])
+            self._class_weight = class_weights(train.classes, self.config['class_names'],
+                                               self.config.get('class_weights'))
+        return self._class_weight
+
+    def checkpoint_path(self, phase):
+        return os.path.join(self.model_dir, f"{self.config['output']}_{phase['name']}.keras")
+
+    def callbacks(self, phase, val_data, samples_per_epoch):
+        from tensorflow import keras
+
+        monitor = phase['checkpoint_monitor']
+        # Macro F1 first: later callbacks see its log key in the same epoch
+        callbacks = [
+            macro_f1_callback(val_data, every=self.macro_f1_every, verbose=self.verbose),
+            keras.callbacks.ModelCheckpoint(self.checkpoint_path(phase), monitor=monitor, mode=monitor_mode(monitor),
+                                            save_best_only=True, verbose=self.verbose),
+        ]
+        if phase.get('early_stopping'):
+            callbacks.append(keras.callbacks.EarlyStopping(
+                **{'restore_best_weights': True, 'verbose': self.verbose, **phase['early_stopping']}
+            ))
+        if phase.get('reduce_lr'):
+            callbacks.append(keras.callbacks.ReduceLROnPlateau(**{'verbose': self.verbose, **phase['reduce_lr']}))
+        callbacks.append(images_per_second_callback(samples_per_epoch, verbose=self.verbose))
+        return callbacks
+
+    def run_phase(self, model, phase, epochs=None, steps_per_epoch=None):
+        """
+        Train one phase and reload its best checkpoint.
+
+        Returns:
+            tuple: (model, phase record dict, Keras history dict)
+        """
+        from .model import backbone_of, compile_model, load_checkpoint, set_trainable
+
+        batch_size = phase.get('batch_size', self.config['batch_size'])
+        train_data, val_data = self.split('train', batch_size), self.split('val', batch_size)
+        with self.strategy.scope():
+            trainable = set_trainable(backbone_of(model), phase['unfreeze'], phase.get('freeze_batchnorm', False))
+            compile_model(model, self.config, phase['learning_rate'], jit_compile=self.xla)
+        if self.verbose:
+            print(f"\n{'=' * 70}\nPHASE {phase['name']}: {trainable} backbone layers trainable, "
+                  f"lr={phase['learning_rate']}, batch={batch_size}\n{'=' * 70}")
+
+        samples = steps_per_epoch * batch_size if steps_per_epoch else train_data.samples
+        step_times = step_time_callback()
+        history = model.fit(
+            train_data.dataset.repeat() if steps_per_epoch else train_data.dataset,
+            validation_data=val_data.dataset,
+            epochs=epochs or phase['epochs'],
+            steps_per_epoch=steps_per_epoch,
+            class_weight=self.class_weight,
+            callbacks=self.callbacks(phase, val_data, samples) + [step_times],
+            verbose=self.verbose
+        ).history
+
+        step = median_step_time(step_times.times, step_times.epoch_starts)
+        monitor = phase['checkpoint_monitor']
+        scores = history.get(monitor, [])
+        record = {
+            'epochs': len(history.get('loss', [])),
+            'trainable_layers': trainable,
+            'batch_size': batch_size,
+            'step_ms': step * 1000.0,
+            'images_per_sec': batch_size / step if step else 0.0,
+            'best': (min(scores) if monitor_mode(monitor) == 'min' else max(scores)) if scores else None,
+        }
+
+        checkpoint = self.checkpoint_path(phase)
+        if os.path.exists(checkpoint):
+            del model
+            gc.collect()
+            with self.strategy.scope():
+                model = load_checkpoint(checkpoint)
+        return model, record, history
+
+    def train(self, epochs=None, steps_per_epoch=None):
+        """
+        All phases, then the test report; saves <model_dir>/<output>.keras
+        and <output>_history.json.
+
+        Args:
+            epochs: Epochs per phase override (dry run)
+            steps_per_epoch: Steps per epoch override (dry run; the training split repeats)
+
+        Returns:
+            dict: 'phases' {name: record}, 'test' report summary, 'model' path
+        """
+        from .model import build_model
+
+        config = self.config
+        os.makedirs(self.model_dir, exist_ok=True)
+        train_data = self.split('train', config['batch_size'])
+        if self.verbose:
+            print(f"\n[CONFIG] {config['title']}: {config['backbone']}, {config['img_size']}, "
+                  f"pipeline={config['pipeline']}, {len(config['phases'])} phases")
+            print(f"[DATA] train={train_data.samples}, val={self.split('val', config['batch_size']).samples}, "
+                  f"{'cache: ' + self.cache_root if self.cache_root else 'image files'}")
+            for index, name in enumerate(config['class_names']):
+                print(f"  {name}: {np.sum(train_data.classes == index)} images, weight {self.class_weight[index]:.2f}")
+
+        with self.strategy.scope():
+            model = build_model(config, weights=self.weights)
+
+        results = {'phases': {}}
+        histories = {}
+        for phase in config['phases']:
+            model, record, history = self.run_phase(model, phase, epochs, steps_per_epoch)
+            results['phases'][phase['name']] = record
+            histories[phase['name']] = {key: [float(value) for value in values] for key, values in history.items()}
+
+        test_data = self.split('test', config['batch_size'])
+        report = validation_report(test_data.classes, model.predict(test_data.dataset, verbose=0), self.num_classes)
+        cm = report['confusion_matrix']
+        results['test'] = {
+            'accuracy': float(np.trace(cm) / max(1, cm.sum())),
+            'macro_f1': report['macro_f1'],
+            'per_class_f1': dict(zip(config['class_names'], report['f1'].tolist())),
+        }
+        if self.verbose:
+            print(f"\n[TEST] accuracy {results['test']['accuracy'] * 100:.2f}%, "
+                  f"macro F1 {report['macro_f1'] * 100:.2f}%")
+            print(format_report(report, config['class_names']))
+
+        results['model'] = os.path.join(self.model_dir, f"{config['output']}.keras")
+        model.save(results['model'])
+        with open(os.path.join(self.model_dir, f"{config['output']}_history.json"), 'w', encoding='utf-8') as f:
+            json.dump({'history': histories, **results}, f, indent=2)
+        return results
+
+
+def dry_run(config, steps=5, epochs=2, images=8, img_size=None, batch_size=None, use_cache=False,
+            workdir=None, **trainer_kwargs):
+    """
+    Train a config for a few steps per phase on synthetic images, through the
+    same data path, model, loss and phase schedule; a regression benchmark
+    for the training step.
+
+    Args:
+        config: Training config
+        steps: Steps per epoch
+        epochs: Epochs per phase (the first is warm-up and not timed)
+        images: Validation/test images per split (train gets 4x)
+        img_size: (height, width) override (smaller is faster on CPU)
+        batch_size: Batch size override for every phase
+        use_cache: Compile the synthetic splits and train from the TFRecord cache
+        workdir: Keep the synthetic data and checkpoints here (default: temporary, removed)
+        trainer_kwargs: Trainer arguments (xla, strategy, verbose, ...)
+
+    Returns:
+        Trainer.train() results
+    """
+    from .synthetic import write_synthetic_dataset
+
+    owns_workdir = workdir is None
+    workdir = workdir or tempfile.mkdtemp(prefix='train_dry_run_')
+    try:
+        img_size = tuple(img_size or config['img_size'])
+        dirs = write_synthetic_dataset(os.path.join(workdir, 'images'), config['class_names'], img_size, images)
+        phases = [{key: value for key, value in phase.items() if not (batch_size and key == 'batch_size')}
+                  for phase in config['phases']]
+        synthetic = {**config, 'img_size': img_size, 'files': folder_files(dirs), 'phases': phases,
+                     'batch_size': batch_size or config['batch_size']}
+
+        cache_root = None
+        if use_cache:
+            cache_root = os.path.join(workdir, 'cache')
+            for split in SPLITS:
+                filepaths, labels = synthetic['files'](split, config['class_names'])
+                compile_split(filepaths, labels, config['class_names'], os.path.join(cache_root, split), img_size,
+                              config['pipeline'], color_mode=config.get('color_mode', 'rgb'), verbose=0)
+
+        trainer = Trainer(synthetic, cache_root=cache_root, model_dir=os.path.join(workdir, 'models'), weights=None,
+                          **trainer_kwargs)
+        return trainer.train(epochs=epochs, steps_per_epoch=steps)
+    finally:
+        if owns_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
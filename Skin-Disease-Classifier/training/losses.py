@@ -0,0 +1,76 @@
+"""
+Losses for the training engine, selected by a config's 'loss' entry.
+
+The macro-F1 losses are vectorized versions of the per-class loops the
+bone trainer used to define; the train_*_macro_f1.py scripts now run the
+engine, so these are the only copies. All cast to float32 first: under mixed precision the
+1e-7 clipping underflows in float16.
+Importing this module imports TensorFlow.
+"""
+
+import tensorflow as tf
+from tensorflow import keras
+
+
+def _soft_f1(y_true, y_pred):
+    """Per-class soft F1 from probabilities, shape (num_classes,)."""
+    tp = tf.reduce_sum(y_true * y_pred, axis=0)
+    fp = tf.reduce_sum((1.0 - y_true) * y_pred, axis=0)
+    fn = tf.reduce_sum(y_true * (1.0 - y_pred), axis=0)
+    precision = tp / (tp + fp + 1e-8)
+    recall = tp / (tp + fn + 1e-8)
+    return 2.0 * precision * recall / (precision + recall + 1e-8)
+
+
+def soft_macro_f1_loss(y_true, y_pred):
+    """1 - soft (differentiable) macro F1."""
+    y_true = tf.cast(y_true, tf.float32)
+    y_pred = tf.clip_by_value(tf.cast(y_pred, tf.float32), 1e-7, 1.0 - 1e-7)
+    return 1.0 - tf.reduce_mean(_soft_f1(y_true, y_pred))
+
+
+def focal_macro_f1_loss(alpha_per_class=None, alpha=0.75, gamma=2.5, f1_weight=0.3):
+    """
+    Focal loss + soft macro F1 hybrid.
+
+    Args:
+        alpha_per_class: Focal alpha per class (default: alpha for every class)
+        alpha: Focal alpha for classes without an alpha_per_class entry
+        gamma: Focusing parameter
+        f1_weight: Share of (1 - macro F1); the focal term gets the rest
+
+    Returns:
+        Loss function (y_true, y_pred)
+    """
+    def loss(y_true, y_pred):
+        y_true = tf.cast(y_true, tf.float32)
+        y_pred = tf.clip_by_value(tf.cast(y_pred, tf.float32), 1e-7, 1.0 - 1e-7)
+        num_classes = y_true.shape[-1]
+        alphas = list(alpha_per_class or [])[:num_classes]
+        alphas = tf.constant(alphas + [alpha] * (num_classes - len(alphas)), dtype=tf.float32)
+
+        # Binary focal term per (sample, class), averaged over both
+        p_t = y_true * y_pred + (1.0 - y_true) * (1.0 - y_pred)
+        focal = alphas * tf.pow(1.0 - p_t, gamma) * -tf.math.log(p_t + 1e-8)
+        macro_f1 = tf.reduce_mean(_soft_f1(y_true, y_pred))
+        return (1.0 - f1_weight) * tf.reduce_mean(focal) + f1_weight * (1.0 - macro_f1)
+
+    loss.__name__ = 'focal_macro_f1_loss'
+    return loss
+
+
+def get_loss(spec):
+    """
+    Loss from a config's {'name': ..., **kwargs} entry.
+
+    Raises:
+        ValueError: Unknown loss name
+    """
+    kwargs = {key: value for key, value in spec.items() if key != 'name'}
+    if spec['name'] == 'categorical_crossentropy':
+        return keras.losses.CategoricalCrossentropy(**kwargs)
+    if spec['name'] == 'focal_macro_f1':
+        return focal_macro_f1_loss(**kwargs)
+    if spec['name'] == 'soft_macro_f1':
+        return soft_macro_f1_loss
+    raise ValueError(f"Unknown loss {spec['name']!r}")
@@ -0,0 +1,104 @@
+"""
+Model building for the training engine: ImageNet backbone, the config's
+head and a float32 softmax (so losses and StreamingMacroF1 see float32
+probabilities under mixed precision), per-phase freezing and compilation.
+
+Models are keras.Sequential([backbone, ...]) so the backbone can be found
+again after a checkpoint is reloaded (backbone_of). Metrics and layers come
+from inference/custom_objects.py, the classes the APIs and export tools
+load the models with.
+Importing this module imports TensorFlow.
+"""
+
+from tensorflow import keras
+from tensorflow.keras import layers
+
+from inference.custom_objects import CUSTOM_OBJECTS, GrayscaleToRGB, StreamingMacroF1
+
+from .losses import get_loss
+
+BACKBONES = {
+    'densenet121': keras.applications.DenseNet121,
+    'efficientnetb2': keras.applications.EfficientNetB2,
+    'efficientnetb3': keras.applications.EfficientNetB3,
+}
+
+
+def input_channels(config):
+    """Channels the input pipeline produces (densenet_clahe always outputs RGB)."""
+    if config.get('color_mode', 'rgb') == 'grayscale' and config['pipeline'] != 'densenet_clahe':
+        return 1
+    return 3
+
+
+def build_model(config, weights='imagenet', img_size=None):
+    """
+    Backbone + head + float32 softmax for a config.
+
+    Args:
+        config: Training config (training/configs)
+        weights: Backbone weights ('imagenet' or None for random initialization)
+        img_size: (height, width) override
+    """
+    img_size = tuple(img_size or config['img_size'])
+    backbone = BACKBONES[config['backbone']](input_shape=(*img_size, 3), include_top=False, weights=weights)
+
+    stack = []
+    if input_channels(config) == 1:
+        stack += [keras.Input(shape=(*img_size, 1)), GrayscaleToRGB()]
+    stack += [backbone, layers.GlobalAveragePooling2D()]
+    for spec in config['head']:
+        if spec[0] == 'batchnorm':
+            stack.append(layers.BatchNormalization())
+        elif spec[0] == 'dropout':
+            stack.append(layers.Dropout(spec[1]))
+        else:
+            regularizer = keras.regularizers.l2(spec[2]) if len(spec) > 2 else None
+            stack.append(layers.Dense(spec[1], activation='relu', kernel_regularizer=regularizer))
+    stack.append(layers.Dense(len(config['class_names']), activation='softmax', dtype='float32',
+                              name='predictions'))
+    return keras.Sequential(stack)
+
+
+def backbone_of(model):
+    """The nested backbone model of a build_model() model."""
+    for layer in model.layers:
+        if isinstance(layer, keras.Model):
+            return layer
+    raise ValueError("Model has no nested backbone")
+
+
+def set_trainable(backbone, unfreeze, freeze_batchnorm=False):
+    """
+    Train the backbone's top `unfreeze` layers ('all': every layer, 0: none).
+
+    Returns:
+        Number of trainable backbone layers
+    """
+    count = len(backbone.layers) if unfreeze == 'all' else min(int(unfreeze), len(backbone.layers))
+    backbone.trainable = count > 0
+    first = len(backbone.layers) - count
+    for index, layer in enumerate(backbone.layers):
+        layer.trainable = index >= first and not (freeze_batchnorm and isinstance(layer, layers.BatchNormalization))
+    return len([layer for layer in backbone.layers if layer.trainable]) if count else 0
+
+
+def compile_model(model, config, learning_rate, jit_compile=False):
+    """Adam + the config's loss; accuracy, streaming macro F1 and top-k accuracy."""
+    top_k = config.get('top_k', 2)
+    model.compile(
+        optimizer=keras.optimizers.Adam(learning_rate=learning_rate, beta_1=0.9, beta_2=0.999),
+        loss=get_loss(config['loss']),
+        metrics=[
+            'accuracy',
+            StreamingMacroF1(num_classes=len(config['class_names']), name='macro_f1_metric'),
+            keras.metrics.TopKCategoricalAccuracy(k=top_k, name=f'top_{top_k}_accuracy'),
+        ],
+        jit_compile=jit_compile
+    )
+    return model
+
+
+def load_checkpoint(path):
+    """Reload a saved model for the next phase (recompiled by the caller)."""
+    return keras.models.load_model(path, custom_objects=CUSTOM_OBJECTS, compile=False)
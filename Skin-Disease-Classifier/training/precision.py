@@ -0,0 +1,120 @@
+"""
+Mixed precision and XLA options for the training scripts.
+
+    python train_bone_4class_macro_f1.py --precision mixed_bfloat16 --xla
+
+--precision sets Keras' global dtype policy before the model is built:
+layers compute in float16/bfloat16 and keep float32 variables. The
+scripts' softmax heads are float32 (dtype='float32'), so the losses and
+StreamingMacroF1 always see float32 probabilities; the custom losses also
+cast their inputs, because their 1e-7 clipping underflows in float16.
+
+mixed_float16 needs loss scaling so small gradients do not flush to zero:
+Model.compile wraps the optimizer in a LossScaleOptimizer under that
+policy, and the custom losses are scaled like the built-in ones (they are
+plain loss functions of y_true/y_pred). bfloat16 has float32's exponent
+range and needs no scaling.
+
+--xla passes jit_compile=True to model.compile (train, evaluate and
+predict steps are compiled with XLA).
+
+Which one is fast depends on the hardware: float16 on NVIDIA GPUs with
+compute capability >= 7.0, bfloat16 on >= 8.0 and on CPUs with AVX512-BF16
+or AMX (oneDNN). precision_warning() reports a mismatch.
+"""
+
+import argparse
+import os
+
+PRECISIONS = ('fp32', 'mixed_bfloat16', 'mixed_float16')
+POLICY_NAMES = {'fp32': 'float32', 'mixed_bfloat16': 'mixed_bfloat16', 'mixed_float16': 'mixed_float16'}
+CPU_BF16_FLAGS = ('avx512_bf16', 'amx_bf16')
+
+
+def add_precision_arguments(parser):
+    """Add --precision and --xla (defaults from TRAIN_PRECISION / TRAIN_XLA)."""
+    parser.add_argument('--precision', choices=PRECISIONS,
+                        default=os.environ.get('TRAIN_PRECISION', 'fp32').strip().lower() or 'fp32',
+                        help="Keras dtype policy (default: fp32)")
+    parser.add_argument('--xla', action='store_true',
+                        default=os.environ.get('TRAIN_XLA', '').strip().lower() in ('1', 'true', 'yes'),
+                        help="Compile the train/eval steps with XLA (jit_compile=True)")
+    return parser
+
+
+def parse_training_args(description=None, argv=None):
+    """The trainers' command line: --precision and --xla."""
+    parser = argparse.ArgumentParser(description=description,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_precision_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def cpu_flags():
+    """CPU feature flags from /proc/cpuinfo (empty set where unavailable)."""
+    try:
+        with open('/proc/cpuinfo', 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('flags'):
+                    return set(line.split(':', 1)[1].split())
+    except OSError:
+        pass
+    return set()
+
+
+def gpu_compute_capabilities():
+    """(major, minor) per visible GPU."""
+    import tensorflow as tf
+
+    capabilities = []
+    for device in tf.config.list_physical_devices('GPU'):
+        capability = tf.config.experimental.get_device_details(device).get('compute_capability')
+        if capability:
+            capabilities.append(tuple(capability))
+    return capabilities
+
+
+def precision_warning(precision, gpu_capabilities, flags):
+    """
+    Warning text if the hardware has no fast path for the policy, else None.
+
+    Args:
+        precision: One of PRECISIONS
+        gpu_capabilities: [(major, minor), ...] of the visible GPUs
+        flags: CPU feature flags
+    """
+    if precision == 'fp32':
+        return None
+    if gpu_capabilities:
+        required = (8, 0) if precision == 'mixed_bfloat16' else (7, 0)
+        if min(gpu_capabilities) < required:
+            return (f"{precision} needs GPU compute capability >= {required[0]}.{required[1]} for a speedup "
+                    f"(found {'.'.join(map(str, min(gpu_capabilities)))}); it may be slower than fp32")
+        return None
+    if precision == 'mixed_float16':
+        return "mixed_float16 on CPU has no fast kernels and is usually slower than fp32; use mixed_bfloat16"
+    if not any(flag in flags for flag in CPU_BF16_FLAGS):
+        return ("CPU has no AVX512-BF16/AMX support; mixed_bfloat16 is emulated and may be slower than fp32")
+    return None
+
+
+def set_precision(precision, verbose=1):
+    """
+    Set Keras' global dtype policy. Call before building the model.
+
+    Returns:
+        The keras.mixed_precision.Policy in effect
+    """
+    from tensorflow import keras
+
+    if precision not in PRECISIONS:
+        raise ValueError(f"precision must be one of {PRECISIONS}, got {precision!r}")
+    keras.mixed_precision.set_global_policy(POLICY_NAMES[precision])
+    policy = keras.mixed_precision.global_policy()
+    if verbose:
+        print(f"[PRECISION] {precision}: compute {policy.compute_dtype}, variables {policy.variable_dtype}"
+              f"{' (dynamic loss scaling)' if precision == 'mixed_float16' else ''}")
+        warning = precision_warning(precision, gpu_compute_capabilities(), cpu_flags())
+        if warning:
+            print(f"[WARNING] {warning}")
+    return policy
@@ -0,0 +1,271 @@
+"""
+Preprocessed TFRecord cache of a dataset split.
+
+Every epoch the trainers decode the same JPEG/PNGs, resize them and (bone,
+lung) run CLAHE at 384x384 again. compile_split() does that once and writes
+the result as sharded TFRecords:
+
+    <cache>/<split>/manifest.json
+    <cache>/<split>/shard-00000-of-00008.tfrecord ...
+
+Each record holds the uint8 pixels after decode + resize (+ grayscale check
+and CLAHE for densenet_clahe), the label, the source path and the SHA-256 of
+the source file. Normalization and augmentation still run while training,
+on the cached pixels. The manifest stores the parameters, labels and source
+hashes; compile_split() skips a split whose manifest already matches.
+
+Records are written round-robin (record i goes to shard i % shards), so an
+interleaved read with block_length=1 returns them in file order again:
+RecordData reads the shards in parallel and still lines up with .classes
+when shuffle is off.
+
+Augmented training splits see CLAHE before augmentation (the live pipeline
+augments first); the geometric and brightness augmentations are applied to
+the equalized image instead of the other way round.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from .data import ImageFolderData
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+DEFAULT_SHARDS = 8
+DEFAULT_SHUFFLE_BUFFER = 512
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Hex SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def shard_names(shards):
+    return [f"shard-{index:05d}-of-{shards:05d}.tfrecord" for index in range(shards)]
+
+
+def stored_channels(pipeline, color_mode):
+    """Channels of the cached pixels (densenet_clahe always stores RGB)."""
+    return 3 if pipeline == 'densenet_clahe' or color_mode == 'rgb' else 1
+
+
+def cache_params(class_names, img_size, pipeline, color_mode, clahe):
+    """The manifest fields a cached split must match to be reused."""
+    return {
+        'version': MANIFEST_VERSION,
+        'class_names': list(class_names),
+        'img_size': list(img_size),
+        'pipeline': pipeline,
+        'color_mode': color_mode,
+        'channels': stored_channels(pipeline, color_mode),
+        'clahe': bool(clahe),
+    }
+
+
+def read_manifest(cache_dir):
+    """Manifest of a compiled split, or None if there is none."""
+    path = os.path.join(cache_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def is_up_to_date(manifest, params, files, hashes, labels):
+    """True if a manifest was compiled with these parameters from these exact files."""
+    if manifest is None:
+        return False
+    if any(manifest.get(key) != value for key, value in params.items()):
+        return False
+    return (manifest.get('files') == list(files)
+            and manifest.get('sha256') == list(hashes)
+            and manifest.get('labels') == [int(label) for label in labels])
+
+
+def _bytes_feature(value):
+    import tensorflow as tf
+    return tf.train.Feature(bytes_list=tf.train.BytesList(value=[value]))
+
+
+def _int64_feature(value):
+    import tensorflow as tf
+    return tf.train.Feature(int64_list=tf.train.Int64List(value=[value]))
+
+
+def compile_split(filepaths, labels, class_names, cache_dir, img_size, pipeline,
+                  color_mode='rgb', shards=DEFAULT_SHARDS, force=False, clahe=None, verbose=1):
+    """
+    Write one split as preprocessed TFRecord shards.
+
+    Args:
+        filepaths: Source images, in label/file order (list_image_files order)
+        labels: Label per file
+        class_names: Class names (label order)
+        cache_dir: Output directory for this split
+        img_size: (height, width)
+        pipeline: One of inference.preprocessing.PIPELINES
+        color_mode: 'rgb' or 'grayscale'
+        shards: Number of TFRecord files
+        force: Rewrite even if the manifest is up to date
+        clahe: Apply CLAHE (densenet_clahe only, default: when OpenCV is available)
+
+    Returns:
+        tuple: (manifest dict, True if the split was written / False if skipped)
+    """
+    import tensorflow as tf
+
+    # Pixels are produced by the live pipeline's own decode/enhance steps
+    data = ImageFolderData(cache_dir, class_names, img_size, batch_size=1, pipeline=pipeline,
+                           color_mode=color_mode, clahe=clahe, files=(filepaths, labels))
+    params = cache_params(class_names, img_size, pipeline, color_mode, data.clahe)
+    files = [os.path.relpath(path).replace(os.sep, '/') for path in data.filepaths]
+    hashes = [file_sha256(path) for path in data.filepaths]
+
+    existing = read_manifest(cache_dir)
+    if not force and is_up_to_date(existing, params, files, hashes, data.classes):
+        if verbose:
+            print(f"[CACHE] {cache_dir}: up to date ({len(files)} images)")
+        return existing, False
+
+    shards = max(1, min(int(shards), max(1, data.samples)))
+    names = shard_names(shards)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    def stored_pixels(path):
+        image = data.enhance(data.decode(path))
+        return tf.cast(image, tf.uint8)
+
+    pixels = tf.data.Dataset.from_tensor_slices(data.filepaths).map(
+        stored_pixels, num_parallel_calls=tf.data.AUTOTUNE, deterministic=True
+    ).prefetch(tf.data.AUTOTUNE)
+
+    writers = [tf.io.TFRecordWriter(os.path.join(cache_dir, name + '.tmp')) for name in names]
+    try:
+        for index, image in enumerate(pixels):
+            example = tf.train.Example(features=tf.train.Features(feature={
+                'image': _bytes_feature(image.numpy().tobytes()),
+                'label': _int64_feature(int(data.classes[index])),
+                'path': _bytes_feature(files[index].encode('utf-8')),
+                'sha256': _bytes_feature(hashes[index].encode('ascii')),
+            }))
+            writers[index % shards].write(example.SerializeToString())
+            if verbose and (index + 1) % 1000 == 0:
+                print(f"  {index + 1}/{data.samples}")
+    finally:
+        for writer in writers:
+            writer.close()
+
+    # Shards first, manifest last: a crash leaves no manifest that matches
+    if existing is not None:
+        os.remove(os.path.join(cache_dir, MANIFEST_NAME))
+    for name in names:
+        os.replace(os.path.join(cache_dir, name + '.tmp'), os.path.join(cache_dir, name))
+    for name in (existing or {}).get('shards', []):
+        if name not in names and os.path.exists(os.path.join(cache_dir, name)):
+            os.remove(os.path.join(cache_dir, name))
+
+    manifest = {
+        **params,
+        'count': data.samples,
+        'shards': names,
+        'files': files,
+        'sha256': hashes,
+        'labels': data.classes.tolist(),
+    }
+    with open(os.path.join(cache_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    if verbose:
+        print(f"[CACHE] {cache_dir}: {data.samples} images -> {shards} shards")
+    return manifest, True
+
+
+class RecordData(ImageFolderData):
+    """
+    ImageFolderData over a compiled split: reads the cached uint8 pixels
+    instead of decoding images. Same attributes; .filepaths are the source
+    paths recorded at compile time.
+
+    Args:
+        cache_dir: Split directory written by compile_split()
+        batch_size: Batch size
+        augmentation: Augmentation for training, None for validation/test
+        shuffle: Shuffle shard order and records (buffer of shuffle_buffer images)
+        seed: Shuffle seed
+        shuffle_buffer: Records held for shuffling (memory: buffer x H x W x C bytes)
+    """
+
+    def __init__(self, cache_dir, batch_size, augmentation=None, shuffle=False, seed=None,
+                 shuffle_buffer=DEFAULT_SHUFFLE_BUFFER):
+        manifest = read_manifest(cache_dir)
+        if manifest is None:
+            raise FileNotFoundError(f"No {MANIFEST_NAME} in {cache_dir}; run compile_dataset.py first")
+        if manifest.get('version') != MANIFEST_VERSION:
+            raise ValueError(f"{cache_dir} was compiled with manifest version {manifest.get('version')}, "
+                             f"expected {MANIFEST_VERSION}; re-run compile_dataset.py --force")
+        self.manifest = manifest
+        self.shuffle_buffer = shuffle_buffer
+        # CLAHE (if any) is already in the cached pixels
+        super().__init__(cache_dir, manifest['class_names'], manifest['img_size'], batch_size,
+                         manifest['pipeline'], augmentation=augmentation, shuffle=shuffle, seed=seed,
+                         color_mode=manifest['color_mode'], clahe=False,
+                         files=(manifest['files'], manifest['labels']))
+        self.shard_paths = [os.path.join(cache_dir, name) for name in manifest['shards']]
+
+    def source(self):
+        import tensorflow as tf
+
+        shards = tf.data.Dataset.from_tensor_slices(self.shard_paths)
+        if self.shuffle:
+            shards = shards.shuffle(len(self.shard_paths), seed=self.seed, reshuffle_each_iteration=True)
+        dataset = shards.interleave(
+            tf.data.TFRecordDataset,
+            cycle_length=len(self.shard_paths),
+            block_length=1,
+            num_parallel_calls=tf.data.AUTOTUNE,
+            deterministic=not self.shuffle
+        )
+        if self.shuffle:
+            dataset = dataset.shuffle(max(1, min(self.shuffle_buffer, self.samples)), seed=self.seed,
+                                      reshuffle_each_iteration=True)
+        return dataset
+
+    def read(self, serialized):
+        import tensorflow as tf
+
+        example = tf.io.parse_single_example(serialized, {
+            'image': tf.io.FixedLenFeature([], tf.string),
+            'label': tf.io.FixedLenFeature([], tf.int64),
+        })
+        image = tf.io.decode_raw(example['image'], tf.uint8)
+        image = tf.reshape(image, (*self.img_size, self.manifest['channels']))
+        return tf.cast(image, tf.float32), tf.cast(example['label'], tf.int32)
+
+
+def load_split(split, directory, class_names, img_size, batch_size, pipeline, cache_root=None, **kwargs):
+    """
+    The trainers' split loader: RecordData from <cache_root>/<split> when a
+    cache is given, ImageFolderData on the image directory otherwise.
+
+    Raises:
+        ValueError: The cache was compiled with other classes, size or pipeline
+    """
+    if not cache_root:
+        return ImageFolderData(directory, class_names, img_size, batch_size, pipeline, **kwargs)
+
+    color_mode = kwargs.pop('color_mode', 'rgb')
+    kwargs.pop('clahe', None)
+    data = RecordData(os.path.join(cache_root, split), batch_size, **kwargs)
+    expected = {'class_names': list(class_names), 'img_size': list(img_size),
+                'pipeline': pipeline, 'color_mode': color_mode}
+    mismatched = [key for key, value in expected.items() if data.manifest.get(key) != value]
+    if mismatched:
+        raise ValueError(f"Cache {data.directory} does not match the training config ({', '.join(mismatched)}); "
+                         f"re-run compile_dataset.py")
+    return data
@@ -12,6 +12,7 @@ from .validators import (
 from .helpers import (
     serialize_firestore_doc,
     serialize_firestore_timestamp,
+    to_json_value,
     sanitize_string,
     get_user_id_from_token
 )
@@ -28,6 +29,7 @@ __all__ = [
     'validate_pagination_params',
     'serialize_firestore_doc',
     'serialize_firestore_timestamp',
+    'to_json_value',
     'sanitize_string',
     'get_user_id_from_token',
 ]
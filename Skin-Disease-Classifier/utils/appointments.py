@@ -0,0 +1,115 @@
+"""
+Doctor appointment queue queries.
+
+The queue is ordered by status (pending > approved > completed > rejected),
+then by date and time. The status order is stored on every appointment as
+statusPriority so Firestore can sort and paginate the queue with composite
+indexes (firestore.indexes.json) instead of the API reading every appointment
+of a specialty and sorting in memory.
+
+backfill_status_priority() adds the field to appointments written before it
+existed; without it they do not appear in the ordered queries.
+"""
+
+from firebase_admin import firestore
+import logging
+
+from .helpers import serialize_firestore_doc
+
+logger = logging.getLogger(__name__)
+
+STATUS_PRIORITY = {'pending': 0, 'approved': 1, 'completed': 2, 'rejected': 3}
+UNKNOWN_STATUS_PRIORITY = 4
+
+# Firestore batch limit is 500 writes
+BATCH_SIZE = 400
+
+
+def status_priority(status):
+    """Sort position of an appointment status in the doctor queue."""
+    return STATUS_PRIORITY.get(status, UNKNOWN_STATUS_PRIORITY)
+
+
+def queue_query(db, specialty=None, status=None):
+    """
+    Ordered doctor queue query.
+
+    Args:
+        db: Firestore client
+        specialty (str): Doctor specialty (doctorType filter), None for all
+        status (str): Only this status (optional)
+
+    Returns:
+        Firestore query ordered by statusPriority, date, time
+    """
+    query = db.collection('appointments')
+    if specialty:
+        query = query.where('doctorType', '==', specialty)
+    if status:
+        # A single status needs no priority ordering, only date/time
+        query = query.where('status', '==', status)
+    else:
+        query = query.order_by('statusPriority')
+    return query.order_by('date').order_by('time')
+
+
+def status_count_calls(db, specialty=None):
+    """
+    One zero-argument callable per status (in STATUS_PRIORITY order) running
+    a count() aggregation (billed per 1000 index entries instead of per
+    document). Handlers pass them to their own run_parallel() call together
+    with their other reads and zip the results with STATUS_PRIORITY.
+
+    Returns:
+        list: Callables returning int counts
+    """
+    def count(status):
+        query = db.collection('appointments')
+        if specialty:
+            query = query.where('doctorType', '==', specialty)
+        result = query.where('status', '==', status).count().get()
+        return int(result[0][0].value)
+
+    return [lambda status=status: count(status) for status in STATUS_PRIORITY]
+
+
+def serialize_appointment(doc):
+    """Appointment snapshot -> JSON-ready dict (id + timestamps as Unix seconds)."""
+    data = serialize_firestore_doc(doc)
+    data.pop('statusPriority', None)
+    return data
+
+
+def backfill_status_priority(db, dry_run=False):
+    """
+    Set statusPriority on appointments that are missing it or have a stale value.
+
+    Args:
+        db: Firestore client
+        dry_run (bool): Count but do not write
+
+    Returns:
+        int: Number of appointments updated
+    """
+    batch = db.batch()
+    pending = 0
+    updated = 0
+    for doc in db.collection('appointments').stream():
+        data = doc.to_dict()
+        priority = status_priority(data.get('status', 'pending'))
+        if data.get('statusPriority') == priority:
+            continue
+        updated += 1
+        if dry_run:
+            continue
+        batch.update(doc.reference, {'statusPriority': priority})
+        pending += 1
+        if pending >= BATCH_SIZE:
+            batch.commit()
+            batch = db.batch()
+            pending = 0
+    if pending:
+        batch.commit()
+
+    logger.info(f"statusPriority set on {updated} appointment(s)")
+    return updated
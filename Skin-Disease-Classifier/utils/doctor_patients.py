@@ -0,0 +1,207 @@
+"""
+Doctor -> patient index.
+
+The "my patients" view lists patients with at least one approved or completed
+appointment with the doctor. Instead of scanning appointments on every
+request, each doctor keeps one document per patient in the
+doctors/{doctorId}/patients subcollection (document ID = patient uid):
+
+    {
+        "userId": str,
+        "totalAppointments": int,       # approved + completed
+        "completedAppointments": int,
+        "lastAppointment": "YYYY-MM-DD",
+        "updatedAt": Timestamp
+    }
+
+The entries are updated in the same transaction as the appointment status
+change (approve/reject/complete), for both the previous and the new doctorId. rebuild_doctor_patients() recomputes them from the
+appointments collection (backfill, or after status changes that bypassed the
+API).
+"""
+
+from collections import defaultdict
+from firebase_admin import firestore
+import logging
+
+from .appointments import status_priority
+
+logger = logging.getLogger(__name__)
+
+PATIENTS_SUBCOLLECTION = 'patients'
+COUNTED_STATUSES = ('approved', 'completed')
+
+# Firestore batch limit is 500 writes
+BATCH_SIZE = 400
+
+
+def patients_collection(db, doctor_id):
+    return db.collection('doctors').document(doctor_id).collection(PATIENTS_SUBCOLLECTION)
+
+
+def count_patients(db, doctor_id):
+    """
+    Number of patients with at least one counted appointment, via a count()
+    aggregation on the doctor's index (entries may drop to zero, but are kept).
+
+    Returns:
+        int
+    """
+    query = patients_collection(db, doctor_id).where('totalAppointments', '>', 0)
+    return int(query.count().get()[0][0].value)
+
+
+def apply_status_change(entry, appointment, new_status, doctor_id, owner_id=None):
+    """
+    New patient index fields after an appointment status change.
+
+    The appointment counts for the doctor in its doctorId field, so a change can
+    move it out of one doctor's index (owner_id = previous doctorId) and into
+    another's (owner_id = doctor_id).
+
+    Args:
+        entry (dict): Current index entry of owner_id ({} if the patient is not indexed yet)
+        appointment (dict): Appointment data before the change
+        new_status (str): Status being written
+        doctor_id (str): doctorId of the appointment after the change
+        owner_id (str): Doctor whose index entry is updated (default: doctor_id)
+
+    Returns:
+        dict: Updated entry, or None if the index does not change
+    """
+    owner_id = owner_id or doctor_id
+    old_status = appointment.get('status')
+    owned_before = appointment.get('doctorId') == owner_id
+    owned_after = doctor_id == owner_id
+    counted_before = old_status in COUNTED_STATUSES and owned_before
+    counted_after = new_status in COUNTED_STATUSES and owned_after
+    completed_before = old_status == 'completed' and owned_before
+    completed_after = new_status == 'completed' and owned_after
+    if counted_before == counted_after and completed_before == completed_after:
+        return None
+
+    entry = dict(entry)
+    entry['userId'] = appointment.get('userId')
+    entry['totalAppointments'] = max(0, entry.get('totalAppointments', 0) + (int(counted_after) - int(counted_before)))
+    entry['completedAppointments'] = max(
+        0, entry.get('completedAppointments', 0) + (int(completed_after) - int(completed_before)))
+    date = appointment.get('date') or ''
+    if counted_after and date > entry.get('lastAppointment', ''):
+        entry['lastAppointment'] = date
+    entry.setdefault('lastAppointment', '')
+    return entry
+
+
+@firestore.transactional
+def update_appointment_status(transaction, db, appointment_ref, doctor_id, update_data):
+    """
+    Write an appointment status change and the affected patient index entries atomically.
+
+    Besides the acting doctor's entry, the entry of the appointment's previous
+    doctorId is updated when another doctor rejects or completes it.
+
+    Args:
+        transaction: Firestore transaction (db.transaction())
+        db: Firestore client
+        appointment_ref: Appointment document reference
+        doctor_id (str): Doctor making the change
+        update_data (dict): Appointment fields to update, including 'status'
+            (statusPriority is derived from it)
+    """
+    appointment = appointment_ref.get(transaction=transaction).to_dict() or {}
+    patient_id = appointment.get('userId')
+    new_doctor_id = update_data.get('doctorId', appointment.get('doctorId'))
+
+    entries = []
+    if patient_id:
+        # All transaction reads must happen before the writes
+        owners = dict.fromkeys(uid for uid in (doctor_id, appointment.get('doctorId'), new_doctor_id) if uid)
+        for owner_id in owners:
+            entry_ref = patients_collection(db, owner_id).document(patient_id)
+            snapshot = entry_ref.get(transaction=transaction)
+            entry = apply_status_change(snapshot.to_dict() if snapshot.exists else {},
+                                        appointment, update_data['status'], new_doctor_id, owner_id)
+            if entry is not None:
+                entries.append((entry_ref, entry))
+
+    transaction.update(appointment_ref, {**update_data, 'statusPriority': status_priority(update_data['status'])})
+    for entry_ref, entry in entries:
+        transaction.set(entry_ref, {**entry, 'updatedAt': firestore.SERVER_TIMESTAMP})
+
+
+def compute_patient_index(appointments):
+    """
+    Patient index entries from a doctor's appointments.
+
+    Args:
+        appointments: Iterable of appointment dicts of one doctor
+
+    Returns:
+        dict: patient uid -> entry
+    """
+    entries = defaultdict(lambda: {'totalAppointments': 0, 'completedAppointments': 0, 'lastAppointment': ''})
+    for data in appointments:
+        patient_id = data.get('userId')
+        if not patient_id or data.get('status') not in COUNTED_STATUSES:
+            continue
+        entry = entries[patient_id]
+        entry['userId'] = patient_id
+        entry['totalAppointments'] += 1
+        entry['completedAppointments'] += int(data.get('status') == 'completed')
+        entry['lastAppointment'] = max(entry['lastAppointment'], data.get('date') or '')
+    return dict(entries)
+
+
+def rebuild_doctor_patients(db, doctor_id=None, dry_run=False):
+    """
+    Recompute patient index entries from the appointments collection.
+
+    Entries of patients that no longer have counted appointments are deleted.
+
+    Args:
+        db: Firestore client
+        doctor_id (str): Only rebuild this doctor (default: every doctor with appointments)
+        dry_run (bool): Compute but do not write
+
+    Returns:
+        dict: doctor uid -> {patient uid -> entry}
+    """
+    query = db.collection('appointments')
+    if doctor_id:
+        query = query.where('doctorId', '==', doctor_id)
+
+    per_doctor = defaultdict(list)
+    for doc in query.stream():
+        data = doc.to_dict()
+        if data.get('doctorId'):
+            per_doctor[data['doctorId']].append(data)
+    if doctor_id:
+        per_doctor.setdefault(doctor_id, [])
+
+    results = {uid: compute_patient_index(appointments) for uid, appointments in per_doctor.items()}
+    if dry_run:
+        return results
+
+    batch = db.batch()
+    pending = 0
+    for uid, entries in results.items():
+        collection = patients_collection(db, uid)
+        stale = [doc.reference for doc in collection.stream() if doc.id not in entries]
+        writes = [(ref, None) for ref in stale]
+        writes += [(collection.document(pid), {**entry, 'updatedAt': firestore.SERVER_TIMESTAMP})
+                   for pid, entry in entries.items()]
+        for ref, data in writes:
+            if data is None:
+                batch.delete(ref)
+            else:
+                batch.set(ref, data)
+            pending += 1
+            if pending >= BATCH_SIZE:
+                batch.commit()
+                batch = db.batch()
+                pending = 0
+    if pending:
+        batch.commit()
+
+    logger.info(f"Rebuilt patient index for {len(results)} doctor(s)")
+    return results
@@ -0,0 +1,81 @@
+"""
+Concurrent Firestore reads for request handlers.
+
+Handlers that need several independent documents (e.g. the doctor record and
+the appointment being approved) used to read them one after another, paying
+one round-trip each. get_snapshots() fetches any number of document
+references in a single BatchGetDocuments call and returns them in argument
+order. run_parallel() runs independent queries (count aggregations, a page
+query next to a lookup) on a shared thread pool so their round-trips overlap.
+
+The synchronous Firestore client is thread-safe, so this works inside the
+existing WSGI handlers; FIRESTORE_READ_THREADS bounds the pool per process.
+Callers should pass all of a request's reads to one run_parallel() call: a
+call made from a pool worker runs its callables inline, because waiting on
+the bounded pool from inside it can deadlock once every worker is waiting.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+
+_executor = None
+_executor_lock = threading.Lock()
+_worker = threading.local()
+
+
+def _mark_worker():
+    _worker.active = True
+
+
+def read_executor():
+    """Process-wide thread pool for run_parallel (FIRESTORE_READ_THREADS, default 8)."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=max(1, int(os.environ.get('FIRESTORE_READ_THREADS', '8'))),
+                    thread_name_prefix='firestore-read',
+                    initializer=_mark_worker
+                )
+    return _executor
+
+
+def get_snapshots(db, *refs):
+    """
+    Fetch several documents in one round-trip.
+
+    Args:
+        db: Firestore client
+        *refs: Document references; None entries are skipped
+
+    Returns:
+        tuple: One snapshot per argument, in argument order (None for None refs).
+            Missing documents come back as snapshots with exists == False.
+    """
+    wanted = [ref for ref in refs if ref is not None]
+    by_path = {}
+    if wanted:
+        for snapshot in db.get_all(list({ref.path: ref for ref in wanted}.values())):
+            by_path[snapshot.reference.path] = snapshot
+    return tuple(by_path.get(ref.path) if ref is not None else None for ref in refs)
+
+
+def run_parallel(*calls):
+    """
+    Run independent zero-argument callables concurrently.
+
+    Called from a read_executor() worker (a callable that itself calls
+    run_parallel), the callables run one after another in that worker.
+
+    Returns:
+        list: Results in argument order
+
+    Raises:
+        The exception of the first failing call (in argument order)
+    """
+    if len(calls) <= 1 or getattr(_worker, 'active', False):
+        return [call() for call in calls]
+    futures = [read_executor().submit(call) for call in calls]
+    return [future.result() for future in futures]
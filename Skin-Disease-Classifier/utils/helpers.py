@@ -3,9 +3,16 @@ Helper utilities for common operations.
 """
 
 from datetime import datetime
-from firebase_admin import firestore
+from functools import singledispatch
+import base64
 import logging
 
+try:
+    from google.cloud.firestore_v1 import GeoPoint
+    from google.cloud.firestore_v1.base_document import BaseDocumentReference
+except ImportError:
+    GeoPoint = BaseDocumentReference = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -38,6 +45,75 @@ def serialize_firestore_timestamp(timestamp):
     return None
 
 
+# Values returned unchanged by to_json_value (exact types, checked before dispatch)
+_JSON_SCALARS = frozenset((str, int, float, bool, type(None)))
+
+# Exact class -> converter, resolved once per class from the _convert_value registry
+_converters = {}
+
+
+def to_json_value(value):
+    """
+    Convert a Firestore field value to a JSON-ready value, recursively.
+    
+    Timestamps become Unix seconds, GeoPoints {"latitude", "longitude"},
+    document references their path and bytes base64 text; dicts, lists and
+    tuples are converted element by element. Other values are returned as is.
+    
+    Args:
+        value: Any value read from a Firestore document
+        
+    Returns:
+        JSON-serializable value
+    """
+    cls = value.__class__
+    if cls in _JSON_SCALARS:
+        return value
+    converter = _converters.get(cls)
+    if converter is None:
+        converter = _converters.setdefault(cls, _convert_value.dispatch(cls))
+    return converter(value)
+
+
+@singledispatch
+def _convert_value(value):
+    return value
+
+
+@_convert_value.register(datetime)
+def _datetime_to_json(value):
+    # Firestore returns DatetimeWithNanoseconds, a datetime subclass
+    return value.timestamp()
+
+
+# Scalars are checked inline: most values in a document need no conversion
+@_convert_value.register(dict)
+def _dict_to_json(value):
+    return {key: item if item.__class__ in _JSON_SCALARS else to_json_value(item)
+            for key, item in value.items()}
+
+
+@_convert_value.register(list)
+@_convert_value.register(tuple)
+def _list_to_json(value):
+    return [item if item.__class__ in _JSON_SCALARS else to_json_value(item) for item in value]
+
+
+@_convert_value.register(bytes)
+def _bytes_to_json(value):
+    return base64.b64encode(value).decode('ascii')
+
+
+if GeoPoint is not None:
+    @_convert_value.register(GeoPoint)
+    def _geopoint_to_json(value):
+        return {'latitude': value.latitude, 'longitude': value.longitude}
+
+    @_convert_value.register(BaseDocumentReference)
+    def _reference_to_json(value):
+        return value.path
+
+
 def serialize_firestore_doc(doc):
     """
     Serialize a Firestore document to a dictionary with proper timestamp handling.
@@ -46,25 +122,62 @@ def serialize_firestore_doc(doc):
         doc: Firestore document snapshot
         
     Returns:
-        dict: Serialized document data
+        dict: Serialized document data (nested values converted with to_json_value)
     """
     if not doc.exists:
         return None
     
-    data = doc.to_dict()
+    data = to_json_value(doc.to_dict())
     data['id'] = doc.id
+    return data
+
+
+def fetch_page(query, per_page, start_after=None):
+    """
+    Read one keyset-paginated page of an ordered Firestore query.
     
-    # Serialize timestamps
-    for key, value in data.items():
-        if isinstance(value, (firestore.Timestamp, datetime)):
-            data[key] = serialize_firestore_timestamp(value)
-        elif isinstance(value, dict):
-            # Recursively handle nested dictionaries
-            for nested_key, nested_value in value.items():
-                if isinstance(nested_value, (firestore.Timestamp, datetime)):
-                    value[nested_key] = serialize_firestore_timestamp(nested_value)
+    Only per_page + 1 documents are read; the extra one just tells whether
+    there is a next page, so the cost of a page does not depend on how many
+    documents match the query.
     
-    return data
+    Args:
+        query: Firestore query with order_by applied
+        per_page: Page size
+        start_after: Document snapshot of the previous page's last document
+        
+    Returns:
+        tuple: (docs, has_more)
+    """
+    if start_after is not None:
+        query = query.start_after(start_after)
+    docs = list(query.limit(per_page + 1).stream())
+    has_more = len(docs) > per_page
+    return docs[:per_page], has_more
+
+
+# Documents per BatchGetDocuments request in get_documents()
+GET_ALL_CHUNK_SIZE = 100
+
+
+def get_documents(db, refs, chunk_size=GET_ALL_CHUNK_SIZE):
+    """
+    Fetch many documents with batched get_all calls instead of one get() each.
+    
+    Args:
+        db: Firestore client
+        refs: Document references (duplicates are fetched once)
+        chunk_size: References per get_all request
+        
+    Returns:
+        dict: document ID -> snapshot (only for documents that exist)
+    """
+    unique = list({ref.path: ref for ref in refs}.values())
+    docs = {}
+    for start in range(0, len(unique), chunk_size):
+        for snapshot in db.get_all(unique[start:start + chunk_size]):
+            if snapshot.exists:
+                docs[snapshot.id] = snapshot
+    return docs
 
 
 def sanitize_string(value, max_length=None):
@@ -97,12 +210,14 @@ def sanitize_string(value, max_length=None):
     return sanitized
 
 
-def get_user_id_from_token(request):
+def get_user_id_from_token(request, token_cache=None):
     """
     Extract and verify user ID from request token.
     
     Args:
         request: Flask request object
+        token_cache: Optional TokenCache; verified tokens are reused until
+            they expire instead of being verified on every request
         
     Returns:
         str: User ID
@@ -122,13 +237,19 @@ def get_user_id_from_token(request):
         raise AuthenticationError("Token is empty")
     
     try:
-        decoded = auth.verify_id_token(token)
+        if token_cache is not None:
+            decoded = token_cache.verify(token, auth.verify_id_token)
+        else:
+            decoded = auth.verify_id_token(token)
         return decoded['uid']
-    except auth.InvalidIdTokenError:
-        raise AuthenticationError("Invalid token")
     except auth.ExpiredIdTokenError:
         raise AuthenticationError("Token has expired")
+    except auth.RevokedIdTokenError:
+        raise AuthenticationError("Token has been revoked")
+    except auth.InvalidIdTokenError:
+        raise AuthenticationError("Invalid token")
+    except auth.UserDisabledError:
+        raise AuthenticationError("User account is disabled")
     except Exception as e:
         logger.error(f"Token verification error: {str(e)}")
         raise AuthenticationError("Token verification failed")
-
@@ -0,0 +1,52 @@
+"""
+Flask JSON provider for Firestore data.
+
+Handlers can return Firestore field values (timestamps, GeoPoints, document
+references, nested maps and arrays) from jsonify() directly; they are
+converted with helpers.to_json_value. Encoding uses orjson when it is
+installed (several times faster than the json module on large history and
+appointment lists) and falls back to Flask's default encoder otherwise.
+
+Datetimes are encoded as Unix seconds, like the rest of the API, instead of
+Flask's HTTP date strings.
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+from .helpers import to_json_value
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def firestore_default(value):
+    """Encoder fallback for values json/orjson cannot encode natively."""
+    converted = to_json_value(value)
+    if converted is not value:
+        return converted
+    return DefaultJSONProvider.default(value)
+
+
+class FirestoreJSONProvider(DefaultJSONProvider):
+    """
+    DefaultJSONProvider with Firestore value conversion and an orjson fast path.
+
+    Usage:
+        app.json = FirestoreJSONProvider(app)
+    """
+
+    def dumps(self, obj, **kwargs):
+        if not ORJSON_AVAILABLE:
+            kwargs.setdefault('default', firestore_default)
+            return super().dumps(obj, **kwargs)
+
+        # Datetimes go through firestore_default (Unix seconds), not orjson's RFC 3339
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=firestore_default, option=option).decode('utf-8')
@@ -0,0 +1,287 @@
+"""
+Per-user response cache for the read endpoints of the auth API.
+
+Responses are keyed on an owner (usually the uid) + endpoint scope + query
+parameters, so users never see each other's cached bodies. Mutating endpoints
+call invalidate(owner, scope): every owner/scope pair has a generation token
+that is part of the entry keys, and invalidation replaces the token instead of
+searching for keys. Entries of the old generation are never read again and
+age out of the store.
+
+Read endpoints use lookup() and pass the returned generation to set(), so a
+response built from a Firestore read that raced with an invalidation is
+stored under the old generation (or dropped), never under the new one.
+lookup() does not write: owners that are never set() (e.g. unknown share
+tokens) leave nothing in the store.
+
+Stores:
+    MemoryStore - in-process LRU with a size bound and TTL (per worker process)
+    RedisStore  - any Redis-compatible server, shared by all workers; needs
+                  the optional `redis` package
+
+Store errors are logged and treated as cache misses, so a cache outage never
+fails a request.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('memory', 'redis')
+
+
+class MemoryStore:
+    """
+    Thread-safe in-process LRU + TTL store.
+
+    Args:
+        max_entries: Maximum number of entries (0 disables the store)
+    """
+
+    def __init__(self, max_entries=2048):
+        self.max_entries = max(0, int(max_entries))
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and now > expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl_seconds=None):
+        if not self.max_entries:
+            return
+        with self._lock:
+            self._put(key, value, ttl_seconds)
+
+    def add(self, key, value, ttl_seconds=None):
+        """Set key only if it is missing or expired; returns whether it was set."""
+        if not self.max_entries:
+            return False
+        now = time.time()
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and (item[1] is None or now <= item[1]):
+                return False
+            self._put(key, value, ttl_seconds)
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _put(self, key, value, ttl_seconds):
+        expires_at = time.time() + ttl_seconds if ttl_seconds else None
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+class RedisStore:
+    """
+    Store on a Redis-compatible server (values are JSON encoded).
+
+    Args:
+        url: redis:// URL, e.g. redis://localhost:6379/0
+        prefix: Key prefix so the cache can share a database
+    """
+
+    def __init__(self, url, prefix='medianalytica:'):
+        import redis
+
+        self.url = url
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        raw = self._client.get(self.prefix + key)
+        return None if raw is None else json.loads(raw)
+
+    def set(self, key, value, ttl_seconds=None):
+        self._client.set(self.prefix + key, json.dumps(value), ex=int(ttl_seconds) if ttl_seconds else None)
+
+    def add(self, key, value, ttl_seconds=None):
+        return bool(self._client.set(self.prefix + key, json.dumps(value),
+                                     ex=int(ttl_seconds) if ttl_seconds else None, nx=True))
+
+    def delete(self, key):
+        self._client.delete(self.prefix + key)
+
+
+class ResponseCache:
+    """
+    Owner/scope keyed JSON response cache with explicit invalidation.
+
+    Args:
+        store: MemoryStore, RedisStore or another object with get/set/add/delete
+        ttl_seconds: Entry lifetime; bounds staleness for writes that bypass
+            the API (e.g. client-side Firestore writes)
+    """
+
+    # Generation tokens outlive entries so invalidation keeps working
+    GENERATION_TTL_FACTOR = 10
+
+    def __init__(self, store, ttl_seconds=300):
+        self.store = store
+        self.ttl_seconds = float(ttl_seconds)
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'invalidations': 0, 'errors': 0}
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build a cache from environment variables:
+        RESPONSE_CACHE_BACKEND (memory/redis, default memory),
+        RESPONSE_CACHE_SIZE (memory store entries, default 2048, 0 disables),
+        RESPONSE_CACHE_TTL (seconds, default 300),
+        REDIS_URL (redis backend, default redis://localhost:6379/0).
+        """
+        backend = os.environ.get('RESPONSE_CACHE_BACKEND', 'memory').strip().lower()
+        if backend not in BACKENDS:
+            raise ValueError(f"RESPONSE_CACHE_BACKEND must be one of {BACKENDS}, got {backend!r}")
+        ttl_seconds = float(os.environ.get('RESPONSE_CACHE_TTL', '300'))
+        max_entries = int(os.environ.get('RESPONSE_CACHE_SIZE', '2048'))
+
+        if backend == 'redis':
+            url = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+            try:
+                return cls(RedisStore(url), ttl_seconds=ttl_seconds)
+            except ImportError:
+                logger.warning("redis package not installed, falling back to the in-process response cache")
+        return cls(MemoryStore(max_entries), ttl_seconds=ttl_seconds)
+
+    @property
+    def enabled(self):
+        return self.ttl_seconds > 0 and getattr(self.store, 'max_entries', 1) > 0
+
+    def lookup(self, owner, scope, params=None):
+        """
+        Cached response for owner + scope + params, and the generation to
+        pass to set() on a miss.
+
+        Returns:
+            (value or None, generation): generation is a new, not yet stored
+            token if owner/scope has none
+        """
+        if not self.enabled:
+            return None, None
+        try:
+            generation = self.store.get(self._generation_key(owner, scope))
+            value = None
+            if generation is not None:
+                value = self.store.get(self._entry_key(owner, scope, generation, params))
+        except Exception as e:
+            return self._error('get', e), None
+        self._count('hits' if value is not None else 'misses')
+        return value, generation or uuid.uuid4().hex
+
+    def get(self, owner, scope, params=None):
+        """
+        Cached response for owner + scope + params.
+
+        Returns:
+            The cached JSON-serializable value, or None
+        """
+        return self.lookup(owner, scope, params)[0]
+
+    def set(self, owner, scope, value, params=None, generation=None):
+        """
+        Store a JSON-serializable response value.
+
+        Args:
+            generation: Generation returned by lookup() before the data was
+                read. The value is dropped if owner/scope has been
+                invalidated since. Without it the current generation is used.
+        """
+        if not self.enabled:
+            return
+        try:
+            if generation is None:
+                generation = self._generation(owner, scope)
+            elif not self._claim_generation(owner, scope, generation):
+                return
+            self.store.set(self._entry_key(owner, scope, generation, params), value, self.ttl_seconds)
+        except Exception as e:
+            self._error('set', e)
+
+    def invalidate(self, owner, *scopes):
+        """Drop every cached response of these scopes for owner (all params)."""
+        if not self.enabled:
+            return
+        for scope in scopes:
+            try:
+                self.store.set(self._generation_key(owner, scope), uuid.uuid4().hex,
+                               self.ttl_seconds * self.GENERATION_TTL_FACTOR)
+            except Exception as e:
+                self._error('invalidate', e)
+                continue
+            self._count('invalidations')
+
+    def stats(self):
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['misses']
+            return {
+                'enabled': self.enabled,
+                'backend': type(self.store).__name__,
+                'ttl_seconds': self.ttl_seconds,
+                'hit_rate': round(self._counters['hits'] / lookups, 4) if lookups else 0.0,
+                **self._counters
+            }
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _generation_key(owner, scope):
+        return f"gen:{owner}:{scope}"
+
+    @staticmethod
+    def _entry_key(owner, scope, generation, params):
+        query = '&'.join(f"{k}={v}" for k, v in sorted((params or {}).items()))
+        return f"resp:{owner}:{scope}:{generation}:{query}"
+
+    def _generation(self, owner, scope):
+        key = self._generation_key(owner, scope)
+        generation = self.store.get(key)
+        if generation is None:
+            # Missing (first use or evicted): a fresh token orphans any old entries
+            generation = uuid.uuid4().hex
+            self.store.set(key, generation, self.ttl_seconds * self.GENERATION_TTL_FACTOR)
+        return generation
+
+    def _claim_generation(self, owner, scope, generation):
+        """Whether generation is (or, if none was stored, now becomes) the current one."""
+        key = self._generation_key(owner, scope)
+        if self.store.add(key, generation, self.ttl_seconds * self.GENERATION_TTL_FACTOR):
+            return True
+        return self.store.get(key) == generation
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _error(self, operation, error):
+        self._count('errors')
+        logger.warning(f"Response cache {operation} failed: {str(error)[:200]}")
+        return None
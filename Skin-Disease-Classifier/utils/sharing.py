@@ -0,0 +1,141 @@
+"""
+Public analysis share links.
+
+Share documents live at shared/{shareToken} and embed a snapshot of the
+analysis, so opening a link is a single document read by ID. Shares are
+immutable after creation, which makes the public response cacheable until
+expiresAt: it carries an ETag and a Cache-Control max-age that never extends
+past the expiry.
+
+Documents created before this layout have a random document ID, are found
+with a shareToken query, and have no snapshot. migrate_shared_links() moves
+them to the token-keyed layout.
+"""
+
+from datetime import datetime, timezone
+import hashlib
+import json
+import logging
+import time
+
+from .helpers import serialize_firestore_timestamp, to_json_value
+
+logger = logging.getLogger(__name__)
+
+SHARED_COLLECTION = 'shared'
+
+# Fields of the analysis that are not shown on the public page
+PRIVATE_FIELDS = ('userId',)
+
+# Firestore batch limit is 500 writes
+BATCH_SIZE = 400
+
+
+def share_snapshot(analysis_data):
+    """Analysis fields embedded in a share document (private fields removed)."""
+    return {key: value for key, value in analysis_data.items() if key not in PRIVATE_FIELDS}
+
+
+def public_analysis(snapshot):
+    """Share snapshot -> JSON-ready analysis for the public endpoint."""
+    return to_json_value(snapshot)
+
+
+def expiry_timestamp(expires_at):
+    """
+    expiresAt field -> Unix timestamp.
+
+    Firestore returns timezone-aware datetimes; naive datetimes (written with
+    datetime.utcnow()) are treated as UTC.
+    """
+    if isinstance(expires_at, datetime) and expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return serialize_firestore_timestamp(expires_at)
+
+
+def share_etag(payload):
+    """Strong ETag value (unquoted, as werkzeug's set_etag expects) for a public response."""
+    body = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()[:32]
+
+
+def cache_max_age(expires_at, max_age_cap, now=None):
+    """
+    Cache-Control max-age (seconds) for a share that expires at expires_at.
+
+    Args:
+        expires_at (float): Unix timestamp, or None for no expiry
+        max_age_cap (int): Upper bound
+        now (float): Current Unix time (default: time.time())
+
+    Returns:
+        int: 0 when already expired
+    """
+    now = time.time() if now is None else now
+    if expires_at is None:
+        return int(max_age_cap)
+    return max(0, min(int(max_age_cap), int(expires_at - now)))
+
+
+def find_legacy_share(db, share_token):
+    """Share document created with a random ID (shareToken query), or None."""
+    for doc in db.collection(SHARED_COLLECTION).where('shareToken', '==', share_token).limit(1).stream():
+        if doc.id != share_token:
+            return doc
+    return None
+
+
+def migrate_share(db, share_doc, batch=None):
+    """
+    Write a legacy share under its token (with an analysis snapshot) and delete the old document.
+
+    Returns:
+        dict: The migrated share data, or None if the analysis no longer exists
+    """
+    data = share_doc.to_dict()
+    if 'analysis' not in data:
+        analysis_doc = db.collection('analyses').document(data.get('analysisId', '')).get() \
+            if data.get('analysisId') else None
+        if analysis_doc is None or not analysis_doc.exists:
+            return None
+        data['analysis'] = share_snapshot(analysis_doc.to_dict())
+
+    writer = batch if batch is not None else db.batch()
+    writer.set(db.collection(SHARED_COLLECTION).document(data['shareToken']), data)
+    writer.delete(share_doc.reference)
+    if batch is None:
+        writer.commit()
+    return data
+
+
+def migrate_shared_links(db, dry_run=False):
+    """
+    Move every legacy share document to shared/{shareToken}.
+
+    Returns:
+        dict: {"migrated": int, "skipped": int} (skipped = analysis deleted)
+    """
+    result = {'migrated': 0, 'skipped': 0}
+    batch = db.batch()
+    pending = 0
+    for doc in db.collection(SHARED_COLLECTION).stream():
+        token = doc.to_dict().get('shareToken')
+        if not token or doc.id == token:
+            continue
+        if dry_run:
+            result['migrated'] += 1
+            continue
+        if migrate_share(db, doc, batch=batch) is None:
+            result['skipped'] += 1
+            continue
+        result['migrated'] += 1
+        pending += 2
+        if pending >= BATCH_SIZE:
+            batch.commit()
+            batch = db.batch()
+            pending = 0
+    if pending:
+        batch.commit()
+
+    logger.info(f"Shared links migrated: {result}")
+    return result
@@ -0,0 +1,204 @@
+"""
+Per-user statistics aggregate.
+
+Every user has one document in the userStats collection (document ID = uid)
+that is kept up to date when analyses are written, so GET /api/user/stats is a
+single document read instead of several scans over the analyses collection:
+
+    {
+        "totalAnalyses": int,
+        "diseaseTypeCounts": {"skin": int, "bone": int, ...},
+        "lastAnalysisAt": Timestamp,
+        "updatedAt": Timestamp,
+        "rebuilt": True
+    }
+
+rebuild_user_stats() recomputes the documents from the analyses collection
+(backfill for existing users, repair after manual edits) and sets the
+"rebuilt" marker. Increments never set it, so a document created by an
+increment alone (a user who saved analyses before the aggregate existed)
+is recognised as incomplete; ensure_user_stats() backfills it before the
+next increment or read.
+"""
+
+from collections import defaultdict
+from firebase_admin import firestore
+import logging
+
+from .helpers import serialize_firestore_timestamp
+from .validators import ALLOWED_DISEASE_TYPES
+
+logger = logging.getLogger(__name__)
+
+USER_STATS_COLLECTION = 'userStats'
+
+# Set only by rebuild_user_stats(): the counts cover every analysis
+REBUILT_FIELD = 'rebuilt'
+
+# Firestore batch limit is 500 writes
+BATCH_SIZE = 400
+
+
+def stats_update(disease_type, delta=1):
+    """
+    Fields for set(..., merge=True) on a user's stats document.
+
+    Counts use atomic increments, so concurrent analyses of the same user
+    do not overwrite each other.
+
+    Args:
+        disease_type (str): Disease type of the added/removed analysis
+        delta (int): +1 when an analysis is saved, -1 when one is deleted
+
+    Returns:
+        dict: Update fields
+    """
+    update = {
+        'totalAnalyses': firestore.Increment(delta),
+        'diseaseTypeCounts': {disease_type: firestore.Increment(delta)},
+        'updatedAt': firestore.SERVER_TIMESTAMP
+    }
+    if delta > 0:
+        update['lastAnalysisAt'] = firestore.SERVER_TIMESTAMP
+    return update
+
+
+def compute_user_stats(analyses):
+    """
+    Compute a stats document from analysis data.
+
+    Args:
+        analyses: Iterable of analysis dicts (diseaseType, createdAt)
+
+    Returns:
+        dict: totalAnalyses, diseaseTypeCounts, lastAnalysisAt
+    """
+    counts = defaultdict(int)
+    total = 0
+    last_analysis_at = None
+    last_timestamp = None
+
+    for data in analyses:
+        total += 1
+        disease_type = data.get('diseaseType')
+        if disease_type:
+            counts[disease_type] += 1
+        created_at = data.get('createdAt')
+        timestamp = serialize_firestore_timestamp(created_at) if created_at is not None else None
+        if timestamp is not None and (last_timestamp is None or timestamp > last_timestamp):
+            last_timestamp = timestamp
+            last_analysis_at = created_at
+
+    return {
+        'totalAnalyses': total,
+        'diseaseTypeCounts': dict(counts),
+        'lastAnalysisAt': last_analysis_at
+    }
+
+
+def stats_summary(stats_data):
+    """
+    Response fields for GET /api/user/stats from a stats document.
+
+    Args:
+        stats_data (dict): Stats document data, or None if it does not exist
+
+    Returns:
+        dict: totalAnalyses, diseaseTypeCounts, mostAnalyzedDisease, lastAnalysisDate
+    """
+    stats_data = stats_data or {}
+    stored_counts = stats_data.get('diseaseTypeCounts') or {}
+    disease_counts = {dt: int(stored_counts.get(dt, 0)) for dt in sorted(ALLOWED_DISEASE_TYPES)}
+
+    most_analyzed = None
+    if disease_counts and max(disease_counts.values()) > 0:
+        most_analyzed = max(disease_counts.items(), key=lambda x: x[1])[0]
+
+    return {
+        'totalAnalyses': int(stats_data.get('totalAnalyses', 0)),
+        'diseaseTypeCounts': disease_counts,
+        'mostAnalyzedDisease': most_analyzed,
+        'lastAnalysisDate': serialize_firestore_timestamp(stats_data.get('lastAnalysisAt'))
+    }
+
+
+def needs_rebuild(stats_data):
+    """
+    Whether a stats document must be recomputed before it can be used.
+
+    Args:
+        stats_data (dict): Stats document data, or None if it does not exist
+
+    Returns:
+        bool: True if the document is missing or was never rebuilt
+    """
+    return not stats_data or not stats_data.get(REBUILT_FIELD)
+
+
+def ensure_user_stats(db, uid):
+    """
+    Return a user's stats, backfilling them from analyses if needed.
+
+    Called before every increment and on read, so the first analysis saved
+    or deleted after the aggregate was deployed does not create a document
+    holding only that delta. The backfill runs before the caller commits its
+    own analysis write, which the increment then adds on top.
+
+    Args:
+        db: Firestore client
+        uid (str): User ID
+
+    Returns:
+        dict: Stats document data (or the rebuilt stats)
+    """
+    stats_doc = db.collection(USER_STATS_COLLECTION).document(uid).get()
+    stats_data = stats_doc.to_dict() if stats_doc.exists else None
+    if not needs_rebuild(stats_data):
+        return stats_data
+    logger.info(f"Backfilling stats for user {uid}")
+    return rebuild_user_stats(db, uid=uid).get(uid)
+
+
+def rebuild_user_stats(db, uid=None, dry_run=False):
+    """
+    Recompute stats documents from the analyses collection.
+
+    Args:
+        db: Firestore client
+        uid (str): Only rebuild this user (default: every user with analyses)
+        dry_run (bool): Compute but do not write
+
+    Returns:
+        dict: uid -> computed stats
+    """
+    query = db.collection('analyses')
+    if uid:
+        query = query.where('userId', '==', uid)
+
+    per_user = defaultdict(list)
+    for doc in query.stream():
+        data = doc.to_dict()
+        if data.get('userId'):
+            per_user[data['userId']].append(data)
+    if uid:
+        per_user.setdefault(uid, [])
+
+    results = {user_id: compute_user_stats(analyses) for user_id, analyses in per_user.items()}
+    if dry_run:
+        return results
+
+    batch = db.batch()
+    pending = 0
+    for user_id, stats in results.items():
+        ref = db.collection(USER_STATS_COLLECTION).document(user_id)
+        batch.set(ref, {**stats, 'updatedAt': firestore.SERVER_TIMESTAMP, REBUILT_FIELD: True})
+        pending += 1
+        if pending >= BATCH_SIZE:
+            batch.commit()
+            batch = db.batch()
+            pending = 0
+    if pending:
+        batch.commit()
+
+    logger.info(f"Rebuilt stats for {len(results)} user(s)")
+    return results
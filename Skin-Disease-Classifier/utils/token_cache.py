@@ -0,0 +1,156 @@
+"""
+Verified Firebase ID token cache and lastLogin write coalescing.
+
+auth.verify_id_token checks the RS256 signature (and, with check_revoked,
+fetches the user record) on every request. TokenCache keeps the decoded
+claims of recently verified tokens in a bounded in-process LRU, keyed by a
+SHA-256 of the token (the raw token is never stored). An entry is reused until
+the earlier of the token's `exp` and `max_age` seconds after verification;
+max_age bounds how long a revoked or disabled user keeps access when
+revocation checks are enabled.
+
+LastLoginThrottle lets /auth/verify write users/{uid}.lastLogin at most once
+per interval per user instead of on every call.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenCache:
+    """
+    Bounded LRU of verified ID tokens.
+
+    Args:
+        max_entries: Maximum number of cached tokens (0 disables the cache)
+        max_age_seconds: Re-verify a cached token after this long
+        check_revoked: Pass check_revoked=True to verify_id_token
+    """
+
+    def __init__(self, max_entries=10000, max_age_seconds=300, check_revoked=False):
+        self.max_entries = max(0, int(max_entries))
+        self.max_age_seconds = float(max_age_seconds)
+        self.check_revoked = bool(check_revoked)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build a cache from environment variables:
+        TOKEN_CACHE_SIZE (default 10000, 0 disables),
+        TOKEN_CACHE_MAX_AGE (seconds, default 300),
+        TOKEN_CHECK_REVOKED (true/false, default false).
+        """
+        return cls(
+            max_entries=int(os.environ.get('TOKEN_CACHE_SIZE', '10000')),
+            max_age_seconds=float(os.environ.get('TOKEN_CACHE_MAX_AGE', '300')),
+            check_revoked=os.environ.get('TOKEN_CHECK_REVOKED', 'false').strip().lower() in ('1', 'true', 'yes')
+        )
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0 and self.max_age_seconds > 0
+
+    @staticmethod
+    def token_key(token):
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def verify(self, token, verifier):
+        """
+        Decoded claims of a token, verifying it only on a cache miss.
+
+        Args:
+            token (str): Firebase ID token
+            verifier: Callable (token, check_revoked=bool) -> decoded claims,
+                normally firebase_admin.auth.verify_id_token
+
+        Returns:
+            dict: Decoded token claims
+
+        Raises:
+            Whatever verifier raises (failed verifications are not cached)
+        """
+        if not self.enabled:
+            return verifier(token, check_revoked=self.check_revoked)
+
+        key = self.token_key(token)
+        now = time.time()
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None:
+                decoded, expires_at = item
+                if now < expires_at:
+                    self._entries.move_to_end(key)
+                    self._counters['hits'] += 1
+                    return decoded
+                del self._entries[key]
+            self._counters['misses'] += 1
+
+        decoded = verifier(token, check_revoked=self.check_revoked)
+        expires_at = min(float(decoded.get('exp', now)), now + self.max_age_seconds)
+        if expires_at > now:
+            with self._lock:
+                self._entries[key] = (decoded, expires_at)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._counters['evictions'] += 1
+        return decoded
+
+    def forget_user(self, uid):
+        """Drop every cached token of a user (e.g. after revoking their sessions)."""
+        with self._lock:
+            for key in [k for k, (decoded, _) in self._entries.items() if decoded.get('uid') == uid]:
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['misses']
+            return {
+                'enabled': self.enabled,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'max_age_seconds': self.max_age_seconds,
+                'check_revoked': self.check_revoked,
+                'hit_rate': round(self._counters['hits'] / lookups, 4) if lookups else 0.0,
+                **self._counters
+            }
+
+
+class LastLoginThrottle:
+    """
+    At most one lastLogin write per user per interval (per process).
+
+    Args:
+        interval_seconds: Minimum time between writes for one user (0 = always write)
+        max_users: Bound on remembered users
+    """
+
+    def __init__(self, interval_seconds=900, max_users=10000):
+        self.interval_seconds = float(interval_seconds)
+        self.max_users = max(1, int(max_users))
+        self._last_write = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """LAST_LOGIN_WRITE_INTERVAL (minutes, default 15, 0 writes on every call)."""
+        return cls(interval_seconds=float(os.environ.get('LAST_LOGIN_WRITE_INTERVAL', '15')) * 60)
+
+    def should_write(self, uid):
+        """Whether lastLogin should be written now; records the write if so."""
+        now = time.time()
+        with self._lock:
+            last = self._last_write.get(uid)
+            if last is not None and now - last < self.interval_seconds:
+                return False
+            self._last_write[uid] = now
+            self._last_write.move_to_end(uid)
+            while len(self._last_write) > self.max_users:
+                self._last_write.popitem(last=False)
+            return True
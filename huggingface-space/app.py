@@ -8,6 +8,13 @@ Supports: Skin, Bone, Lung, Eye Disease Detection
 
 import os
 import sys
+import glob
+import time
+import shutil
+import gc
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import numpy as np
 from flask import Flask, request, jsonify
 from flask_cors import CORS
@@ -16,21 +23,21 @@ import io
 import tensorflow as tf
 from tensorflow import keras
 
-# OpenCV for CLAHE (X-ray preprocessing)
-try:
-    import cv2
-    CLAHE_AVAILABLE = True
-except ImportError:
-    print("[WARNING] OpenCV not available. CLAHE disabled.")
-    CLAHE_AVAILABLE = False
+from batching import MicroBatcher
+from prediction_cache import PredictionCache, model_version
+from warmup import Warmup, warmup_batch_sizes
+from tflite_backend import inference_backend, tflite_precision, tflite_model_path, open_tflite_model
+from onnx_backend import onnx_model_path, open_onnx_model
+from manifest import load_manifest, manifest_path, output_key, select_output
 
-# Preprocessing functions
-from tensorflow.keras.applications.densenet import preprocess_input as densenet_preprocess
-from tensorflow.keras.applications.efficientnet import preprocess_input as efficientnet_preprocess
+# Preprocessing pipelines (CLAHE for X-rays needs OpenCV)
+from preprocessing import CLAHE_AVAILABLE, PreprocessPool, Preprocessor
+if not CLAHE_AVAILABLE:
+    print("[WARNING] OpenCV not available. CLAHE disabled.")
 
 # Hugging Face Hub for model downloading
 try:
-    from huggingface_hub import snapshot_download, hf_hub_download
+    from huggingface_hub import snapshot_download, hf_hub_download, HfApi
     HF_HUB_AVAILABLE = True
 except ImportError:
     print("[WARNING] huggingface_hub not available. Models must be in local 'models/' folder.")
@@ -46,6 +53,24 @@ CORS(app)
 HF_USERNAME = os.environ.get('HF_USERNAME', 'melihkzmz')  # Set your HF username here or via env var
 REPO_PREFIX = 'medianalytica'  # Prefix for model repositories
 
+# Local model cache (one directory per Hub revision) and bootstrap parallelism
+MODEL_CACHE_DIR = os.environ.get('MODEL_CACHE_DIR', 'models')
+MODEL_LOAD_WORKERS = int(os.environ.get('MODEL_LOAD_WORKERS', '4'))
+BOOTSTRAP_TIMINGS = {}
+
+# Lazy mode: models are loaded on first request and evicted (least recently
+# used first) when the resident set exceeds MODEL_MEMORY_BUDGET_MB (0 = no limit).
+# Models listed in PINNED_MODELS are loaded at startup and never evicted.
+LAZY_LOADING = os.environ.get('LAZY_LOADING', 'false').lower() == 'true'
+MODEL_MEMORY_BUDGET_MB = float(os.environ.get('MODEL_MEMORY_BUDGET_MB', '0'))
+PINNED_MODELS = {m.strip() for m in os.environ.get('PINNED_MODELS', '').split(',') if m.strip()}
+
+# Micro-batching: concurrent requests for the same disease are stacked into one
+# forward pass. Requests wait at most BATCH_WINDOW_MS for others to arrive.
+BATCHING_ENABLED = os.environ.get('BATCHING_ENABLED', 'true').lower() == 'true'
+BATCH_MAX_SIZE = int(os.environ.get('BATCH_MAX_SIZE', '8'))
+BATCH_WINDOW_MS = float(os.environ.get('BATCH_WINDOW_MS', '10'))
+
 # ============================================================================
 # MODEL CONFIGURATIONS
 # ============================================================================
@@ -114,7 +139,7 @@ MODELS = {
             'Retinal_Detachment': 'Retina Dekolmanı',
             'Retinitis_Pigmentosa': 'Retinitis Pigmentosa'
         },
-        'preprocess': 'simple',
+        'preprocess': 'rescale',
         'model': None
     }
 }
@@ -164,76 +189,73 @@ class StreamingMacroF1(keras.metrics.Metric):
 # PREPROCESSING FUNCTIONS
 # ============================================================================
 
-def apply_clahe(img):
-    """Apply CLAHE for X-ray images"""
-    if not CLAHE_AVAILABLE:
-        return img
-    
-    if img.dtype != np.uint8:
-        img_uint8 = np.clip(img, 0, 255).astype(np.uint8)
-    else:
-        img_uint8 = img
-    
-    # Check if grayscale
-    if len(img_uint8.shape) == 3 and img_uint8.shape[2] == 3:
-        if np.allclose(img_uint8[:,:,0], img_uint8[:,:,1]) and np.allclose(img_uint8[:,:,1], img_uint8[:,:,2]):
-            img_2d = img_uint8[:,:,0]
-        else:
-            return img  # RGB image, no CLAHE
-    elif len(img_uint8.shape) == 2:
-        img_2d = img_uint8
-    else:
-        return img
-    
-    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-    img_clahe = clahe.apply(img_2d)
-    
-    # Convert back to RGB
-    return np.stack([img_clahe] * 3, axis=-1)
+# One pipeline per model, see preprocessing.py
+PREPROCESSORS = {
+    disease_type: Preprocessor(config['preprocess'], config['img_size'])
+    for disease_type, config in MODELS.items()
+}
+
+# PREPROCESS_WORKERS > 0 runs decode/resize/CLAHE on a worker pool, next to
+# the micro-batcher threads that run the models
+preprocess_pool = PreprocessPool.from_env()
 
 def preprocess_image(image, disease_type):
-    """Preprocess image based on disease type"""
-    config = MODELS[disease_type]
-    img_size = config['img_size']
-    preprocess_type = config['preprocess']
-    
-    # Resize
-    image = image.resize(img_size)
-    img_array = np.array(image)
-    
-    # Ensure RGB
-    if len(img_array.shape) == 2:
-        img_array = np.stack([img_array] * 3, axis=-1)
-    elif img_array.shape[2] == 4:
-        img_array = img_array[:, :, :3]
-    elif img_array.shape[2] == 1:
-        img_array = np.repeat(img_array, 3, axis=-1)
-    
-    # Apply preprocessing
-    if preprocess_type == 'densenet_clahe':
-        # Apply CLAHE for X-ray images
-        if img_array.dtype != np.uint8:
-            img_array = np.clip(img_array, 0, 255).astype(np.uint8)
-        img_array = apply_clahe(img_array)
-        img_array = img_array.astype(np.float32)
-        img_array = np.expand_dims(img_array, axis=0)
-        img_array = densenet_preprocess(img_array)
-    elif preprocess_type == 'efficientnet':
-        img_array = img_array.astype(np.float32)
-        img_array = np.expand_dims(img_array, axis=0)
-        img_array = efficientnet_preprocess(img_array)
-    else:  # simple - for eye
-        img_array = img_array.astype(np.float32) / 255.0
-        img_array = np.expand_dims(img_array, axis=0)
-    
-    return img_array
+    """
+    Preprocess a PIL image or encoded upload bytes based on disease type,
+    returns (1, H, W, 3) float32
+    """
+    return preprocess_pool.run(PREPROCESSORS[disease_type], image)
 
 # ============================================================================
 # MODEL DOWNLOADING FROM HUGGING FACE HUB
 # ============================================================================
+#
+# Snapshots are stored per revision: models/<disease>/<commit sha>/. A snapshot
+# is only downloaded when the Hub revision has no complete local copy, so warm
+# restarts skip the download entirely.
+
+SNAPSHOT_MARKER = '.snapshot_complete'
+
+def resolve_hub_revision(hf_repo):
+    """Current commit sha of a Hub repository, or None if the Hub is unreachable"""
+    try:
+        return HfApi().model_info(hf_repo).sha
+    except Exception as e:
+        print(f"[INFO] Could not resolve revision for {hf_repo}: {str(e)[:200]}")
+        return None
+
+def find_cached_snapshot(disease_type, revision=None):
+    """
+    Local snapshot directory for a revision. Without a revision (offline),
+    the most recently completed snapshot is returned.
+    """
+    disease_dir = os.path.join(MODEL_CACHE_DIR, disease_type)
+    if revision:
+        snapshot_dir = os.path.join(disease_dir, revision)
+        if os.path.exists(os.path.join(snapshot_dir, SNAPSHOT_MARKER)):
+            return snapshot_dir
+        return None
+    
+    if not os.path.isdir(disease_dir):
+        return None
+    snapshots = [
+        os.path.join(disease_dir, name) for name in os.listdir(disease_dir)
+        if os.path.exists(os.path.join(disease_dir, name, SNAPSHOT_MARKER))
+    ]
+    if not snapshots:
+        return None
+    return max(snapshots, key=lambda d: os.path.getmtime(os.path.join(d, SNAPSHOT_MARKER)))
+
+def prune_snapshots(disease_type, keep_dir):
+    """Remove snapshots of older revisions"""
+    disease_dir = os.path.join(MODEL_CACHE_DIR, disease_type)
+    for name in os.listdir(disease_dir):
+        path = os.path.join(disease_dir, name)
+        if os.path.isdir(path) and os.path.abspath(path) != os.path.abspath(keep_dir):
+            shutil.rmtree(path, ignore_errors=True)
 
 def download_model_from_hub(disease_type, config):
-    """Download model from Hugging Face Hub"""
+    """Download model from Hugging Face Hub (skipped when the revision is already cached)"""
     if not HF_HUB_AVAILABLE:
         return None
     
@@ -242,25 +264,32 @@ def download_model_from_hub(disease_type, config):
         print(f"[SKIP] {disease_type}: HF_USERNAME not configured")
         return None
     
+    revision = resolve_hub_revision(hf_repo)
+    cached_dir = find_cached_snapshot(disease_type, revision)
+    if cached_dir:
+        print(f"[CACHE] {disease_type}: Revision {revision or 'latest local'} already downloaded ({cached_dir})")
+        config['timings']['cache_hit'] = True
+        return cached_dir
+    if revision is None:
+        print(f"[WARNING] {disease_type}: Hub unreachable and no cached snapshot")
+        return None
+    
     try:
-        print(f"[DOWNLOAD] {disease_type}: Downloading from {hf_repo}...")
-        
-        # Create models directory
-        os.makedirs('models', exist_ok=True)
+        print(f"[DOWNLOAD] {disease_type}: Downloading {hf_repo}@{revision[:8]}...")
         
         # Download entire repository (for SavedModel) or specific file
-        local_dir = os.path.join('models', disease_type)
+        local_dir = os.path.join(MODEL_CACHE_DIR, disease_type, revision)
+        os.makedirs(local_dir, exist_ok=True)
         
         # Try to download as repository first (for SavedModel)
         try:
             snapshot_download(
                 repo_id=hf_repo,
+                revision=revision,
                 local_dir=local_dir,
                 repo_type="model",
                 local_dir_use_symlinks=False
             )
-            print(f"[SUCCESS] {disease_type}: Downloaded to {local_dir}")
-            return local_dir
         except Exception as e:
             # If repository download fails, try downloading individual files
             print(f"[INFO] {disease_type}: Repository download failed, trying individual files...")
@@ -273,93 +302,352 @@ def download_model_from_hub(disease_type, config):
                 'model.pb'
             ]
             
+            downloaded = False
             for filename in model_files:
                 try:
-                    downloaded_path = hf_hub_download(
+                    hf_hub_download(
                         repo_id=hf_repo,
                         filename=filename,
+                        revision=revision,
                         local_dir=local_dir,
                         repo_type="model",
                         local_dir_use_symlinks=False
                     )
                     print(f"[SUCCESS] {disease_type}: Downloaded {filename}")
-                    return os.path.dirname(downloaded_path) if os.path.isfile(downloaded_path) else downloaded_path
+                    downloaded = True
+                    break
                 except:
                     continue
             
-            print(f"[WARNING] {disease_type}: Could not download from Hub: {e}")
-            return None
+            if not downloaded:
+                print(f"[WARNING] {disease_type}: Could not download from Hub: {e}")
+                return None
+        
+        # Mark the snapshot complete only after every file is in place
+        with open(os.path.join(local_dir, SNAPSHOT_MARKER), 'w') as f:
+            f.write(revision)
+        prune_snapshots(disease_type, local_dir)
+        print(f"[SUCCESS] {disease_type}: Downloaded to {local_dir}")
+        return local_dir
             
     except Exception as e:
         print(f"[ERROR] {disease_type}: Download failed: {e}")
         return None
 
+def resolve_model_path(hub_path):
+    """A snapshot directory is either a SavedModel or contains a single .keras/.h5 file"""
+    if os.path.exists(os.path.join(hub_path, 'saved_model.pb')):
+        return hub_path
+    for name in sorted(os.listdir(hub_path)):
+        if name.endswith(('.keras', '.h5')):
+            return os.path.join(hub_path, name)
+    return hub_path
+
 # ============================================================================
 # MODEL LOADING
 # ============================================================================
 
-def load_models():
-    """Load all available models - tries Hub first, then local"""
-    custom_objects = {
-        'StreamingMacroF1': StreamingMacroF1,
-        'macro_f1_metric': StreamingMacroF1(num_classes=3)
-    }
+CUSTOM_OBJECTS = {
+    'StreamingMacroF1': StreamingMacroF1,
+    'macro_f1_metric': StreamingMacroF1(num_classes=3)
+}
+
+def load_runtime_model(path):
+    """TFLite / ONNX export for a loaded model: inside the Hub snapshot, else next to the local model"""
+    backend = inference_backend()
+    snapshot = path if os.path.isdir(path) else os.path.dirname(path)
+    if backend == 'tflite':
+        precision = tflite_precision()
+        matches = sorted(glob.glob(os.path.join(snapshot, f'*_{precision}.tflite')))
+        return open_tflite_model(matches[0] if matches else tflite_model_path(path, precision))
+    if backend == 'onnx':
+        matches = sorted(glob.glob(os.path.join(snapshot, '*.onnx')))
+        return open_onnx_model(matches[0] if matches else onnx_model_path(path))
+    return None
+
+def find_manifest(disease_type, path):
+    """export_model.py manifest: uploaded into the Hub snapshot, or next to the local model"""
+    snapshot = path if os.path.isdir(path) else os.path.dirname(path)
+    for candidate in (os.path.join(snapshot, f'{disease_type}_manifest.json'),
+                      manifest_path(os.path.dirname(MODELS[disease_type]['path']), disease_type)):
+        manifest = load_manifest(candidate)
+        if manifest:
+            return manifest
+    return None
+
+def load_model(disease_type, config):
+    """Download (if needed) and load a single model - tries Hub first, then local"""
+    config['timings'] = {'download_s': 0.0, 'load_s': 0.0, 'cache_hit': False}
     
-    for disease_type, config in MODELS.items():
-        # Step 1: Try downloading from Hugging Face Hub
-        hub_path = download_model_from_hub(disease_type, config)
+    # Step 1: Try downloading from Hugging Face Hub
+    start = time.perf_counter()
+    hub_path = download_model_from_hub(disease_type, config)
+    config['timings']['download_s'] = round(time.perf_counter() - start, 3)
+    
+    # Step 2: Try loading from Hub path, then local paths
+    paths_to_try = []
+    if hub_path:
+        paths_to_try.append(resolve_model_path(hub_path))
+    
+    # Add local paths
+    paths_to_try.extend([config['path'], config['path_alt']])
+    
+    # Try each path
+    start = time.perf_counter()
+    for path in paths_to_try:
+        if not path or not os.path.exists(path):
+            continue
         
-        # Step 2: Try loading from Hub path, then local paths
-        paths_to_try = []
-        if hub_path:
-            # If it's a directory, add it; if it's a file, add parent directory
-            if os.path.isdir(hub_path):
-                paths_to_try.append(hub_path)
+        try:
+            print(f"[LOADING] {disease_type}: {path}")
+            
+            if os.path.isdir(path):
+                # SavedModel format
+                model = tf.saved_model.load(path)
+                if hasattr(model, 'signatures') and 'serving_default' in model.signatures:
+                    config['model'] = model.signatures['serving_default']
+                    config['model_type'] = 'savedmodel'
+                else:
+                    config['model'] = model
+                    config['model_type'] = 'savedmodel_callable'
             else:
-                paths_to_try.append(os.path.dirname(hub_path))
-        
-        # Add local paths
-        paths_to_try.extend([config['path'], config['path_alt']])
-        
-        # Try each path
-        model_loaded = False
-        for path in paths_to_try:
-            if not path or not os.path.exists(path):
-                continue
+                # Keras format
+                config['model'] = keras.models.load_model(path, custom_objects=CUSTOM_OBJECTS, compile=False)
+                config['model_type'] = 'keras'
             
+            # Optional TFLite / ONNX Runtime backend (INFERENCE_BACKEND=tflite|onnx) for predictions
+            config['runtime'] = load_runtime_model(path)
+            # Signature output key from the export manifest (older exports: first key)
+            config['output_key'] = output_key(find_manifest(disease_type, path))
+            config['model_path'] = path
+            config['model_version'] = model_version(config['runtime'].path if config['runtime'] else path)
+            config['timings']['load_s'] = round(time.perf_counter() - start, 3)
+            print(f"[SUCCESS] {disease_type} model loaded! (version {config['model_version']}, "
+                  f"download {config['timings']['download_s']}s, load {config['timings']['load_s']}s)")
+            return True
+            
+        except Exception as e:
+            print(f"[ERROR] Failed to load {disease_type} from {path}: {str(e)[:200]}")
+            continue
+    
+    print(f"[WARNING] {disease_type} model not found! Check HF_USERNAME or upload models to Hub.")
+    return False
+
+def load_models(disease_types=None):
+    """Load models concurrently (all of them unless disease_types is given)"""
+    os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
+    if disease_types is None:
+        disease_types = list(MODELS.keys())
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=MODEL_LOAD_WORKERS) as executor:
+        futures = {executor.submit(load_model, d, MODELS[d]): d for d in disease_types}
+        for future in as_completed(futures):
             try:
-                print(f"[LOADING] {disease_type}: {path}")
-                
-                if os.path.isdir(path):
-                    # SavedModel format
-                    model = tf.saved_model.load(path)
-                    if hasattr(model, 'signatures') and 'serving_default' in model.signatures:
-                        config['model'] = model.signatures['serving_default']
-                        config['model_type'] = 'savedmodel'
-                    else:
-                        config['model'] = model
-                        config['model_type'] = 'savedmodel_callable'
-                else:
-                    # Keras format
-                    config['model'] = keras.models.load_model(path, custom_objects=custom_objects, compile=False)
-                    config['model_type'] = 'keras'
-                
-                print(f"[SUCCESS] {disease_type} model loaded!")
-                model_loaded = True
-                break
-                
+                future.result()
             except Exception as e:
-                print(f"[ERROR] Failed to load {disease_type} from {path}: {str(e)[:200]}")
+                print(f"[ERROR] {futures[future]}: Unexpected loading error: {e}")
+    
+    BOOTSTRAP_TIMINGS['total_s'] = round(time.perf_counter() - start, 3)
+    print(f"[BOOTSTRAP] Models ready in {BOOTSTRAP_TIMINGS['total_s']}s")
+
+# ============================================================================
+# MODEL POOL (LAZY LOADING)
+# ============================================================================
+
+RESIDENT_MODELS = OrderedDict()  # disease_type -> estimated size in MB, oldest first
+POOL_STATS = {'loads': 0, 'evictions': 0}
+_pool_lock = threading.Lock()
+_load_locks = {disease_type: threading.Lock() for disease_type in MODELS}
+
+def estimate_model_size_mb(path):
+    """Approximate resident size of a model from its size on disk"""
+    if not path or not os.path.exists(path):
+        return 0.0
+    if os.path.isfile(path):
+        return os.path.getsize(path) / (1024 * 1024)
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+    return total / (1024 * 1024)
+
+def register_resident(disease_type):
+    """Track a loaded model in the LRU and evict others if over budget"""
+    config = MODELS[disease_type]
+    with _pool_lock:
+        RESIDENT_MODELS[disease_type] = estimate_model_size_mb(config.get('model_path'))
+        RESIDENT_MODELS.move_to_end(disease_type)
+        POOL_STATS['loads'] += 1
+    evict_models(keep=disease_type)
+
+def evict_models(keep=None):
+    """Evict least recently used, unpinned models until the budget is met"""
+    if MODEL_MEMORY_BUDGET_MB <= 0:
+        return
+    
+    evicted = []
+    with _pool_lock:
+        total = sum(RESIDENT_MODELS.values())
+        for disease_type in list(RESIDENT_MODELS):
+            if total <= MODEL_MEMORY_BUDGET_MB:
+                break
+            if disease_type == keep or disease_type in PINNED_MODELS:
                 continue
-        
-        if not model_loaded:
-            print(f"[WARNING] {disease_type} model not found! Check HF_USERNAME or upload models to Hub.")
+            total -= RESIDENT_MODELS.pop(disease_type)
+            # In-flight requests keep their own reference; TF frees the graph
+            # once the last one finishes
+            MODELS[disease_type]['model'] = None
+            MODELS[disease_type]['runtime'] = None
+            POOL_STATS['evictions'] += 1
+            evicted.append(disease_type)
+    
+    if evicted:
+        gc.collect()
+        print(f"[POOL] Evicted {', '.join(evicted)} (budget {MODEL_MEMORY_BUDGET_MB:.0f} MB)")
+
+def get_model(disease_type):
+    """Resident model for a disease type, loading it first in lazy mode"""
+    config = MODELS[disease_type]
+    model = config['model']
+    if model is not None:
+        if LAZY_LOADING:
+            with _pool_lock:
+                if disease_type in RESIDENT_MODELS:
+                    RESIDENT_MODELS.move_to_end(disease_type)
+        return model
+    if not LAZY_LOADING:
+        return None
+    
+    with _load_locks[disease_type]:
+        if config['model'] is None:
+            print(f"[POOL] Loading {disease_type} on demand...")
+            if not load_model(disease_type, config):
+                return None
+            register_resident(disease_type)
+            # The request that triggered the load waits for warm-up, later ones hit a warm graph
+            Warmup(disease_type).start(build_warmup_steps([disease_type]), background=False)
+        return config['model']
+
+def pool_stats():
+    """Lazy-loading state for /metrics"""
+    with _pool_lock:
+        return {
+            "lazy_loading": LAZY_LOADING,
+            "memory_budget_mb": MODEL_MEMORY_BUDGET_MB,
+            "pinned": sorted(PINNED_MODELS),
+            "resident_mb": {k: round(v, 1) for k, v in RESIDENT_MODELS.items()},
+            **POOL_STATS
+        }
+
+# ============================================================================
+# INFERENCE
+# ============================================================================
+
+def run_model(disease_type, images):
+    """Run a preprocessed (N, H, W, 3) batch through the model, returns (N, num_classes)"""
+    config = MODELS[disease_type]
+    model = get_model(disease_type)
+    if model is None:
+        raise RuntimeError(f"Model for {disease_type} not loaded")
+    runtime_model = config.get('runtime')
+    if runtime_model is not None:
+        return runtime_model.predict(images)
+    model_type = config.get('model_type', 'keras')
+    
+    if model_type == 'savedmodel':
+        # SavedModel signature - output is a dict
+        predictions = model(tf.constant(images, dtype=tf.float32))
+        return select_output(predictions, config.get('output_key')).numpy()
+    elif model_type == 'savedmodel_callable':
+        predictions = model(tf.constant(images, dtype=tf.float32))
+        if hasattr(predictions, 'numpy'):
+            predictions = predictions.numpy()
+        return predictions
+    else:
+        return model.predict(images, verbose=0)
+
+# Repeated uploads of the same image are answered from this cache
+prediction_cache = PredictionCache.from_env()
+
+BATCHERS = {}
+
+def start_batchers():
+    """Create one micro-batcher per loaded model"""
+    if not BATCHING_ENABLED:
+        print("[BATCH] Micro-batching disabled")
+        return
+    
+    for disease_type, config in MODELS.items():
+        if config['model'] is None and not LAZY_LOADING:
+            continue
+        BATCHERS[disease_type] = MicroBatcher(
+            disease_type,
+            lambda images, d=disease_type: run_model(d, images),
+            max_batch_size=BATCH_MAX_SIZE,
+            window_ms=BATCH_WINDOW_MS
+        )
+    print(f"[BATCH] Micro-batching enabled: max_batch_size={BATCH_MAX_SIZE}, window={BATCH_WINDOW_MS}ms")
+
+# ============================================================================
+# WARM-UP
+# ============================================================================
+
+def default_warmup_batch_sizes():
+    """Every power of two up to the largest batch the micro-batcher can form"""
+    if not BATCHING_ENABLED:
+        return [1]
+    sizes = {BATCH_MAX_SIZE}
+    size = 1
+    while size < BATCH_MAX_SIZE:
+        sizes.add(size)
+        size *= 2
+    return sorted(sizes)
+
+def build_warmup_steps(disease_types):
+    """Dummy predictions at each warm-up batch size for the given (loaded) models"""
+    batch_sizes = warmup_batch_sizes(default_warmup_batch_sizes())
+    steps = []
+    for disease_type in disease_types:
+        config = MODELS[disease_type]
+        if config['model'] is None:
+            continue
+        width, height = config['img_size']
+        if config['preprocess'] == 'densenet_clahe':
+            # Grayscale sample so the CLAHE path is exercised too
+            gray = np.random.randint(0, 255, (height, width), dtype=np.uint8)
+            sample = Image.fromarray(gray).convert('RGB')
+        else:
+            sample = Image.fromarray(np.random.randint(0, 255, (height, width, 3), dtype=np.uint8))
+        processed = preprocess_image(sample, disease_type)
+        for batch_size in batch_sizes:
+            batch = np.repeat(processed, batch_size, axis=0)
+            steps.append((
+                f"{disease_type}_bs{batch_size}",
+                lambda d=disease_type, b=batch: run_model(d, b),
+                True
+            ))
+    return steps
+
+warmup = Warmup('combined')
 
 # Load models at startup
 print("=" * 60)
 print("MediAnalytica - Loading Models...")
 print("=" * 60)
-load_models()
+if LAZY_LOADING:
+    # Only pinned models are loaded up front, the rest on first request
+    print(f"[POOL] Lazy loading enabled (budget: {MODEL_MEMORY_BUDGET_MB or 'unlimited'} MB, pinned: {sorted(PINNED_MODELS) or 'none'})")
+    load_models([d for d in MODELS if d in PINNED_MODELS])
+    for disease_type in MODELS:
+        if MODELS[disease_type]['model'] is not None:
+            register_resident(disease_type)
+else:
+    load_models()
+start_batchers()
+if LAZY_LOADING or any(v['model'] is not None for v in MODELS.values()):
+    warmup.start(build_warmup_steps(list(MODELS.keys())))
+else:
+    warmup.fail("No models loaded")
 print("=" * 60)
 
 # ============================================================================
@@ -378,6 +666,8 @@ def home():
         "endpoints": {
             "GET /": "API status",
             "GET /health": "Health check",
+            "GET /ready": "Readiness (200 once warm-up has finished)",
+            "GET /metrics": "Inference metrics (batch-size histograms, prediction cache, load timings)",
             "POST /predict/<disease_type>": "Predict disease (skin, bone, lung, eye)",
             "GET /classes/<disease_type>": "Get class names"
         }
@@ -388,11 +678,37 @@ def health():
     """Health check endpoint"""
     available = sum(1 for v in MODELS.values() if v['model'] is not None)
     return jsonify({
-        "status": "healthy" if available > 0 else "no_models",
+        "status": "healthy" if available > 0 or LAZY_LOADING else "no_models",
         "models_loaded": available,
         "total_models": len(MODELS)
     })
 
+@app.route('/ready')
+def ready():
+    """Readiness probe - 503 until warm-up has finished"""
+    return jsonify(warmup.status()), 200 if warmup.ready else 503
+
+@app.route('/metrics')
+def metrics():
+    """Inference metrics"""
+    return jsonify({
+        "batching": {
+            "enabled": BATCHING_ENABLED,
+            "models": {k: b.stats() for k, b in BATCHERS.items()}
+        },
+        "prediction_cache": prediction_cache.stats(),
+        "preprocess_pool": preprocess_pool.stats(),
+        "model_pool": pool_stats(),
+        "backend": {
+            "requested": inference_backend(),
+            "models": {k: (v['runtime'].path if v.get('runtime') else 'tensorflow') for k, v in MODELS.items()}
+        },
+        "bootstrap": {
+            "total_s": BOOTSTRAP_TIMINGS.get('total_s'),
+            "models": {k: v.get('timings') for k, v in MODELS.items()}
+        }
+    })
+
 @app.route('/classes/<disease_type>')
 def get_classes(disease_type):
     """Get class names for a disease type"""
@@ -414,9 +730,10 @@ def predict(disease_type):
         return jsonify({"error": f"Unknown disease type: {disease_type}. Available: {list(MODELS.keys())}"}), 400
     
     config = MODELS[disease_type]
-    model = config['model']
     
-    if model is None:
+    # The model version is known once the model has been loaded (it is kept
+    # after a lazy-mode eviction so cached predictions stay valid)
+    if config.get('model_version') is None and get_model(disease_type) is None:
         return jsonify({"error": f"Model for {disease_type} not loaded"}), 503
     
     if 'image' not in request.files:
@@ -427,26 +744,24 @@ def predict(disease_type):
         return jsonify({"error": "Empty filename"}), 400
     
     try:
-        # Load and preprocess image
-        image = Image.open(io.BytesIO(file.read())).convert('RGB')
-        processed_image = preprocess_image(image, disease_type)
+        file_content = file.read()
+        cache_key = PredictionCache.make_key(file_content, disease_type, config.get('model_version', 'unknown'))
+        cached = prediction_cache.get(cache_key)
         
-        # Predict
-        model_type = config.get('model_type', 'keras')
-        if model_type == 'savedmodel':
-            # SavedModel signature
-            input_tensor = tf.constant(processed_image, dtype=tf.float32)
-            predictions = model(input_tensor)
-            # Get output from dict
-            output_key = list(predictions.keys())[0]
-            predictions = predictions[output_key].numpy()
-        elif model_type == 'savedmodel_callable':
-            input_tensor = tf.constant(processed_image, dtype=tf.float32)
-            predictions = model(input_tensor)
-            if hasattr(predictions, 'numpy'):
-                predictions = predictions.numpy()
+        if cached is not None:
+            predictions = cached.probabilities[np.newaxis, :]
         else:
-            predictions = model.predict(processed_image, verbose=0)
+            # Decode + preprocess (on the preprocessing pool when enabled);
+            # grayscale modes (L) are kept so X-rays skip the channel check
+            processed_image = preprocess_image(file_content, disease_type)
+            
+            # Predict (batched with concurrent requests when enabled)
+            batcher = BATCHERS.get(disease_type)
+            if batcher is not None:
+                predictions = batcher.submit(processed_image)
+            else:
+                predictions = run_model(disease_type, processed_image)
+            prediction_cache.put(cache_key, predictions[0])
         
         # Format results
         classes = config['classes']
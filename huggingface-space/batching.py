@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MediAnalytica - Dynamic micro-batching for model inference
+
+Concurrent /predict requests for the same disease type are collected for a
+short window (or until the batch is full), stacked into a single array and
+run through the model in one call. The probability rows are then handed back
+to the waiting requests.
+"""
+
+import threading
+import time
+import queue
+from collections import Counter
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class MicroBatcher:
+    """
+    Per-model batching scheduler.
+
+    Args:
+        name: Label used in logs and stats (e.g. 'skin')
+        predict_fn: Callable taking a (N, H, W, C) float32 array and returning
+            an (N, num_classes) array of probabilities
+        max_batch_size: Maximum number of images per model call
+        window_ms: How long the first request in a batch waits for others
+    """
+
+    def __init__(self, name, predict_fn, max_batch_size=8, window_ms=10.0):
+        self.name = name
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.window_ms = max(0.0, float(window_ms))
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._histogram = Counter()
+        self._requests = 0
+        self._batches = 0
+        self._fallbacks = 0
+
+        self._worker = threading.Thread(
+            target=self._run, name=f"batcher-{name}", daemon=True
+        )
+        self._worker.start()
+
+    def submit(self, images, timeout=None):
+        """
+        Queue a preprocessed batch (usually shape (1, H, W, C)) and block
+        until its predictions are ready.
+
+        Returns:
+            np.ndarray: Prediction rows for the submitted images
+        """
+        future = Future()
+        self._queue.put((images, future))
+        return future.result(timeout=timeout)
+
+    def stats(self):
+        """Batch-size histogram and counters."""
+        with self._lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "window_ms": self.window_ms,
+                "requests": self._requests,
+                "batches": self._batches,
+                "avg_batch_size": round(self._requests / self._batches, 2) if self._batches else 0.0,
+                "fallbacks": self._fallbacks,
+                "histogram": {str(size): count for size, count in sorted(self._histogram.items())}
+            }
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def _collect(self):
+        """Block for the first request, then gather more until the window closes."""
+        items = [self._queue.get()]
+        rows = len(items[0][0])
+        deadline = time.monotonic() + self.window_ms / 1000.0
+
+        while rows < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            items.append(item)
+            rows += len(item[0])
+
+        return items, rows
+
+    def _run(self):
+        while True:
+            items, rows = self._collect()
+
+            with self._lock:
+                self._histogram[rows] += 1
+                self._requests += len(items)
+                self._batches += 1
+
+            try:
+                outputs = self._predict(items, rows)
+            except Exception as e:
+                for _, future in items:
+                    future.set_exception(e)
+                continue
+
+            offset = 0
+            for images, future in items:
+                n = len(images)
+                future.set_result(outputs[offset:offset + n])
+                offset += n
+
+    def _predict(self, items, rows):
+        if len(items) == 1:
+            return np.asarray(self.predict_fn(items[0][0]))
+
+        batch = np.concatenate([images for images, _ in items], axis=0)
+        try:
+            return np.asarray(self.predict_fn(batch))
+        except Exception as e:
+            # Some exported signatures have a fixed batch dimension of 1.
+            # Fall back to one call per request so they keep working.
+            print(f"[BATCH] {self.name}: batched call with {rows} rows failed, "
+                  f"running requests one by one: {str(e)[:200]}")
+            with self._lock:
+                self._fallbacks += 1
+            return np.concatenate(
+                [np.asarray(self.predict_fn(images)) for images, _ in items], axis=0
+            )
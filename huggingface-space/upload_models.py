@@ -9,6 +9,9 @@ from huggingface_hub import HfApi, login
 import os
 import sys
 
+from tflite_backend import PARITY_REPORT_NAME, PRECISIONS, tflite_model_path
+from onnx_backend import PARITY_REPORT_NAME as ONNX_PARITY_REPORT_NAME, onnx_model_path
+
 # Configuration
 HF_USERNAME = "melihkzmz"  # Replace with your Hugging Face username
 REPO_PREFIX = "medianalytica"  # Will create repos like: medianalytica-skin-model, etc.
@@ -89,6 +92,30 @@ def upload_model(model_name, config):
                 repo_type="model"
             )
         
+        # TFLite / ONNX exports (export_model.py) + their parity reports, if present
+        export_files = []
+        for exports, report_name in (
+            ([tflite_model_path(local_path, p) for p in PRECISIONS], PARITY_REPORT_NAME),
+            ([onnx_model_path(local_path)], ONNX_PARITY_REPORT_NAME),
+        ):
+            exports = [p for p in exports if os.path.exists(p)]
+            report_path = os.path.join(os.path.dirname(local_path), report_name)
+            if exports and os.path.exists(report_path):
+                exports.append(report_path)
+            export_files.extend(exports)
+        # export_model.py manifest (signature output key, hashes)
+        manifest_file = os.path.join(os.path.dirname(local_path), f'{model_name}_manifest.json')
+        if os.path.exists(manifest_file):
+            export_files.append(manifest_file)
+        for path in export_files:
+            print(f"[UPLOAD] Uploading {os.path.basename(path)}...")
+            api.upload_file(
+                path_or_fileobj=path,
+                path_in_repo=os.path.basename(path),
+                repo_id=f"{HF_USERNAME}/{repo_name}",
+                repo_type="model"
+            )
+        
         print(f"[SUCCESS] {model_name} model uploaded successfully!")
         print(f"[INFO] Model available at: https://huggingface.co/{HF_USERNAME}/{repo_name}")
         return True
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Copy the shared inference modules into the Space
+The Space imports prediction_cache, preprocessing, warmup, tflite_backend,
+onnx_backend and manifest as top-level modules; the only maintained copy is
+Skin-Disease-Classifier/inference/. Run this before running app.py locally,
+upload_models.py, or uploading the Space files.
+
+Usage:
+  python vendor_inference.py           # copy changed modules
+  python vendor_inference.py --check   # exit 1 if a copy is missing or stale
+"""
+
+import argparse
+import filecmp
+import os
+import shutil
+import sys
+
+SPACE_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_DIR = os.path.join(SPACE_DIR, '..', 'Skin-Disease-Classifier', 'inference')
+
+# Modules without package-relative imports, so they also work flat in the Space
+VENDORED_MODULES = (
+    'manifest.py',
+    'onnx_backend.py',
+    'prediction_cache.py',
+    'preprocessing.py',
+    'tflite_backend.py',
+    'warmup.py',
+)
+
+
+def stale_modules(source_dir=SOURCE_DIR, target_dir=SPACE_DIR):
+    """Vendored modules that are missing from target_dir or differ from source_dir."""
+    return [
+        name for name in VENDORED_MODULES
+        if not os.path.exists(os.path.join(target_dir, name))
+        or not filecmp.cmp(os.path.join(source_dir, name), os.path.join(target_dir, name), shallow=False)
+    ]
+
+
+def vendor(source_dir=SOURCE_DIR, target_dir=SPACE_DIR):
+    """
+    Copy the stale modules from source_dir to target_dir.
+
+    Returns:
+        list of copied file names
+    """
+    copied = stale_modules(source_dir, target_dir)
+    for name in copied:
+        shutil.copyfile(os.path.join(source_dir, name), os.path.join(target_dir, name))
+    return copied
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--check', action='store_true', help="Only report missing or stale copies")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        stale = stale_modules()
+        for name in stale:
+            print(f"[STALE] {name}")
+        if stale:
+            print("Run: python vendor_inference.py")
+            return 1
+        print("Vendored inference modules are up to date")
+        return 0
+
+    copied = vendor()
+    for name in copied:
+        print(f"[COPIED] {name}")
+    print(f"{len(copied)} module(s) copied from {os.path.normpath(SOURCE_DIR)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
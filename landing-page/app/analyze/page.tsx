@@ -494,8 +494,7 @@ export default function AnalyzePage() {
 
       // Upload image to Firebase Storage
       const { ref, uploadBytes, getDownloadURL } = await import('firebase/storage')
-      const { storage, db } = await import('@/lib/firebase')
-      const { collection, addDoc, serverTimestamp } = await import('firebase/firestore')
+      const { storage } = await import('@/lib/firebase')
       
       console.log('Uploading image to Storage...')
       const storageRef = ref(storage, `analysis_images/${user.uid}/${Date.now()}_${imageFile.name}`)
@@ -506,7 +505,6 @@ export default function AnalyzePage() {
 
       // Prepare analysis data
       const analysisData = {
-        userId: user.uid,
         userEmail: user.email,
         diseaseType: diseaseType,
         results: results.top_3 && results.top_3.length > 0
@@ -521,16 +519,18 @@ export default function AnalyzePage() {
         topPrediction: results.prediction,
         topConfidence: results.confidence,
         imageUrl: imageUrl,
-        gradcamUrl: results.gradcam || null,
-        createdAt: serverTimestamp(),
-        updatedAt: serverTimestamp()
+        gradcamUrl: results.gradcam || null
       }
 
-      // Save directly to Firestore (no backend API needed)
-      console.log('Saving analysis to Firestore...')
-      const docRef = await addDoc(collection(db, 'analyses'), analysisData)
-      console.log('Analysis saved to Firestore:', docRef.id)
-      return docRef.id
+      // Saved through the auth API, which also updates userStats in the same batch
+      console.log('Saving analysis...')
+      const { authApiFetch } = await import('@/lib/authApi')
+      const saved = await authApiFetch(user, '/api/user/analyses', {
+        method: 'POST',
+        body: JSON.stringify(analysisData)
+      })
+      console.log('Analysis saved:', saved.analysisId)
+      return saved.analysisId as string
       
     } catch (error: any) {
       console.error('Error saving analysis:', error)
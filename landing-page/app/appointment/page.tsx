@@ -8,7 +8,7 @@ import { auth, db } from '@/lib/firebase'
 import { showToast } from '@/lib/utils'
 import { Calendar, Clock, FileText, User, ArrowLeft, CheckCircle2 } from 'lucide-react'
 import Link from 'next/link'
-import { generateJitsiRoomName } from '@/lib/appointmentUtils'
+import { generateJitsiRoomName, statusPriority } from '@/lib/appointmentUtils'
 
 export default function AppointmentPage() {
   const router = useRouter()
@@ -59,6 +59,7 @@ export default function AppointmentPage() {
         reason: formData.reason,
         doctorType: formData.doctorType,
         status: 'pending',
+        statusPriority: statusPriority('pending'),
         jitsiRoom: tempRoomName, // Will be updated when approved
         createdAt: serverTimestamp()
       })
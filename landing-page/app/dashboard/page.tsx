@@ -746,24 +746,14 @@ export default function DashboardPage() {
   const acceptAppointment = async (appointmentId: string) => {
     if (!user) return
     try {
-      const { doc, updateDoc, serverTimestamp, getDoc } = await import('firebase/firestore')
-      const { db } = await import('@/lib/firebase')
       const { generateJitsiRoomName } = await import('@/lib/appointmentUtils')
+      const { authApiFetch } = await import('@/lib/authApi')
       
-      // Get appointment to check if jitsiRoom exists
-      const appointmentRef = doc(db, 'appointments', appointmentId)
-      const appointmentDoc = await getDoc(appointmentRef)
-      const appointmentData = appointmentDoc.data()
-      
-      // Generate room name if not exists
-      const jitsiRoom = appointmentData?.jitsiRoom || generateJitsiRoomName(appointmentId)
-      
-      await updateDoc(appointmentRef, {
-        status: 'approved',
-        doctorId: user.uid,
-        jitsiRoom: jitsiRoom,
-        updatedAt: serverTimestamp(),
-        approvedAt: serverTimestamp()
+      // Status changes go through the API so the doctor's patient index is updated
+      // in the same transaction (the room name is only stored if none exists yet)
+      await authApiFetch(user, `/api/doctors/appointments/${appointmentId}/approve`, {
+        method: 'POST',
+        body: JSON.stringify({ action: 'approve', jitsiRoom: generateJitsiRoomName(appointmentId) })
       })
       
       showToast('Randevu onaylandı!', 'success')
@@ -778,13 +768,11 @@ export default function DashboardPage() {
   const rejectAppointment = async (appointmentId: string) => {
     if (!user) return
     try {
-      const { doc, updateDoc, serverTimestamp } = await import('firebase/firestore')
-      const { db } = await import('@/lib/firebase')
+      const { authApiFetch } = await import('@/lib/authApi')
       
-      await updateDoc(doc(db, 'appointments', appointmentId), {
-        status: 'rejected',
-        doctorId: user.uid,
-        updatedAt: serverTimestamp()
+      await authApiFetch(user, `/api/doctors/appointments/${appointmentId}/approve`, {
+        method: 'POST',
+        body: JSON.stringify({ action: 'reject' })
       })
       
       showToast('Randevu reddedildi.', 'info')
@@ -829,35 +817,13 @@ export default function DashboardPage() {
       const note = prompt('Tamamlanma notu (opsiyonel):')
       if (note === null) return // User cancelled
 
-      const { doc, updateDoc, serverTimestamp, getDoc } = await import('firebase/firestore')
-      const { db } = await import('@/lib/firebase')
-      
-      const appointmentRef = doc(db, 'appointments', appointmentId)
-      const appointmentDoc = await getDoc(appointmentRef)
-      
-      if (!appointmentDoc.exists()) {
-        showToast('Randevu bulunamadı.', 'error')
-        return
-      }
-      
-      const appointmentData = appointmentDoc.data()
-      
-      // Check if appointment is approved (only approved appointments can be completed)
-      if (appointmentData.status !== 'approved') {
-        showToast('Sadece onaylanmış randevular tamamlanabilir.', 'error')
-        return
-      }
-      
-      const updateData: any = {
-        status: 'completed',
-        updatedAt: serverTimestamp()
-      }
-      
-      if (note) {
-        updateData.completionNote = note
-      }
-      
-      await updateDoc(appointmentRef, updateData)
+      // The API checks that the appointment is approved and updates the
+      // patient index in the same transaction
+      const { authApiFetch } = await import('@/lib/authApi')
+      await authApiFetch(user, `/api/doctors/appointments/${appointmentId}/complete`, {
+        method: 'POST',
+        body: JSON.stringify(note ? { note } : {})
+      })
       
       showToast('Randevu tamamlandı olarak işaretlendi!', 'success')
       loadMyAppointments()
@@ -1377,8 +1343,7 @@ export default function DashboardPage() {
 
       // Upload image to Firebase Storage
       const { ref, uploadBytes, getDownloadURL } = await import('firebase/storage')
-      const { storage, db } = await import('@/lib/firebase')
-      const { collection, addDoc, serverTimestamp } = await import('firebase/firestore')
+      const { storage } = await import('@/lib/firebase')
       
       console.log('Uploading image to Storage...')
       const storageRef = ref(storage, `analysis_images/${user.uid}/${Date.now()}_${imageFile.name}`)
@@ -1389,7 +1354,6 @@ export default function DashboardPage() {
 
       // Prepare analysis data
       const analysisData = {
-        userId: user.uid,
         userEmail: user.email,
           diseaseType: diseaseType,
           results: results.top_3 && results.top_3.length > 0 
@@ -1404,16 +1368,18 @@ export default function DashboardPage() {
           topPrediction: results.prediction,
         topConfidence: results.confidence,
         imageUrl: imageUrl,
-        gradcamUrl: results.gradcam || null,
-        createdAt: serverTimestamp(),
-        updatedAt: serverTimestamp()
+        gradcamUrl: results.gradcam || null
       }
 
-      // Save directly to Firestore (no backend API needed)
-      console.log('Saving analysis to Firestore...')
-      const docRef = await addDoc(collection(db, 'analyses'), analysisData)
-      console.log('Analysis saved to Firestore:', docRef.id)
-      return docRef.id
+      // Saved through the auth API, which also updates userStats in the same batch
+      console.log('Saving analysis...')
+      const { authApiFetch } = await import('@/lib/authApi')
+      const saved = await authApiFetch(user, '/api/user/analyses', {
+        method: 'POST',
+        body: JSON.stringify(analysisData)
+      })
+      console.log('Analysis saved:', saved.analysisId)
+      return saved.analysisId as string
       
     } catch (error: any) {
       console.error('Error saving analysis:', error)
@@ -2,6 +2,21 @@
  * Utility functions for appointment management
  */
 
+/**
+ * Doctor queue order stored on each appointment as `statusPriority`
+ * (backend sorts and paginates the queue on it; keep in sync with utils/appointments.py)
+ */
+export const STATUS_PRIORITY: Record<string, number> = {
+  pending: 0,
+  approved: 1,
+  completed: 2,
+  rejected: 3
+}
+
+export function statusPriority(status: string): number {
+  return STATUS_PRIORITY[status] ?? 4
+}
+
 /**
  * Check if current time is within appointment window
  * Allows joining 30 minutes before and 30 minutes after scheduled time
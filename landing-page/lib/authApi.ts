@@ -0,0 +1,36 @@
+/**
+ * Auth API (Skin-Disease-Classifier/auth_api.py) client
+ */
+
+import { config } from './config'
+
+/**
+ * Call an auth API endpoint with the user's Firebase ID token.
+ * Writes that keep server-side aggregates up to date (userStats,
+ * the doctor -> patient index) go through the API instead of Firestore.
+ *
+ * Throws with the API's error message on a non-2xx response or `success: false`.
+ */
+export async function authApiFetch(
+  user: { getIdToken: () => Promise<string> },
+  path: string,
+  init: RequestInit = {}
+): Promise<any> {
+  if (!config.apiUrl) {
+    throw new Error('Auth API adresi yapılandırılmamış (NEXT_PUBLIC_API_URL)')
+  }
+  const token = await user.getIdToken()
+  const response = await fetch(`${config.apiUrl}${path}`, {
+    ...init,
+    headers: {
+      'Content-Type': 'application/json',
+      ...(init.headers || {}),
+      Authorization: `Bearer ${token}`
+    }
+  })
+  const data = await response.json().catch(() => ({}))
+  if (!response.ok || data.success === false) {
+    throw new Error(data.error || `HTTP ${response.status}`)
+  }
+  return data
+}
@@ -1,8 +1,12 @@
 export const config = {
   // API Configuration
-  apiUrl: typeof window !== 'undefined' && (window.location.hostname === 'localhost' || window.location.hostname === '127.0.0.1')
-    ? 'http://localhost:5001'
-    : null, // No backend deployed yet - set to null to disable API calls
+  // Auth API (auth_api.py): analyses are saved through it so userStats stays in sync.
+  // Production: set NEXT_PUBLIC_API_URL; localhost defaults to the dev server.
+  apiUrl: process.env.NEXT_PUBLIC_API_URL || (
+    typeof window !== 'undefined' && (window.location.hostname === 'localhost' || window.location.hostname === '127.0.0.1')
+      ? 'http://localhost:5001'
+      : null
+  ),
   
   // Hugging Face Space API URL for disease detection
   // Update this with your actual Space URL: https://YOUR_USERNAME-SPACE_NAME.hf.space